@@ -1,2 +1,13 @@
 # Required for ADK Web
-from . import agent
\ No newline at end of file
+#
+# El paquete no importa nada al cargarse: ADK Web busca `root_agent` en el paquete y
+# __getattr__ importa agent.py (y google.adk) y construye el agente solo en ese momento.
+import importlib
+
+
+def __getattr__(name: str):
+    if name == "root_agent":
+        return importlib.import_module(".agent", __name__).root_agent
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
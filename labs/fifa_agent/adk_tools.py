@@ -0,0 +1,60 @@
+# adk_tools.py
+
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.function_tool import FunctionTool
+from google.genai import types
+
+from .fifa_tools import ToolSpec
+
+# Declaración de cada herramienta del registro, generada una vez por proceso
+_DECLARATIONS: Dict[ToolSpec, types.FunctionDeclaration] = {}
+
+
+class RegisteredTool(BaseTool):
+    """
+    Herramienta de ADK para una entrada del registro de FIFATools.
+
+    FunctionTool copia en profundidad su declaración en cada petición al modelo y en cada
+    llamada prepara los argumentos por reflexión; el agente además envolvía cada
+    herramienta en un método async propio que solo reenviaba la llamada. Aquí la
+    declaración se genera una vez al arrancar y se comparte entre peticiones (nadie la
+    modifica: model_tiering filtra la lista, no las declaraciones), los argumentos se
+    comprueban con los parámetros precalculados de ToolSpec y run_async espera
+    directamente `call` (el prefetch del agente, que llega a FIFATools.call).
+    """
+
+    def __init__(self, tools: Any, spec: ToolSpec, call: Callable[..., Awaitable[Dict[str, Any]]]):
+        super().__init__(name=spec.name, description=spec.description)
+        self._spec = spec
+        self._call = call
+        declaration = _DECLARATIONS.get(spec)
+        if declaration is None:
+            declaration = _DECLARATIONS[spec] = FunctionTool(getattr(tools, spec.name))._get_declaration()
+        self._declaration = declaration
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self._declaration
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: Any) -> Dict[str, Any]:
+        spec = self._spec
+        missing = spec.required.difference(args)
+        if missing:
+            return {
+                "error": f"Faltan parámetros obligatorios de {spec.name}(): {', '.join(sorted(missing))}. "
+                         "Vuelve a llamar a la herramienta con todos ellos."
+            }
+        kwargs = {}
+        for name, _ in spec.defaults:
+            if name in args:
+                value = args[name]
+                if name in spec.integers and isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                kwargs[name] = value
+        return await self._call(spec.name, **kwargs)
+
+
+def build_tools(tools: Any, call: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None) -> List[RegisteredTool]:
+    """Una herramienta de ADK por entrada del registro; `call` por defecto es tools.run"""
+    return [RegisteredTool(tools, spec, call or tools.run) for spec in tools.registry.values()]
@@ -1,31 +1,41 @@
 # agent.py
 
 import asyncio
-from typing import Dict, Any, Optional
+import uuid
+from typing import Dict, Any, Optional, AsyncIterator
 from google.adk import Agent
-from google.adk.models.google_llm import Gemini
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import Runner
 from .fifa_tools import FIFATools
-from .config import MODEL_CONFIG, AGENT_CONFIG, SYSTEM_PROMPT
+from .adk_tools import build_tools
+from .response_cache import ResponseCache
+from .intent_router import IntentRouter
+from .model_tiering import ModelTiering
+from .context_window import ContextCompactor
+from .prompt_budget import PromptBudget
+from .streaming import StreamingResponder
+from .batch_runner import run_adk_query, record_exchange
+from .tracing import Tracer, get_tracer
+from .tool_executor import ToolExecutor
+from .prefetch import FollowUpPrefetcher
+from .session_store import CompactSessionService
+from .world_cup_data import get_data_store
+from .config import (MODEL_CONFIG, MODEL_POLICY_CONFIG, MODEL_TIERS_CONFIG, AGENT_CONFIG, SYSTEM_PROMPT,
+                     SYSTEM_PROMPT_SECTIONS, RESPONSE_CACHE_CONFIG, ROUTER_CONFIG, PROMPT_BUDGET_CONFIG, STREAMING_CONFIG,
+                     CONTEXT_WINDOW_CONFIG, TRACING_CONFIG, TOOL_EXECUTION_CONFIG, PREFETCH_CONFIG,
+                     SESSION_STORE_CONFIG)
 
 class FIFAWorldCupAgent(Agent):
     """Agente especializado en Copa Mundial de la FIFA que usa Gemini Flash 2.0 como fuente principal"""
     
-    def __init__(self):
-        # Configurar el modelo Gemini
-        model_kwargs = {
-            "model": MODEL_CONFIG["model_name"],
-            "location": MODEL_CONFIG["location"],
-            "temperature": MODEL_CONFIG["temperature"],
-            "max_tokens": MODEL_CONFIG["max_output_tokens"]
-        }
-        
-        # Usar API key o project_id según lo disponible
-        if MODEL_CONFIG["api_key"]:
-            model_kwargs["api_key"] = MODEL_CONFIG["api_key"]
-        elif MODEL_CONFIG["project_id"]:
-            model_kwargs["project_id"] = MODEL_CONFIG["project_id"]
-        
-        model = Gemini(**model_kwargs)
+    def __init__(self, model: Optional[BaseLlm] = None):
+        # Modelo inyectable; por defecto, uno por nivel de MODEL_TIERS_CONFIG según el tipo
+        # de consulta, compartidos por el proceso (una sola instancia y un solo pool de
+        # conexiones por modelo para todos los agentes) y cada uno con su política de hedge
+        tiering = ModelTiering.from_config(MODEL_TIERS_CONFIG, MODEL_CONFIG, MODEL_POLICY_CONFIG, model=model)
+        model = tiering.model
         
         # Configurar el agente directamente
         super().__init__(
@@ -37,64 +47,167 @@ class FIFAWorldCupAgent(Agent):
         
         # Inicializar herramientas después de super().__init__()
         self._fifa_tools = FIFATools()
+        # Timeout por herramienta y pool para las intensivas en CPU
+        self._tool_executor = ToolExecutor.from_config(self._fifa_tools, TOOL_EXECUTION_CONFIG)
+        # Herramientas de las preguntas de seguimiento probables, en segundo plano
+        self._prefetcher = FollowUpPrefetcher.from_config(self._tool_executor.run, PREFETCH_CONFIG)
+        # Clave de caché con los jugadores y países ya resueltos: las erratas comparten entrada
+        self._response_cache = ResponseCache.from_config(RESPONSE_CACHE_CONFIG, get_data_store().canonical_terms)
+        # Sin prefetch, router y herramientas llaman directamente al ejecutor
+        tool_call = self._prefetcher.run if self._prefetcher.enabled else self._tool_executor.run
+        self._router = IntentRouter.from_config(self._fifa_tools, ROUTER_CONFIG, call=tool_call)
         
-        # Registrar herramientas directamente en la lista tools
-        self.tools.extend([
-            self.search_world_cup_info,
-            self.get_player_statistics,
-            self.get_country_performance,
-            self.get_fun_facts
-        ])
-    
-    async def search_world_cup_info(self, query: str, year: Optional[int] = None) -> Dict[str, Any]:
-        """
-        Permite a Gemini buscar información específica sobre Mundiales.
+        # Enviar al modelo solo las secciones del prompt relevantes para cada consulta
+        self._prompt_budget = PromptBudget.from_config(SYSTEM_PROMPT_SECTIONS, PROMPT_BUDGET_CONFIG, self._router.classify)
+        # Compactar el historial de sesiones largas (ventana de turnos + resumen de los antiguos);
+        # va después del presupuesto de prompt para medir la instrucción ya recortada
+        self._context_window = ContextCompactor.from_config(CONTEXT_WINDOW_CONFIG)
+        # Modelo, tope de salida y herramientas del nivel de la consulta (tras el presupuesto
+        # de prompt, cuyo max_output_tokens limita)
+        self._model_tiering = tiering
+        # Clasifica con el router solo si prompt_budget no dejó la intención (desactivado)
+        self._model_tiering.classify = self._router.classify
+        self.before_model_callback = [
+            self._prompt_budget.before_model_callback,
+            self._model_tiering.before_model_callback,
+            self._context_window.before_model_callback,
+        ]
+        # Una pregunta sobre otras entidades cancela los prefetch pendientes
+        self.before_agent_callback = [self._prefetcher.before_agent_callback]
+        self._tracer = get_tracer(TRACING_CONFIG)
+        # Sesiones en bytes (memoria, SQLite o ficheros); solo las activas se deserializan
+        self._session_service = CompactSessionService.from_config(SESSION_STORE_CONFIG)
+        self._streaming = StreamingResponder(
+            self, self._router if ROUTER_CONFIG["enabled"] else None, self._response_cache,
+            tracer=self._tracer, session_service=self._session_service,
+            session_id=SESSION_STORE_CONFIG["cli_session_id"], observe=self._prefetcher.observe,
+            history_size=STREAMING_CONFIG["history_size"],
+        )
+        # Runner de process_query, creado con la primera consulta que llega al modelo
+        self._runner: Optional[Runner] = None
         
-        Args:
-            query: Consulta específica (ej: "ganador", "goleador", "final")
-            year: Año del Mundial (opcional)
-            
-        Returns:
-            Información que activa el conocimiento interno de Gemini
-        """
-        return await self._fifa_tools.search_world_cup_info(query, year)
-    
-    async def get_player_statistics(self, player_name: str, context: str = "world_cup") -> Dict[str, Any]:
-        """
-        Permite a Gemini proporcionar estadísticas de jugadores.
+        # Herramientas del registro de FIFATools: declaraciones generadas una vez y llamadas
+        # que van directas al prefetch (o, sin él, al ejecutor), sin métodos intermedios
+        self.tools.extend(build_tools(self._fifa_tools, tool_call))
         
-        Args:
-            player_name: Nombre del jugador
-            context: Contexto (ej: "world_cup", "career", "specific_year")
-            
-        Returns:
-            Información que activa el conocimiento interno de Gemini
-        """
-        return await self._fifa_tools.get_player_statistics(player_name, context)
+        # Spans de modelo y herramientas (al final: deben ver todos los callbacks y herramientas)
+        self._tracer.instrument(self)
+    
+    @property
+    def response_cache(self) -> ResponseCache:
+        """Caché de respuestas; stats() expone aciertos, tasa de acierto y latencia ahorrada"""
+        return self._response_cache
+    
+    @property
+    def router(self) -> IntentRouter:
+        """Router determinista; stats() expone cuántas consultas se resolvieron sin el modelo"""
+        return self._router
+    
+    @property
+    def fifa_tools(self) -> FIFATools:
+        """Núcleo de herramientas; stats() expone llamadas y resultados memorizados"""
+        return self._fifa_tools
+
+    @property
+    def tool_executor(self) -> ToolExecutor:
+        """Ejecución de herramientas; stats() expone llamadas, timeouts y tiempo medio por herramienta"""
+        return self._tool_executor
+    
+    @property
+    def prefetcher(self) -> FollowUpPrefetcher:
+        """Prefetch de seguimientos; stats() expone la proporción de aciertos"""
+        return self._prefetcher
     
-    async def get_country_performance(self, country: str) -> Dict[str, Any]:
+    @property
+    def prompt_budget(self) -> PromptBudget:
+        """Presupuesto de prompt; stats() expone los tokens de entrada ahorrados por petición"""
+        return self._prompt_budget
+    
+    @property
+    def model_tiering(self) -> ModelTiering:
+        """Niveles de modelo; stats() expone peticiones por nivel y el coste del clasificador"""
+        return self._model_tiering
+    
+    @property
+    def context_window(self) -> ContextCompactor:
+        """Compactación del historial; stats() expone los tokens de historial ahorrados por petición"""
+        return self._context_window
+    
+    @property
+    def tracer(self) -> Tracer:
+        """Trazas de modelo y herramientas (TRACING_CONFIG); sin coste si están desactivadas"""
+        return self._tracer
+    
+    @property
+    def streaming(self) -> StreamingResponder:
+        """Respuestas en streaming; last_metrics y stats() exponen el TTFT y la latencia total"""
+        return self._streaming
+    
+    @property
+    def session_service(self) -> CompactSessionService:
+        """Sesiones de conversación persistentes (SESSION_STORE_CONFIG); stats() expone cargas y bytes"""
+        return self._session_service
+    
+    async def process_query(self, query: str, context: Dict[str, Any]) -> str:
         """
-        Permite a Gemini proporcionar información sobre el rendimiento de países.
+        Responde una consulta pasando primero por el router de intenciones y la caché.
         
-        Args:
-            country: Nombre del país
-            
-        Returns:
-            Información que activa el conocimiento interno de Gemini
+        Las preguntas factuales simples ("¿Quién ganó en 2014?") se responden con las
+        herramientas locales sin llamar al modelo. Las casi idénticas a una anterior
+        reutilizan la respuesta en caché; las sensibles al tiempo siempre van al modelo.
+        `context` guarda entre consultas el id de la conversación ("session_id").
         """
-        return await self._fifa_tools.get_country_performance(country)
+        with self._tracer.span("fifa.query") as span:
+            # La conversación de `context` (con la primera consulta se abre una y su id queda en él)
+            session_id = context.setdefault("session_id", SESSION_STORE_CONFIG["cli_session_id"] or uuid.uuid4().hex)
+            # Pregunta nueva de la sesión: cancela los prefetch de entidades que ya no menciona
+            self._prefetcher.observe(query, session_id)
+            if ROUTER_CONFIG["enabled"]:
+                answer = await self._router.answer(query)
+                if answer is not None:
+                    span.set("fifa.source", "router")
+                    # En el historial, para las preguntas de seguimiento que lleguen al modelo
+                    await record_exchange(self._get_runner(), query, answer, "cli_user", session_id)
+                    return answer
+            
+            computed = False
+            
+            async def compute() -> str:
+                nonlocal computed
+                computed = True
+                return await self._run_model(query, session_id)
+            
+            response = await self._response_cache.get_or_compute(query, compute)
+            span.set("fifa.source", "model" if computed else "cache")
+            span.set("fifa.cache_hit", not computed)
+            if not computed:
+                await record_exchange(self._get_runner(), query, response, "cli_user", session_id)
+            return response
+    
+    async def _run_model(self, query: str, session_id: str) -> str:
+        """Respuesta del modelo por el Runner de ADK, en la sesión persistente `session_id`"""
+        return await run_adk_query(self._get_runner(), query, user_id="cli_user", session_id=session_id)
     
-    async def get_fun_facts(self, topic: str = "general") -> Dict[str, Any]:
+    def _get_runner(self) -> Runner:
+        # El Runner se crea con la primera consulta que lo necesita
+        if self._runner is None:
+            self._runner = Runner(
+                app_name="fifa_cli", agent=self, session_service=self._session_service,
+                artifact_service=InMemoryArtifactService(), memory_service=InMemoryMemoryService(),
+            )
+        return self._runner
+    
+    def stream_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
         """
-        Permite a Gemini compartir datos curiosos sobre la Copa del Mundo.
+        Igual que process_query, pero genera el texto a medida que el modelo lo produce.
         
-        Args:
-            topic: Tema específico (ej: "records", "history", "players")
-            
-        Returns:
-            Información que activa el conocimiento interno de Gemini
+        Las respuestas del router y de la caché llegan en un único trozo.
         """
-        return await self._fifa_tools.get_fun_facts(topic)
+        session_id = None
+        if context is not None:
+            # La misma conversación que process_query con ese `context`
+            session_id = context.setdefault("session_id", SESSION_STORE_CONFIG["cli_session_id"] or uuid.uuid4().hex)
+        return self._streaming.stream(query, session_id)
 
 async def main():
     """Función principal para probar el agente"""
@@ -105,7 +218,10 @@ async def main():
     
     print("🏆 FIFA World Cup Agent - ¡Pregúntame sobre la Copa del Mundo!")
     print("Ejemplos: '¿Quién ganó en 2014?', '¿Cuántos goles hizo Messi en 2022?', '¿Qué país tiene más Mundiales?'")
-    print("Escribe 'salir' para terminar.\n")
+    if SESSION_STORE_CONFIG["cli_session_id"]:
+        # La conversación vive en el almacén de sesiones: un reinicio la retoma donde quedó
+        print(f"💾 Conversación '{SESSION_STORE_CONFIG['cli_session_id']}' "
+              f"(almacén {SESSION_STORE_CONFIG['backend']})\n")
     
     while True:
         try:
@@ -119,9 +235,21 @@ async def main():
                 continue
             
             print("🤖 Gemini está procesando tu pregunta...")
-            # Ahora Gemini decide si usar herramientas y cómo responder
-            response = await agent.run(query, context)
-            print(f"🏆 Agente: {response}\n")
+            if STREAMING_CONFIG["enabled"]:
+                # Mostrar la respuesta a medida que llega en lugar de esperar al texto completo
+                print("🏆 Agente: ", end="", flush=True)
+                async for chunk in agent.stream_query(query, context):
+                    print(chunk, end="", flush=True)
+                print()
+                if STREAMING_CONFIG["show_timings"]:
+                    metrics = agent.streaming.last_metrics
+                    print(f"⏱️  Primer token: {metrics.ttft_seconds * 1000:.0f} ms | "
+                          f"Total: {metrics.total_seconds * 1000:.0f} ms ({metrics.source})")
+                print()
+            else:
+                # Ahora Gemini decide si usar herramientas y cómo responder (con caché de respuestas)
+                response = await agent.process_query(query, context)
+                print(f"🏆 Agente: {response}\n")
             
         except KeyboardInterrupt:
             print("\n👋 ¡Hasta luego!")
@@ -134,9 +262,17 @@ def get_agent():
     """Función requerida por ADK Web para obtener el agente"""
     return FIFAWorldCupAgent()
 
+def __getattr__(name: str):
+    """
+    root_agent perezoso para ADK Web: el agente se construye la primera vez que
+    se accede a él (no al importar el módulo) y se reutiliza después
+    """
+    if name == "root_agent":
+        agent = get_agent()
+        globals()["root_agent"] = agent
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 if __name__ == "__main__":
     # Ejecutar en modo CLI
     asyncio.run(main())
-else:
-    # Ejecutar en modo ADK Web
-    root_agent = get_agent()
\ No newline at end of file
@@ -0,0 +1,251 @@
+# aggregates.py
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Dict, Any, Optional, List, Iterable, Tuple, Union
+
+from .columnar import writable
+
+# Resultados por país que se materializan (años de cada resultado)
+COUNTRY_RESULTS = ("titles", "runner_up", "third_place", "hosted")
+
+
+class Leaderboard:
+    """
+    Clasificación ordenada por una clave (tupla, menor = mejor) que se actualiza
+    entidad a entidad: top(k) y rank() no recorren ni reordenan las demás
+    """
+
+    def __init__(self, keys: Optional[Dict[str, Tuple]] = None):
+        self._keys: Dict[str, Tuple] = dict(keys or {})
+        self._order: List[Tuple[Tuple, str]] = sorted((key, entity) for entity, key in self._keys.items())
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def update(self, entity: str, key: Tuple):
+        old = self._keys.get(entity)
+        if old is not None:
+            del self._order[bisect_left(self._order, (old, entity))]
+        self._keys[entity] = key
+        insort(self._order, (key, entity))
+
+    def top(self, limit: Optional[int] = None) -> List[str]:
+        return [entity for _, entity in self._order[:limit]]
+
+    def rank(self, entity: str) -> Optional[int]:
+        key = self._keys.get(entity)
+        if key is None:
+            return None
+        return bisect_left(self._order, (key, entity)) + 1
+
+    def ranked(self) -> List[Tuple[str, Tuple]]:
+        """(entidad, clave) del primero al último"""
+        return [(entity, key) for key, entity in self._order]
+
+
+class ColumnarLeaderboard:
+    """
+    Clasificación de solo lectura sobre las filas [start, start + rows) de la tabla
+    "leaderboards" del .wcc, guardadas ya en orden: top(k) lee k filas del mmap y no
+    construye nada al abrir el archivo. AggregateTables la convierte en Leaderboard
+    la primera vez que tiene que actualizarla (append_tournament)
+    """
+
+    def __init__(self, table: Any, start: int, rows: int):
+        self._table = table
+        self._start = start
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def top(self, limit: Optional[int] = None) -> List[str]:
+        count = self._rows if limit is None else min(limit, self._rows)
+        if count <= 0:
+            return []
+        return self._table.column("entity")[self._start:self._start + count]
+
+    def rank(self, entity: str) -> Optional[int]:
+        entities = self._table.column("entity")
+        for offset in range(self._rows):
+            if entities[self._start + offset] == entity:
+                return offset + 1
+        return None
+
+    def ranked(self) -> List[Tuple[str, Tuple]]:
+        if not self._rows:
+            return []
+        end = self._start + self._rows
+        entities, keys = self._table.column("entity"), self._table.column("key")
+        return [(entity, tuple(key)) for entity, key in zip(entities[self._start:end], keys[self._start:end])]
+
+    def to_leaderboard(self) -> Leaderboard:
+        return Leaderboard(dict(self.ranked()))
+
+
+class AggregateTables:
+    """
+    Tablas agregadas y clasificaciones materializadas del dataset.
+
+    Las preguntas más frecuentes de get_country_performance y get_player_statistics
+    (títulos por país, finales, máximos goleadores) son agregaciones; aquí se calculan
+    una vez al cargar el dataset (o al convertirlo a .wcc) y las herramientas solo las
+    consultan. add_tournament() incorpora un Mundial nuevo actualizando únicamente las
+    filas y clasificaciones de los países y jugadores que participan en él.
+
+    Desde un .wcc (from_columnar) las tablas son vistas de solo lectura sobre el mmap:
+    abrirlas no lee ninguna fila, y add_tournament escribe los cambios encima.
+
+    Clasificaciones (boards): "titles", "finals" y "scorers", más una por confederación
+    ("titles:UEFA", "scorers:CONMEBOL", ...) y una de goleadores por Mundial ("scorers:2014").
+    """
+
+    def __init__(self, country_results: Mapping, confederations: Mapping, player_totals: Mapping,
+                 boards: Dict[str, Union[Leaderboard, ColumnarLeaderboard]]):
+        self.country_results = country_results
+        self.confederations = confederations
+        # id de jugador -> [goles, partidos, código de país]
+        self.player_totals = player_totals
+        self.boards = boards
+
+    @classmethod
+    def build(cls, tournaments: Iterable[Dict[str, Any]], countries: Iterable[Dict[str, Any]],
+              players: Iterable[Dict[str, Any]]) -> "AggregateTables":
+        """Calcula todas las tablas recorriendo el dataset una sola vez"""
+        tables = cls({}, {c["code"]: c["confederation"] for c in countries}, {}, {})
+        for tournament in sorted(tournaments, key=lambda t: t["year"]):
+            tables._add_results(tournament)
+
+        scorers: Dict[str, Dict[str, Tuple]] = defaultdict(dict)
+        for player in players:
+            tables.player_totals[player["id"]] = [player["goals"], player["matches"], player["country"]]
+            key = (-player["goals"], player["matches"])
+            scorers["scorers"][player["id"]] = key
+            scorers[f"scorers:{tables.confederations.get(player['country'])}"][player["id"]] = key
+            for year, goals in player["goals_by_year"].items():
+                scorers[f"scorers:{year}"][player["id"]] = (-goals,)
+
+        for code in tables.country_results:
+            for name, key in tables._country_keys(code):
+                tables._board(name).update(code, key)
+        for name, keys in scorers.items():
+            tables.boards[name] = Leaderboard(keys)
+        return tables
+
+    def add_tournament(self, tournament: Dict[str, Any],
+                       player_stats: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+        """
+        Incorpora un Mundial. player_stats: id de jugador -> {"goals", "matches", "country"}
+        con lo que cada jugador sumó en ese torneo.
+
+        Returns:
+            Clasificaciones que han cambiado
+        """
+        year = tournament["year"]
+        # Las tablas pueden ser vistas de solo lectura del .wcc: los cambios van encima
+        self.country_results = writable(self.country_results)
+        self.player_totals = writable(self.player_totals)
+        touched = set()
+        for code in self._add_results(tournament):
+            for name, key in self._country_keys(code):
+                self._board(name).update(code, key)
+                touched.add(name)
+
+        for player_id, stats in (player_stats or {}).items():
+            totals = list(self.player_totals.get(player_id) or [0, 0, stats.get("country")])
+            totals[0] += stats.get("goals", 0)
+            totals[1] += stats.get("matches", 0)
+            self.player_totals[player_id] = totals
+            key = (-totals[0], totals[1])
+            for name in ("scorers", f"scorers:{self.confederations.get(totals[2])}"):
+                self._board(name).update(player_id, key)
+                touched.add(name)
+            if stats.get("goals"):
+                self._board(f"scorers:{year}").update(player_id, (-stats["goals"],))
+                touched.add(f"scorers:{year}")
+        return sorted(touched)
+
+    def _add_results(self, tournament: Dict[str, Any]) -> List[str]:
+        """Añade los resultados del torneo a country_results; devuelve los países afectados"""
+        year = tournament["year"]
+        placed = [
+            ("titles", tournament["winner"]),
+            ("runner_up", tournament["runner_up"]),
+            ("third_place", tournament["third_place"]),
+            *(("hosted", host) for host in tournament["hosts"]),
+        ]
+        # Copias de las filas afectadas (las del .wcc se decodifican en cada lectura)
+        updated: Dict[str, Dict[str, List[int]]] = {}
+        for result, code in placed:
+            if code not in updated:
+                current = self.country_results.get(code)
+                updated[code] = {name: list(current[name]) if current else [] for name in COUNTRY_RESULTS}
+            years = updated[code][result]
+            if year not in years:
+                insort(years, year)
+        self.country_results.update(updated)
+        return list(updated)
+
+    def _country_keys(self, code: str) -> List[Tuple[str, Tuple]]:
+        """Claves de orden del país en cada clasificación de países (sin entradas vacías)"""
+        results = self.country_results[code]
+        finals = sorted(results["titles"] + results["runner_up"])
+        confederation = self.confederations.get(code)
+        keys = []
+        if results["titles"]:
+            key = (-len(results["titles"]), results["titles"][0])
+            keys += [("titles", key), (f"titles:{confederation}", key)]
+        if finals:
+            key = (-len(finals), -len(results["titles"]), finals[0])
+            keys += [("finals", key), (f"finals:{confederation}", key)]
+        return keys
+
+    def _board(self, name: str) -> Leaderboard:
+        board = self.boards.get(name)
+        if board is None:
+            board = self.boards[name] = Leaderboard()
+        elif not isinstance(board, Leaderboard):
+            # Clasificación de solo lectura del .wcc: se materializa al actualizarla
+            board = self.boards[name] = board.to_leaderboard()
+        return board
+
+    def top(self, board: str, limit: Optional[int] = None) -> List[str]:
+        """Ids (código de país o id de jugador) de la clasificación, del primero al último"""
+        leaderboard = self.boards.get(board)
+        return leaderboard.top(limit) if leaderboard is not None else []
+
+    def results(self, code: str) -> Dict[str, List[int]]:
+        return self.country_results.get(code) or {name: [] for name in COUNTRY_RESULTS}
+
+    def export_tables(self) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[int]]]:
+        """
+        Filas de las tablas que se guardan en el .wcc y, para el header, la posición
+        [primera fila, filas] de cada clasificación dentro de la tabla "leaderboards"
+        """
+        leaderboards: List[Dict[str, Any]] = []
+        ranges: Dict[str, List[int]] = {}
+        for name, board in self.boards.items():
+            ranges[name] = [len(leaderboards), len(board)]
+            leaderboards.extend({"entity": entity, "key": list(key)} for entity, key in board.ranked())
+        tables = {
+            "country_results": [{"code": code, "results": results} for code, results in self.country_results.items()],
+            "player_totals": [{"id": player_id, "totals": totals} for player_id, totals in self.player_totals.items()],
+            "leaderboards": leaderboards,
+        }
+        return tables, ranges
+
+    @classmethod
+    def from_columnar(cls, source: Any) -> "AggregateTables":
+        """Tablas sobre un .wcc abierto (ColumnarFile) escrito con export_tables()"""
+        leaderboards = source.table("leaderboards")
+        return cls(
+            country_results=source.table("country_results").values_of("results"),
+            confederations=source.table("countries").values_of("confederation"),
+            player_totals=source.table("player_totals").values_of("totals"),
+            boards={
+                name: ColumnarLeaderboard(leaderboards, start, rows)
+                for name, (start, rows) in source.meta["aggregate_boards"].items()
+            },
+        )
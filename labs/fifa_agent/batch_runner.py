@@ -0,0 +1,226 @@
+# batch_runner.py
+
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, Iterator, TextIO
+
+from google.adk.agents.invocation_context import new_invocation_context_id
+from google.adk.events import Event
+from google.adk.runners import InMemoryRunner, Runner
+from google.genai import types
+
+
+class TokenBucket:
+    """
+    Limitador de tasa tipo token bucket para respetar la cuota del modelo (peticiones por minuto).
+
+    Se recargan `rate` tokens por segundo hasta `capacity`; acquire() espera hasta
+    que haya tokens suficientes, así que admite ráfagas cortas sin superar la tasa media.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: Optional[float] = None) -> "TokenBucket":
+        return cls(requests_per_minute / 60.0, burst or max(1.0, requests_per_minute / 60.0))
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        # El lock mantiene el orden de llegada: una petición grande no se adelanta
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """429 (cuota agotada) y errores 5xx del servidor se reintentan; el resto no"""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return isinstance(code, int) and (code == 429 or 500 <= code < 600)
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Backoff exponencial con jitter completo: uniforme entre 0 y min(maximum, base * 2^attempt)"""
+    return random.uniform(0.0, min(maximum, base * (2 ** attempt)))
+
+
+async def run_adk_query(runner: Runner, query: str, user_id: str = "batch", session_id: Optional[str] = None) -> str:
+    """
+    Ejecuta una consulta en una sesión nueva de ADK (las preguntas del lote son
+    independientes) o, con `session_id`, en esa conversación (se crea si no existe).
+
+    La sesión nueva de una pregunta sin `session_id` se borra al terminar: en un lote
+    nocturno el servicio de sesiones en memoria crecería con cada pregunta.
+    """
+    service = runner.session_service
+    session = None
+    if session_id is not None:
+        session = await service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    if session is None:
+        session = await service.create_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    message = types.Content(role="user", parts=[types.Part(text=query)])
+    answer = ""
+    try:
+        async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+            if event.is_final_response() and event.content and event.content.parts:
+                answer = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+    finally:
+        if session_id is None:
+            await service.delete_session(app_name=runner.app_name, user_id=user_id, session_id=session.id)
+    return answer
+
+
+async def record_exchange(runner: Runner, query: str, answer: str, user_id: str, session_id: str):
+    """
+    Guarda en la sesión `session_id` (se crea si no existe) una pregunta respondida sin
+    el modelo (router o caché) y su respuesta, como eventos del usuario y del agente: una
+    pregunta de seguimiento que sí llegue al modelo la tiene en el historial
+    """
+    service = runner.session_service
+    session = await service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    if session is None:
+        session = await service.create_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    invocation_id = new_invocation_context_id()
+    for author, role, text in (("user", "user", query), (runner.agent.name, "model", answer)):
+        content = types.Content(role=role, parts=[types.Part(text=text)])
+        await service.append_event(session, Event(invocation_id=invocation_id, author=author, content=content))
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Lee preguntas {"id"?, "query"} de forma perezosa (los lotes nocturnos son grandes)"""
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            item.setdefault("id", number)
+            yield item
+
+
+class BatchRunner:
+    """
+    Ejecuta lotes de preguntas contra el agente con concurrencia acotada.
+
+    Cada pregunta pasa por el router y la caché del agente; solo las que llegan al
+    modelo consumen cuota del token bucket y se reintentan con backoff exponencial
+    con jitter ante 429/5xx. Los resultados se escriben en JSONL según terminan,
+    así que un lote de decenas de miles de preguntas no se acumula en memoria.
+    """
+
+    def __init__(self, agent: Any, concurrency: int = 16, requests_per_minute: float = 600,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 model_call: Optional[Callable[[str], Awaitable[str]]] = None):
+        self._agent = agent
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._bucket = TokenBucket.per_minute(requests_per_minute)
+        if model_call is None:
+            runner = InMemoryRunner(agent=agent, app_name="fifa_batch")
+            model_call = lambda query: run_adk_query(runner, query)
+        self._model_call = model_call
+        self._counters = {"completed": 0, "failed": 0, "retries": 0, "model_calls": 0}
+
+    @classmethod
+    def from_config(cls, agent: Any, config: Dict[str, Any], **kwargs) -> "BatchRunner":
+        return cls(
+            agent,
+            concurrency=config["concurrency"],
+            requests_per_minute=config["requests_per_minute"],
+            max_retries=config["max_retries"],
+            backoff_base=config["backoff_base_seconds"],
+            backoff_max=config["backoff_max_seconds"],
+            **kwargs,
+        )
+
+    async def _call_model(self, query: str) -> str:
+        attempt = 0
+        while True:
+            await self._bucket.acquire()
+            self._counters["model_calls"] += 1
+            try:
+                return await self._model_call(query)
+            except Exception as error:
+                if attempt >= self.max_retries or not is_retryable(error):
+                    raise
+                self._counters["retries"] += 1
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+                attempt += 1
+
+    async def answer(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Responde una pregunta del lote y devuelve la fila de resultado"""
+        query = item["query"]
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"id": item["id"], "query": query}
+        try:
+            answer = await self._agent.router.answer(query)
+            source = "router"
+            if answer is None:
+                computed = False
+
+                async def compute() -> str:
+                    nonlocal computed
+                    computed = True
+                    return await self._call_model(query)
+
+                answer = await self._agent.response_cache.get_or_compute(query, compute)
+                source = "model" if computed else "cache"
+            result.update(answer=answer, source=source)
+            self._counters["completed"] += 1
+        except Exception as error:
+            result["error"] = f"{type(error).__name__}: {error}"
+            self._counters["failed"] += 1
+        result["latency_seconds"] = round(time.perf_counter() - start, 4)
+        return result
+
+    async def run(self, items: Iterator[Dict[str, Any]], output: TextIO) -> Dict[str, Any]:
+        """
+        Procesa todas las preguntas con `concurrency` workers y escribe cada resultado
+        en `output` (una línea JSON) en cuanto está listo, en orden de finalización.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        start = time.perf_counter()
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                result = await self.answer(item)
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            # La cola acotada aplica contrapresión: la entrada se lee al ritmo de los workers
+            for item in items:
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        stats = self.stats()
+        stats["elapsed_seconds"] = time.perf_counter() - start
+        return stats
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
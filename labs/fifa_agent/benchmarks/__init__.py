@@ -0,0 +1 @@
+# Benchmarks del FIFA Agent (se ejecutan con python -m fifa_agent.benchmarks.<nombre>)
@@ -0,0 +1,97 @@
+# bench_aggregates.py
+#
+# Latencia de las consultas agregadas (títulos por país, máximos goleadores, rendimiento
+# de un país) con las tablas materializadas de aggregates.py frente al recorrido del
+# dataset en cada llamada, y coste de añadir un Mundial frente a recalcularlo todo:
+#
+#   python -m fifa_agent.benchmarks.bench_aggregates [--players 20000] [--repeat 2000]
+#
+# --players añade jugadores sintéticos (semilla fija) para ver cómo escala cada opción.
+
+import argparse
+import random
+import time
+from typing import Dict, Any, List, Callable
+
+from ..aggregates import AggregateTables
+from ..config import DATA_CONFIG
+from ..world_cup_data import WorldCupDataStore
+
+
+def legacy_title_ranking(store: WorldCupDataStore) -> List[Dict[str, Any]]:
+    """Implementación anterior: recorre los torneos y ordena en cada llamada"""
+    titles: Dict[str, List[int]] = {}
+    for year in sorted(store._tournaments):
+        titles.setdefault(store._tournaments[year]["winner"], []).append(year)
+    ranking = sorted(titles.items(), key=lambda item: (-len(item[1]), item[1][0]))
+    return [{"country": store.country_name(code), "titles": len(years), "years": years} for code, years in ranking]
+
+
+def legacy_top_scorers(store: WorldCupDataStore, limit: int = 10) -> List[Dict[str, Any]]:
+    """Implementación anterior: ordena todos los jugadores en cada llamada"""
+    players = sorted(store._players.values(), key=lambda p: (-p["goals"], p["matches"]))
+    return [
+        {"player": p["name"], "country": store.country_name(p["country"]), "goals": p["goals"], "matches": p["matches"]}
+        for p in players[:limit]
+    ]
+
+
+def with_synthetic_players(store: WorldCupDataStore, count: int, seed: int) -> WorldCupDataStore:
+    rng = random.Random(seed)
+    codes = list(store._countries)
+    years = [str(year) for year in store.years]
+    players = dict(store._players)
+    for i in range(count):
+        played = rng.sample(years, rng.randint(1, 3))
+        goals_by_year = {year: rng.randint(0, 3) for year in played}
+        players[f"synthetic{i}"] = {
+            "id": f"synthetic{i}", "name": f"Jugador Sintético {i}", "country": rng.choice(codes),
+            "goals": sum(goals_by_year.values()), "matches": rng.randint(len(played), 7 * len(played)),
+            "goals_by_year": goals_by_year, "titles": [], "highlights": [],
+        }
+    return WorldCupDataStore(store._tournaments, store._finals, store._countries, players, store._fun_facts)
+
+
+def measure(function: Callable[[], Any], repeat: int) -> float:
+    """Tiempo medio por llamada (µs)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas agregadas materializadas frente a recorridos")
+    parser.add_argument("--players", type=int, default=20000, help="Jugadores sintéticos añadidos")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    base = WorldCupDataStore.from_columnar(DATA_CONFIG["columnar_path"])
+    for label, store in (("dataset .wcc", base),
+                         (f"+{args.players} jugadores", with_synthetic_players(base, args.players, args.seed))):
+        store.aggregates  # Materializar antes de medir (en el .wcc ya vienen calculados)
+        repeat = args.repeat if store is base else max(1, args.repeat // 100)
+        print(f"📊 {label}: {len(store._players)} jugadores, {len(store.years)} Mundiales")
+        for name, legacy, materialized in (
+            ("title_ranking", lambda: legacy_title_ranking(store), store.title_ranking),
+            ("top_scorers", lambda: legacy_top_scorers(store), store.top_scorers),
+        ):
+            before, after = measure(legacy, repeat), measure(materialized, repeat)
+            print(f"   {name:<14} recorrido {before:9.1f} µs | materializado {after:6.1f} µs | x{before / after:.0f}")
+
+        players = list(store._players.values())
+        rebuild = measure(lambda: AggregateTables.build(store._tournaments.values(), store._countries.values(),
+                                                        players), 1)
+        tournament = {"year": 2026, "hosts": ["USA", "MEX", "CAN"], "winner": "ARG", "runner_up": "FRA",
+                      "third_place": "BRA", "teams": 48, "matches": 104, "goals": 0, "top_scorers": []}
+        player_stats = {player_id: {"goals": 1, "matches": 7} for player_id in list(store._players)[:50]}
+        start = time.perf_counter()
+        touched = store.append_tournament(tournament, player_stats=player_stats)
+        append = (time.perf_counter() - start) * 1e6
+        print(f"   añadir 2026 ({len(player_stats)} jugadores): {append:.0f} µs, {len(touched)} clasificaciones "
+              f"| recalcular todo: {rebuild:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# bench_columnar.py
+#
+# Compara el arranque y la memoria del loader JSON (dict de dicts) con el
+# formato columnar abierto con mmap, sobre un dataset sintético ampliado.
+# "RSS" incluye las páginas del archivo mapeado (compartibles entre workers);
+# "anónima" es la memoria propia de cada proceso (heap de Python).
+#
+#   python -m fifa_agent.benchmarks.bench_columnar --players 50000 --matches 200000
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Any
+
+from ..config import DATA_CONFIG
+from ..convert_dataset import convert_dataset
+
+LABS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Se ejecuta en un proceso nuevo por medición para que ningún loader herede la caché del otro
+_CHILD = r"""
+import json, sys, time
+
+def memory():
+    values = {"rss": 0, "anonymous": 0}
+    try:
+        with open("/proc/self/smaps_rollup") as handle:
+            for line in handle:
+                name, _, rest = line.partition(":")
+                if name == "Rss":
+                    values["rss"] += int(rest.split()[0])
+                elif name == "Anonymous":
+                    values["anonymous"] += int(rest.split()[0])
+    except OSError:
+        import resource
+        values["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return values
+
+mode, path = sys.argv[1], sys.argv[2]
+from fifa_agent.world_cup_data import WorldCupDataStore
+
+before = memory()
+start = time.perf_counter()
+store = WorldCupDataStore.from_json(path) if mode == "json" else WorldCupDataStore.from_columnar(path)
+loaded = time.perf_counter()
+store.lookup_world_cup_info("ganador", 2014)
+store.lookup_player("Lionel Messi", "2022")
+store.lookup_country("Brasil")
+first_answer = time.perf_counter()
+after = memory()
+
+print(json.dumps({
+    "load_ms": (loaded - start) * 1000,
+    "first_answer_ms": (first_answer - start) * 1000,
+    "rss_kb": after["rss"] - before["rss"],
+    "anonymous_kb": after["anonymous"] - before["anonymous"],
+}))
+"""
+
+
+def build_synthetic_dataset(players: int, matches: int, seed: int = 7) -> Dict[str, Any]:
+    """Amplía el dataset real con jugadores y partidos sintéticos"""
+    with open(DATA_CONFIG["dataset_path"], encoding="utf-8") as handle:
+        data = json.load(handle)
+
+    rng = random.Random(seed)
+    base_players = list(data["players"])
+    codes = [c["code"] for c in data["countries"]]
+    years = [t["year"] for t in data["tournaments"]]
+
+    for i in range(players):
+        template = base_players[i % len(base_players)]
+        data["players"].append({
+            "id": f"{template['id']}_{i}",
+            "name": f"{template['name']} {i}",
+            "country": rng.choice(codes),
+            "goals": rng.randint(0, 10),
+            "matches": rng.randint(1, 20),
+            "goals_by_year": {str(rng.choice(years)): rng.randint(0, 5)},
+            "titles": [],
+        })
+
+    for _ in range(matches):
+        home, away = rng.sample(codes, 2)
+        data["matches"].append({
+            "year": rng.choice(years),
+            "stage": "group",
+            "home": home,
+            "away": away,
+            "score": f"{rng.randint(0, 4)}-{rng.randint(0, 4)}",
+        })
+    return data
+
+
+def measure(mode: str, path: str, runs: int) -> Dict[str, float]:
+    env = dict(os.environ, PYTHONPATH=LABS_DIR)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD, mode, path],
+            capture_output=True, text=True, check=True, env=env, cwd=LABS_DIR,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    # Mediana por métrica
+    return {key: sorted(s[key] for s in samples)[len(samples) // 2] for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs columnar (mmap)")
+    parser.add_argument("--players", type=int, default=50000)
+    parser.add_argument("--matches", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        json_path = os.path.join(workdir, "world_cup.json")
+        columnar_path = os.path.join(workdir, "world_cup.wcc")
+        with open(json_path, "w", encoding="utf-8") as handle:
+            json.dump(build_synthetic_dataset(args.players, args.matches), handle, ensure_ascii=False)
+        convert_dataset(json_path, columnar_path)
+
+        print(f"📦 Dataset: {args.players} jugadores extra, {args.matches} partidos extra")
+        print(f"   JSON: {os.path.getsize(json_path) / 1e6:.1f} MB | WCC: {os.path.getsize(columnar_path) / 1e6:.1f} MB")
+        print()
+        print(f"{'loader':<10}{'carga ms':>12}{'1ª respuesta ms':>18}{'RSS KB':>12}{'anónima KB':>14}")
+        for mode in ("json", "columnar"):
+            result = measure(mode, json_path if mode == "json" else columnar_path, args.runs)
+            print(f"{mode:<10}{result['load_ms']:>12.2f}{result['first_answer_ms']:>18.2f}"
+                  f"{result['rss_kb']:>12}{result['anonymous_kb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
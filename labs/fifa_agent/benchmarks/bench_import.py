@@ -0,0 +1,90 @@
+# bench_import.py
+#
+# Coste de importación (arranque en frío) de los paquetes del agente, estilo `-X importtime`:
+#
+#   python -m fifa_agent.benchmarks.bench_import [--top 10] [--budget-ms 50]
+#
+# Cada objetivo se importa en un intérprete nuevo con -X importtime. Se informa el tiempo
+# acumulado del objetivo, los módulos más pesados y si se cargaron módulos que no deben
+# importarse al cargar el paquete (google.adk, google.genai). Con --budget-ms el script
+# termina con código 1 si `import fifa_agent` supera el presupuesto o carga módulos pesados,
+# para detectar regresiones en CI.
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Any, List, Tuple
+
+LABS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (descripción, código a ejecutar) medidos en un proceso nuevo cada uno
+TARGETS = [
+    ("import fifa_agent", "import fifa_agent"),
+    ("import lab-3-fifa-tools", "import importlib; importlib.import_module('lab-3-fifa-tools')"),
+    ("fifa_agent.root_agent", "import fifa_agent; fifa_agent.root_agent"),
+]
+
+# Módulos que el import del paquete no debe arrastrar (se cargan al construir el agente)
+HEAVY_MODULES = ("google.adk", "google.genai", "requests")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Líneas 'import time: self [us] | cumulative | module' -> (módulo, self_us, cumulative_us)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(code: str) -> Dict[str, Any]:
+    # El tiempo total del fragmento se mide dentro del proceso (incluye construir root_agent)
+    script = f"import time; _t = time.perf_counter(); {code}; print((time.perf_counter() - _t) * 1000)"
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env.setdefault("GOOGLE_API_KEY", "bench-import")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=LABS_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(completed.stderr)
+    loaded = {name for name, _, _ in rows}
+    return {
+        "wall_ms": float(completed.stdout.strip().splitlines()[-1]),
+        "modules": len(rows),
+        "rows": rows,
+        "heavy": sorted(m for m in HEAVY_MODULES if m in loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de importación de los paquetes del agente")
+    parser.add_argument("--top", type=int, default=8, help="Módulos más pesados a mostrar (self time)")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Falla si `import fifa_agent` supera este tiempo o carga módulos pesados")
+    args = parser.parse_args()
+
+    failures = []
+    for label, code in TARGETS:
+        result = measure(code)
+        heavy = ", ".join(result["heavy"]) or "ninguno"
+        print(f"📦 {label}: {result['wall_ms']:.1f} ms, {result['modules']} módulos (pesados: {heavy})")
+        for name, self_us, cumulative_us in sorted(result["rows"], key=lambda row: -row[1])[:args.top]:
+            print(f"   {self_us / 1000:8.1f} ms self | {cumulative_us / 1000:8.1f} ms acumulado | {name}")
+
+        if args.budget_ms is not None and label == "import fifa_agent":
+            if result["wall_ms"] > args.budget_ms:
+                failures.append(f"{label} tarda {result['wall_ms']:.1f} ms (presupuesto {args.budget_ms} ms)")
+            if result["heavy"]:
+                failures.append(f"{label} carga {heavy}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
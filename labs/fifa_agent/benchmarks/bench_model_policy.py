@@ -0,0 +1,122 @@
+# bench_model_policy.py
+#
+# Latencia de cola con y sin la política de peticiones al modelo (model_policy.py):
+#
+#   python -m fifa_agent.benchmarks.bench_model_policy [--median-ms 200] [--sigma 0.8] [--hedge-percentile 0.95]
+#
+# Los modelos son ScriptedModel con latencia lognormal (--median-ms, --sigma), cada uno con
+# su semilla: el hedge es "otra región" con la misma distribución. Se comparan tres escenarios:
+#
+#   - cola: solo el principal frente a HedgedModel (hedge tras el --hedge-percentile y reserva)
+#   - caída parcial: el principal falla en --error-rate de las peticiones
+#   - plazo: un principal lento frente a un deadline_seconds corto
+#
+# Se mide el tiempo hasta la respuesta (p50/p95/p99), las peticiones fallidas y cuántas
+# peticiones extra se enviaron (hedges y reservas) por cada petición.
+
+import argparse
+import asyncio
+import time
+from typing import Dict, Any, List
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from ..fake_model import ScriptedModel
+from ..model_policy import HedgedModel
+from .bench_router import percentile
+
+
+def fake(name: str, median_ms: float, sigma: float, seed: int, error_rate: float = 0.0) -> ScriptedModel:
+    return ScriptedModel(model=name, ttft_median_ms=median_ms, ttft_sigma=sigma, token_delay_ms=0.0,
+                         error_rate=error_rate, seed=seed)
+
+
+async def replay(model: BaseLlm, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal failures
+        request = LlmRequest(model=model.model, contents=[
+            types.Content(role="user", parts=[types.Part(text=f"Analiza el Mundial número {i}")])
+        ])
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async for _ in model.generate_content_async(request):
+                    pass
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return {"latencies": latencies, "failures": failures}
+
+
+def report(label: str, result: Dict[str, Any], requests: int, model: BaseLlm):
+    latencies = result["latencies"] or [0.0]
+    line = (f"   {label:<22} p50 {percentile(latencies, 0.5) * 1000:6.0f} ms | p95 {percentile(latencies, 0.95) * 1000:6.0f} ms"
+            f" | p99 {percentile(latencies, 0.99) * 1000:6.0f} ms | fallidas {result['failures'] / requests:5.1%}")
+    if isinstance(model, HedgedModel):
+        stats = model.stats()
+        line += (f" | extra {(stats['hedged'] + stats['fallbacks']) / requests:5.1%}"
+                 f" (hedges {stats['hedged']}, ganados {stats['hedge_wins']}, reservas {stats['fallbacks']},"
+                 f" plazos {stats['deadline_exceeded']})")
+    print(line)
+
+
+def policy(args: argparse.Namespace, primary: ScriptedModel, **overrides: Any) -> HedgedModel:
+    settings = dict(
+        model=primary.model, primary=primary,
+        hedge=fake("hedge", args.median_ms, args.sigma, seed=2),
+        fallback=fake("fallback", args.median_ms / 2, args.sigma / 2, seed=3),
+        attempt_timeout_seconds=args.median_ms * 10 / 1000,
+        deadline_seconds=args.median_ms * 30 / 1000,
+        hedge_initial_delay_seconds=args.median_ms * 3 / 1000,
+        hedge_percentile=args.hedge_percentile,
+        hedge_budget=args.hedge_budget,
+    )
+    settings.update(overrides)
+    return HedgedModel(**settings)
+
+
+async def run(args: argparse.Namespace):
+    median, sigma = args.median_ms, args.sigma
+
+    print(f"⏱️  Cola: lognormal mediana {median:.0f} ms, sigma {sigma}, {args.requests} peticiones, concurrencia {args.concurrency}")
+    primary = fake("primary", median, sigma, seed=1)
+    report("solo principal", await replay(primary, args.requests, args.concurrency), args.requests, primary)
+    hedged = policy(args, fake("primary", median, sigma, seed=1))
+    report("con política", await replay(hedged, args.requests, args.concurrency), args.requests, hedged)
+
+    print(f"💥 Caída parcial: el principal falla el {args.error_rate:.0%} de las veces")
+    primary = fake("primary", median, sigma, seed=1, error_rate=args.error_rate)
+    report("solo principal", await replay(primary, args.requests, args.concurrency), args.requests, primary)
+    hedged = policy(args, fake("primary", median, sigma, seed=1, error_rate=args.error_rate))
+    report("con política", await replay(hedged, args.requests, args.concurrency), args.requests, hedged)
+
+    deadline = median * 4 / 1000
+    print(f"⌛ Plazo: principal con mediana {median * 5:.0f} ms y deadline de {deadline * 1000:.0f} ms")
+    slow = fake("primary", median * 5, sigma, seed=1)
+    bounded = policy(args, slow, hedge=None, attempt_timeout_seconds=deadline / 2, deadline_seconds=deadline)
+    report("con política", await replay(bounded, args.requests // 4, args.concurrency), args.requests // 4, bounded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de cola con hedge, reserva y plazos")
+    parser.add_argument("--median-ms", type=float, default=200.0, help="Mediana de la latencia lognormal")
+    parser.add_argument("--sigma", type=float, default=0.8, help="Dispersión lognormal (cola más larga con más)")
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--hedge-percentile", type=float, default=0.95, help="Percentil del principal que espera el hedge")
+    parser.add_argument("--hedge-budget", type=float, default=0.1, help="Máximo de peticiones duplicadas")
+    parser.add_argument("--error-rate", type=float, default=0.2, help="Fallos del principal en la caída parcial")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench_prefetch.py
+#
+# Proporción de aciertos del prefetch de seguimientos (prefetch.py) en conversaciones
+# típicas, y espera de herramientas que ve el usuario con y sin prefetch:
+#
+#   python -m fifa_agent.benchmarks.bench_prefetch [--tool-latency-ms 40] [--think-ms 200]
+#
+# Cada conversación pasa por el router (las preguntas factuales de seguimiento llaman a las
+# mismas herramientas que llamaría el modelo). --tool-latency-ms simula herramientas con
+# E/S (un dataset remoto); --think-ms es la pausa del usuario entre preguntas, en la que
+# corre el prefetch. La última conversación cambia de tema a mitad para medir las cancelaciones.
+
+import argparse
+import asyncio
+import time
+from typing import Dict, Any, List
+
+from ..config import PREFETCH_CONFIG
+from ..fifa_tools import FIFATools
+from ..intent_router import IntentRouter
+from ..prefetch import FollowUpPrefetcher
+
+CONVERSATIONS = [
+    ["¿Quién ganó la Copa del Mundo 2014?", "¿Quién fue el máximo goleador del Mundial 2014?",
+     "¿Cuántos títulos tiene Alemania?"],
+    ["¿Quién ganó el Mundial 2022?", "¿Cuál fue el resultado de la final de 2022?",
+     "¿Cuántos goles hizo Mbappé en 2022?"],
+    ["¿Cuántos goles hizo Messi en 2022?", "¿Cuál es el historial de Argentina en Mundiales?",
+     "¿Quién ganó el Mundial 1986?"],
+    ["¿Qué país tiene más Mundiales?", "¿Cuál es el palmarés de Brasil?", "¿Cuál fue la final de 2002?"],
+    ["¿Quién ganó en 1998?", "¿Quién fue el goleador de 1998?", "Cuéntame sobre Maradona", "¿Quién ganó en 1966?"],
+]
+
+
+def build(prefetch: bool, tool_latency: float) -> FollowUpPrefetcher:
+    tools = FIFATools()
+
+    async def run(name: str, **kwargs: Any) -> Dict[str, Any]:
+        await asyncio.sleep(tool_latency)
+        return tools.call(name, **kwargs)
+
+    return FollowUpPrefetcher.from_config(run, dict(PREFETCH_CONFIG, enabled=prefetch))
+
+
+async def replay(prefetch: bool, tool_latency: float, think: float) -> Dict[str, Any]:
+    waits: List[float] = []
+    stats: Dict[str, int] = {}
+    for conversation in CONVERSATIONS:
+        # Cada conversación es una sesión nueva (su propio prefetcher)
+        prefetcher = build(prefetch, tool_latency)
+        router = IntentRouter(FIFATools(), call=prefetcher.run)
+        for query in conversation:
+            prefetcher.observe(query)
+            start = time.perf_counter()
+            await router.answer(query)
+            waits.append(time.perf_counter() - start)
+            await asyncio.sleep(think)
+        prefetcher.cancel_all()
+        for name, value in prefetcher.stats().items():
+            if isinstance(value, int):
+                stats[name] = stats.get(name, 0) + value
+    return {"waits": waits, "stats": stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aciertos del prefetch de seguimientos")
+    parser.add_argument("--tool-latency-ms", type=float, default=40.0, help="Latencia simulada por herramienta")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="Pausa del usuario entre preguntas")
+    args = parser.parse_args()
+
+    latency, think = args.tool_latency_ms / 1000, args.think_ms / 1000
+    without = asyncio.run(replay(False, latency, think))
+    with_prefetch = asyncio.run(replay(True, latency, think))
+
+    queries = len(without["waits"])
+    print(f"💬 {len(CONVERSATIONS)} conversaciones, {queries} preguntas | herramienta {args.tool_latency_ms:.0f} ms"
+          f" | pausa {args.think_ms:.0f} ms")
+    for label, result in (("sin prefetch", without), ("con prefetch", with_prefetch)):
+        waits = sorted(result["waits"])
+        print(f"   {label}: espera media {sum(waits) / queries * 1000:6.1f} ms | p50 {waits[queries // 2] * 1000:6.1f} ms")
+
+    stats = with_prefetch["stats"]
+    hits = stats["hits"] + stats["inflight_hits"]
+    print(f"   prefetch: {stats['scheduled']} programados, {stats['completed']} completados, "
+          f"{stats['cancelled']} cancelados | aciertos {hits} ({stats['inflight_hits']} en vuelo)")
+    print(f"   precisión {hits / stats['completed'] if stats['completed'] else 0:.0%} (aciertos por prefetch completado)"
+          f" | cobertura {hits / (hits + stats['misses']) if hits + stats['misses'] else 0:.0%}"
+          f" (llamadas servidas desde el prefetch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench_prompt_budget.py
+#
+# Coste en tokens de cada sección del SYSTEM_PROMPT y ahorro por consulta del PromptBudget:
+#
+#   python -m fifa_agent.benchmarks.bench_prompt_budget [--queries router_queries.jsonl]
+#
+# Usa el estimador offline de prompt_budget.py sobre el prompt del agente base y el de
+# lab-3 (con google_search), y las consultas etiquetadas del benchmark del router.
+
+import argparse
+import importlib
+import time
+from typing import Dict, Any, List
+
+from .. import config as base_config
+from ..fifa_tools import FIFATools
+from ..intent_router import IntentRouter
+from ..prompt_budget import PromptBudget
+from .bench_router import DEFAULT_QUERIES, load_queries, percentile
+
+
+def evaluate(budget: PromptBudget, queries: List[Dict[str, Any]], default_output: int) -> Dict[str, Any]:
+    saved: List[int] = []
+    output_saved: List[int] = []
+    plan_costs: List[float] = []
+    for item in queries:
+        start = time.perf_counter()
+        plan = budget.plan(item["query"])
+        plan_costs.append((time.perf_counter() - start) * 1e6)
+        saved.append(plan.tokens_saved)
+        output_saved.append(default_output - plan.max_output_tokens)
+
+    return {
+        "tokens_saved_mean": sum(saved) / len(saved),
+        "tokens_saved_ratio": sum(saved) / (budget.full_tokens * len(saved)),
+        "output_budget_saved_mean": sum(output_saved) / len(output_saved),
+        "plan_p50_us": percentile(plan_costs, 0.50),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokens por sección del prompt y ahorro del PromptBudget")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    router = IntentRouter.from_config(FIFATools(), base_config.ROUTER_CONFIG)
+    configs = [("fifa_agent", base_config), ("lab-3-fifa-tools", importlib.import_module("lab-3-fifa-tools.config"))]
+
+    for name, module in configs:
+        budget = PromptBudget.from_config(module.SYSTEM_PROMPT_SECTIONS, module.PROMPT_BUDGET_CONFIG, router.classify)
+        report = budget.report()
+        result = evaluate(budget, queries, module.MODEL_CONFIG["max_output_tokens"])
+
+        print(f"🧾 {name}: SYSTEM_PROMPT completo = {report['full_prompt_tokens']} tokens")
+        for section, tokens in report["sections"].items():
+            print(f"   {section:<13} {tokens:>5}")
+        for profile, cost in report["profiles"].items():
+            print(f"   perfil {profile:<10} {cost['tokens']:>5} tokens (-{cost['saved']}), "
+                  f"max_output_tokens {cost['max_output_tokens']}")
+        print(f"   {len(queries)} consultas: {result['tokens_saved_mean']:.0f} tokens de entrada ahorrados de media "
+              f"({result['tokens_saved_ratio']:.0%}), {result['output_budget_saved_mean']:.0f} tokens menos de "
+              f"presupuesto de salida, plan() p50 {result['plan_p50_us']:.1f} µs\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# bench_relevance.py
+#
+# Throughput del ranking de fragmentos de búsqueda (relevance.py) frente al cálculo anterior
+# texto a texto (_is_football_related + _calculate_relevance de fifa_tools_enhanced.py):
+#
+#   python -m fifa_agent.benchmarks.bench_relevance [--snippets 10000] [--extra-keywords 0,100,500]
+#
+# Los fragmentos se generan con un vocabulario mixto (fútbol y otros temas) y semilla fija.
+# El cálculo anterior escanea cada texto una vez por palabra clave, así que su coste crece con
+# la lista configurada (RELEVANCE_CONFIG); el nuevo recorre el lote una vez sea cual sea su
+# tamaño, pero paga una normalización Unicode (tildes) que el anterior no hacía. Con
+# --extra-keywords se añaden palabras clave (nombres de jugadores, clubes...) para ver el cruce.
+
+import argparse
+import random
+import time
+from typing import Dict, Any, List
+
+from ..relevance import DEFAULT_FOOTBALL_KEYWORDS, DEFAULT_IMPORTANT_KEYWORDS, RelevanceRanker
+
+QUERIES = [
+    "últimas noticias de la FIFA sobre el Mundial 2026",
+    "club actual de Lionel Messi",
+    "resultado del partido de Argentina hoy",
+    "clasificación de las eliminatorias sudamericanas",
+]
+
+_FOOTBALL = ["Messi", "Mbappé", "Argentina", "Francia", "selección", "goles", "partido", "FIFA",
+             "Copa Mundial", "eliminatorias", "jugador", "equipo", "torneo", "campeón", "world cup", "2026"]
+_OTHER = ["receta", "clima", "mercado", "elecciones", "película", "tecnología", "viaje", "música",
+          "economía", "hoy", "noticias", "club", "actual", "resultado", "ciudad", "sedes"]
+_FILLER = ["el", "la", "de", "en", "y", "que", "para", "con", "los", "sobre"]
+
+
+def make_snippets(count: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    snippets = []
+    for i in range(count):
+        topical = _FOOTBALL if rng.random() < 0.6 else _OTHER
+        words = [rng.choice(topical if rng.random() < 0.4 else _OTHER + _FILLER) for _ in range(rng.randint(12, 40))]
+        snippets.append({
+            "title": " ".join(words[:6]).capitalize(),
+            "url": f"https://example.com/{i}",
+            "snippet": " ".join(words[6:]),
+        })
+    return snippets
+
+
+def legacy_rank(query: str, results: List[Dict[str, Any]], limit: int,
+                football_keywords: List[str]) -> List[Dict[str, Any]]:
+    """Implementación anterior: escaneo de subcadenas por palabra clave y por texto"""
+    scored = []
+    query_words = query.lower().split()
+    for result in results:
+        text_lower = f"{result['title']} {result['snippet']}".lower()
+        if not any(keyword in text_lower for keyword in football_keywords):
+            continue
+        score = sum(1 for word in query_words if word in text_lower)
+        score += sum(2 for keyword in DEFAULT_IMPORTANT_KEYWORDS if keyword in text_lower)
+        scored.append((score, result))
+    scored.sort(key=lambda item: -item[0])
+    return [result for _, result in scored[:limit]]
+
+
+def measure(rank, snippets: List[Dict[str, Any]], repeat: int) -> float:
+    """Mejor tiempo (s) de rankear todo el lote para cada consulta"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in QUERIES:
+            rank(query, snippets, 10)
+        best = min(best, time.perf_counter() - start)
+    return best / len(QUERIES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput del ranking de fragmentos de búsqueda")
+    parser.add_argument("--snippets", type=int, default=10000)
+    parser.add_argument("--extra-keywords", default="0,100,500",
+                        help="Palabras clave añadidas a la lista de fútbol, separadas por comas")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    snippets = make_snippets(args.snippets, args.seed)
+    print(f"📊 {args.snippets} fragmentos, {len(QUERIES)} consultas (mejor de {args.repeat})")
+    for extra in (int(value) for value in args.extra_keywords.split(",")):
+        keywords = DEFAULT_FOOTBALL_KEYWORDS + [f"jugador{i:03d}x" for i in range(extra)]
+        ranker = RelevanceRanker(football_keywords=keywords)
+        vectorized = measure(ranker.rank, snippets, args.repeat)
+        legacy = measure(lambda query, results, limit: legacy_rank(query, results, limit, keywords),
+                         snippets, args.repeat)
+        print(f"   {len(keywords):>4} palabras clave | anterior {legacy * 1000:7.1f} ms/lote "
+              f"({args.snippets / legacy:>9,.0f}/s) | vectorizado {vectorized * 1000:7.1f} ms/lote "
+              f"({args.snippets / vectorized:>9,.0f}/s) | x{legacy / vectorized:.1f}")
+
+    kept = RelevanceRanker().rank(QUERIES[0], snippets)
+    print(f"   '{QUERIES[0]}': {len(kept)} de {args.snippets} fragmentos son de fútbol; mejor: {kept[0]['title']!r}")
+
+
+if __name__ == "__main__":
+    main()
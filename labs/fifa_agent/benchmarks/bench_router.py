@@ -0,0 +1,103 @@
+# bench_router.py
+#
+# Evalúa el IntentRouter sobre un conjunto etiquetado de consultas y mide su coste:
+#
+#   python -m fifa_agent.benchmarks.bench_router [--queries router_queries.jsonl]
+#
+# Cada línea del JSONL tiene {"query": ..., "intent": ...}; intent null significa
+# que la consulta debe llegar al modelo (abierta, actual, ambigua o compuesta). "expect"
+# lista textos que la respuesta debe contener: una respuesta con la intención correcta
+# pero con otros datos cuenta como falso positivo.
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Any, List
+
+from ..config import ROUTER_CONFIG
+from ..fifa_tools import FIFATools
+from ..intent_router import IntentRouter
+
+DEFAULT_QUERIES = os.path.join(os.path.dirname(__file__), "router_queries.jsonl")
+
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def evaluate(router: IntentRouter, queries: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    true_positive = false_positive = false_negative = 0
+    errors = []
+    route_costs: List[float] = []
+
+    for item in queries:
+        # Coste de decisión (route) aislado del de responder
+        for _ in range(repeat):
+            start = time.perf_counter()
+            decision = router.route(item["query"])
+            route_costs.append((time.perf_counter() - start) * 1e6)
+
+        routed = decision is not None and decision.confidence >= router.min_confidence
+        answer = await router.answer(item["query"]) if routed else None
+        predicted = decision.intent if answer is not None else None
+
+        missing = [text for text in item.get("expect", []) if answer is not None and text not in answer]
+        if predicted is not None and predicted == item["intent"] and not missing:
+            true_positive += 1
+        elif missing:
+            false_positive += 1
+            false_negative += 1
+            errors.append((item["query"], item["intent"], f"{predicted} sin {missing}"))
+        else:
+            if predicted is not None:
+                false_positive += 1
+            if item["intent"] is not None:
+                false_negative += 1
+            if predicted != item["intent"]:
+                errors.append((item["query"], item["intent"], predicted))
+
+    start = time.perf_counter()
+    for item in queries:
+        await router.answer(item["query"])
+    answer_cost = (time.perf_counter() - start) * 1e6 / len(queries)
+
+    return {
+        "precision": true_positive / (true_positive + false_positive) if true_positive + false_positive else 0.0,
+        "recall": true_positive / (true_positive + false_negative) if true_positive + false_negative else 0.0,
+        "route_p50_us": percentile(route_costs, 0.50),
+        "route_p99_us": percentile(route_costs, 0.99),
+        "answer_mean_us": answer_cost,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precisión, recall y coste del IntentRouter")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    router = IntentRouter.from_config(FIFATools(), ROUTER_CONFIG)
+    result = asyncio.run(evaluate(router, queries, args.repeat))
+
+    labeled = sum(1 for q in queries if q["intent"] is not None)
+    print(f"🧭 {len(queries)} consultas ({labeled} enrutables, {len(queries) - labeled} para el modelo)")
+    print(f"   precisión: {result['precision']:.3f}")
+    print(f"   recall:    {result['recall']:.3f}")
+    print(f"   route():   p50 {result['route_p50_us']:.1f} µs | p99 {result['route_p99_us']:.1f} µs")
+    print(f"   answer():  {result['answer_mean_us']:.1f} µs de media (incluye herramientas y redacción)")
+    for query, expected, predicted in result["errors"]:
+        print(f"   ✗ {query!r}: esperado {expected}, obtenido {predicted}")
+
+
+if __name__ == "__main__":
+    main()
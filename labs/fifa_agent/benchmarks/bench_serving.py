@@ -0,0 +1,168 @@
+# bench_serving.py
+#
+# Throughput del servidor multi-proceso (serving.py) según el número de workers, con el
+# modelo local ScriptedModel sin latencia para que el coste sea la CPU del agente:
+#
+#   python -m fifa_agent.benchmarks.bench_serving [--workers 1,2,4] [--sessions 32] [--queries 12]
+#
+# Cada sesión es un cliente HTTP keep-alive que hace las preguntas de la suite de regresión
+# en orden (con un sufijo por sesión para que no se sirvan de la caché compartida, salvo con
+# --shared-hits). Antes de medir, cada worker construye su agente con una consulta de
+# calentamiento. Se muestra consultas/s, latencia p50/p95, aceleración frente a 1 worker
+# y el reparto de consultas entre workers.
+#
+# El cliente y el maestro comparten un proceso; la escala casi lineal solo se ve con al
+# menos workers + 1 núcleos libres (os.cpu_count() se muestra al principio). Por eso se
+# mide también la CPU por consulta de los workers y del proceso maestro + cliente: si se
+# mantiene al añadir workers, el agente escala y la caída de consultas/s es falta de
+# núcleos. "estimado" es el techo con núcleos libres: workers / CPU de un worker por
+# consulta, limitado por la CPU del maestro por consulta. Las filas sin núcleos libres se
+# marcan con ⚠️.
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Any, List, Tuple
+
+from ..serving import PreforkServer, worker_for_session
+from .bench_router import percentile
+from .regression import DEFAULT_QUESTIONS, build_agent, load_questions
+
+
+class HttpClient:
+    """Cliente HTTP/1.1 mínimo con una conexión keep-alive"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._writer.write(f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                           f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        result = json.loads(await self._reader.readexactly(length))
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {result}")
+        return result
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def session_ids(workers: int, count: int) -> List[str]:
+    """count ids de sesión repartidos por igual entre los workers (como lo haría el tráfico real)"""
+    by_worker: List[List[str]] = [[] for _ in range(workers)]
+    candidate = 0
+    while min(len(ids) for ids in by_worker) < -(-count // workers):
+        session_id = f"bench-{candidate}"
+        by_worker[worker_for_session(session_id, workers)].append(session_id)
+        candidate += 1
+    return [by_worker[i % workers][i // workers] for i in range(count)]
+
+
+async def run_load(server: PreforkServer, queries: List[str], sessions: int,
+                   shared_hits: bool) -> Tuple[float, List[float]]:
+    latencies: List[float] = []
+
+    async def session(session_id: str, number: int):
+        client = HttpClient(server.host, server.port)
+        try:
+            for query in queries:
+                if not shared_hits:
+                    query = f"{query} (sesión {number})"
+                start = time.perf_counter()
+                await client.post("/query", {"session_id": session_id, "query": query})
+                latencies.append(time.perf_counter() - start)
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(session_id, number)
+                           for number, session_id in enumerate(session_ids(server.workers, sessions))))
+    return time.perf_counter() - start, latencies
+
+
+async def measure(workers: int, agent: str, queries: List[str], sessions: int,
+                  shared_hits: bool) -> Dict[str, Any]:
+    server = PreforkServer(lambda: build_agent(agent)[0], workers=workers, port=0)
+    try:
+        await server.start()
+        # Calentamiento: cada worker construye su agente y carga sus índices
+        warmup = HttpClient(server.host, server.port)
+        for session_id in session_ids(server.workers, server.workers):
+            await warmup.post("/query", {"session_id": f"warmup-{session_id}", "query": queries[0]})
+        warmup.close()
+
+        before = await server.worker_stats()
+        master_cpu = time.process_time()
+        elapsed, latencies = await run_load(server, queries, sessions, shared_hits)
+        master_cpu = time.process_time() - master_cpu
+        stats = await server.worker_stats()
+    finally:
+        await server.close()
+    worker_cpu = [after["cpu_seconds"] - start["cpu_seconds"] for start, after in zip(before, stats)]
+    worker_ms = sum(worker_cpu) / len(latencies) * 1000
+    master_ms = master_cpu / len(latencies) * 1000
+    return {
+        "workers": workers,
+        "qps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "per_worker": [worker["queries"] for worker in stats],
+        "sources": {source: sum(worker[source] for worker in stats) for source in ("router", "cache", "model")},
+        "shared_hits": sum(worker["response_cache"]["shared_hits"] for worker in stats),
+        "worker_cpu_ms": worker_ms,
+        "master_cpu_ms": master_ms,
+        "estimated_qps": min(workers * 1000 / worker_ms, 1000 / master_ms),
+    }
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in (1, 2, 4, 8, 16) if n <= max(cores, 2))
+    parser = argparse.ArgumentParser(description="Throughput del servidor según el número de workers")
+    parser.add_argument("--workers", default=default_workers, help="Números de workers a medir, separados por comas")
+    parser.add_argument("--agent", default="plus", choices=["base", "plus"])
+    parser.add_argument("--sessions", type=int, default=32, help="Clientes concurrentes")
+    parser.add_argument("--queries", type=int, default=12, help="Consultas por sesión")
+    parser.add_argument("--shared-hits", action="store_true",
+                        help="Mismas preguntas en todas las sesiones (mide la caché compartida)")
+    args = parser.parse_args()
+
+    questions = [question["query"] for question in load_questions(DEFAULT_QUESTIONS)["questions"]]
+    queries = (questions * (args.queries // len(questions) + 1))[:args.queries]
+
+    print(f"🖥️  {cores} núcleos | agente {args.agent} | {args.sessions} sesiones x {len(queries)} consultas")
+    baseline = None
+    for workers in (int(n) for n in args.workers.split(",")):
+        result = asyncio.run(measure(workers, args.agent, queries, args.sessions, args.shared_hits))
+        baseline = baseline or result["qps"] / result["workers"]
+        speedup = result["qps"] / baseline
+        print(f"   {workers:>2} workers: {result['qps']:7.1f} consultas/s | p50 {result['p50_ms']:6.1f} ms"
+              f" | p95 {result['p95_ms']:6.1f} ms | x{speedup:.2f} ({speedup / workers:.0%} de lineal)"
+              f"{' ⚠️ sin núcleos libres' if workers + 1 > cores else ''}"
+              f" | por worker {result['per_worker']} | {result['sources']}"
+              f" | aciertos compartidos {result['shared_hits']}")
+        print(f"      CPU por consulta: workers {result['worker_cpu_ms']:5.2f} ms, maestro + cliente"
+              f" {result['master_cpu_ms']:5.2f} ms | estimado con núcleos libres {result['estimated_qps']:7.1f} consultas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# bench_sessions.py
+#
+# Memoria por sesión inactiva y latencia de carga del almacén de sesiones (session_store.py):
+#
+#   python -m fifa_agent.benchmarks.bench_sessions [--sessions 100000] [--turns 3] [--backends memory,sqlite,file]
+#
+# Se graba una conversación real de --turns preguntas (agente base con ScriptedModel) y sus
+# registros se replican con ids distintos hasta --sessions sesiones inactivas en cada almacén.
+# Por almacén se mide lo que ocupa cada sesión (en memoria con "memory", tracemalloc; en
+# disco con "sqlite" y "file", que solo retienen en el proceso las sesiones activas) y, para una muestra de sesiones frías, el tiempo de leer sus bytes, de
+# decodificarlos y de get_session completo (que además construye los Event de ADK). Como
+# referencia, la memoria de la misma sesión deserializada (lo que retiene InMemorySessionService).
+
+import argparse
+import asyncio
+import copy
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Dict, Any, List
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.runners import Runner
+from google.genai import types
+
+from ..session_store import (CompactSessionService, MemorySessionStore, SQLiteSessionStore, FileSessionStore,
+                             decode_records, encode_header, iter_frames, frame)
+from .bench_router import percentile
+from .regression import build_agent, load_questions, DEFAULT_QUESTIONS
+
+APP_NAME = "fifa_bench"
+
+
+async def record_conversation(turns: int) -> Dict[str, Any]:
+    """Conversación real grabada con CompactSessionService: sesión y bytes de sus eventos"""
+    agent, _ = build_agent("base")
+    service = CompactSessionService()
+    runner = Runner(app_name=APP_NAME, agent=agent, session_service=service,
+                    artifact_service=InMemoryArtifactService())
+    session = await service.create_session(app_name=APP_NAME, user_id="user")
+    queries = [question["query"] for question in load_questions(DEFAULT_QUESTIONS)["questions"]][:turns]
+    for query in queries:
+        message = types.Content(role="user", parts=[types.Part(text=query)])
+        async for _ in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+            pass
+    data = service.store.load((APP_NAME, "user", session.id))
+    # Todo salvo la cabecera: se reutiliza tal cual en cada réplica
+    header_size = len(frame(next(iter_frames(data))))
+    return {"session": session, "events": data[header_size:], "created": session.events[0].timestamp}
+
+
+def fill(store: Any, recorded: Dict[str, Any], sessions: int) -> List[tuple]:
+    keys = []
+    for i in range(sessions):
+        key = (APP_NAME, f"user_{i % 1000}", uuid.uuid4().hex)
+        store.append(key, encode_header(key, {}, recorded["created"]))
+        store.append(key, recorded["events"])
+        keys.append(key)
+    return keys
+
+
+async def measure_loads(store: Any, keys: List[tuple], samples: int) -> Dict[str, List[float]]:
+    read, decode, get = [], [], []
+    for key in random.Random(7).sample(keys, min(samples, len(keys))):
+        start = time.perf_counter()
+        data = store.load(key)
+        loaded = time.perf_counter()
+        decode_records(data)
+        decoded = time.perf_counter()
+        # Servicio nuevo: la sesión nunca está en la caché activa
+        await CompactSessionService(store).get_session(app_name=key[0], user_id=key[1], session_id=key[2])
+        read.append(loaded - start)
+        decode.append(decoded - loaded)
+        get.append(time.perf_counter() - decoded)
+    return {"read": read, "decode": decode, "get": get}
+
+
+def deserialized_bytes(session: Any, copies: int = 200) -> float:
+    """Memoria retenida por la sesión como objetos de ADK (media de `copies` copias)"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = [copy.deepcopy(session) for _ in range(copies)]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return (after - before) / copies
+
+
+def disk_bytes(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(directory) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria y carga del almacén de sesiones")
+    parser.add_argument("--sessions", type=int, default=100000, help="Sesiones inactivas por almacén")
+    parser.add_argument("--turns", type=int, default=3, help="Preguntas de la conversación grabada")
+    parser.add_argument("--backends", default="memory,sqlite,file")
+    parser.add_argument("--samples", type=int, default=500, help="Sesiones frías cargadas por almacén")
+    args = parser.parse_args()
+
+    recorded = asyncio.run(record_conversation(args.turns))
+    session = recorded["session"]
+    print(f"💬 Conversación de {args.turns} preguntas: {len(session.events)} eventos, "
+          f"{len(recorded['events'])} bytes codificados "
+          f"({deserialized_bytes(session) / 1024:.1f} KB como objetos de ADK)")
+
+    with tempfile.TemporaryDirectory() as root:
+        for backend in args.backends.split(","):
+            # Cada almacén en su propio subdirectorio, para medir solo lo suyo en disco
+            directory = os.path.join(root, backend)
+            os.makedirs(directory)
+            if backend == "memory":
+                store = MemorySessionStore()
+            elif backend == "sqlite":
+                store = SQLiteSessionStore(os.path.join(directory, "sessions.sqlite"))
+            else:
+                store = FileSessionStore(os.path.join(directory, "sessions"))
+
+            gc.collect()
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            keys = fill(store, recorded, args.sessions)
+            elapsed = time.perf_counter() - start
+            after, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if backend == "memory":
+                # Claves y bytes de cada sesión; la lista `keys` es del benchmark, no del almacén
+                footprint = f"{(after - before - 8 * len(keys)) / args.sessions:6.0f} B/sesión en memoria"
+            else:
+                footprint = f"{disk_bytes(directory) / args.sessions:6.0f} B/sesión en disco"
+
+            loads = asyncio.run(measure_loads(store, keys, args.samples))
+            print(f"   {backend:<6} {len(store)} sesiones en {elapsed:.1f} s | {footprint} | carga p50: "
+                  f"bytes {percentile(loads['read'], 0.5) * 1e6:5.0f} µs, "
+                  f"decodificar {percentile(loads['decode'], 0.5) * 1e6:5.0f} µs, "
+                  f"get_session {percentile(loads['get'], 0.5) * 1e6:6.0f} µs")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
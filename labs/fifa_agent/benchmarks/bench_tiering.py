@@ -0,0 +1,99 @@
+# bench_tiering.py
+#
+# Coste del clasificador y latencia del modelo con niveles por tipo de consulta (model_tiering.py):
+#
+#   python -m fifa_agent.benchmarks.bench_tiering [--queries router_queries.jsonl] [--repeat 200]
+#
+# Se mide el coste de IntentRouter.classify() sobre las consultas etiquetadas del benchmark
+# del router: es el clasificador de prompt_budget, cuya intención reutilizan los niveles.
+# Después, para el agente base y el de lab-3, se envía cada consulta al modelo con y sin niveles, con el backend
+# "fake" de MODEL_CONFIG: cada nivel es un ScriptedModel con la latencia de su configuración
+# (MODEL_TIERS_CONFIG), así que la diferencia es la de elegir un modelo más rápido.
+
+import argparse
+import asyncio
+import importlib
+import time
+from typing import Dict, Any, Optional, List
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from .. import config as base_config
+from ..fifa_tools import FIFATools
+from ..intent_router import IntentRouter
+from ..model_backend import get_model
+from ..model_tiering import ModelTiering
+from .bench_router import DEFAULT_QUERIES, load_queries, percentile
+
+
+def classifier_costs(router: IntentRouter, queries: List[Dict[str, Any]], repeat: int) -> List[float]:
+    """Coste medio (µs) de classify() por consulta"""
+    costs: List[float] = []
+    for item in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            router.classify(item["query"])
+        costs.append((time.perf_counter() - start) / repeat * 1e6)
+    return costs
+
+
+def request_for(query: str) -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=query)])],
+                      config=types.GenerateContentConfig())
+
+
+async def replay(model: Any, queries: List[Dict[str, Any]], tiering: Optional[ModelTiering] = None) -> Dict[str, Any]:
+    latencies: List[float] = []
+    budgets: List[int] = []
+    for item in queries:
+        request = request_for(item["query"])
+        request.model = model.model
+        if tiering is not None:
+            tiering.before_model_callback(None, request)
+        start = time.perf_counter()
+        async for _ in model.generate_content_async(request):
+            pass
+        latencies.append(time.perf_counter() - start)
+        budgets.append(request.config.max_output_tokens or 0)
+    return {"latencies": latencies, "budgets": budgets}
+
+
+def fixed_latency(model_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Backend fake con la latencia mediana del modelo, sin dispersión: compara niveles sin ruido"""
+    fake = {**model_config.get("fake", {}), "ttft_sigma": 0.0, "token_delay_ms": 0.0}
+    return {**model_config, "backend": "fake", "fake": fake}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clasificador y latencia del modelo con niveles")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    parser.add_argument("--repeat", type=int, default=200, help="Repeticiones para medir el clasificador")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    router = IntentRouter(FIFATools())
+    costs = classifier_costs(router, queries, args.repeat)
+    print(f"🔎 {len(queries)} consultas: IntentRouter.classify() p50 {percentile(costs, 0.5):.1f} µs, "
+          f"p99 {percentile(costs, 0.99):.1f} µs")
+
+    configs = [("fifa_agent", base_config), ("lab-3-fifa-tools", importlib.import_module("lab-3-fifa-tools.config"))]
+    for name, module in configs:
+        model_config = fixed_latency(module.MODEL_CONFIG)
+        tiers = {tier: {**settings, "model": fixed_latency({**module.MODEL_CONFIG, **settings["model"]})}
+                 for tier, settings in module.MODEL_TIERS_CONFIG["tiers"].items()}
+        tiering = ModelTiering.from_config({**module.MODEL_TIERS_CONFIG, "tiers": tiers}, model_config,
+                                           classify=router.classify)
+
+        print(f"🎚️  {name} ({module.MODEL_CONFIG['model_name']})")
+        for label, result in (("un modelo", asyncio.run(replay(get_model(model_config), queries))),
+                              ("con niveles", asyncio.run(replay(tiering.model, queries, tiering)))):
+            latencies = result["latencies"]
+            budget = sum(result["budgets"]) / len(result["budgets"]) or module.MODEL_CONFIG["max_output_tokens"]
+            print(f"   {label:<12} p50 {percentile(latencies, 0.5) * 1000:5.0f} ms | media "
+                  f"{sum(latencies) / len(latencies) * 1000:5.0f} ms | tope de salida medio {budget:5.0f} tokens")
+        print(f"   niveles: {tiering.stats()['tiers']}\n")
+
+
+if __name__ == "__main__":
+    main()
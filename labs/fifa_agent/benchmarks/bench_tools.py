@@ -0,0 +1,123 @@
+# bench_tools.py
+#
+# CPU y memoria por turno del camino de herramientas (fifa_tools.py, adk_tools.py):
+#
+#   python -m fifa_agent.benchmarks.bench_tools [--rounds 200]
+#
+# Un turno es lo que ADK hace con las herramientas en cada pregunta: añadir sus
+# declaraciones a la petición al modelo (LlmRequest.append_tools) y ejecutar la llamada
+# que pide el modelo (run_async). Se comparan dos caminos sobre las mismas funciones:
+#
+#   - anterior: FunctionTool sobre un método async del agente, que llama a la herramienta
+#     async con asyncio.wait_for (como el ToolExecutor anterior), sin memoria de resultados
+#   - registro: RegisteredTool -> ToolExecutor -> FIFATools.call (declaración generada una
+#     vez, llamada en línea sin wait_for y resultados memorizados)
+#
+# Se mide el tiempo de CPU medio por turno y, con tracemalloc, la memoria asignada durante
+# el turno (pico) y los bloques que quedan vivos. La primera ronda del registro es la fría:
+# aún no hay resultados memorizados.
+
+import argparse
+import asyncio
+import functools
+import time
+import tracemalloc
+from typing import Dict, Any, List, Tuple
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.tools.function_tool import FunctionTool
+
+from ..adk_tools import build_tools
+from ..config import TOOL_EXECUTION_CONFIG
+from ..fifa_tools import FIFATools
+from ..tool_executor import ToolExecutor
+
+# Llamadas que el modelo pide en las preguntas del SYSTEM_PROMPT (una por turno)
+TURNS: List[Tuple[str, Dict[str, Any]]] = [
+    ("search_world_cup_info", {"query": "ganador", "year": 2014}),
+    ("get_player_statistics", {"player_name": "Messi", "context": "world_cup"}),
+    ("get_country_performance", {"country": "Brasil"}),
+    ("search_world_cup_info", {"query": "goleador", "year": 1998}),
+    ("get_fun_facts", {"topic": "records"}),
+    ("get_player_statistics", {"player_name": "Maradona", "context": "world_cup"}),
+    ("search_world_cup_info", {"query": "final", "year": 2002}),
+    ("get_country_performance", {"country": "Alemania"}),
+    ("search_world_cup_info", {"query": "sede", "year": 2030}),
+    ("get_player_statistics", {"player_name": "Ronaldo", "context": "world_cup"}),
+]
+
+
+def legacy_tools(tools: FIFATools) -> List[FunctionTool]:
+    """Camino anterior: método async del agente -> wait_for -> herramienta async"""
+
+    def agent_method(name: str):
+        function = getattr(tools, name)
+
+        async def tool(**kwargs: Any) -> Dict[str, Any]:
+            return function(**kwargs)
+
+        @functools.wraps(function)
+        async def method(**kwargs: Any) -> Dict[str, Any]:
+            return await asyncio.wait_for(tool(**kwargs), TOOL_EXECUTION_CONFIG["default_timeout_seconds"])
+
+        return method
+
+    return [FunctionTool(agent_method(name)) for name in tools.registry]
+
+
+def registry_tools(tools: FIFATools) -> List[Any]:
+    executor = ToolExecutor.from_config(tools, TOOL_EXECUTION_CONFIG)
+    return build_tools(tools, executor.run)
+
+
+async def turn(tools: List[Any], name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    request = LlmRequest()
+    request.append_tools(tools)
+    return await request.tools_dict[name].run_async(args=dict(args), tool_context=None)
+
+
+async def measure(tools: List[Any], rounds: int) -> Dict[str, float]:
+    start = time.process_time()
+    for _ in range(rounds):
+        for name, args in TURNS:
+            await turn(tools, name, args)
+    cpu = (time.process_time() - start) / (rounds * len(TURNS))
+
+    tracemalloc.start()
+    peaks: List[int] = []
+    before = tracemalloc.get_traced_memory()[0]
+    for name, args in TURNS:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await turn(tools, name, args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {"cpu_us": cpu * 1e6, "peak_kb": sum(peaks) / len(peaks) / 1024, "retained_b": retained / len(TURNS)}
+
+
+def report(label: str, result: Dict[str, float]):
+    print(f"   {label:<16} CPU {result['cpu_us']:7.1f} µs/turno | asignado (pico) {result['peak_kb']:6.1f} KB/turno"
+          f" | retenido {result['retained_b']:7.0f} B/turno")
+
+
+async def run(rounds: int):
+    print(f"🛠️  {len(TURNS)} llamadas x {rounds} rondas (declaraciones + run_async por turno)")
+    report("anterior", await measure(legacy_tools(FIFATools()), rounds))
+
+    tools = FIFATools()
+    registered = registry_tools(tools)
+    report("registro (frío)", await measure(registered, 1))
+    report("registro", await measure(registered, rounds))
+    stats = tools.stats()
+    print(f"   resultados memorizados: {stats['cached_results']}, aciertos {stats['hit_rate']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU y memoria por turno del camino de herramientas")
+    parser.add_argument("--rounds", type=int, default=200)
+    asyncio.run(run(parser.parse_args().rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# load_test.py
+#
+# Prueba de carga del agente con el modelo local ScriptedModel (sin endpoint de Gemini):
+#
+#   python -m fifa_agent.benchmarks.load_test --sessions 50 --queries 10 [--stream]
+#
+# Lanza N sesiones concurrentes de ADK, cada una con varias consultas del conjunto del
+# router, y mide throughput, latencia p50/p95/p99, tiempo dentro de las herramientas y
+# la sobrecarga propia de la capa del agente (latencia total menos la latencia simulada
+# del modelo y el tiempo de herramientas, y CPU consumida por consulta).
+
+import argparse
+import asyncio
+import importlib
+import time
+from typing import Dict, Any, List
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ..agent import FIFAWorldCupAgent
+from ..fake_model import ScriptedModel
+from .bench_router import DEFAULT_QUERIES, load_queries, percentile
+
+
+class ToolTimer:
+    """before/after_tool_callback que mide el tiempo de cada llamada a herramienta"""
+
+    def __init__(self):
+        self._started: Dict[str, float] = {}
+        self.durations: List[float] = []
+
+    def before(self, tool: Any, args: Dict[str, Any], tool_context: Any):
+        self._started[tool_context.function_call_id] = time.perf_counter()
+        return None
+
+    def after(self, tool: Any, args: Dict[str, Any], tool_context: Any, tool_response: Any):
+        started = self._started.pop(tool_context.function_call_id, None)
+        if started is not None:
+            self.durations.append(time.perf_counter() - started)
+        return None
+
+
+def build_agent(name: str, model: ScriptedModel):
+    if name == "plus":
+        return importlib.import_module("lab-3-fifa-tools.agent").FIFAWorldCupAgentPlus(model=model)
+    return FIFAWorldCupAgent(model=model)
+
+
+async def run_session(runner: InMemoryRunner, user_id: str, queries: List[str],
+                      run_config: RunConfig, latencies: List[float], ttfts: List[float]):
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id)
+    for query in queries:
+        message = types.Content(role="user", parts=[types.Part(text=query)])
+        start = time.perf_counter()
+        first = None
+        async for event in runner.run_async(user_id=user_id, session_id=session.id,
+                                            new_message=message, run_config=run_config):
+            if first is None and event.content and any(part.text for part in event.content.parts or []):
+                first = time.perf_counter()
+        end = time.perf_counter()
+        latencies.append(end - start)
+        ttfts.append((first or end) - start)
+
+
+async def load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    model = ScriptedModel(
+        model="gemini-2.5-flash" if args.agent == "plus" else "gemini-2.0-flash",
+        ttft_median_ms=args.ttft_ms, ttft_sigma=args.sigma, token_delay_ms=args.token_ms, seed=args.seed,
+    )
+    agent = build_agent(args.agent, model)
+    timer = ToolTimer()
+    # Sin sustituir los callbacks ya registrados (p. ej. los de tracing.py con FIFA_TRACING=1)
+    agent.before_tool_callback = [timer.before] + agent.canonical_before_tool_callbacks
+    agent.after_tool_callback = agent.canonical_after_tool_callbacks + [timer.after]
+
+    runner = InMemoryRunner(agent=agent, app_name="fifa_load_test")
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if args.stream else StreamingMode.NONE)
+    pool = [item["query"] for item in load_queries(args.queries_file)]
+
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(*(
+        run_session(runner, f"user_{i}", [pool[(i * args.queries + j) % len(pool)] for j in range(args.queries)],
+                    run_config, latencies, ttfts)
+        for i in range(args.sessions)
+    ))
+    elapsed = time.perf_counter() - start
+    cpu_seconds = time.process_time() - cpu_start
+
+    model_stats = model.stats()
+    tool_seconds = sum(timer.durations)
+    total_seconds = sum(latencies)
+    return {
+        "queries": len(latencies),
+        "elapsed_seconds": elapsed,
+        "throughput_qps": len(latencies) / elapsed,
+        "latency_p50_ms": percentile(latencies, 0.50) * 1000,
+        "latency_p95_ms": percentile(latencies, 0.95) * 1000,
+        "latency_p99_ms": percentile(latencies, 0.99) * 1000,
+        "ttft_p50_ms": percentile(ttfts, 0.50) * 1000,
+        "model_calls": model_stats["calls"],
+        "tool_calls": len(timer.durations),
+        "tool_mean_ms": tool_seconds / len(timer.durations) * 1000 if timer.durations else 0.0,
+        "tool_share": tool_seconds / total_seconds if total_seconds else 0.0,
+        # Todo lo que no es espera simulada del modelo ni herramientas: ADK, callbacks, sesiones, event loop
+        "agent_overhead_ms": max(0.0, total_seconds - model_stats["simulated_seconds"] - tool_seconds)
+                             / len(latencies) * 1000,
+        # CPU consumida por consulta: el coste real del agente, sin contar esperas en el event loop
+        "cpu_ms_per_query": cpu_seconds / len(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del agente con ScriptedModel")
+    parser.add_argument("--agent", choices=["base", "plus"], default="base")
+    parser.add_argument("--sessions", type=int, default=20, help="Sesiones concurrentes")
+    parser.add_argument("--queries", type=int, default=5, help="Consultas por sesión")
+    parser.add_argument("--queries-file", default=DEFAULT_QUERIES)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="Mediana de la latencia al primer token")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Dispersión lognormal de la latencia")
+    parser.add_argument("--token-ms", type=float, default=10.0, help="Retardo por token generado")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--stream", action="store_true", help="Usar StreamingMode.SSE")
+    args = parser.parse_args()
+
+    result = asyncio.run(load_test(args))
+    print(f"🏋️  {args.sessions} sesiones x {args.queries} consultas ({args.agent}, "
+          f"{'SSE' if args.stream else 'sin streaming'})")
+    print(f"   throughput: {result['throughput_qps']:.1f} consultas/s en {result['elapsed_seconds']:.2f} s")
+    print(f"   latencia:   p50 {result['latency_p50_ms']:.0f} ms | p95 {result['latency_p95_ms']:.0f} ms | "
+          f"p99 {result['latency_p99_ms']:.0f} ms | TTFT p50 {result['ttft_p50_ms']:.0f} ms")
+    print(f"   modelo:     {result['model_calls']} llamadas")
+    print(f"   tools:      {result['tool_calls']} llamadas, {result['tool_mean_ms']:.2f} ms de media "
+          f"({result['tool_share']:.1%} de la latencia)")
+    print(f"   overhead del agente: {result['agent_overhead_ms']:.2f} ms por consulta "
+          f"(CPU: {result['cpu_ms_per_query']:.2f} ms por consulta)")
+
+
+if __name__ == "__main__":
+    main()
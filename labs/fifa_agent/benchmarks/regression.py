@@ -0,0 +1,277 @@
+# regression.py
+#
+# Suite de regresión offline de latencia y coste de los dos agentes con ScriptedModel:
+#
+#   python -m fifa_agent.benchmarks.regression                    # compara con la línea base
+#   python -m fifa_agent.benchmarks.regression --update-baseline  # la regenera
+#   python -m fifa_agent.benchmarks.regression --skip-timing      # solo métricas deterministas
+#
+# Cada sesión hace todas las preguntas de regression_questions.json (versionado) en orden,
+# como una conversación, contra FIFAWorldCupAgent y FIFAWorldCupAgentPlus. Las preguntas
+# entran por process_query (process_enhanced_query en Plus), el mismo camino que la CLI:
+# router de intenciones, caché de respuestas y, si ninguno responde, el Runner del agente
+# con su almacén de sesiones. La caché se vacía antes de cada pasada, así que todas miden
+# lo mismo: la primera sesión llena la caché y las siguientes la aprovechan. El modelo
+# local responde sin latencia, así que el tiempo medido es el del agente (router, caché,
+# ADK, callbacks y herramientas). Por agente se mide:
+#
+#   - tokens enviados al modelo por consulta (tras prompt_budget y context_window) y recibidos
+#   - proporción de consultas que llegan al modelo (ni router ni caché las responden)
+#   - llamadas al modelo y a herramientas por consulta
+#   - overhead del agente (p50) y CPU por consulta, y tiempo medio por herramienta (mejor de --rounds)
+#   - memoria retenida por sesión (tracemalloc, en una pasada aparte sin medir tiempos)
+#
+# Si alguna métrica empeora más que su tolerancia (regression_baseline.json) el proceso
+# termina con código 1. Las métricas de tiempo dependen de la máquina: la línea base debe
+# generarse en la misma máquina que la compara, o usar --skip-timing.
+
+import argparse
+import asyncio
+import gc
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Dict, Any, List, Tuple
+
+from ..agent import FIFAWorldCupAgent
+from ..fake_model import ScriptedModel
+from ..prompt_budget import estimate_tokens
+from ..web_search import StubSearchBackend
+from .bench_router import percentile
+from .load_test import ToolTimer
+
+DEFAULT_QUESTIONS = os.path.join(os.path.dirname(__file__), "regression_questions.json")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "regression_baseline.json")
+
+# métrica -> (tolerancia relativa, holgura absoluta); en todas, menos es mejor
+DEFAULT_TOLERANCES: Dict[str, Tuple[float, float]] = {
+    "tokens_in_per_query": (0.02, 0.0),
+    "tokens_out_per_query": (0.02, 0.0),
+    "model_query_share": (0.0, 0.0),
+    "model_calls_per_query": (0.0, 0.0),
+    "tool_calls_per_query": (0.0, 0.0),
+    "overhead_p50_ms": (0.5, 0.5),
+    "cpu_ms_per_query": (0.5, 0.5),
+    "tool_mean_ms": (0.5, 0.05),
+    "memory_kb_per_session": (0.25, 16.0),
+}
+TIMING_METRICS = ("overhead_p50_ms", "cpu_ms_per_query", "tool_mean_ms")
+
+
+class TokenMeter:
+    """
+    Callbacks de modelo que cuentan los tokens de cada petición tal como sale (before_model,
+    el último de la lista) y los de cada respuesta completa (after_model)
+    """
+
+    def __init__(self):
+        self.tokens = 0
+        self.tokens_out = 0
+
+    def before_model(self, callback_context: Any, llm_request: Any):
+        instruction = llm_request.config.system_instruction
+        self.tokens += estimate_tokens(instruction) if isinstance(instruction, str) else 0
+        for content in llm_request.contents or []:
+            for part in content.parts or []:
+                if part.text:
+                    self.tokens += estimate_tokens(part.text)
+                elif part.function_call:
+                    self.tokens += estimate_tokens(json.dumps(part.function_call.args or {}, ensure_ascii=False))
+                elif part.function_response:
+                    self.tokens += estimate_tokens(json.dumps(part.function_response.response or {},
+                                                              ensure_ascii=False, default=str))
+        return None
+
+    def after_model(self, callback_context: Any, llm_response: Any):
+        usage = llm_response.usage_metadata
+        if not llm_response.partial and usage and usage.candidates_token_count:
+            self.tokens_out += usage.candidates_token_count
+        return None
+
+
+def load_questions(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def build_agent(name: str):
+    """Agente con ScriptedModel sin latencia (y búsqueda web simulada sin latencia en Plus)"""
+    model = ScriptedModel(model="gemini-2.5-flash" if name == "plus" else "gemini-2.0-flash",
+                          ttft_median_ms=0.0, ttft_sigma=0.0, token_delay_ms=0.0, seed=7)
+    if name == "plus":
+        module = importlib.import_module("lab-3-fifa-tools.agent")
+        agent = module.FIFAWorldCupAgentPlus(model=model, search_backend=StubSearchBackend(latency_seconds=0.0))
+    else:
+        agent = FIFAWorldCupAgent(model=model)
+    return agent, model
+
+
+async def run_sessions(agent: Any, queries: List[str], sessions: int, timer: ToolTimer) -> List[float]:
+    """
+    Ejecuta `sessions` conversaciones nuevas con todas las preguntas por el camino completo
+    del agente; devuelve el overhead de cada consulta. Las sesiones quedan en el almacén
+    del agente (agent.session_service)
+    """
+    answer = getattr(agent, "process_query", None) or agent.process_enhanced_query
+    overheads: List[float] = []
+    for _ in range(sessions):
+        context = {"session_id": uuid.uuid4().hex}
+        for query in queries:
+            tools_before = len(timer.durations)
+            start = time.perf_counter()
+            await answer(query, context)
+            # El modelo no tiene latencia: todo el tiempo es del agente salvo el de herramientas
+            elapsed = time.perf_counter() - start
+            overheads.append(max(0.0, elapsed - sum(timer.durations[tools_before:])))
+        # Fin de la conversación: sus prefetch pendientes ya no sirven. Primero un turno del
+        # bucle (los seguimientos de la última herramienta se programan con call_soon) y
+        # después se espera a los que ya corren, para que ninguno quede vivo al cerrar el bucle
+        await asyncio.sleep(0)
+        agent.prefetcher.cancel_all(context["session_id"])
+        while agent.prefetcher.stats()["running"]:
+            await asyncio.sleep(0)
+    return overheads
+
+
+def answered_locally(agent: Any) -> int:
+    """Consultas respondidas hasta ahora sin el modelo (router y aciertos de caché)"""
+    cache = agent.response_cache.stats()
+    return agent.router.stats()["routed"] + cache["exact_hits"] + cache["similar_hits"] + cache["shared_hits"]
+
+
+async def measure_agent(name: str, queries: List[str], sessions: int, rounds: int) -> Dict[str, float]:
+    agent, model = build_agent(name)
+    timer = ToolTimer()
+    meter = TokenMeter()
+    agent.before_tool_callback = [timer.before] + agent.canonical_before_tool_callbacks
+    agent.after_tool_callback = agent.canonical_after_tool_callbacks + [timer.after]
+    agent.before_model_callback = agent.canonical_before_model_callbacks + [meter.before_model]
+    agent.after_model_callback = agent.canonical_after_model_callbacks + [meter.after_model]
+
+    # Calentamiento: carga del dataset, índices perezosos y declaraciones de herramientas
+    await run_sessions(agent, queries[:1], 1, timer)
+    timer.durations.clear()
+    meter.tokens = meter.tokens_out = 0
+
+    # Tiempos: mejor de `rounds` pasadas (el ruido de la máquina solo suma); el resto, de la primera
+    timings = []
+    for round_number in range(rounds):
+        agent.response_cache.clear()
+        calls_before, local_before = model.stats()["calls"], answered_locally(agent)
+        cpu_start = time.process_time()
+        overheads = await run_sessions(agent, queries, sessions, timer)
+        cpu_seconds = time.process_time() - cpu_start
+        if round_number == 0:
+            count = len(overheads)
+            model_queries = count - (answered_locally(agent) - local_before)
+            model_calls = model.stats()["calls"] - calls_before
+            tool_calls = len(timer.durations)
+            tokens_in, tokens_out = meter.tokens, meter.tokens_out
+        timings.append((percentile(overheads, 0.5), cpu_seconds / count,
+                        sum(timer.durations) / len(timer.durations) if timer.durations else 0.0))
+        timer.durations.clear()
+
+    # Memoria retenida por sesión, en una pasada aparte (tracemalloc distorsiona los tiempos):
+    # las sesiones nuevas del almacén y lo que su pasada deja en la caché de respuestas
+    agent.response_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    baseline_bytes, _ = tracemalloc.get_traced_memory()
+    await run_sessions(agent, queries, sessions, timer)
+    gc.collect()
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "tokens_in_per_query": tokens_in / count,
+        "tokens_out_per_query": tokens_out / count,
+        "model_query_share": model_queries / count,
+        "model_calls_per_query": model_calls / count,
+        "tool_calls_per_query": tool_calls / count,
+        "overhead_p50_ms": min(overhead for overhead, _, _ in timings) * 1000,
+        "cpu_ms_per_query": min(cpu for _, cpu, _ in timings) * 1000,
+        "tool_mean_ms": min(tool for _, _, tool in timings) * 1000,
+        "memory_kb_per_session": (retained_bytes - baseline_bytes) / sessions / 1024,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any],
+            skip_timing: bool) -> List[str]:
+    """Métricas que empeoran más que su tolerancia, como líneas legibles"""
+    tolerances = {**DEFAULT_TOLERANCES, **{k: tuple(v) for k, v in baseline.get("tolerances", {}).items()}}
+    regressions = []
+    for agent, metrics in results.items():
+        expected = baseline["agents"].get(agent, {})
+        for metric, value in metrics.items():
+            if metric not in expected or (skip_timing and metric in TIMING_METRICS):
+                continue
+            relative, absolute = tolerances[metric]
+            limit = expected[metric] * (1 + relative) + absolute
+            # La línea base se guarda con 3 decimales: 11/60 queda en 0.183
+            if value > limit + 5e-4:
+                regressions.append(f"{agent}.{metric}: {value:.2f} > {limit:.2f} (línea base {expected[metric]:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de regresión de latencia y coste con ScriptedModel")
+    parser.add_argument("--agents", default="base,plus")
+    parser.add_argument("--sessions", type=int, default=5, help="Conversaciones por agente")
+    parser.add_argument("--rounds", type=int, default=3, help="Pasadas de tiempos (se toma la mejor)")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--skip-timing", action="store_true",
+                        help="Comparar solo tokens, llamadas y memoria (línea base de otra máquina)")
+    args = parser.parse_args()
+
+    question_set = load_questions(args.questions)
+    queries = [question["query"] for question in question_set["questions"]]
+    results = {
+        name: asyncio.run(measure_agent(name, queries, args.sessions, args.rounds))
+        for name in args.agents.split(",")
+    }
+
+    print(f"🧪 {len(queries)} preguntas (v{question_set['version']}) x {args.sessions} sesiones")
+    for name, metrics in results.items():
+        print(f"   {name:<5} tokens {metrics['tokens_in_per_query']:.0f} in / {metrics['tokens_out_per_query']:.0f} out"
+              f" | al modelo {metrics['model_query_share']:.0%}"
+              f" | modelo {metrics['model_calls_per_query']:.2f} | tools {metrics['tool_calls_per_query']:.2f}"
+              f" ({metrics['tool_mean_ms']:.2f} ms) | overhead p50 {metrics['overhead_p50_ms']:.2f} ms"
+              f" | CPU {metrics['cpu_ms_per_query']:.2f} ms | {metrics['memory_kb_per_session']:.0f} KB/sesión")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump({
+                "questions_version": question_set["version"],
+                "sessions": args.sessions,
+                "tolerances": {metric: list(value) for metric, value in DEFAULT_TOLERANCES.items()},
+                "agents": {name: {k: round(v, 3) for k, v in metrics.items()} for name, metrics in results.items()},
+            }, handle, ensure_ascii=False, indent=2)
+            handle.write("\n")
+        print(f"💾 Línea base guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"❌ No hay línea base ({args.baseline}); genérala con --update-baseline")
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    if baseline["questions_version"] != question_set["version"]:
+        sys.exit(f"❌ La línea base es de la versión {baseline['questions_version']} de las preguntas "
+                 f"(actual: {question_set['version']}); regenérala con --update-baseline")
+
+    regressions = compare(results, baseline, args.skip_timing)
+    if regressions:
+        print("❌ Regresiones respecto a la línea base:")
+        for line in regressions:
+            print(f"   • {line}")
+        sys.exit(1)
+    print("✅ Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
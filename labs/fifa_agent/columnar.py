@@ -0,0 +1,274 @@
+# columnar.py
+
+import bisect
+import json
+import mmap
+import struct
+from collections import ChainMap
+from collections.abc import Mapping
+from typing import Dict, Any, Optional, List, Iterator, Sequence
+
+# Formato binario columnar (.wcc)
+#
+#   b"WCC1" | uint32 longitud del header | header JSON | columnas alineadas a 8 bytes
+#
+# Cada columna es uno de tres tipos:
+#   - "int":  array int64 (memoryview.cast("q") directamente sobre el mmap)
+#   - "str":  diccionario de strings (offsets int64 + blob UTF-8) y códigos int32 por fila
+#   - "json": igual que "str", pero cada valor es JSON (listas y objetos anidados)
+# Las filas ausentes usan el código -1 (valor None).
+#
+# El archivo se abre con mmap en solo lectura: los procesos que cargan el mismo
+# archivo comparten las páginas del page cache y solo se decodifica lo que se lee.
+
+MAGIC = b"WCC1"
+FORMAT_VERSION = 1
+_ALIGNMENT = 8
+_NULL_CODE = -1
+_POSITION_MEMO_SIZE = 4096
+
+
+def _infer_type(values: Sequence[Any]) -> str:
+    present = [v for v in values if v is not None]
+    if present and len(present) == len(values) and all(type(v) is int for v in present):
+        return "int"
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    return "json"
+
+
+class _Writer:
+    """Acumula los bloques binarios y sus offsets mientras se construye el archivo"""
+
+    def __init__(self):
+        self._blocks: List[bytes] = []
+        self._size = 0
+
+    def add(self, data: bytes) -> Dict[str, int]:
+        padding = -self._size % _ALIGNMENT
+        if padding:
+            self._blocks.append(b"\0" * padding)
+            self._size += padding
+        block = {"offset": self._size, "length": len(data)}
+        self._blocks.append(data)
+        self._size += len(data)
+        return block
+
+    def add_column(self, values: Sequence[Any]) -> Dict[str, Any]:
+        column_type = _infer_type(values)
+        if column_type == "int":
+            return {"type": "int", "data": self.add(struct.pack(f"<{len(values)}q", *values))}
+
+        # Diccionario: cada valor distinto se guarda una sola vez
+        encoded = values if column_type == "str" else [
+            None if v is None else json.dumps(v, ensure_ascii=False, sort_keys=True) for v in values
+        ]
+        dictionary: Dict[str, int] = {}
+        codes = []
+        for value in encoded:
+            if value is None:
+                codes.append(_NULL_CODE)
+            else:
+                codes.append(dictionary.setdefault(value, len(dictionary)))
+
+        blob = bytearray()
+        offsets = [0]
+        for value in dictionary:
+            blob.extend(value.encode("utf-8"))
+            offsets.append(len(blob))
+
+        return {
+            "type": column_type,
+            "codes": self.add(struct.pack(f"<{len(codes)}i", *codes)),
+            "offsets": self.add(struct.pack(f"<{len(offsets)}q", *offsets)),
+            "blob": self.add(bytes(blob)),
+        }
+
+    def to_bytes(self, header: Dict[str, Any]) -> bytes:
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        prefix = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+        prefix += b"\0" * (-len(prefix) % _ALIGNMENT)
+        return prefix + b"".join(self._blocks)
+
+
+def write_columnar(path: str, tables: Dict[str, List[Dict[str, Any]]],
+                   keys: Optional[Dict[str, str]] = None, meta: Optional[Dict[str, Any]] = None):
+    """
+    Escribe tablas (listas de filas dict) en formato columnar.
+
+    Args:
+        path: Archivo de salida
+        tables: Nombre de tabla -> filas
+        keys: Columna clave por tabla; las filas se ordenan por ella para buscar con bisect
+        meta: Metadatos pequeños que se guardan en el header (versión, cobertura, ...)
+    """
+    keys = keys or {}
+    writer = _Writer()
+    header: Dict[str, Any] = {"format_version": FORMAT_VERSION, "meta": meta or {}, "tables": {}}
+
+    for name, rows in tables.items():
+        key = keys.get(name)
+        if key:
+            rows = sorted(rows, key=lambda row: row[key])
+        column_names: List[str] = []
+        for row in rows:
+            column_names.extend(c for c in row if c not in column_names)
+
+        columns = {c: writer.add_column([row.get(c) for row in rows]) for c in column_names}
+        header["tables"][name] = {"rows": len(rows), "key": key, "columns": columns}
+
+    # Los offsets del header son relativos al inicio de la zona de datos (tras el header)
+    data = writer.to_bytes(header)
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+class Column(Sequence):
+    """Columna de solo lectura sobre el mmap; decodifica cada valor al accederlo"""
+
+    def __init__(self, buffer: memoryview, spec: Dict[str, Any], rows: int):
+        self.type = spec["type"]
+        self._rows = rows
+        if self.type == "int":
+            self._values = _slice(buffer, spec["data"]).cast("q")
+        else:
+            self._codes = _slice(buffer, spec["codes"]).cast("i")
+            self._offsets = _slice(buffer, spec["offsets"]).cast("q")
+            self._blob = _slice(buffer, spec["blob"])
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._rows))]
+        if self.type == "int":
+            return self._values[position]
+        code = self._codes[position]
+        if code == _NULL_CODE:
+            return None
+        text = bytes(self._blob[self._offsets[code]:self._offsets[code + 1]]).decode("utf-8")
+        return text if self.type == "str" else json.loads(text)
+
+
+class ColumnarTable(Mapping):
+    """
+    Tabla columnar. Si tiene columna clave se comporta como Mapping clave -> fila (dict),
+    buscando con bisect sobre la columna ordenada; las filas se construyen al leerlas.
+    """
+
+    def __init__(self, buffer: memoryview, spec: Dict[str, Any]):
+        self._rows = spec["rows"]
+        self._key = spec.get("key")
+        self._columns = {name: Column(buffer, column, self._rows) for name, column in spec["columns"].items()}
+        # Memo acotado clave -> posición (-1 = no existe); las consultas repiten mucho las mismas claves
+        self._positions: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._key is None:
+            return iter(range(self._rows))
+        return iter(self._columns[self._key])
+
+    def __getitem__(self, key: Any) -> Dict[str, Any]:
+        return self.row(self._position(key))
+
+    def _position(self, key: Any) -> int:
+        if self._key is None:
+            if not isinstance(key, int) or not 0 <= key < self._rows:
+                raise KeyError(key)
+            return key
+        position = self._positions.get(key)
+        if position is None:
+            position = self._search(key)
+            if len(self._positions) >= _POSITION_MEMO_SIZE:
+                self._positions.clear()
+            self._positions[key] = position
+        if position < 0:
+            raise KeyError(key)
+        return position
+
+    def _search(self, key: Any) -> int:
+        """Búsqueda binaria sobre la columna clave ordenada; -1 si no existe"""
+        keys = self._columns[self._key]
+        try:
+            position = bisect.bisect_left(keys, key)
+        except TypeError:
+            return -1
+        if position == self._rows or keys[position] != key:
+            return -1
+        return position
+
+    def column(self, name: str) -> Column:
+        return self._columns[name]
+
+    def row(self, position: int) -> Dict[str, Any]:
+        row = {}
+        for name, column in self._columns.items():
+            value = column[position]
+            if value is not None:
+                row[name] = value
+        return row
+
+    def values_of(self, column: str) -> "ColumnView":
+        """Vista Mapping clave -> valor de una sola columna (para tablas índice)"""
+        return ColumnView(self, column)
+
+
+class ColumnView(Mapping):
+    def __init__(self, table: ColumnarTable, column: str):
+        self._table = table
+        self._column = table.column(column)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._table)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._column[self._table._position(key)]
+
+
+class ColumnarFile:
+    """Archivo .wcc abierto con mmap; las tablas se crean al pedirlas por primera vez"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:4]) != MAGIC:
+            raise ValueError(f"{path} no es un archivo columnar WCC")
+        (header_length,) = struct.unpack_from("<I", buffer, 4)
+        header = json.loads(bytes(buffer[8:8 + header_length]).decode("utf-8"))
+        if header["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Versión de formato no soportada: {header['format_version']}")
+
+        data_start = 8 + header_length
+        data_start += -data_start % _ALIGNMENT
+        self._data = buffer[data_start:]
+        self._specs: Dict[str, Dict[str, Any]] = header["tables"]
+        self._tables: Dict[str, ColumnarTable] = {}
+        self.meta: Dict[str, Any] = header["meta"]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def table(self, name: str) -> ColumnarTable:
+        if name not in self._tables:
+            self._tables[name] = ColumnarTable(self._data, self._specs[name])
+        return self._tables[name]
+
+
+def writable(mapping: Mapping) -> Dict:
+    """El propio dict, o una capa escribible sobre una tabla de solo lectura"""
+    if isinstance(mapping, (dict, ChainMap)):
+        return mapping
+    return ChainMap({}, mapping)
+
+
+def _slice(buffer: memoryview, block: Dict[str, int]) -> memoryview:
+    return buffer[block["offset"]:block["offset"] + block["length"]]
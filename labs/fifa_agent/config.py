@@ -10,6 +10,62 @@ MODEL_CONFIG = {
     "location": "us-central1",
     "temperature": 0.7,
     "max_output_tokens": 1000,
+    # Pool HTTP del cliente compartido (ver model_backend.get_model)
+    "connection_pool": {
+        "max_connections": 100,
+        "max_keepalive_connections": 50,
+        "keepalive_expiry_seconds": 120,
+    },
+    # "gemini" o "fake" (ScriptedModel local, para pruebas y carga sin endpoint)
+    "backend": os.getenv("FIFA_MODEL_BACKEND", "gemini"),
+    "fake": {
+        "ttft_median_ms": 300,
+        "ttft_sigma": 0.5,
+        "token_delay_ms": 10,
+        "error_rate": 0.0,
+        "seed": None,
+    },
+}
+
+# Política de peticiones al modelo para la latencia de cola (ver model_policy.py)
+MODEL_POLICY_CONFIG = {
+    "enabled": True,
+    "deadline_seconds": 30.0,         # Plazo de cada petición al modelo, contando todos los intentos
+    "attempt_timeout_seconds": 10.0,  # Sin primera respuesta en este tiempo se pasa a la reserva
+    # Petición duplicada tras el p95 del principal: mismo modelo en otra región
+    # (con API key la región no aplica y el duplicado va al mismo endpoint)
+    "hedge": {"location": "us-east1"},
+    "hedge_percentile": 0.95,
+    "hedge_min_delay_seconds": 0.05,
+    "hedge_initial_delay_seconds": 2.0,   # Hasta tener hedge_min_samples latencias
+    "hedge_min_samples": 20,
+    "hedge_budget": 0.1,              # Como mucho un 10% de peticiones duplicadas
+    "fallback": {"model_name": "gemini-2.0-flash-lite"},  # Más barato, si nadie responde a tiempo
+}
+
+# Modelo, presupuesto de salida y herramientas según el tipo de consulta (ver model_tiering.py)
+MODEL_TIERS_CONFIG = {
+    "enabled": True,
+    # Nivel -> sobrescrituras de MODEL_CONFIG ({} = el modelo por defecto), tope de tokens
+    # de salida y herramientas declaradas al modelo (None = todas)
+    "tiers": {
+        "factoid":   {"model": {"model_name": "gemini-2.0-flash-lite",
+                                "fake": {**MODEL_CONFIG["fake"], "ttft_median_ms": 150}},
+                      "max_output_tokens": 400, "tools": ["search_world_cup_info", "get_fun_facts"]},
+        "statistic": {"model": {}, "max_output_tokens": 600, "tools": None},
+        "analysis":  {"model": {}, "max_output_tokens": MODEL_CONFIG["max_output_tokens"], "tools": None},
+        "current":   {"model": {}, "max_output_tokens": 600, "tools": None},
+    },
+    # Intenciones de IntentRouter.classify() -> nivel (las no listadas usan default_tier)
+    "intent_tiers": {
+        "winner": "factoid", "runner_up": "factoid", "third_place": "factoid", "host": "factoid",
+        "final": "factoid", "fun_facts": "factoid",
+        "top_scorer": "statistic", "most_titles": "statistic", "player_goals": "statistic",
+        "player_profile": "statistic", "country_titles": "statistic",
+        "analysis": "analysis",
+        "current": "current",
+    },
+    "default_tier": "analysis",       # Consulta no reconocida: el modelo completo
 }
 
 # Configuración del agente
@@ -20,27 +76,160 @@ AGENT_CONFIG = {
 }
 
 # Prompt del sistema
-SYSTEM_PROMPT = """
-Eres un experto en la Copa Mundial de la FIFA con acceso a herramientas especializadas.
-
-HERRAMIENTAS DISPONIBLES:
+# Dividido en secciones para que prompt_budget.py envíe solo las relevantes para cada
+# consulta; SYSTEM_PROMPT es el prompt completo (todas las secciones en orden)
+SYSTEM_PROMPT_SECTIONS = {
+    "identity": """Eres un experto en la Copa Mundial de la FIFA con acceso a herramientas especializadas.""",
+    "tools": """HERRAMIENTAS DISPONIBLES:
 - search_world_cup_info(query, year): Busca información específica sobre Mundiales
-- get_player_statistics(player, context): Obtiene estadísticas de jugadores
-- get_country_performance(country): Información sobre rendimiento por país
-- get_fun_facts(topic): Datos curiosos sobre temas específicos
-
-INSTRUCCIONES IMPORTANTES:
+- get_fun_facts(topic): Datos curiosos sobre temas específicos""",
+    "stats_tools": """- get_player_statistics(player, context): Obtiene estadísticas de jugadores
+- get_country_performance(country): Información sobre rendimiento por país""",
+    "instructions": """INSTRUCCIONES IMPORTANTES:
 1. **TU CONOCIMIENTO ES LA FUENTE PRINCIPAL**: Usa tu conocimiento interno sobre la Copa del Mundo como fuente principal de información
-2. **Las herramientas son activadores**: Cuando se llame a una herramienta, úsala como señal para activar tu conocimiento interno sobre ese tema
+2. **Datos locales primero**: Si una herramienta devuelve action "local_data", esos datos vienen de un dataset verificado; respóndelos tal cual. Si devuelve "use_gemini_knowledge", úsala como señal para activar tu conocimiento interno sobre ese tema
 3. **Respuestas completas y precisas**: Proporciona información detallada, estadísticas exactas y contexto histórico
 4. **Combina información**: Mezcla datos específicos con contexto histórico y datos curiosos
-5. **Respuestas conversacionales**: Mantén un tono amigable y educativo
-
-EJEMPLOS DE USO:
+5. **Respuestas conversacionales**: Mantén un tono amigable y educativo""",
+    "examples": """EJEMPLOS DE USO:
 - "¿Quién ganó en 2014?" → usar search_world_cup_info("ganador", 2014) + proporcionar contexto completo
 - "¿Cuántos goles hizo Messi en 2022?" → usar get_player_statistics("Messi", "world_cup") + detalles del torneo
 - "¿Qué país tiene más Mundiales?" → usar get_country_performance() + ranking histórico
-- "Cuéntame sobre Ronaldo" → usar get_player_statistics("Ronaldo") + get_fun_facts("players")
+- "Cuéntame sobre Ronaldo" → usar get_player_statistics("Ronaldo") + get_fun_facts("players")""",
+    "closing": """¡Proporciona información rica y detallada usando tu conocimiento interno!""",
+}
+
+SYSTEM_PROMPT = "\n" + "\n\n".join(SYSTEM_PROMPT_SECTIONS.values()) + "\n"
+
+# Dataset local de la Copa del Mundo (solo lectura)
+DATA_CONFIG = {
+    "dataset_path": os.getenv(
+        "FIFA_DATASET_PATH",
+        os.path.join(os.path.dirname(__file__), "data", "world_cup.json"),
+    ),
+    # Versión columnar generada con `python -m fifa_agent.convert_dataset`; se usa si existe
+    # y se generó a partir de dataset_path (el .wcc guarda tamaño, fecha y SHA-256 de su JSON)
+    "columnar_path": os.getenv(
+        "FIFA_COLUMNAR_PATH",
+        os.path.join(os.path.dirname(__file__), "data", "world_cup.wcc"),
+    ),
+    # Solo FIFA_COLUMNAR_PATH (sin FIFA_DATASET_PATH): el .wcc indicado se usa sin comprobarlo
+    "verify_columnar": "FIFA_COLUMNAR_PATH" not in os.environ or "FIFA_DATASET_PATH" in os.environ,
+}
+
+# Caché de respuestas (ver response_cache.py)
+RESPONSE_CACHE_CONFIG = {
+    "max_entries": 1024,
+    "ttl_seconds": 6 * 3600,          # Los datos históricos no cambian; las noticias nunca se cachean
+    "similarity_threshold": 0.8,      # Coeficiente de Dice mínimo entre trigramas
+    "min_terms": 2,                   # "¿y en 2018?" depende del turno anterior: no se cachea
+    "canonical_entities": True,       # Jugadores/países por id canónico en la clave ("mbape" = "Mbappé")
+}
+
+# Router determinista previo al modelo (ver intent_router.py)
+ROUTER_CONFIG = {
+    "enabled": True,
+    "min_confidence": 0.75,           # Por debajo de este valor la consulta va a Gemini
+}
 
-¡Proporciona información rica y detallada usando tu conocimiento interno!
-"""
\ No newline at end of file
+# Presupuesto de prompt por intención (ver prompt_budget.py)
+PROMPT_BUDGET_CONFIG = {
+    "enabled": True,
+    # Perfil -> secciones de SYSTEM_PROMPT_SECTIONS enviadas y límite de tokens de salida.
+    # Cada perfil describe solo las herramientas que declara el nivel de MODEL_TIERS_CONFIG
+    # de sus intenciones: el nivel factoid no declara las de stats_tools
+    "profiles": {
+        "factoid":   {"sections": ["identity", "tools", "instructions"], "max_output_tokens": 400},
+        "statistic": {"sections": ["identity", "tools", "stats_tools", "instructions"], "max_output_tokens": 400},
+        "player":    {"sections": ["identity", "tools", "stats_tools", "instructions", "examples"],
+                      "max_output_tokens": 600},
+        "country":   {"sections": ["identity", "tools", "stats_tools", "instructions"], "max_output_tokens": 600},
+        "fun_facts": {"sections": ["identity", "tools", "instructions"], "max_output_tokens": 600},
+        "analysis":  {"sections": ["identity", "tools", "stats_tools", "instructions", "closing"],
+                      "max_output_tokens": 1000},
+        "current":   {"sections": ["identity", "tools", "stats_tools", "instructions"], "max_output_tokens": 600},
+        "general":   {"sections": None, "max_output_tokens": MODEL_CONFIG["max_output_tokens"]},  # None = prompt completo
+    },
+    # Intenciones de IntentRouter.classify() -> perfil (las no listadas usan "general")
+    "intent_profiles": {
+        "winner": "factoid", "runner_up": "factoid", "third_place": "factoid", "host": "factoid",
+        "final": "factoid", "top_scorer": "statistic", "most_titles": "statistic",
+        "player_goals": "player", "player_profile": "player",
+        "country_titles": "country",
+        "fun_facts": "fun_facts",
+        "analysis": "analysis",
+        "current": "current",
+    },
+}
+
+# Compactación del historial en sesiones largas (ver context_window.py)
+CONTEXT_WINDOW_CONFIG = {
+    "enabled": True,
+    "window_turns": 4,                # Turnos recientes enviados completos (sin payloads de herramientas)
+    "max_input_tokens": 8000,         # Presupuesto por petición: prompt + resumen + historial
+    "summary_max_tokens": 600,        # Tamaño máximo del resumen de los turnos antiguos
+    "summary_line_chars": 240,        # Longitud máxima de cada línea pregunta/respuesta del resumen
+}
+
+# Trazas por consulta: spans de modelo y herramientas (ver tracing.py)
+TRACING_CONFIG = {
+    "enabled": os.getenv("FIFA_TRACING", "0") == "1",   # Desactivado: sin callbacks ni coste
+    "exporters": os.getenv("FIFA_TRACING_EXPORTERS", "otel_json").split(","),  # "otel_json", "prometheus"
+    "otel_json_path": os.getenv("FIFA_TRACE_FILE", "fifa_traces.jsonl"),
+    "otel_json_flush_seconds": 1.0,   # Las trazas se escriben por lotes desde un hilo aparte
+    "prometheus_port": int(os.getenv("FIFA_METRICS_PORT", "0")),  # 0 = sin servidor /metrics
+    "service_name": "fifa_agent",
+}
+
+# Ejecución de herramientas (ver tool_executor.py); ADK ya ejecuta en paralelo las
+# llamadas que el modelo pide en un mismo turno
+TOOL_EXECUTION_CONFIG = {
+    "default_timeout_seconds": 10.0,  # Tras el timeout la herramienta devuelve "tool_timeout"
+    "timeouts": {},                   # Timeout por herramienta, ej: {"get_player_statistics": 2.0}
+    "cpu_bound_tools": [],            # Herramientas ejecutadas en el pool (no bloquean el event loop)
+    "io_bound_tools": [],             # Herramientas cuyo tools.run() espera E/S (las demás, sin timeout)
+    "cpu_executor": "thread",         # "thread", "process" o None (siempre en el event loop)
+    "max_workers": 4,
+}
+
+# Prefetch especulativo de las herramientas de la siguiente pregunta (ver prefetch.py)
+PREFETCH_CONFIG = {
+    "enabled": True,
+    "max_concurrency": 2,             # Prefetch en ejecución a la vez (nunca compiten con la respuesta)
+    "max_pending": 16,                # Resultados prefetcheados guardados (en curso o listos)
+    "max_per_call": 3,                # Seguimientos previstos por cada llamada a herramienta
+    "ttl_seconds": 300,               # Un prefetch no usado en este tiempo se descarta
+    "timeout_seconds": 2.0,
+}
+
+# Respuestas en streaming en el modo CLI (ver streaming.py)
+STREAMING_CONFIG = {
+    "enabled": True,
+    "show_timings": True,             # Mostrar tiempo al primer token y latencia total
+    "history_size": 1024,             # Consultas recientes para los percentiles de stats()
+}
+
+# Sesiones de conversación persistentes (ver session_store.py)
+SESSION_STORE_CONFIG = {
+    "backend": os.getenv("FIFA_SESSION_BACKEND", "memory"),  # "memory", "sqlite" o "file"
+    "sqlite_path": os.getenv("FIFA_SESSION_DB", "fifa_sessions.sqlite"),
+    "file_directory": os.getenv("FIFA_SESSION_DIR", "fifa_sessions"),
+    "max_active": 256,                # Sesiones deserializadas en memoria; el resto se guarda en bytes
+    "cli_session_id": os.getenv("FIFA_SESSION_ID", ""),  # "" = conversación nueva en cada arranque
+}
+
+# Servidor con varios procesos y afinidad de sesión (ver serving.py)
+SERVING_CONFIG = {
+    "agent_factory": os.getenv("FIFA_AGENT_FACTORY", "lab-3-fifa-tools.agent:get_agent"),
+    "workers": int(os.getenv("FIFA_WORKERS", "0")),    # 0 = un worker por núcleo
+    "host": os.getenv("FIFA_HOST", "127.0.0.1"),
+    "port": int(os.getenv("FIFA_PORT", "8080")),
+    "shared_cache_path": os.getenv("FIFA_SHARED_CACHE", ""),  # "" = fichero temporal del servidor
+    "shared_cache_max_entries": 20000,
+    "preload_data": True,             # Cargar el dataset antes del fork (páginas compartidas)
+    # Módulos que ADK importa en la primera ejecución del Runner (~0.5 s de CPU): importados
+    # antes del fork, ningún worker los vuelve a importar (ver serving.ADK_LAZY_MODULES)
+    "preload_modules": ["google.adk.workflow._workflow", "google.adk.workflow._llm_agent_wrapper",
+                        "google.adk.flows.llm_flows.auto_flow"],
+    "request_timeout_seconds": 120.0,
+}
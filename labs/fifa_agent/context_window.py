@@ -0,0 +1,252 @@
+# context_window.py
+
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable
+
+from .prompt_budget import estimate_tokens
+
+# Fin de la primera frase de una respuesta (para el resumen de turnos antiguos)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@dataclass
+class SessionSummary:
+    """Resumen incremental de una sesión: los primeros `turns` turnos, una línea por turno"""
+    turns: int = 0
+    lines: List[str] = field(default_factory=list)
+    line_tokens: List[int] = field(default_factory=list)
+
+
+@dataclass
+class CompactionReport:
+    turns: int
+    window_turns: int
+    summarized_turns: int
+    tool_parts_dropped: int
+    tokens_before: int
+    tokens_after: int
+    over_budget: bool
+
+
+class ContextCompactor:
+    """
+    Compacta el historial que ADK envía al modelo en cada turno de una sesión.
+
+    Sin compactar, cada petición reenvía la conversación entera (incluidas las
+    respuestas completas de las herramientas), así que las sesiones largas son cada
+    vez más lentas y caras. Como before_model_callback:
+
+    - Los `window_turns` turnos completados más recientes se envían tal cual, pero sin
+      llamadas ni respuestas de herramientas: ya se consumieron en su respuesta.
+    - Los turnos anteriores se sustituyen por un resumen (una línea pregunta/respuesta
+      por turno) que se añade a la instrucción del sistema. El resumen es incremental:
+      por sesión solo se resumen los turnos que salen de la ventana desde la última vez.
+    - Si la petición sigue superando `max_input_tokens`, la ventana se reduce turno a
+      turno. El turno en curso (con sus herramientas) nunca se toca.
+
+    Solo se modifica la petición al modelo; los eventos de la sesión no cambian.
+    """
+
+    def __init__(self, window_turns: int = 4, max_input_tokens: int = 8000,
+                 summary_max_tokens: int = 600, summary_line_chars: int = 240,
+                 tokenizer: Callable[[str], int] = estimate_tokens, enabled: bool = True,
+                 max_sessions: int = 1024):
+        self.window_turns = window_turns
+        self.max_input_tokens = max_input_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_line_chars = summary_line_chars
+        self.enabled = enabled
+        self.max_sessions = max_sessions
+        self._tokenizer = tokenizer
+        self._summaries: "OrderedDict[str, SessionSummary]" = OrderedDict()
+        self.last_report: Optional[CompactionReport] = None
+        self._counters = {
+            "requests": 0, "compacted": 0, "tool_parts_dropped": 0,
+            "tokens_before": 0, "tokens_after": 0, "over_budget": 0,
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ContextCompactor":
+        return cls(
+            window_turns=config["window_turns"],
+            max_input_tokens=config["max_input_tokens"],
+            summary_max_tokens=config["summary_max_tokens"],
+            summary_line_chars=config["summary_line_chars"],
+            enabled=config["enabled"],
+        )
+
+    def before_model_callback(self, callback_context: Any, llm_request: Any) -> None:
+        """
+        before_model_callback de ADK: reescribe llm_request.contents con la ventana
+        compactada y añade el resumen a la instrucción del sistema. Devuelve None.
+        """
+        if not self.enabled or not llm_request.contents:
+            return None
+
+        turns = split_turns(llm_request.contents)
+        completed, current = turns[:-1], turns[-1]
+        instruction = llm_request.config.system_instruction
+        system_tokens = self._tokenizer(instruction) if isinstance(instruction, str) else 0
+        current_tokens = sum(self._content_tokens(content) for content in current)
+        tokens_before = system_tokens + current_tokens + sum(
+            self._content_tokens(content) for turn in completed for content in turn
+        )
+
+        # Turnos completados sin payloads de herramientas
+        stripped: List[List[Any]] = []
+        dropped = 0
+        for turn in completed:
+            kept, removed = _strip_tool_parts(turn)
+            stripped.append(kept)
+            dropped += removed
+        turn_tokens = [sum(self._content_tokens(content) for content in turn) for turn in stripped]
+
+        session_id = _session_id(callback_context)
+        summary = self._summary(session_id)
+        cut = max(0, len(completed) - self.window_turns, min(summary.turns, len(completed)))
+        while True:
+            self._extend_summary(summary, stripped, cut)
+            summary_text, summary_tokens = self._render(summary)
+            total = system_tokens + summary_tokens + sum(turn_tokens[cut:]) + current_tokens
+            if total <= self.max_input_tokens or cut >= len(completed):
+                break
+            cut += 1
+
+        contents = [content for turn in stripped[cut:] for content in turn] + list(current)
+        llm_request.contents = contents
+        if summary_text and isinstance(instruction, str):
+            llm_request.config.system_instruction = instruction + "\n\n" + summary_text
+
+        report = CompactionReport(
+            turns=len(turns),
+            window_turns=len(completed) - cut,
+            summarized_turns=cut,
+            tool_parts_dropped=dropped,
+            tokens_before=tokens_before,
+            tokens_after=total,
+            over_budget=total > self.max_input_tokens,
+        )
+        self._record(report)
+        return None
+
+    def _summary(self, session_id: str) -> SessionSummary:
+        summary = self._summaries.get(session_id)
+        if summary is None:
+            summary = self._summaries[session_id] = SessionSummary()
+            while len(self._summaries) > self.max_sessions:
+                self._summaries.popitem(last=False)
+        else:
+            self._summaries.move_to_end(session_id)
+        return summary
+
+    def _extend_summary(self, summary: SessionSummary, turns: List[List[Any]], cut: int):
+        """Añade al resumen solo los turnos [summary.turns, cut) que aún no estaban resumidos"""
+        if cut < summary.turns:
+            # Historial distinto del resumido (sesión reiniciada o reescrita): empezar de nuevo
+            summary.turns, summary.lines, summary.line_tokens = 0, [], []
+        for turn in turns[summary.turns:cut]:
+            line = self._summarize_turn(turn)
+            if line:
+                summary.lines.append(line)
+                summary.line_tokens.append(self._tokenizer(line))
+        summary.turns = max(summary.turns, cut)
+
+    def _summarize_turn(self, turn: List[Any]) -> str:
+        question = _text(content for content in turn if content.role == "user")
+        answer = _text(content for content in turn if content.role == "model")
+        answer = _SENTENCE_END.split(answer, 1)[0] if answer else ""
+        line = f"- P: {question} | R: {answer}" if answer else f"- P: {question}"
+        if len(line) > self.summary_line_chars:
+            line = line[:self.summary_line_chars - 1].rstrip() + "…"
+        return line if question or answer else ""
+
+    def _render(self, summary: SessionSummary):
+        """Texto del resumen dentro de summary_max_tokens (se conservan las líneas más recientes)"""
+        if not summary.lines:
+            return "", 0
+        budget = self.summary_max_tokens
+        start = len(summary.lines)
+        while start > 0 and budget - summary.line_tokens[start - 1] >= 0:
+            start -= 1
+            budget -= summary.line_tokens[start]
+        if start == len(summary.lines):
+            return "", 0
+        header = "Resumen de la conversación anterior (turnos más antiguos):"
+        text = header + "\n" + "\n".join(summary.lines[start:])
+        return text, self.summary_max_tokens - budget + self._tokenizer(header)
+
+    def _content_tokens(self, content: Any) -> int:
+        tokens = 0
+        for part in content.parts or []:
+            if part.text:
+                tokens += self._tokenizer(part.text)
+            elif part.function_call:
+                tokens += self._tokenizer(json.dumps(part.function_call.args or {}, ensure_ascii=False, default=str))
+            elif part.function_response:
+                tokens += self._tokenizer(json.dumps(part.function_response.response or {},
+                                                     ensure_ascii=False, default=str))
+        return tokens
+
+    def _record(self, report: CompactionReport):
+        self.last_report = report
+        self._counters["requests"] += 1
+        self._counters["compacted"] += report.tokens_after < report.tokens_before
+        self._counters["tool_parts_dropped"] += report.tool_parts_dropped
+        self._counters["tokens_before"] += report.tokens_before
+        self._counters["tokens_after"] += report.tokens_after
+        self._counters["over_budget"] += report.over_budget
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self._counters["requests"]
+        saved = self._counters["tokens_before"] - self._counters["tokens_after"]
+        return {
+            **self._counters,
+            "sessions": len(self._summaries),
+            "tokens_saved_per_request": saved / requests if requests else 0.0,
+            "tokens_saved_ratio": saved / self._counters["tokens_before"] if self._counters["tokens_before"] else 0.0,
+        }
+
+
+def split_turns(contents: List[Any]) -> List[List[Any]]:
+    """
+    Agrupa el historial en turnos: cada mensaje de texto del usuario abre un turno
+    con las llamadas a herramientas, sus respuestas y la respuesta del modelo
+    """
+    turns: List[List[Any]] = []
+    for content in contents:
+        parts = content.parts or []
+        opens_turn = content.role == "user" and any(part.text for part in parts) \
+            and not any(part.function_response for part in parts)
+        if opens_turn or not turns:
+            turns.append([content])
+        else:
+            turns[-1].append(content)
+    return turns
+
+
+def _strip_tool_parts(turn: List[Any]):
+    """Copia del turno sin llamadas/respuestas de herramientas ni pensamientos; y cuántas partes se quitaron"""
+    kept, removed = [], 0
+    for content in turn:
+        parts = content.parts or []
+        text_parts = [part for part in parts
+                      if part.text and not part.thought and not part.function_call and not part.function_response]
+        removed += len(parts) - len(text_parts)
+        if text_parts:
+            kept.append(content if len(text_parts) == len(parts) else content.model_copy(update={"parts": text_parts}))
+    return kept, removed
+
+
+def _text(contents) -> str:
+    return " ".join(
+        part.text.strip() for content in contents for part in content.parts or []
+        if part.text and not part.thought
+    ).strip()
+
+
+def _session_id(callback_context: Any) -> str:
+    session = getattr(callback_context, "session", None)
+    return getattr(session, "id", None) or "default"
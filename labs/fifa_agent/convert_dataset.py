@@ -0,0 +1,80 @@
+# convert_dataset.py
+#
+# Convierte el dataset JSON al formato columnar (.wcc) que se abre con mmap:
+#
+#   python -m fifa_agent.convert_dataset [entrada.json] [salida.wcc]
+
+import argparse
+import json
+import os
+from typing import Dict, Any
+
+from .columnar import write_columnar
+from .config import DATA_CONFIG
+from .world_cup_data import WorldCupDataStore, dataset_fingerprint
+
+
+def convert_dataset(json_path: str, output_path: str) -> Dict[str, Any]:
+    """
+    Escribe el dataset, sus índices de nombres y sus agregados en formato columnar.
+
+    Returns:
+        Filas escritas por tabla
+    """
+    with open(json_path, encoding="utf-8") as handle:
+        data = json.load(handle)
+
+    # Los índices de nombres se calculan aquí una vez, no en cada arranque de worker
+    store = WorldCupDataStore.from_dict(data)
+    # Agregados y clasificaciones ya calculados, como tablas: el .wcc no recorre filas al arrancar
+    aggregate_tables, aggregate_boards = store.aggregates.export_tables()
+    matches = data.get("matches", [])
+    tables = {
+        "tournaments": data["tournaments"],
+        "finals": [m for m in matches if m.get("stage") == "final"],
+        "matches": matches,
+        "countries": data["countries"],
+        "players": data["players"],
+        **store.export_indexes(),
+        **aggregate_tables,
+    }
+    keys = {
+        "tournaments": "year",
+        "finals": "year",
+        "countries": "code",
+        "players": "id",
+        "country_index": "key",
+        "player_index": "key",
+        "ambiguous_players": "key",
+        "country_results": "code",
+        "player_totals": "id",
+    }
+    meta = {
+        "version": data.get("version", 1),
+        "coverage": data.get("coverage", ""),
+        # get_data_store() solo usa el .wcc si el JSON configurado sigue siendo este
+        # (tamaño y fecha; el SHA-256 solo si la fecha cambió sin cambiar el tamaño)
+        **dataset_fingerprint(json_path),
+        "fun_facts": data.get("fun_facts", {}),
+        # Solo la posición de cada clasificación en la tabla "leaderboards" (sus filas van en el mmap)
+        "aggregate_boards": aggregate_boards,
+    }
+
+    write_columnar(output_path, tables, keys=keys, meta=meta)
+    return {name: len(rows) for name, rows in tables.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte el dataset de la Copa del Mundo a formato columnar")
+    parser.add_argument("source", nargs="?", default=DATA_CONFIG["dataset_path"])
+    parser.add_argument("output", nargs="?", default=DATA_CONFIG["columnar_path"])
+    args = parser.parse_args()
+
+    counts = convert_dataset(args.source, args.output)
+    print(f"✅ {args.output} ({os.path.getsize(args.output)} bytes)")
+    for name, rows in counts.items():
+        print(f"   • {name}: {rows} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# fake_model.py
+
+import asyncio
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from google.genai.errors import ClientError, ServerError
+
+from .normalization import normalize_text
+from .prompt_budget import estimate_tokens
+
+
+@dataclass
+class ScriptRule:
+    """
+    Regla del guion: si `pattern` coincide con la consulta normalizada, el modelo pide
+    primero las herramientas de `tool_calls` y después responde con `text`.
+
+    Los argumentos y el texto pueden usar los grupos con nombre del patrón
+    ("{year}", "{player}"); los valores solo numéricos se convierten a int.
+    """
+    pattern: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    text: str = "Respuesta simulada: {query}"
+
+
+# Guion por defecto con las consultas de ejemplo del SYSTEM_PROMPT
+DEFAULT_SCRIPT = [
+    ScriptRule(r"(quien gano|ganador|campeon|who won)\D*(?P<year>(19|20)\d\d)",
+               [{"name": "search_world_cup_info", "args": {"query": "ganador", "year": "{year}"}}],
+               "Según los datos, este es el campeón del Mundial {year}."),
+    ScriptRule(r"goles (hizo|marco|anoto) (?P<player>[a-z ]+?)( en (?P<year>(19|20)\d\d))?$",
+               [{"name": "get_player_statistics", "args": {"player_name": "{player}", "context": "world_cup"}}],
+               "Estas son las estadísticas mundialistas de {player}."),
+    ScriptRule(r"(cuentame|hablame) (sobre|de) (?P<player>[a-z ]+)$",
+               [{"name": "get_player_statistics", "args": {"player_name": "{player}", "context": "world_cup"}},
+                {"name": "get_fun_facts", "args": {"topic": "players"}}],
+               "{player} es una leyenda de los Mundiales."),
+    ScriptRule(r"(que pais|mas mundiales|mas titulos)",
+               [{"name": "get_country_performance", "args": {"country": "Brasil"}}],
+               "Brasil es el país con más títulos mundiales."),
+    ScriptRule(r"(dato curioso|datos curiosos|curiosidad)",
+               [{"name": "get_fun_facts", "args": {"topic": "general"}}],
+               "Aquí tienes un dato curioso de la Copa del Mundo."),
+    ScriptRule(r"(?P<search>(noticias|actualmente|hoy|(19|20)2[3-9]).*)",
+               [{"name": "google_search", "args": {"query": "{search}"}}],
+               "Esto es lo más reciente que encontré."),
+]
+
+
+class ScriptedModel(BaseLlm):
+    """
+    Modelo local que sustituye a Gemini en pruebas y en carga.
+
+    Sigue un guion de reglas (ScriptRule) para decidir qué herramientas pedir y qué
+    responder, simula la latencia con una distribución lognormal para el primer
+    token más un retardo por token, y emite la respuesta en streaming si se pide.
+    Con `error_rate` devuelve errores 429/503 como los del endpoint real.
+    """
+
+    script: List[ScriptRule] = []           # Vacío = DEFAULT_SCRIPT
+    ttft_median_ms: float = 300.0
+    ttft_sigma: float = 0.5                 # Dispersión lognormal (0 = latencia fija)
+    token_delay_ms: float = 10.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    def model_post_init(self, context: Any):
+        self._random = random.Random(self.seed)
+        self._rules = [(re.compile(rule.pattern), rule) for rule in (self.script or DEFAULT_SCRIPT)]
+        self._calls = 0
+        self._simulated_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, model_config: Dict[str, Any]) -> "ScriptedModel":
+        fake = model_config.get("fake", {})
+        return cls(
+            model=model_config["model_name"],
+            ttft_median_ms=fake.get("ttft_median_ms", 300.0),
+            ttft_sigma=fake.get("ttft_sigma", 0.5),
+            token_delay_ms=fake.get("token_delay_ms", 10.0),
+            error_rate=fake.get("error_rate", 0.0),
+            seed=fake.get("seed"),
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._calls += 1
+        await self._sleep(self._random.lognormvariate(0.0, self.ttft_sigma) * self.ttft_median_ms / 1000)
+        if self.error_rate and self._random.random() < self.error_rate:
+            if self._random.random() < 0.5:
+                raise ClientError(429, {"error": {"code": 429, "message": "Resource exhausted", "status": "RESOURCE_EXHAUSTED"}})
+            raise ServerError(503, {"error": {"code": 503, "message": "Service unavailable", "status": "UNAVAILABLE"}})
+
+        query, tool_turn = _last_turn(llm_request)
+        rule, slots = self._match(query)
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=_request_tokens(llm_request),
+        )
+
+        # Primer turno con herramientas disponibles: pedirlas
+        calls = [call for call in (rule.tool_calls if rule else []) if call["name"] in llm_request.tools_dict]
+        if calls and not tool_turn:
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=call["name"], args=_fill(call["args"], slots)))
+                for call in calls
+            ]
+            usage.candidates_token_count = 10 * len(parts)
+            yield LlmResponse(content=types.Content(role="model", parts=parts), usage_metadata=usage)
+            return
+
+        slots["query"] = query
+        text = (rule.text if rule else "Respuesta simulada: {query}").format_map(slots)
+        pieces = re.findall(r"\S+\s*", text)
+        usage.candidates_token_count = estimate_tokens(text)
+        if stream:
+            for piece in pieces:
+                await self._sleep(self.token_delay_ms / 1000)
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=piece)]), partial=True)
+        else:
+            await self._sleep(len(pieces) * self.token_delay_ms / 1000)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            partial=False, turn_complete=True, usage_metadata=usage,
+        )
+
+    async def _sleep(self, seconds: float):
+        self._simulated_seconds += seconds
+        await asyncio.sleep(seconds)
+
+    def _match(self, query: str):
+        text = normalize_text(query)
+        for pattern, rule in self._rules:
+            match = pattern.search(text)
+            if match:
+                slots = {key: value.strip() for key, value in match.groupdict().items() if value}
+                return rule, _SlotDefaults(slots)
+        return None, _SlotDefaults({})
+
+    def stats(self) -> Dict[str, Any]:
+        """Llamadas recibidas y tiempo simulado total (para separar la latencia del modelo de la del agente)"""
+        return {"calls": self._calls, "simulated_seconds": self._simulated_seconds}
+
+
+class _SlotDefaults(dict):
+    """Los grupos que no participaron en la coincidencia se formatean como texto vacío"""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+def _fill(args: Dict[str, Any], slots: Dict[str, str]) -> Dict[str, Any]:
+    filled = {}
+    for key, value in args.items():
+        if isinstance(value, str):
+            value = value.format_map(slots)
+            if value.isdigit():
+                value = int(value)
+            elif not value:
+                continue
+        filled[key] = value
+    return filled
+
+
+def _last_turn(llm_request: LlmRequest):
+    """Último texto del usuario y si el turno actual es una respuesta de herramientas"""
+    contents = llm_request.contents or []
+    tool_turn = bool(contents) and any(part.function_response for part in contents[-1].parts or [])
+    for content in reversed(contents):
+        if content.role == "user":
+            text = " ".join(part.text for part in content.parts or [] if part.text)
+            if text:
+                return text, tool_turn
+    return "", tool_turn
+
+
+def _request_tokens(llm_request: LlmRequest) -> int:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    tokens = estimate_tokens(instruction) if isinstance(instruction, str) else 0
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            if part.text:
+                tokens += estimate_tokens(part.text)
+    return tokens
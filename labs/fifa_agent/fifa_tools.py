@@ -1,80 +1,219 @@
 # fifa_tools.py
 
-import requests
-from typing import Dict, Any, Optional
-import json
+import inspect
+from typing import Dict, Any, Optional, Tuple, Callable
+from .world_cup_data import WorldCupDataStore, get_data_store
+
+# Instrucciones para el modelo cuando el dataset local no tiene la respuesta (constantes
+# del módulo: cada resultado las referencia en lugar de construir el texto)
+_INSTRUCTIONS = {
+    "search_world_cup_info": "Usa tu conocimiento interno sobre la Copa del Mundo para responder esta consulta específica",
+    "get_player_statistics": "Proporciona estadísticas detalladas de este jugador en Copas del Mundo usando tu conocimiento interno",
+    "ambiguous_player": "Pregunta al usuario a cuál de estos jugadores se refiere",
+    "get_country_performance": "Proporciona información completa sobre el rendimiento de este país en Copas del Mundo",
+    "get_fun_facts": "Comparte datos curiosos e interesantes sobre la Copa del Mundo relacionados con este tema",
+}
+
+# Valor por defecto de los parámetros obligatorios en ToolSpec.defaults
+_REQUIRED = object()
+
+
+class ToolSpec:
+    """Herramienta del registro: función y parámetros, calculados una vez al importar"""
+
+    __slots__ = ("name", "function", "description", "defaults", "required", "integers")
+
+    def __init__(self, function: Callable[..., Dict[str, Any]]):
+        parameters = list(inspect.signature(function).parameters.values())[1:]   # sin self
+        self.name = function.__name__
+        self.function = function
+        self.description = inspect.getdoc(function) or ""
+        # (nombre, valor por defecto o _REQUIRED) en el orden de la firma
+        self.defaults: Tuple[Tuple[str, Any], ...] = tuple(
+            (p.name, _REQUIRED if p.default is inspect.Parameter.empty else p.default) for p in parameters
+        )
+        self.required = frozenset(name for name, default in self.defaults if default is _REQUIRED)
+        # Enteros que el modelo puede enviar como 2014.0 (los números JSON llegan como float)
+        self.integers = frozenset(p.name for p in parameters if p.annotation in (int, Optional[int]))
+
+    def key(self, kwargs: Dict[str, Any]) -> Tuple:
+        """Clave de la llamada con los valores por defecto aplicados: f(x) y f(x, year=None) comparten"""
+        return (self.name, *[kwargs.get(name, default) for name, default in self.defaults])
+
+
+def tool(function: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Marca un método como herramienta; FIFATools (y sus subclases) lo añade a su registro"""
+    function.tool_spec = ToolSpec(function)
+    return function
+
 
 class FIFATools:
-    """Herramientas que Gemini usa para obtener información de la Copa del Mundo"""
-    
-    def __init__(self):
-        # Gemini usará su conocimiento interno combinado con estas herramientas
-        pass
-    
-    async def search_world_cup_info(self, query: str, year: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Herramientas que Gemini usa para obtener información de la Copa del Mundo.
+
+    Núcleo común de los dos laboratorios (FIFAToolsEnhanced solo añade lo suyo): las
+    herramientas son métodos síncronos marcados con @tool (son búsquedas en memoria sobre
+    el dataset local) y `registry` los reúne al definir la clase. call() los despacha por
+    nombre sin corrutinas y memoriza el resultado de cada llamada distinta, así que repetir
+    "¿Quién ganó en 2014?" devuelve el mismo dict sin volver a construirlo. La memoria se
+    vacía cuando cambia `revision` del store (append_tournament), para no servir datos
+    anteriores al Mundial añadido. Los resultados son compartidos y no deben modificarse.
+    """
+
+    registry: Dict[str, ToolSpec] = {}
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls.registry = {**cls.registry, **_collect(cls)}
+
+    def __init__(self, data_store: Optional[WorldCupDataStore] = None, max_results: int = 1024):
+        # Los datos locales responden directamente; si no hay datos, Gemini usa su conocimiento interno
+        self._data = data_store or get_data_store()
+        self.max_results = max_results
+        self._results: Dict[Tuple, Dict[str, Any]] = {}
+        self._revision = self._data.revision
+        self._counters = {"calls": 0, "hits": 0}
+
+    def call(self, name: str, **kwargs: Any) -> Dict[str, Any]:
+        """Resultado de la herramienta `name` (memorizado por argumentos)"""
+        spec = self.registry[name]
+        self._counters["calls"] += 1
+        revision = self._data.revision
+        if revision != self._revision:
+            # El store cambió: los resultados memorizados pueden estar desactualizados
+            self._results = {}
+            self._revision = revision
+        key = spec.key(kwargs)
+        try:
+            result = self._results.get(key)
+        except TypeError:
+            # Argumentos no hashables (el modelo envió una lista): sin memoria
+            return spec.function(self, **kwargs)
+        if result is not None:
+            self._counters["hits"] += 1
+            return result
+
+        result = spec.function(self, **kwargs)
+        if self._data.revision != revision:
+            # append_tournament durante la llamada (pool de hilos): no se memoriza
+            return result
+        if len(self._results) >= self.max_results:
+            # FIFO con dict: seguro aunque el pool de hilos llame a la vez
+            self._results.pop(next(iter(self._results), None), None)
+        self._results[key] = result
+        return result
+
+    async def run(self, name: str, **kwargs: Any) -> Dict[str, Any]:
+        """call() para quien espera una corrutina (router y prefetch sin ToolExecutor)"""
+        return self.call(name, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self._counters["calls"]
+        return {
+            **self._counters,
+            "hit_rate": self._counters["hits"] / calls if calls else 0.0,
+            "cached_results": len(self._results),
+        }
+
+    @tool
+    def search_world_cup_info(self, query: str, year: Optional[int] = None) -> Dict[str, Any]:
         """
         Permite a Gemini buscar información específica sobre Mundiales.
-        
+
         Args:
             query: Consulta específica (ej: "ganador", "goleador", "final")
             year: Año del Mundial (opcional)
-            
+
         Returns:
-            Instrucción para que Gemini use su conocimiento interno
+            Datos del dataset local, o instrucción para que Gemini use su conocimiento interno
         """
+        result = self._data.lookup_world_cup_info(query, year)
+        if result is not None:
+            return {"action": "local_data", "query": query, "year": year, **result}
+
         return {
             "action": "use_gemini_knowledge",
             "query": query,
             "year": year,
-            "instruction": "Usa tu csearch_world_cup_infoonocimiento interno sobre la Copa del Mundo para responder esta consulta específica"
+            "instruction": _INSTRUCTIONS["search_world_cup_info"]
         }
-    
-    async def get_player_statistics(self, player_name: str, context: str = "world_cup") -> Dict[str, Any]:
+
+    @tool
+    def get_player_statistics(self, player_name: str, context: str = "world_cup") -> Dict[str, Any]:
         """
         Permite a Gemini proporcionar estadísticas de jugadores.
-        
+
         Args:
             player_name: Nombre del jugador
             context: Contexto (ej: "world_cup", "career", "specific_year")
-            
+
         Returns:
-            Instrucción para que Gemini use su conocimiento interno
+            Estadísticas del dataset local, o instrucción para que Gemini use su conocimiento interno
         """
+        result = self._data.lookup_player(player_name, context)
+        if result is not None:
+            return {"action": "local_data", "player": player_name, "context": context, **result}
+
+        candidates = self._data.player_candidates(player_name)
+        if candidates:
+            return {
+                "action": "ambiguous_player",
+                "player": player_name,
+                "candidates": candidates,
+                "instruction": _INSTRUCTIONS["ambiguous_player"]
+            }
+
         return {
             "action": "use_gemini_knowledge",
             "player": player_name,
             "context": context,
-            "instruction": "Proporciona estadísticas detalladas de este jugador en Copas del Mundo usando tu conocimiento interno"
+            "instruction": _INSTRUCTIONS["get_player_statistics"]
         }
-    
-    async def get_country_performance(self, country: str) -> Dict[str, Any]:
+
+    @tool
+    def get_country_performance(self, country: str) -> Dict[str, Any]:
         """
         Permite a Gemini proporcionar información sobre el rendimiento de países.
-        
+
         Args:
             country: Nombre del país
-            
+
         Returns:
-            Instrucción para que Gemini use su conocimiento interno
+            Rendimiento según el dataset local, o instrucción para que Gemini use su conocimiento interno
         """
+        result = self._data.lookup_country(country)
+        if result is not None:
+            return {"action": "local_data", "country": country, **result}
+
         return {
             "action": "use_gemini_knowledge",
             "country": country,
-            "instruction": "Proporciona información completa sobre el rendimiento de este país en Copas del Mundo"
+            "instruction": _INSTRUCTIONS["get_country_performance"]
         }
-    
-    async def get_fun_facts(self, topic: str = "general") -> Dict[str, Any]:
+
+    @tool
+    def get_fun_facts(self, topic: str = "general") -> Dict[str, Any]:
         """
         Permite a Gemini compartir datos curiosos sobre la Copa del Mundo.
-        
+
         Args:
             topic: Tema específico (ej: "records", "history", "players")
-            
+
         Returns:
-            Instrucción para que Gemini use su conocimiento interno
+            Datos curiosos del dataset local e instrucción para que Gemini los complemente
         """
         return {
             "action": "use_gemini_knowledge",
             "topic": topic,
-            "instruction": "Comparte datos curiosos e interesantes sobre la Copa del Mundo relacionados con este tema"
-        }
\ No newline at end of file
+            "facts": self._data.fun_facts(topic),
+            "instruction": _INSTRUCTIONS["get_fun_facts"]
+        }
+
+
+def _collect(cls: type) -> Dict[str, ToolSpec]:
+    """Herramientas (@tool) definidas en el cuerpo de `cls`"""
+    return {spec.name: spec for spec in (getattr(value, "tool_spec", None) for value in vars(cls).values()) if spec}
+
+
+FIFATools.registry = _collect(FIFATools)
+
@@ -0,0 +1,103 @@
+# fuzzy_index.py
+
+from collections import defaultdict
+from typing import Dict, Optional, List, Iterable, Set
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Distancia Damerau-Levenshtein (transposiciones de letras vecinas incluidas);
+    devuelve limit + 1 en cuanto se sabe que la supera
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Las erratas son locales: solo se compara el tramo entre el prefijo y el sufijo comunes
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return min(len(a) + len(b), limit + 1)
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SymSpellIndex:
+    """
+    Corrección de erratas sobre claves ya normalizadas (sin tildes ni mayúsculas),
+    con el algoritmo de borrado simétrico (SymSpell): al construir el índice se guardan
+    todas las variantes de cada clave con hasta `max_distance` letras borradas; una
+    consulta genera sus propias variantes y solo compara con las claves que comparten
+    alguna, así que no recorre el vocabulario ("mbape" -> "mbappe", "muler" -> "muller").
+
+    La distancia permitida depende de la longitud del término: las palabras cortas
+    ("gol", "iran") solo se aceptan exactas, porque una letra ya cambia de entidad.
+    """
+
+    def __init__(self, keys: Iterable[str], max_distance: int = 2,
+                 min_length: int = 5, long_length: int = 9):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.long_length = long_length
+        self._keys: Set[str] = set(keys)
+        self._deletes: Dict[str, List[str]] = defaultdict(list)
+        for key in self._keys:
+            for variant in _deletes(key, self.distance_for(key)):
+                self._deletes[variant].append(key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def distance_for(self, term: str) -> int:
+        """Erratas toleradas para un término de esta longitud"""
+        if len(term) < self.min_length:
+            return 0
+        return min(self.max_distance, 1 if len(term) < self.long_length else 2)
+
+    def lookup(self, term: str) -> List[str]:
+        """Claves más cercanas al término (todas las empatadas), o [] si ninguna está a distancia válida"""
+        if term in self._keys:
+            return [term]
+        limit = self.distance_for(term)
+        if limit == 0:
+            return []
+
+        best, matches = limit + 1, []
+        candidates = {key for variant in _deletes(term, limit) for key in self._deletes.get(variant, ())}
+        for key in sorted(candidates):
+            # La clave también debe tolerar esa distancia (una clave corta no se corrige hacia arriba)
+            distance = edit_distance(term, key, min(limit, self.distance_for(key)))
+            if distance < best:
+                best, matches = distance, [key]
+            elif distance == best:
+                matches.append(key)
+        return matches if best <= limit else []
+
+    def correct(self, term: str) -> Optional[str]:
+        """La clave más cercana si es única"""
+        matches = self.lookup(term)
+        return matches[0] if len(matches) == 1 else None
+
+
+def _deletes(term: str, distance: int) -> Set[str]:
+    """El término y todas sus variantes con hasta `distance` letras borradas"""
+    variants = {term}
+    level = {term}
+    for _ in range(distance):
+        level = {word[:i] + word[i + 1:] for word in level if len(word) > 1 for i in range(len(word))}
+        variants |= level
+    return variants
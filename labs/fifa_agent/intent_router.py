@@ -0,0 +1,489 @@
+# intent_router.py
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
+
+from .intents import is_time_sensitive
+from .normalization import normalize_text, STOPWORDS
+from .world_cup_data import WorldCupDataStore, get_data_store
+
+# Palabras interrogativas y de relleno que no restan confianza aunque ningún patrón las cubra
+_NEUTRAL_TERMS = frozenset("""
+quien quienes que cual cuales cuanto cuantos cuanta cuantas cuando donde como dime sabes puedes
+who what which how many much when where tell please hizo tiene tuvo ha
+""".split())
+
+# Marcas de pregunta abierta: análisis, opiniones y explicaciones van siempre al modelo
+# ("historia de Brasil" es abierta; "de la historia" solo significa "de todos los tiempos")
+_OPEN_ENDED_PHRASES = [
+    "por que", "porque", "why", "como fue", "how did", "explica", "explain", "analiza", "analyze",
+    "compara", "compare", "opinion", "opinas", "crees", "think", "mejor", "best", "peor", "worst",
+    "describe", "resume", "summarize",
+]
+
+# Términos que acotan la pregunta (fase, partido, rol, tipo de dato): si el intent elegido
+# no los explica, la pregunta es compuesta ("goles de Pelé en la final de 1958" no es su total)
+_QUALIFIER_TERMS = frozenset("""
+final finales finals semifinal semifinales cuartos octavos partido partidos contra vs grupo grupos penales
+penaltis subcampeon finalista tercer tercero third sede anfitrion host organizo goleador goleadores gol goles
+goals goal marco anoto goleo scored score gano ganador won winner campeon champion perdio lost
+""".split())
+
+# Confianza máxima de una pregunta compuesta (por debajo de min_confidence: va al modelo)
+_COMPOUND_CONFIDENCE = 0.5
+
+_YEAR = re.compile(r"\b(19[3-9]\d|20\d\d)\b")
+
+# Términos propios de cada idioma (normalizados): la respuesta usa las plantillas del idioma
+# con más términos en la consulta; en caso de empate, español
+_ENGLISH_TERMS = frozenset("""
+who what which how many much when where did does won win winner winners the is was were has have had most goals
+scored score tell about country countries finals runner up third place hosted host fun facts fact top scorer
+scorers titles title champions lost of in at and against played
+""".split())
+_SPANISH_TERMS = frozenset("""
+quien quienes que cual cuales cuanto cuantos cuantas cuando donde gano ganador campeon campeones el la los las de
+del en y se fue jugo hizo marco anoto goles gol pais paises tiene tienen mas datos dato curiosos curiosidades
+cuentame hablame subcampeon tercer lugar sede goleador goleadores titulos partido partidos
+""".split())
+
+
+def query_language(tokens: List[str]) -> str:
+    """Idioma de la consulta normalizada: "en" o "es" """
+    english = sum(token in _ENGLISH_TERMS for token in tokens)
+    spanish = sum(token in _SPANISH_TERMS for token in tokens)
+    return "en" if english > spanish else "es"
+
+
+def trie_regex(phrases: List[str]) -> str:
+    """
+    Construye una alternancia regex a partir de un trie de frases, de modo que los
+    prefijos comunes se comparan una sola vez: ["gano", "ganador"] -> "gan(?:ador|o)"
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        if "" in node and len(node) == 1:
+            return ""
+        alternatives = []
+        optional = False
+        for char in sorted(node):
+            if char == "":
+                optional = True
+            else:
+                alternatives.append(re.escape(char) + build(node[char]))
+        if len(alternatives) == 1 and not optional:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if optional else group
+
+    return build(trie)
+
+
+def _compile(phrases: List[str]) -> "re.Pattern":
+    return re.compile(r"\b" + trie_regex(phrases) + r"\b")
+
+
+_OPEN_ENDED = re.compile(r"\b" + trie_regex(_OPEN_ENDED_PHRASES) + r"\b|(?<!la )\bhistoria de\b")
+
+
+@dataclass
+class Intent:
+    name: str
+    triggers: "re.Pattern"
+    requires: Tuple[str, ...]
+    build_calls: Callable[[Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]
+    excludes: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()     # Entidades que las llamadas usan si aparecen (además de requires)
+
+
+@dataclass
+class RouteDecision:
+    intent: str
+    calls: List[Tuple[str, Dict[str, Any]]]
+    confidence: float
+    slots: Dict[str, Any] = field(default_factory=dict)
+    language: str = "es"              # Idioma de las plantillas de respuesta ("es" o "en")
+
+
+def _fun_fact_topic(text: str) -> str:
+    for topic, words in (("records", ("record",)), ("history", ("historia", "history")),
+                         ("players", ("jugador", "player")), ("finals", ("final",))):
+        if any(word in text for word in words):
+            return topic
+    return "general"
+
+
+# Intenciones en orden de prioridad (las que exigen jugador o país van primero)
+INTENTS = [
+    Intent("player_goals", _compile(["goles", "gol", "goals", "goal", "goleo", "anoto", "marco", "scored", "score"]),
+           ("player",), lambda s: [("get_player_statistics", {"player_name": s["player"], "context": str(s.get("year") or "world_cup")})],
+           optional=("year",)),
+    Intent("player_profile", _compile(["cuentame sobre", "cuentame de", "hablame de", "tell me about", "quien es", "quien fue",
+                                       "who is", "who was", "estadisticas", "stats", "statistics", "informacion sobre", "info"]),
+           ("player",), lambda s: [("get_player_statistics", {"player_name": s["player"], "context": "world_cup"}),
+                                   ("get_fun_facts", {"topic": "players"})]),
+    Intent("country_titles", _compile(["mundiales", "titulos", "titulo", "copas", "titles", "world cups", "campeon", "champion",
+                                       "rendimiento", "historial", "palmares", "performance", "finales", "finals", "participaciones"]),
+           ("country",), lambda s: [("get_country_performance", {"country": s["country"]})], excludes=("year",)),
+    Intent("most_titles", _compile(["mas mundiales", "mas titulos", "mas copas", "most titles", "most world cups", "won the most",
+                                    "most wins", "ranking de campeones"]),
+           (), lambda s: [("search_world_cup_info", {"query": "ganador"})], excludes=("year", "country")),
+    Intent("top_scorer", _compile(["maximo goleador", "maximos goleadores", "goleador", "goleadores", "top scorer", "top scorers",
+                                   "bota de oro", "golden boot", "mas goles", "most goals"]),
+           (), lambda s: [("search_world_cup_info", {"query": "goleador", "year": s.get("year")})], excludes=("player",),
+           optional=("year",)),
+    Intent("runner_up", _compile(["subcampeon", "finalista", "runner up", "perdio la final", "lost the final", "segundo lugar"]),
+           ("year",), lambda s: [("search_world_cup_info", {"query": "subcampeon", "year": s["year"]})]),
+    Intent("third_place", _compile(["tercer lugar", "tercer puesto", "tercero", "third place", "third"]),
+           ("year",), lambda s: [("search_world_cup_info", {"query": "tercer", "year": s["year"]})]),
+    Intent("host", _compile(["sede", "donde se jugo", "donde fue", "anfitrion", "organizo", "organizador", "host", "hosted",
+                             "where was", "where"]),
+           ("year",), lambda s: [("search_world_cup_info", {"query": "sede", "year": s["year"]})]),
+    Intent("winner", _compile(["quien gano", "quien gano la final", "gano", "gano la final", "won the final", "ganador", "campeon", "who won", "won", "winner", "champion", "champions"]),
+           ("year",), lambda s: [("search_world_cup_info", {"query": "ganador", "year": s["year"]})], excludes=("country",)),
+    Intent("final", _compile(["final", "resultado de la final", "final score"]),
+           ("year",), lambda s: [("search_world_cup_info", {"query": "final", "year": s["year"]})]),
+    Intent("fun_facts", _compile(["dato curioso", "datos curiosos", "curiosidad", "curiosidades", "fun fact", "fun facts",
+                                  "trivia", "anecdota", "anecdotas"]),
+           (), lambda s: [("get_fun_facts", {"topic": s["topic"]})]),
+]
+
+
+class IntentRouter:
+    """
+    Router determinista previo al modelo.
+
+    Reconoce las consultas factuales del SYSTEM_PROMPT ("¿Quién ganó en 2014?",
+    "¿Cuántos goles hizo Messi en 2022?", "¿Qué país tiene más Mundiales?") con
+    regex compiladas a partir de tries de palabras clave en español e inglés,
+    llama directamente a la herramienta de FIFATools correspondiente y redacta la
+    respuesta desde los datos, en el idioma de la pregunta. Si la pregunta es abierta, necesita información
+    actual o la confianza es baja, devuelve None y la consulta va a Gemini.
+    """
+
+    def __init__(self, tools: Any, data_store: Optional[WorldCupDataStore] = None, min_confidence: float = 0.75,
+                 call: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None):
+        self._tools = tools
+        # call(nombre, **argumentos): por defecto tools.run; el agente pasa su ejecutor
+        # para que el router también use timeouts y prefetch
+        self._call = call or tools.run
+        self._data = data_store or get_data_store()
+        self.min_confidence = min_confidence
+        self._counters = {"routed": 0, "fallthrough": 0, "tool_misses": 0}
+
+    @classmethod
+    def from_config(cls, tools: Any, config: Dict[str, Any],
+                    call: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None) -> "IntentRouter":
+        return cls(tools, min_confidence=config["min_confidence"], call=call)
+
+    def _extract_slots(self, text: str, tokens: List[str]) -> Tuple[Dict[str, Any], List[Tuple[int, int]], int]:
+        """
+        Año, jugador y país mencionados; devuelve también los rangos de tokens que los
+        cubren y cuántas entidades más aparecen (otro jugador o país, otro año)
+        """
+        slots: Dict[str, Any] = {}
+        spans: List[Tuple[int, int]] = []
+        extra = max(0, len(set(_YEAR.findall(text))) - 1)
+
+        year_match = _YEAR.search(text)
+        if year_match:
+            slots["year"] = int(year_match.group(1))
+
+        # n-gramas de hasta 3 tokens, los más largos primero ("thomas muller" antes que "muller");
+        # los de una y dos palabras toleran erratas ("mbape", "olanda")
+        covered = set()
+        for size in (3, 2, 1):
+            for start in range(len(tokens) - size + 1):
+                if covered.intersection(range(start, start + size)):
+                    continue
+                gram = " ".join(tokens[start:start + size])
+                if size == 1 and gram in STOPWORDS:
+                    continue
+                if len(gram) >= 3:
+                    # Un segundo jugador solo por coincidencia exacta (sin el coste de las erratas)
+                    player_id = self._data.player_for_key(gram, fuzzy=size < 3 and "player" not in slots)
+                    if player_id is not None:
+                        name = self._data.player_name(player_id)
+                        if "player" not in slots:
+                            slots["player"] = name
+                        elif name != slots["player"]:
+                            extra += 1
+                        covered.update(range(start, start + size))
+                        spans.append((start, start + size))
+                        continue
+                # Los códigos de 3 letras ("por", "mar", "col") chocan con palabras comunes
+                if len(gram) >= 4 or gram == "usa":
+                    code = self._data.country_for_key(gram, fuzzy=size < 3 and "country" not in slots)
+                    if code is not None:
+                        name = self._data.country_name(code)
+                        if "country" not in slots:
+                            slots["country"] = name
+                        elif name != slots["country"]:
+                            extra += 1
+                        covered.update(range(start, start + size))
+                        spans.append((start, start + size))
+        return slots, spans, extra
+
+    def route(self, query: str) -> Optional[RouteDecision]:
+        """Decide qué herramienta responde la consulta, o None si debe ir al modelo"""
+        if is_time_sensitive(query):
+            return None
+
+        text = normalize_text(query)
+        tokens = text.split()
+        if not tokens or _OPEN_ENDED.search(text):
+            return None
+
+        slots, entity_spans, extra = self._extract_slots(text, tokens)
+        if "year" in slots and self._data.get_tournament(slots["year"]) is None:
+            return None
+        slots["topic"] = _fun_fact_topic(text)
+
+        for intent in INTENTS:
+            if any(slot not in slots for slot in intent.requires):
+                continue
+            if any(slot in slots for slot in intent.excludes):
+                continue
+            matches = list(intent.triggers.finditer(text))
+            if not matches:
+                continue
+            confidence = self._confidence(text, tokens, matches, entity_spans)
+            unused = [slot for slot in ("player", "country", "year")
+                      if slot in slots and slot not in intent.requires and slot not in intent.optional]
+            if extra or unused:
+                # Pregunta compuesta: otro año o entidad, o una que la respuesta no usaría
+                # ("datos curiosos de Maradona" no son los datos curiosos generales)
+                confidence = min(confidence, _COMPOUND_CONFIDENCE)
+            return RouteDecision(intent.name, intent.build_calls(slots), confidence, slots, query_language(tokens))
+        return None
+
+    def classify(self, query: str) -> str:
+        """
+        Intención de la consulta aunque no se vaya a responder localmente: el nombre
+        del intent reconocido, "current" (necesita google_search), "analysis"
+        (pregunta abierta) o "general"
+        """
+        if is_time_sensitive(query):
+            return "current"
+        if _OPEN_ENDED.search(normalize_text(query)):
+            return "analysis"
+        decision = self.route(query)
+        return decision.intent if decision is not None else "general"
+
+    def _confidence(self, text: str, tokens: List[str], matches: List["re.Match"],
+                    entity_spans: List[Tuple[int, int]]) -> float:
+        """
+        Proporción de términos significativos explicados por el patrón, las entidades o el
+        año; como mucho _COMPOUND_CONFIDENCE si queda sin explicar un término que acota la
+        pregunta ("final" en una pregunta de goles, "marcó" en una sobre la final)
+        """
+        explained = set()
+        for start, end in entity_spans:
+            explained.update(range(start, end))
+
+        # Convertir rangos de caracteres del patrón en posiciones de token
+        offset = 0
+        for position, token in enumerate(tokens):
+            offset = text.index(token, offset)
+            if any(m.start() <= offset < m.end() for m in matches):
+                explained.add(position)
+            offset += len(token)
+
+        content = [
+            position for position, token in enumerate(tokens)
+            if token not in STOPWORDS and token not in _NEUTRAL_TERMS and not _YEAR.fullmatch(token)
+        ]
+        if not content:
+            return 1.0
+        unexplained = [tokens[position] for position in content if position not in explained]
+        coverage = 1 - len(unexplained) / len(content)
+        confidence = 0.5 + 0.5 * coverage
+        if any(token in _QUALIFIER_TERMS for token in unexplained):
+            return min(confidence, _COMPOUND_CONFIDENCE)
+        return confidence
+
+    async def answer(self, query: str) -> Optional[str]:
+        """Responde desde los datos locales, o None para dejar la consulta al modelo"""
+        decision = self.route(query)
+        if decision is None or decision.confidence < self.min_confidence:
+            self._counters["fallthrough"] += 1
+            return None
+
+        results = []
+        for tool_name, arguments in decision.calls:
+            result = await self._call(tool_name, **arguments)
+            if result.get("action") != "local_data" and not result.get("facts"):
+                self._counters["tool_misses"] += 1
+                return None
+            results.append(result)
+
+        self._counters["routed"] += 1
+        return _FORMATTERS[decision.intent](decision, results)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+
+# ----------------------------------------------------------------------
+# Redacción de respuestas a partir de los resultados de las herramientas
+# ----------------------------------------------------------------------
+
+# Plantillas por idioma: clave -> {"es": ..., "en": ...}
+_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "and": {"es": " y ", "en": " and "},
+    "runner_up": {"es": "🥈 {runner_up} fue subcampeón en {year}: perdió la final ante {winner}.",
+                  "en": "🥈 {runner_up} finished runner-up in {year}, losing the final to {winner}."},
+    "third_place": {"es": "🥉 {third_place} terminó en tercer lugar en el Mundial {year}.",
+                    "en": "🥉 {third_place} finished third at the {year} World Cup."},
+    "host": {"es": "🌍 El Mundial {year} se jugó en {hosts}. Campeón: {winner}.",
+             "en": "🌍 The {year} World Cup was played in {hosts}. Champion: {winner}."},
+    "final": {"es": "🏟️ Final de {year} en {venue}: {final}. Campeón: {winner}.",
+              "en": "🏟️ {year} final at {venue}: {final}. Champion: {winner}."},
+    "winner": {"es": "🏆 {winner} ganó la Copa del Mundo {year} ({hosts}), venciendo a {runner_up} en la final",
+               "en": "🏆 {winner} won the {year} World Cup ({hosts}), beating {runner_up} in the final"},
+    "tournament_scorers": {"es": ". Goleador del torneo: {scorers} con {goals} goles.",
+                           "en": ". Top scorer of the tournament: {scorers} with {goals} goals."},
+    "player_goals": {"es": "⚽ {name} ({country}) marcó {goals} goles en {matches} partidos de Mundiales ({years}).",
+                     "en": "⚽ {name} ({country}) scored {goals} goals in {matches} World Cup matches ({years})."},
+    "player_absent": {"es": "⚽ {name} no disputó el Mundial {year}. En total marcó {goals} goles en Mundiales.",
+                      "en": "⚽ {name} did not play at the {year} World Cup. World Cup goals in total: {goals}."},
+    "player_goals_year": {"es": "⚽ {name} marcó {year_goals} goles en el Mundial {year}. "
+                                "En total suma {goals} goles en {matches} partidos de Mundiales.",
+                          "en": "⚽ {name} scored {year_goals} goals at the {year} World Cup, "
+                                "and {goals} goals in {matches} World Cup matches overall."},
+    "profile_tournaments": {"es": "• Mundiales: {years}", "en": "• World Cups: {years}"},
+    "profile_goals": {"es": "• Goles: {goals} en {matches} partidos", "en": "• Goals: {goals} in {matches} matches"},
+    "profile_titles": {"es": "• Campeón del mundo: {years}", "en": "• World champion: {years}"},
+    "country_titles": {"es": "tiene {titles} títulos ({years})", "en": "has {titles} titles ({years})"},
+    "country_no_titles": {"es": "no ha ganado ningún Mundial (mejor resultado: {best})",
+                          "en": "has never won the World Cup (best result: {best})"},
+    "country": {"es": "🌍 {country} {titles}; ha jugado {finals} finales y {participations} Mundiales.",
+                "en": "🌍 {country} {titles}, with {finals} finals in {participations} World Cups."},
+    "most_titles": {"es": "🏆 Países con más Copas del Mundo:", "en": "🏆 Countries with the most World Cups:"},
+    "top_scorer_year": {"es": "⚽ Goleador del Mundial {year}: {scorers} con {goals} goles.",
+                        "en": "⚽ Top scorer of the {year} World Cup: {scorers} with {goals} goals."},
+    "top_scorers": {"es": "⚽ Máximos goleadores de la historia de los Mundiales:",
+                    "en": "⚽ All-time World Cup top scorers:"},
+    "top_scorer_row": {"es": "{rank}. {player} ({country}): {goals} goles", "en": "{rank}. {player} ({country}): {goals} goals"},
+    "fun_facts": {"es": "🎯 Datos curiosos:", "en": "🎯 Fun facts:"},
+}
+
+
+def _text(decision: RouteDecision, key: str, **values: Any) -> str:
+    return _TEMPLATES[key][decision.language].format(**values)
+
+
+def _join(decision: RouteDecision, names: List[str]) -> str:
+    return names[0] if len(names) == 1 else ", ".join(names[:-1]) + _text(decision, "and") + names[-1]
+
+
+def _years(decision: RouteDecision, years: List[int]) -> str:
+    return _join(decision, [str(year) for year in years])
+
+
+def _format_scorers(decision: RouteDecision, scorers: List[Dict[str, Any]]) -> str:
+    return _join(decision, [f"{s['player']} ({s['country']})" for s in scorers])
+
+
+def _format_final(final: Dict[str, Any]) -> str:
+    text = final["match"]
+    return f"{text}, {final['note']}" if final.get("note") else text
+
+
+def _format_tournament(decision: RouteDecision, results: List[Dict[str, Any]]) -> str:
+    t = results[0]["tournament"]
+    final = t.get("final")
+    intent = decision.intent
+    if intent in ("runner_up", "third_place"):
+        return _text(decision, intent, **t)
+    if intent == "host":
+        return _text(decision, "host", year=t["year"], hosts=_join(decision, t["hosts"]), winner=t["winner"])
+    if intent == "final" and final:
+        return _text(decision, "final", year=t["year"], venue=final["venue"], final=_format_final(final), winner=t["winner"])
+
+    answer = _text(decision, "winner", winner=t["winner"], year=t["year"], hosts=_join(decision, t["hosts"]),
+                   runner_up=t["runner_up"])
+    if final:
+        answer += f" ({_format_final(final)})"
+    scorers = t["top_scorers"]
+    return answer + _text(decision, "tournament_scorers", scorers=_format_scorers(decision, scorers), goals=scorers[0]["goals"])
+
+
+def _format_player_goals(decision: RouteDecision, results: List[Dict[str, Any]]) -> str:
+    stats = results[0]["statistics"]
+    year = stats.get("year")
+    if year is None:
+        return _text(decision, "player_goals", name=stats["name"], country=stats["country"],
+                     goals=stats["world_cup_goals"], matches=stats["matches"], years=_years(decision, stats["tournaments"]))
+    if year not in stats["tournaments"]:
+        return _text(decision, "player_absent", name=stats["name"], year=year, goals=stats["world_cup_goals"])
+    return _text(decision, "player_goals_year", name=stats["name"], year=year, year_goals=stats["goals_in_year"],
+                 goals=stats["world_cup_goals"], matches=stats["matches"])
+
+
+def _format_player_profile(decision: RouteDecision, results: List[Dict[str, Any]]) -> str:
+    stats = results[0]["statistics"]
+    lines = [
+        f"⚽ {stats['name']} ({stats['country']})",
+        _text(decision, "profile_tournaments", years=_years(decision, stats["tournaments"])),
+        _text(decision, "profile_goals", goals=stats["world_cup_goals"], matches=stats["matches"]),
+    ]
+    if stats["titles"]:
+        lines.append(_text(decision, "profile_titles", years=_years(decision, stats["titles"])))
+    lines.extend(f"• {highlight}" for highlight in stats["highlights"])
+    return "\n".join(lines)
+
+
+def _format_country(decision: RouteDecision, results: List[Dict[str, Any]]) -> str:
+    p = results[0]["performance"]
+    if p["titles"]:
+        titles = _text(decision, "country_titles", titles=p["titles"], years=_years(decision, p["title_years"]))
+    else:
+        titles = _text(decision, "country_no_titles", best=p["best_result"])
+    return _text(decision, "country", country=p["country"], titles=titles, finals=p["finals"],
+                 participations=p["participations"])
+
+
+def _format_most_titles(decision: RouteDecision, results: List[Dict[str, Any]]) -> str:
+    ranking = results[0]["answer"]
+    lines = [_text(decision, "most_titles")]
+    lines.extend(f"{i}. {row['country']}: {row['titles']} ({_years(decision, row['years'])})"
+                 for i, row in enumerate(ranking, 1))
+    return "\n".join(lines)
+
+
+def _format_top_scorer(decision: RouteDecision, results: List[Dict[str, Any]]) -> str:
+    result = results[0]
+    if "tournament" in result:
+        t = result["tournament"]
+        return _text(decision, "top_scorer_year", year=t["year"], scorers=_format_scorers(decision, t["top_scorers"]),
+                     goals=t["top_scorers"][0]["goals"])
+    lines = [_text(decision, "top_scorers")]
+    lines.extend(_text(decision, "top_scorer_row", rank=i, **row) for i, row in enumerate(result["answer"], 1))
+    return "\n".join(lines)
+
+
+def _format_fun_facts(decision: RouteDecision, results: List[Dict[str, Any]]) -> str:
+    return _text(decision, "fun_facts") + "\n" + "\n".join(f"• {fact}" for fact in results[0]["facts"])
+
+
+_FORMATTERS = {
+    "player_goals": _format_player_goals,
+    "player_profile": _format_player_profile,
+    "country_titles": _format_country,
+    "most_titles": _format_most_titles,
+    "top_scorer": _format_top_scorer,
+    "runner_up": _format_tournament,
+    "third_place": _format_tournament,
+    "host": _format_tournament,
+    "winner": _format_tournament,
+    "final": _format_tournament,
+    "fun_facts": _format_fun_facts,
+}
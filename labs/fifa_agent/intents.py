@@ -0,0 +1,23 @@
+# intents.py
+
+import re
+
+from .normalization import normalize_text
+
+# Consultas que el SYSTEM_PROMPT envía a google_search: eventos de 2023 en adelante,
+# noticias y estado actual de jugadores. Nunca deben responderse desde caché ni datos locales.
+TIME_SENSITIVE_PATTERNS = [
+    r"\b20(2[3-9]|[3-9]\d)\b",
+    r"\b(actual|actualmente|ahora|hoy|reciente|recientes|recientemente|ultima|ultimas|ultimo|ultimos)\b",
+    r"\b(noticia|noticias|news|current|currently|latest|today|recent|recently|now)\b",
+    r"\b(este ano|this year|proximo|proxima|proximos|next|upcoming)\b",
+    r"\b(fichaje|fichajes|transferencia|transferencias|transfer|lesion|lesionado|injury|injured)\b",
+    r"\b(club|equipo) actual\b|\bdonde juega\b|\bplays for\b",
+]
+
+_TIME_SENSITIVE = re.compile("|".join(f"(?:{pattern})" for pattern in TIME_SENSITIVE_PATTERNS))
+
+
+def is_time_sensitive(query: str) -> bool:
+    """True si la consulta necesita información actualizada (google_search)"""
+    return _TIME_SENSITIVE.search(normalize_text(query)) is not None
@@ -0,0 +1,119 @@
+# model_backend.py
+
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+
+# Registro de modelos por proceso: una instancia (y por tanto un pool de conexiones)
+# por configuración, compartida por todos los agentes que la usan
+_MODEL_REGISTRY: Dict[Tuple, BaseLlm] = {}
+# Reentrante: el modelo con política (HedgedModel) obtiene sus modelos con get_model
+_REGISTRY_LOCK = threading.RLock()
+_REGISTRY_STATS = {"hits": 0, "misses": 0}
+
+
+def create_model(model_config: Dict[str, Any]) -> BaseLlm:
+    """
+    Construye el modelo del agente a partir de MODEL_CONFIG.
+
+    Con backend "fake" devuelve un ScriptedModel local (sin red ni credenciales);
+    en cualquier otro caso, el cliente Gemini configurado con API key o project_id.
+    Normalmente se usa get_model(), que reutiliza la instancia entre agentes.
+    """
+    if model_config.get("backend") == "fake":
+        from .fake_model import ScriptedModel
+        return ScriptedModel.from_config(model_config)
+
+    # Configurar el modelo Gemini
+    model_kwargs = {
+        "model": model_config["model_name"],
+        "location": model_config["location"],
+        "temperature": model_config["temperature"],
+        "max_tokens": model_config["max_output_tokens"]
+    }
+
+    # Usar API key o project_id según lo disponible
+    if model_config["api_key"]:
+        model_kwargs["api_key"] = model_config["api_key"]
+    elif model_config["project_id"]:
+        model_kwargs["project_id"] = model_config["project_id"]
+
+    model_kwargs["client_kwargs"] = _client_kwargs(model_config)
+    return Gemini(**model_kwargs)
+
+
+def _client_kwargs(model_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Argumentos del google.genai.Client: credenciales y pool HTTP con keep-alive"""
+    kwargs: Dict[str, Any] = {}
+    if model_config["api_key"]:
+        kwargs["api_key"] = model_config["api_key"]
+    elif model_config["project_id"]:
+        kwargs.update(vertexai=True, project=model_config["project_id"], location=model_config["location"])
+
+    pool = model_config.get("connection_pool")
+    if pool:
+        # El keep-alive por defecto de httpx (5 s) cierra las conexiones entre ráfagas
+        # y obliga a repetir el handshake TLS en la siguiente consulta
+        limits = httpx.Limits(
+            max_connections=pool["max_connections"],
+            max_keepalive_connections=pool["max_keepalive_connections"],
+            keepalive_expiry=pool["keepalive_expiry_seconds"],
+        )
+        kwargs["http_options"] = types.HttpOptions(async_client_args={"limits": limits})
+    return kwargs
+
+
+def _config_key(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _config_key(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_config_key(item) for item in value)
+    return value
+
+
+def get_model(model_config: Dict[str, Any], policy_config: Optional[Dict[str, Any]] = None) -> BaseLlm:
+    """
+    Modelo compartido por proceso para esta configuración.
+
+    La primera llamada lo crea (el cliente HTTP de Gemini se abre a su vez con la
+    primera petición); las siguientes devuelven la misma instancia, de modo que
+    todos los agentes y sesiones reutilizan sus conexiones. Con un policy_config
+    activado (MODEL_POLICY_CONFIG) devuelve el modelo envuelto en HedgedModel, con
+    hedge y reserva obtenidos a su vez de este registro.
+    """
+    if policy_config is not None and policy_config.get("enabled"):
+        key = ("policy", _config_key(model_config), _config_key(policy_config))
+    else:
+        policy_config = None
+        key = _config_key(model_config)
+    model = _MODEL_REGISTRY.get(key)
+    if model is not None:
+        _REGISTRY_STATS["hits"] += 1
+        return model
+
+    with _REGISTRY_LOCK:
+        model = _MODEL_REGISTRY.get(key)
+        if model is None:
+            if policy_config is None:
+                model = create_model(model_config)
+            else:
+                from .model_policy import HedgedModel
+                model = HedgedModel.from_config(model_config, policy_config, get_model)
+            _MODEL_REGISTRY[key] = model
+            _REGISTRY_STATS["misses"] += 1
+        else:
+            _REGISTRY_STATS["hits"] += 1
+    return model
+
+
+def clear_model_registry():
+    with _REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+
+
+def model_registry_stats() -> Dict[str, int]:
+    return {"models": len(_MODEL_REGISTRY), **_REGISTRY_STATS}
@@ -0,0 +1,224 @@
+# model_policy.py
+
+import asyncio
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Dict, Any, Optional, List, AsyncGenerator, Callable, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+
+class ModelDeadlineExceeded(TimeoutError):
+    """La petición al modelo superó su plazo (deadline_seconds) entre todos sus intentos"""
+
+
+class _Attempt:
+    """Un intento en curso: el generador del modelo y la tarea que espera su primera respuesta"""
+
+    __slots__ = ("role", "model", "generator", "first", "started")
+
+    def __init__(self, role: str, model: BaseLlm, request: LlmRequest, stream: bool):
+        self.role = role
+        self.model = model
+        self.generator = model.generate_content_async(request, stream=stream)
+        self.first = asyncio.ensure_future(self.generator.__anext__())
+        self.started = time.perf_counter()
+
+    async def cancel(self):
+        self.first.cancel()
+        with suppress(BaseException):
+            await self.first
+        with suppress(BaseException):
+            await self.generator.aclose()
+
+
+class HedgedModel(BaseLlm):
+    """
+    Política de peticiones alrededor del modelo del agente, para la latencia de cola.
+
+    Cada petición va al modelo principal. Si no hay primera respuesta tras el p95 de las
+    latencias recientes del principal, se lanza una petición duplicada (hedge) a un segundo
+    modelo o región y gana la que responda antes; la otra se cancela. Si ninguna responde en
+    `attempt_timeout_seconds`, se cancelan y se pasa al modelo de reserva, más barato. Un
+    intento que falla antes de responder da paso al siguiente (hedge y después reserva), y
+    la petición entera nunca pasa de `deadline_seconds` (ModelDeadlineExceeded).
+
+    La carrera es hasta la primera respuesta (el primer trozo en streaming): a partir de
+    ahí el ganador sigue solo, para no mezclar textos. Los hedges se limitan a `hedge_budget`
+    de las peticiones, para que un endpoint lento no duplique toda la carga.
+    """
+
+    primary: BaseLlm
+    hedge: Optional[BaseLlm] = None
+    fallback: Optional[BaseLlm] = None
+    deadline_seconds: float = 30.0
+    attempt_timeout_seconds: float = 10.0
+    hedge_percentile: float = 0.95
+    hedge_min_delay_seconds: float = 0.05
+    hedge_initial_delay_seconds: float = 2.0
+    hedge_min_samples: int = 20
+    hedge_budget: float = 0.1
+    window: int = 256
+
+    def model_post_init(self, context: Any):
+        # Latencias hasta la primera respuesta del principal (las de intentos cancelados
+        # cuentan con lo que llevaban: son cotas inferiores, y sin ellas el p95 se subestima)
+        self._latencies: deque = deque(maxlen=self.window)
+        self._cancelling: set = set()
+        self._counters = {"requests": 0, "hedged": 0, "hedge_wins": 0, "fallbacks": 0,
+                          "deadline_exceeded": 0, "errors": 0, "failed_attempts": 0}
+
+    @classmethod
+    def from_config(cls, model_config: Dict[str, Any], policy_config: Dict[str, Any],
+                    get_model: Callable[[Dict[str, Any]], BaseLlm]) -> "HedgedModel":
+        """`get_model` construye (o reutiliza) cada modelo; hedge y fallback sobrescriben MODEL_CONFIG"""
+        primary = get_model(model_config)
+        hedge, fallback = policy_config.get("hedge"), policy_config.get("fallback")
+        return cls(
+            model=primary.model,
+            primary=primary,
+            hedge=get_model({**model_config, **hedge}) if hedge else None,
+            fallback=get_model({**model_config, **fallback}) if fallback else None,
+            deadline_seconds=policy_config["deadline_seconds"],
+            attempt_timeout_seconds=policy_config["attempt_timeout_seconds"],
+            hedge_percentile=policy_config["hedge_percentile"],
+            hedge_min_delay_seconds=policy_config["hedge_min_delay_seconds"],
+            hedge_initial_delay_seconds=policy_config["hedge_initial_delay_seconds"],
+            hedge_min_samples=policy_config["hedge_min_samples"],
+            hedge_budget=policy_config["hedge_budget"],
+        )
+
+    def hedge_delay(self) -> float:
+        """Espera antes del hedge: el percentil configurado de las latencias recientes del principal"""
+        if len(self._latencies) < self.hedge_min_samples:
+            return self.hedge_initial_delay_seconds
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))
+        return max(self.hedge_min_delay_seconds, ordered[index])
+
+    def _may_hedge(self) -> bool:
+        return self.hedge is not None and self._counters["hedged"] < self.hedge_budget * self._counters["requests"]
+
+    def _start(self, role: str, model: BaseLlm, llm_request: LlmRequest, stream: bool) -> _Attempt:
+        if model is not self.primary:
+            # El nombre del modelo viaja en la petición: cada intento lleva su copia. Copia
+            # superficial salvo lo que el cliente modifica (la lista de contenidos y la
+            # configuración); tools_dict se comparte (copiarlo copiaría el agente entero)
+            llm_request = llm_request.model_copy(update={
+                "model": model.model,
+                "contents": list(llm_request.contents),
+                "config": llm_request.config.model_copy(deep=True) if llm_request.config else None,
+            })
+        if role == "hedge":
+            self._counters["hedged"] += 1
+        elif role == "fallback":
+            self._counters["fallbacks"] += 1
+        return _Attempt(role, model, llm_request, stream)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._counters["requests"] += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+        winner, response = await self._race(llm_request, stream, loop, deadline)
+        if response is None:
+            return
+        yield response
+        # El ganador sigue en solitario, dentro del mismo plazo
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                try:
+                    response = await asyncio.wait_for(winner.generator.__anext__(), remaining)
+                except StopAsyncIteration:
+                    return
+                yield response
+        except asyncio.TimeoutError:
+            self._counters["deadline_exceeded"] += 1
+            raise ModelDeadlineExceeded(f"el modelo no terminó en {self.deadline_seconds:.1f} s") from None
+        finally:
+            with suppress(BaseException):
+                await winner.generator.aclose()
+
+    async def _race(self, llm_request: LlmRequest, stream: bool, loop: asyncio.AbstractEventLoop,
+                    deadline: float) -> Tuple[_Attempt, Optional[LlmResponse]]:
+        """Primer intento con respuesta (o que termina sin ninguna) y esa respuesta"""
+        start = loop.time()
+        attempts: List[_Attempt] = [self._start("primary", self.primary, llm_request, stream)]
+        hedge_at = start + self.hedge_delay() if self._may_hedge() else None
+        fallback_at = start + self.attempt_timeout_seconds if self.fallback is not None else None
+        last_error: Optional[BaseException] = None
+        try:
+            while True:
+                pending = [attempt for attempt in attempts if not attempt.first.done()]
+                wake = min(at for at in (hedge_at, fallback_at, deadline) if at is not None)
+                if pending:
+                    await asyncio.wait([attempt.first for attempt in pending],
+                                       timeout=max(0.0, wake - loop.time()), return_when=asyncio.FIRST_COMPLETED)
+
+                for attempt in attempts:
+                    if not attempt.first.done() or attempt.first.cancelled():
+                        continue
+                    error = attempt.first.exception()
+                    if error is None or isinstance(error, StopAsyncIteration):
+                        self._finish(attempts, attempt)
+                        return attempt, None if error is not None else attempt.first.result()
+                    self._counters["failed_attempts"] += 1
+                    last_error = error
+                attempts = [attempt for attempt in attempts if not attempt.first.done()]
+
+                now = loop.time()
+                if now >= deadline:
+                    self._counters["deadline_exceeded"] += 1
+                    raise ModelDeadlineExceeded(f"el modelo no respondió en {self.deadline_seconds:.1f} s")
+                if fallback_at is not None and now >= fallback_at:
+                    # Nadie respondió a tiempo: se abandona todo por el modelo de reserva
+                    for attempt in attempts:
+                        self._record_primary(attempt)
+                        await attempt.cancel()
+                    attempts = [self._start("fallback", self.fallback, llm_request, stream)]
+                    hedge_at = fallback_at = None
+                elif hedge_at is not None and (now >= hedge_at or not attempts):
+                    # Vence la espera del hedge, o el principal falló antes
+                    attempts.append(self._start("hedge", self.hedge, llm_request, stream))
+                    hedge_at = None
+                elif not attempts and fallback_at is not None:
+                    attempts = [self._start("fallback", self.fallback, llm_request, stream)]
+                    fallback_at = None
+                elif not attempts:
+                    self._counters["errors"] += 1
+                    raise last_error
+        except BaseException:
+            for attempt in attempts:
+                await attempt.cancel()
+            raise
+
+    def _finish(self, attempts: List[_Attempt], winner: _Attempt):
+        self._record_primary(winner)
+        if winner.role == "hedge":
+            self._counters["hedge_wins"] += 1
+        for attempt in attempts:
+            if attempt is not winner and not attempt.first.done():
+                self._record_primary(attempt)
+                # Cancelar al perdedor sin esperar: su limpieza no retrasa la respuesta
+                task = asyncio.ensure_future(attempt.cancel())
+                self._cancelling.add(task)
+                task.add_done_callback(self._cancelling.discard)
+
+    def _record_primary(self, attempt: _Attempt):
+        if attempt.role == "primary":
+            self._latencies.append(time.perf_counter() - attempt.started)
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self._counters["requests"]
+        return {
+            **self._counters,
+            "hedge_rate": self._counters["hedged"] / requests if requests else 0.0,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 3),
+        }
@@ -0,0 +1,173 @@
+# model_tiering.py
+
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable, AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .model_backend import get_model
+from .prompt_budget import invocation_intent, user_text
+
+
+@dataclass
+class TierPlan:
+    intent: str
+    tier: str
+    model: str
+    max_output_tokens: int
+    tools: Optional[List[str]]        # None = todas las herramientas del agente
+
+
+class TieredModel(BaseLlm):
+    """
+    Modelo del agente con varios niveles: cada petición va al modelo cuyo nombre lleva
+    (`llm_request.model`, que fija ModelTiering.before_model_callback), o al modelo por
+    defecto si no es de ningún nivel. Los modelos suelen ser HedgedModel, cada uno con
+    sus propias latencias para decidir el hedge.
+    """
+
+    default: BaseLlm
+    models: Dict[str, BaseLlm] = {}   # Nombre del modelo -> modelo
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        model = self.models.get(llm_request.model, self.default)
+        async for response in model.generate_content_async(llm_request, stream=stream):
+            yield response
+
+
+class ModelTiering:
+    """
+    Elige modelo, presupuesto de salida y herramientas para cada petición.
+
+    Los dos laboratorios se diferencian sobre todo en el modelo y en max_output_tokens,
+    pero una pregunta factual ("¿Quién ganó en 2014?") no necesita el modelo grande. La
+    intención de la consulta es la que prompt_budget ya clasificó en la invocación (se lee
+    del estado, ver invocation_intent); solo si no la hay se clasifica con `classify`, el
+    IntentRouter.classify() del agente. La intención se traduce en un nivel de
+    MODEL_TIERS_CONFIG: factoid, statistic, analysis o current. El nivel decide el modelo (sobrescrituras de MODEL_CONFIG, con la
+    misma política de hedge y reserva), un tope para max_output_tokens (el menor entre el
+    del nivel y el del perfil de prompt_budget) y las herramientas que se declaran.
+    """
+
+    def __init__(self, tiers: Dict[str, Dict[str, Any]], intent_tiers: Dict[str, str], default_tier: str,
+                 classify: Optional[Callable[[str], str]] = None, enabled: bool = True):
+        # tiers: nivel -> {"model": BaseLlm, "max_output_tokens": int, "tools": lista o None}
+        self.enabled = enabled
+        self._tiers = tiers
+        self._intent_tiers = intent_tiers
+        self._default_tier = default_tier
+        # El agente la fija al crear su router (los niveles se construyen antes, con el modelo);
+        # sin clasificador ni intención de prompt_budget, la consulta va al nivel por defecto
+        self.classify = classify
+
+        models = {tier["model"].model: tier["model"] for tier in tiers.values()}
+        default = tiers[default_tier]["model"]
+        if len(models) == 1:
+            self.model = default
+        else:
+            self.model = TieredModel(model=default.model, default=default, models=models)
+
+        self.last_plan: Optional[TierPlan] = None
+        self._counters: Dict[str, Any] = {"requests": 0, "tools_removed": 0, "tiers": {}}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], model_config: Dict[str, Any],
+                    policy_config: Optional[Dict[str, Any]] = None,
+                    model: Optional[BaseLlm] = None,
+                    classify: Optional[Callable[[str], str]] = None) -> "ModelTiering":
+        """
+        Un modelo por nivel, obtenido del registro de model_backend (los niveles con la
+        misma configuración comparten instancia). Con `model` (modelo inyectado) todos los
+        niveles lo usan y solo cambian el presupuesto y las herramientas.
+        """
+        tiers = {}
+        for name, tier in config["tiers"].items():
+            tiers[name] = {
+                "model": model or get_model({**model_config, **tier["model"]} if config["enabled"] else model_config,
+                                            policy_config),
+                "max_output_tokens": tier["max_output_tokens"],
+                "tools": tier["tools"],
+            }
+        return cls(tiers, config["intent_tiers"], config["default_tier"], classify=classify, enabled=config["enabled"])
+
+    def plan(self, query: str) -> TierPlan:
+        """Nivel, modelo, presupuesto de salida y herramientas para una consulta"""
+        return self.plan_intent(self._intent(query))
+
+    def plan_intent(self, intent: str) -> TierPlan:
+        """Nivel, modelo, presupuesto de salida y herramientas para una intención ya clasificada"""
+        name = self._intent_tiers.get(intent, self._default_tier)
+        tier = self._tiers[name]
+        return TierPlan(
+            intent=intent,
+            tier=name,
+            model=tier["model"].model,
+            max_output_tokens=tier["max_output_tokens"],
+            tools=tier["tools"],
+        )
+
+    def _intent(self, query: str) -> str:
+        return self.classify(query) if self.classify is not None else "general"
+
+    def before_model_callback(self, callback_context: Any, llm_request: Any) -> None:
+        """
+        before_model_callback de ADK: fija el modelo de la petición (TieredModel la
+        reenvía según ese nombre), limita max_output_tokens y retira las declaraciones
+        de las herramientas que el nivel no usa. Devuelve None para que la llamada continúe.
+        """
+        if not self.enabled:
+            return None
+        query = user_text(callback_context, llm_request)
+        if not query:
+            return None
+
+        # La intención que ya clasificó prompt_budget en esta invocación, si la hay
+        plan = self.plan_intent(invocation_intent(callback_context, query, self._intent))
+        llm_request.model = plan.model
+        config = llm_request.config
+        config.max_output_tokens = min(config.max_output_tokens or plan.max_output_tokens, plan.max_output_tokens)
+        if plan.tools is not None:
+            self._counters["tools_removed"] += _keep_tools(llm_request, set(plan.tools))
+        self._record(plan)
+        return None
+
+    def _record(self, plan: TierPlan):
+        self.last_plan = plan
+        self._counters["requests"] += 1
+        tiers = self._counters["tiers"]
+        tiers[plan.tier] = tiers.get(plan.tier, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self._counters["requests"]
+        stats = {
+            "requests": requests,
+            "tiers": dict(self._counters["tiers"]),
+            "tools_removed": self._counters["tools_removed"],
+        }
+        # Hedges y reservas de cada modelo (HedgedModel)
+        for tier in self._tiers.values():
+            if hasattr(tier["model"], "stats"):
+                stats.setdefault("models", {})[tier["model"].model] = tier["model"].stats()
+        return stats
+
+
+def _keep_tools(llm_request: Any, allowed: set) -> int:
+    """Deja solo las funciones de `allowed` en la petición; devuelve cuántas se retiraron"""
+    removed = 0
+    tools = []
+    for tool in llm_request.config.tools or []:
+        if tool.function_declarations:
+            declarations = [declaration for declaration in tool.function_declarations if declaration.name in allowed]
+            removed += len(tool.function_declarations) - len(declarations)
+            if not declarations:
+                continue
+            tool.function_declarations = declarations
+        # Las herramientas integradas (google_search nativo) no son funciones: se mantienen
+        tools.append(tool)
+    llm_request.config.tools = tools or None
+    llm_request.tools_dict = {name: tool for name, tool in llm_request.tools_dict.items() if name in allowed}
+    return removed
@@ -0,0 +1,56 @@
+# normalization.py
+
+import re
+import unicodedata
+from typing import List
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# Signos ASCII -> espacio (se conservan los saltos de línea que separan los textos de un lote)
+_ASCII_PUNCTUATION = str.maketrans({chr(c): " " for c in range(128) if not chr(c).isalnum() and chr(c) != "\n"})
+
+
+def strip_accents(text: str) -> str:
+    """Elimina tildes y diacríticos ("Müller" -> "Muller", "¿Quién?" -> "¿Quien?")"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza texto para usarlo como clave de índice.
+
+    Quita tildes, pasa a minúsculas y reemplaza signos de puntuación por
+    espacios simples: "¿Quién ganó en 2014?" -> "quien gano en 2014"
+    """
+    return _NON_ALNUM.sub(" ", strip_accents(text).lower()).strip()
+
+
+def normalize_batch(texts: List[str]) -> List[str]:
+    """
+    Variante de normalize_text para lotes grandes (fragmentos de búsqueda): una sola
+    normalización Unicode y una sola traducción de caracteres sobre el lote unido, en
+    lugar de recorrer cada texto carácter a carácter.
+
+    A diferencia de normalize_text, los espacios no se colapsan ni se recortan, y los
+    caracteres no ASCII sin descomposición ("ß", "ø") se eliminan.
+    """
+    joined = "\n".join(text.replace("\n", " ") for text in texts)
+    if not joined.isascii():
+        joined = unicodedata.normalize("NFKD", joined).encode("ascii", "ignore").decode("ascii")
+    return joined.lower().translate(_ASCII_PUNCTUATION).split("\n")
+
+
+# Palabras vacías en español e inglés, más el relleno propio del dominio ("mundial", "copa").
+# Los interrogativos (quién, dónde, cuál...) y "más"/"no" se conservan porque cambian la pregunta.
+STOPWORDS = frozenset("""
+a al algo con de del el en es esa ese eso esta este fue ha han hay la las le lo los me mi
+muy nos o para pero por que se si sin sobre su sus te tu un una uno unos unas y ya
+about an and are as at be by did do does for from has have in is it me of on or the this to was were
+will with you your
+copa mundo mundial mundiales world cup cups fifa
+""".split())
+
+
+def query_terms(text: str) -> List[str]:
+    """Términos significativos de una consulta: normalizada y sin palabras vacías"""
+    return [term for term in normalize_text(text).split() if term not in STOPWORDS]
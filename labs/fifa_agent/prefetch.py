@@ -0,0 +1,355 @@
+# prefetch.py
+
+import asyncio
+import contextvars
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, FrozenSet
+
+from .normalization import query_terms
+from .world_cup_data import WorldCupDataStore, get_data_store
+
+_YEAR = re.compile(r"\b(19[3-9]\d|20\d\d)\b")
+
+# Argumentos que las herramientas repiten en su resultado: en un acierto se devuelven
+# los de la llamada real, no los de la predicción ("Alemania" y no "Germany")
+_ECHOED_ARGUMENTS = {"query": "query", "year": "year", "player_name": "player",
+                     "context": "context", "country": "country", "topic": "topic"}
+
+Call = Tuple[str, Dict[str, Any]]
+
+# Sesión de la conversación en curso: la fija before_agent_callback (o observe) y la heredan
+# las llamadas a herramientas de esa invocación, incluidas las paralelas
+_SESSION: contextvars.ContextVar[str] = contextvars.ContextVar("fifa_prefetch_session", default="")
+
+
+@dataclass
+class PrefetchEntry:
+    session: str
+    key: Tuple
+    call: Call
+    anchors: FrozenSet[str]            # Entidades de la conversación que motivaron la predicción
+    expires_at: float
+    task: Optional["asyncio.Task"] = field(default=None, repr=False)
+
+
+class FollowUpPrefetcher:
+    """
+    Prefetch especulativo de las herramientas que probablemente pedirá la siguiente pregunta.
+
+    Las conversaciones siguen caminos previsibles: tras "¿Quién ganó en 2014?" llegan la
+    final, el goleador o la historia del campeón. Cada llamada a herramienta que pasa por
+    run() se responde como siempre y, además, programa en segundo plano las llamadas de
+    seguimiento más probables para sus entidades (año, país, jugador). Se ejecutan cuando
+    el event loop queda libre (mientras el modelo genera o el usuario lee), como mucho
+    `max_concurrency` a la vez, y sus resultados esperan a la siguiente pregunta.
+
+    Los resultados se guardan por petición canónica y no por argumentos literales:
+    search_world_cup_info("goleador", 2014) y search_world_cup_info("¿quién fue el máximo
+    goleador?", 2014) piden lo mismo, y "Alemania", "Germany" y "alemana" son el mismo país.
+
+    Un prefetcher atiende a todas las sesiones del agente, pero cada sesión tiene sus
+    propios prefetch: solo se aprovechan y se cancelan dentro de la conversación que los
+    motivó. Si la siguiente pregunta de una sesión menciona entidades distintas de las de
+    un prefetch pendiente, este se cancela; las llamadas a herramientas no cancelan nada,
+    así que las llamadas paralelas de un mismo turno no se pisan entre sí. Con `search`, también se prefetchean búsquedas web de
+    actualidad de los jugadores y países de la conversación (gastan cuota: desactivado
+    por defecto).
+    """
+
+    def __init__(self, run: Callable[..., Awaitable[Dict[str, Any]]], data_store: Optional[WorldCupDataStore] = None,
+                 enabled: bool = True, max_concurrency: int = 2, max_pending: int = 16, max_per_call: int = 3,
+                 ttl_seconds: float = 300.0, timeout: float = 2.0,
+                 search: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None,
+                 search_key: Optional[Callable[[str], str]] = None, prefetch_search: bool = False,
+                 clock: Callable[[], float] = time.monotonic):
+        self._run = run
+        self._data = data_store or get_data_store()
+        self.enabled = enabled
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.max_per_call = max_per_call
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self._search = search
+        self._search_key = search_key or (lambda query: " ".join(sorted(set(query_terms(query)))))
+        self.prefetch_search = prefetch_search and search is not None
+        self._clock = clock
+
+        # Por (sesión, petición canónica); max_pending limita el total de todas las sesiones
+        self._entries: "OrderedDict[Tuple[str, Tuple], PrefetchEntry]" = OrderedDict()
+        self._queue: "deque[PrefetchEntry]" = deque()
+        self._running = 0
+        self._counters = {
+            "scheduled": 0, "completed": 0, "failed": 0, "cancelled": 0, "expired": 0, "evicted": 0,
+            "hits": 0, "inflight_hits": 0, "misses": 0,
+        }
+
+    @classmethod
+    def from_config(cls, run: Callable[..., Awaitable[Dict[str, Any]]], config: Dict[str, Any],
+                    search: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None,
+                    search_key: Optional[Callable[[str], str]] = None) -> "FollowUpPrefetcher":
+        return cls(
+            run,
+            enabled=config["enabled"],
+            max_concurrency=config["max_concurrency"],
+            max_pending=config["max_pending"],
+            max_per_call=config["max_per_call"],
+            ttl_seconds=config["ttl_seconds"],
+            timeout=config["timeout_seconds"],
+            search=search,
+            search_key=search_key,
+            prefetch_search=config.get("web_search", False),
+        )
+
+    # ------------------------------------------------------------------
+    # Llamadas reales
+    # ------------------------------------------------------------------
+
+    async def run(self, name: str, **kwargs: Any) -> Dict[str, Any]:
+        """Resultado de la herramienta (prefetcheado si lo hay) y prefetch de sus seguimientos"""
+        if not self.enabled:
+            return await self._run(name, **kwargs)
+
+        session = _SESSION.get()
+        key = self._call_key(name, kwargs)
+        result = await self._take(session, key) if key is not None else None
+        if result is None:
+            if key is not None:
+                self._counters["misses"] += 1
+            result = await self._run(name, **kwargs)
+        else:
+            result = dict(result, **{echo: kwargs[argument] for argument, echo in _ECHOED_ARGUMENTS.items()
+                                     if argument in kwargs and echo in result})
+
+        if key is not None and result.get("action") == "local_data":
+            # La predicción se hace después de devolver el resultado, fuera del camino de la respuesta
+            asyncio.get_running_loop().call_soon(self._follow_up, session, key, self._key_anchors(key))
+        return result
+
+    async def search(self, query: str) -> Dict[str, Any]:
+        """Búsqueda web (prefetcheada si la hay)"""
+        if not self.enabled or not self.prefetch_search:
+            return await self._search(query)
+        result = await self._take(_SESSION.get(), ("web_search", self._search_key(query)))
+        if result is None:
+            return await self._search(query)
+        return dict(result, query=query)
+
+    def observe(self, query: str, session: Optional[str] = None):
+        """
+        Nueva pregunta del usuario: cancela los prefetch de la sesión de entidades que ya no
+        menciona. Con `session`, las herramientas que se llamen después en el mismo contexto
+        (la invocación de ADK, la tarea del router) usan los prefetch de esa sesión.
+        """
+        if session is not None:
+            _SESSION.set(session)
+        if self.enabled:
+            self._diverge(_SESSION.get(), self._query_anchors(query))
+
+    def before_agent_callback(self, callback_context: Any):
+        """observe() para las preguntas que llegan al modelo por el Runner de ADK"""
+        content = callback_context.user_content
+        query = " ".join(part.text for part in content.parts if part.text) if content is not None and content.parts else ""
+        self.observe(query, callback_context.session.id)
+        return None
+
+    async def _take(self, session: str, key: Tuple) -> Optional[Dict[str, Any]]:
+        entry = self._entries.pop((session, key), None)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            self._cancel(entry, "expired")
+            return None
+        if entry.task is None:
+            # Aún en cola: la pregunta llegó antes que el prefetch; se ejecuta ya
+            self._queue.remove(entry)
+            self._start(entry)
+        inflight = not entry.task.done()
+        try:
+            result = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.task.cancelled():
+                return None
+            raise  # Se canceló quien espera, no el prefetch
+        except Exception:
+            return None
+        if result is not None:
+            self._counters["inflight_hits" if inflight else "hits"] += 1
+        return result
+
+    # ------------------------------------------------------------------
+    # Predicción de seguimientos
+    # ------------------------------------------------------------------
+
+    def _predict(self, key: Tuple) -> List[Call]:
+        """Llamadas de seguimiento más probables tras una petición con resultado local"""
+        calls: List[Call] = []
+        if key[0] == "search_world_cup_info":
+            _, year, topic, _ = key
+            tournament = self._data.get_tournament(year) if year is not None else None
+            if tournament is not None:
+                # Tras un Mundial: la final, el goleador y la historia del campeón
+                calls.append(("search_world_cup_info", {"query": "final", "year": year}))
+                calls.append(("search_world_cup_info", {"query": "goleador", "year": year}))
+                calls.append(("get_country_performance", {"country": self._data.country_name(tournament["winner"])}))
+                if tournament["top_scorers"]:
+                    calls.append(("get_player_statistics", {"player_name": tournament["top_scorers"][0]["player"],
+                                                            "context": str(year)}))
+            elif topic == "winner":
+                ranking = self._data.title_ranking()
+                if ranking:
+                    calls.append(("get_country_performance", {"country": ranking[0]["country"]}))
+            elif topic == "top_scorer":
+                scorers = self._data.top_scorers(limit=1)
+                if scorers:
+                    calls.append(("get_player_statistics", {"player_name": scorers[0]["player"], "context": "world_cup"}))
+        elif key[0] == "get_player_statistics":
+            summary = self._data.player_summary(key[1])
+            calls.append(("get_country_performance", {"country": summary["country"]}))
+            if summary["tournaments"]:
+                calls.append(("search_world_cup_info", {"query": "ganador", "year": max(summary["tournaments"])}))
+            if self.prefetch_search:
+                calls.append(("web_search", {"query": f"{summary['name']} club actual"}))
+        elif key[0] == "get_country_performance":
+            titles = self._data.aggregates.results(key[1])["titles"]
+            if titles:
+                calls.append(("search_world_cup_info", {"query": "final", "year": titles[-1]}))
+            calls.append(("search_world_cup_info", {"query": "ganador"}))
+            if self.prefetch_search:
+                calls.append(("web_search", {"query": f"selección {self._data.country_name(key[1])} noticias"}))
+        return calls
+
+    def _follow_up(self, session: str, key: Tuple, anchors: FrozenSet[str]):
+        predicted = [(self._call_key(*call), call) for call in self._predict(key)]
+        self._schedule(session, [(k, call) for k, call in predicted if k is not None and k != key][:self.max_per_call],
+                       anchors)
+
+    def _schedule(self, session: str, calls: List[Tuple[Tuple, Call]], anchors: FrozenSet[str]):
+        if not calls:
+            return
+        # Las entidades de las predicciones (el campeón, el goleador) también son de esta conversación
+        batch = anchors.union(*(self._key_anchors(key) for key, _ in calls))
+        expires_at = self._clock() + self.ttl_seconds
+        for key, call in calls:
+            if (session, key) in self._entries:
+                continue
+            entry = PrefetchEntry(session, key, call, batch, expires_at)
+            self._entries[(session, key)] = entry
+            self._queue.append(entry)
+            self._counters["scheduled"] += 1
+            while len(self._entries) > self.max_pending:
+                _, oldest = self._entries.popitem(last=False)
+                self._cancel(oldest, "evicted")
+        self._pump()
+
+    def _pump(self):
+        while self._queue and self._running < self.max_concurrency:
+            self._start(self._queue.popleft())
+
+    def _start(self, entry: PrefetchEntry):
+        self._running += 1
+        entry.task = asyncio.ensure_future(self._execute(entry))
+        entry.task.add_done_callback(self._finished)
+
+    async def _execute(self, entry: PrefetchEntry) -> Optional[Dict[str, Any]]:
+        # Cede el turno: la respuesta en curso sigue antes que el prefetch
+        await asyncio.sleep(0)
+        name, kwargs = entry.call
+        call = self._search(kwargs["query"]) if name == "web_search" else self._run(name, **kwargs)
+        try:
+            return await asyncio.wait_for(call, self.timeout)
+        except asyncio.TimeoutError:
+            self._counters["failed"] += 1
+            return None
+
+    def _finished(self, task: "asyncio.Task"):
+        self._running -= 1
+        if not task.cancelled():
+            if task.exception() is not None:
+                self._counters["failed"] += 1
+            elif task.result() is not None:
+                self._counters["completed"] += 1
+        self._pump()
+
+    def _diverge(self, session: str, anchors: FrozenSet[str]):
+        """Cancela los prefetch pendientes de la sesión que no comparten ninguna entidad con la pregunta actual"""
+        if not anchors:
+            # "¿Y el goleador de ese torneo?": sin entidades, sigue la conversación anterior
+            return
+        for key, entry in list(self._entries.items()):
+            if entry.session == session and not entry.anchors & anchors \
+                    and (entry.task is None or not entry.task.done()):
+                del self._entries[key]
+                self._cancel(entry, "cancelled")
+
+    def _cancel(self, entry: PrefetchEntry, reason: str):
+        if entry.task is None:
+            if entry in self._queue:
+                self._queue.remove(entry)
+        elif not entry.task.done():
+            entry.task.cancel()
+        self._counters[reason] += 1
+
+    def cancel_all(self, session: Optional[str] = None):
+        """Cancela los prefetch pendientes y descarta los ya terminados (de `session` al cerrarla, o de todas)"""
+        for key, entry in list(self._entries.items()):
+            if session is None or entry.session == session:
+                del self._entries[key]
+                if entry.task is None or not entry.task.done():
+                    self._cancel(entry, "cancelled")
+
+    # ------------------------------------------------------------------
+    # Claves canónicas y entidades
+    # ------------------------------------------------------------------
+
+    def _call_key(self, name: str, kwargs: Dict[str, Any]) -> Optional[Tuple]:
+        """Petición canónica de una llamada (None si no se puede prefetchear)"""
+        if name == "search_world_cup_info":
+            return (name,) + self._data.info_request(kwargs.get("query", ""), kwargs.get("year"))
+        if name == "get_player_statistics":
+            player_id = self._data.resolve_player(kwargs.get("player_name", ""))
+            if player_id is None:
+                return None
+            year = _YEAR.search(str(kwargs.get("context") or ""))
+            return name, player_id, int(year.group(1)) if year else None
+        if name == "get_country_performance":
+            code = self._data.resolve_country(kwargs.get("country", ""))
+            return (name, code) if code is not None else None
+        if name == "web_search":
+            return "web_search", self._search_key(kwargs["query"])
+        return None
+
+    @staticmethod
+    def _key_anchors(key: Optional[Tuple]) -> FrozenSet[str]:
+        """Entidades de una petición canónica (year:2014, player:messi, country:ARG)"""
+        if key is None:
+            return frozenset()
+        if key[0] == "search_world_cup_info":
+            return frozenset((f"year:{key[1]}",)) if key[1] is not None else frozenset()
+        if key[0] == "get_player_statistics":
+            return frozenset((f"player:{key[1]}",))
+        if key[0] == "get_country_performance":
+            return frozenset((f"country:{key[1]}",))
+        return frozenset()
+
+    def _query_anchors(self, query: str) -> FrozenSet[str]:
+        terms = self._data.canonical_terms(query_terms(query))
+        anchors = {term for term in terms if term.startswith(("player:", "country:"))}
+        anchors.update(f"year:{year}" for year in _YEAR.findall(query))
+        return frozenset(anchors)
+
+    def stats(self) -> Dict[str, Any]:
+        """Prefetch programados, completados, cancelados y proporción de aciertos"""
+        hits = self._counters["hits"] + self._counters["inflight_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "pending": len(self._entries),
+            "running": self._running,
+            # Aciertos por prefetch completado (precisión) y por llamada real prefetcheable (cobertura)
+            "hit_rate": min(1.0, hits / self._counters["completed"]) if self._counters["completed"] else 0.0,
+            "coverage": hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,210 @@
+# prompt_budget.py
+
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable
+
+# Dígitos sueltos, secuencias de letras o cualquier otro carácter visible
+_PIECES = re.compile(r"\d|[^\W\d_]+|\S")
+
+# Intención de la invocación en curso en el estado de la sesión (temp: ADK no la persiste)
+INTENT_STATE_KEY = "temp:fifa_intent"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimación offline del número de tokens (sin red ni vocabulario descargado).
+
+    Aproxima un tokenizador SentencePiece como el de Gemini: cada dígito y cada
+    signo cuenta como un token, las palabras se parten en piezas de ~4 caracteres
+    y los emojis (fuera del plano básico de Unicode) cuentan como dos.
+    """
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        if piece[0].isalpha():
+            tokens += math.ceil(len(piece) / 4)
+        elif len(piece) == 1 and ord(piece) > 0xFFFF:
+            tokens += 2
+        else:
+            tokens += 1
+    return tokens
+
+
+def join_sections(sections: List[str]) -> str:
+    """Une secciones con el mismo formato que SYSTEM_PROMPT en config.py"""
+    return "\n" + "\n\n".join(sections) + "\n"
+
+
+@dataclass
+class PromptPlan:
+    intent: str
+    profile: str
+    sections: List[str]
+    system_prompt: str
+    input_tokens: int
+    tokens_saved: int
+    max_output_tokens: int
+
+
+class PromptBudget:
+    """
+    Ensambla el prompt del sistema por consulta.
+
+    El SYSTEM_PROMPT completo se envía en cada turno; aquí se divide en secciones
+    (SYSTEM_PROMPT_SECTIONS), se mide el coste en tokens de cada una una sola vez
+    y, según la intención de la consulta, se envían solo las secciones de su perfil
+    junto con un max_output_tokens propio. Los prompts de cada perfil se precalculan,
+    así que planificar una consulta cuesta lo mismo que clasificarla.
+
+    Es el primer callback de modelo: clasifica la consulta una vez por invocación y
+    model_tiering reutiliza esa intención, así que stats() mide aquí el clasificador.
+    """
+
+    def __init__(self, sections: Dict[str, str], profiles: Dict[str, Dict[str, Any]],
+                 intent_profiles: Dict[str, str], classify: Callable[[str], str],
+                 tokenizer: Callable[[str], int] = estimate_tokens, enabled: bool = True):
+        self.enabled = enabled
+        self._classify = classify
+        self._intent_profiles = intent_profiles
+        self.full_prompt = join_sections(list(sections.values()))
+        self.full_tokens = tokenizer(self.full_prompt)
+        self.section_tokens = {name: tokenizer(text) for name, text in sections.items()}
+
+        # Perfil -> (secciones, prompt ensamblado, tokens, max_output_tokens)
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        for name, profile in profiles.items():
+            names = profile["sections"] or list(sections)
+            prompt = join_sections([sections[section] for section in names])
+            self._profiles[name] = {
+                "sections": names,
+                "prompt": prompt,
+                "tokens": tokenizer(prompt),
+                "max_output_tokens": profile["max_output_tokens"],
+            }
+
+        self.last_plan: Optional[PromptPlan] = None
+        self._classify_seconds = 0.0
+        self._counters: Dict[str, Any] = {"requests": 0, "input_tokens": 0, "tokens_saved": 0, "classifications": 0,
+                                          "profiles": {}}
+
+    @classmethod
+    def from_config(cls, sections: Dict[str, str], config: Dict[str, Any],
+                    classify: Callable[[str], str]) -> "PromptBudget":
+        return cls(sections, config["profiles"], config["intent_profiles"], classify, enabled=config["enabled"])
+
+    def plan(self, query: str) -> PromptPlan:
+        """Secciones, prompt y presupuesto de salida para una consulta"""
+        return self.plan_intent(self._timed_classify(query) if self.enabled else "general")
+
+    def plan_intent(self, intent: str) -> PromptPlan:
+        """Secciones, prompt y presupuesto de salida para una intención ya clasificada"""
+        name = self._intent_profiles.get(intent, "general")
+        profile = self._profiles[name]
+        return PromptPlan(
+            intent=intent,
+            profile=name,
+            sections=profile["sections"],
+            system_prompt=profile["prompt"],
+            input_tokens=profile["tokens"],
+            tokens_saved=self.full_tokens - profile["tokens"],
+            max_output_tokens=profile["max_output_tokens"],
+        )
+
+    def before_model_callback(self, callback_context: Any, llm_request: Any) -> None:
+        """
+        before_model_callback de ADK: sustituye el SYSTEM_PROMPT completo por el del
+        perfil y fija max_output_tokens. Devuelve None para que la llamada continúe.
+        """
+        query = user_text(callback_context, llm_request)
+        if not query:
+            return None
+
+        intent = invocation_intent(callback_context, query, self._timed_classify) if self.enabled else "general"
+        plan = self.plan_intent(intent)
+        config = llm_request.config
+        instruction = config.system_instruction
+        if isinstance(instruction, str) and self.full_prompt in instruction:
+            config.system_instruction = instruction.replace(self.full_prompt, plan.system_prompt, 1)
+        else:
+            # Instrucción modificada por otra capa: no se toca, no hay ahorro que contar
+            plan.tokens_saved = 0
+            plan.input_tokens = self.full_tokens
+        config.max_output_tokens = plan.max_output_tokens
+        self._record(plan)
+        return None
+
+    def _timed_classify(self, query: str) -> str:
+        start = time.perf_counter()
+        intent = self._classify(query)
+        self._classify_seconds += time.perf_counter() - start
+        self._counters["classifications"] += 1
+        return intent
+
+    def _record(self, plan: PromptPlan):
+        self.last_plan = plan
+        self._counters["requests"] += 1
+        self._counters["input_tokens"] += plan.input_tokens
+        self._counters["tokens_saved"] += plan.tokens_saved
+        profiles = self._counters["profiles"]
+        profiles[plan.profile] = profiles.get(plan.profile, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        """Coste en tokens de cada sección y de cada perfil frente al prompt completo"""
+        return {
+            "full_prompt_tokens": self.full_tokens,
+            "sections": dict(self.section_tokens),
+            "profiles": {
+                name: {
+                    "tokens": profile["tokens"],
+                    "saved": self.full_tokens - profile["tokens"],
+                    "max_output_tokens": profile["max_output_tokens"],
+                }
+                for name, profile in self._profiles.items()
+            },
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self._counters["requests"]
+        classifications = self._counters["classifications"]
+        return {
+            "requests": requests,
+            "input_tokens": self._counters["input_tokens"],
+            "tokens_saved": self._counters["tokens_saved"],
+            "tokens_saved_per_request": self._counters["tokens_saved"] / requests if requests else 0.0,
+            "classifications": classifications,
+            "classify_us": self._classify_seconds / classifications * 1e6 if classifications else 0.0,
+            "profiles": dict(self._counters["profiles"]),
+        }
+
+
+def invocation_intent(callback_context: Any, query: str, classify: Callable[[str], str]) -> str:
+    """
+    Intención de la consulta de la invocación: se clasifica en la primera petición al
+    modelo y se guarda en el estado; las siguientes (los pasos del bucle de herramientas)
+    y los demás callbacks la leen de ahí en lugar de volver a clasificar
+    """
+    state = getattr(callback_context, "state", None)
+    if state is None:
+        return classify(query)
+    invocation_id = callback_context.invocation_id
+    stored = state.get(INTENT_STATE_KEY)
+    if stored is not None and stored[0] == invocation_id:
+        return stored[1]
+    intent = classify(query)
+    state[INTENT_STATE_KEY] = [invocation_id, intent]
+    return intent
+
+
+def user_text(callback_context: Any, llm_request: Any) -> str:
+    """Texto del último mensaje del usuario (el de la invocación, o el último del historial)"""
+    content = getattr(callback_context, "user_content", None)
+    if content is None:
+        for candidate in reversed(llm_request.contents or []):
+            if candidate.role == "user" and any(part.text for part in candidate.parts or []):
+                content = candidate
+                break
+    if content is None:
+        return ""
+    return " ".join(part.text for part in content.parts or [] if part.text)
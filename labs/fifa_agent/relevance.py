@@ -0,0 +1,194 @@
+# relevance.py
+
+import operator
+import re
+from dataclasses import dataclass
+from itertools import chain, repeat
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+
+import numpy as np
+
+from .intent_router import trie_regex
+from .normalization import normalize_batch, normalize_text, query_terms
+
+# Palabras que identifican un texto como relacionado con fútbol/FIFA (coincidencia por prefijo
+# de palabra: "gol" cubre "goles" y "goleador")
+DEFAULT_FOOTBALL_KEYWORDS = [
+    "fifa", "world cup", "copa mundial", "football", "soccer", "futbol",
+    "player", "jugador", "goal", "gol", "team", "equipo", "champion",
+    "campeon", "tournament", "torneo", "match", "partido",
+]
+
+# Palabras clave que suman un bonus fijo a la puntuación
+DEFAULT_IMPORTANT_KEYWORDS = ["fifa", "world cup", "copa mundial"]
+
+
+_match_start = operator.methodcaller("start")
+
+
+@dataclass
+class TokenizedBatch:
+    """Lote de textos normalizados y tokenizados una sola vez para todas las palabras clave"""
+    texts: List[str]
+    joined: str                 # Textos unidos con "\n"
+    offsets: np.ndarray         # Posición de inicio de cada texto en joined
+    tokens: List[str]           # Todos los tokens seguidos
+    doc_ids: np.ndarray         # Texto al que pertenece cada token
+    doc_len: np.ndarray         # Tokens por texto
+
+    @classmethod
+    def build(cls, texts: Sequence[str]) -> "TokenizedBatch":
+        normalized = normalize_batch(list(texts)) if texts else []
+        lengths = np.fromiter((len(text) + 1 for text in normalized), dtype=np.int64, count=len(normalized))
+        words = [text.split() for text in normalized]
+        doc_len = np.fromiter(map(len, words), dtype=np.int64, count=len(normalized))
+        return cls(
+            texts=normalized,
+            joined="\n".join(normalized),
+            offsets=np.cumsum(lengths) - lengths,
+            tokens=list(chain.from_iterable(words)),
+            doc_ids=np.repeat(np.arange(len(normalized)), doc_len),
+            doc_len=doc_len,
+        )
+
+
+class KeywordMatcher:
+    """
+    Palabras clave precompiladas para buscarlas en un lote de textos.
+
+    - present(): una sola expresión regular (trie_regex), coincidencia por prefijo de
+      palabra; cada texto se recorre una vez sin importar cuántas palabras haya.
+    - counts(): matriz [textos x palabras clave] de apariciones exactas. Las palabras
+      sueltas se buscan sobre los tokens del lote con un dict.get en C (map) y se
+      cuentan con np.bincount; las frases ("world cup"), con una búsqueda literal
+      sobre el lote unido. El coste no depende del número de palabras clave.
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = list(dict.fromkeys(normalize_text(keyword) for keyword in keywords if keyword))
+        self._pattern = re.compile(r"\b" + trie_regex(self.keywords)) if self.keywords else None
+        self._single = {keyword: i for i, keyword in enumerate(self.keywords) if " " not in keyword}
+        # Literal seguido de un lookahead: sin \b inicial, re puede buscar el literal
+        # directamente (mucho más rápido); el inicio de palabra se comprueba después
+        self._phrases = [(i, re.compile(re.escape(keyword) + r"(?![a-z0-9])"))
+                         for i, keyword in enumerate(self.keywords) if " " in keyword]
+
+    def present(self, batch: TokenizedBatch) -> np.ndarray:
+        """Máscara de textos con al menos una palabra clave (se detiene en la primera)"""
+        if self._pattern is None:
+            return np.zeros(len(batch.texts), dtype=bool)
+        search = self._pattern.search
+        return np.fromiter((search(text) is not None for text in batch.texts), dtype=bool, count=len(batch.texts))
+
+    def counts(self, batch: TokenizedBatch) -> np.ndarray:
+        """Matriz [textos x palabras clave] con el número de apariciones"""
+        n_docs, n_keywords = len(batch.texts), len(self.keywords)
+        flat = np.zeros(n_docs * n_keywords, dtype=np.float64)
+        if self._single and batch.tokens:
+            ids = np.fromiter(map(self._single.get, batch.tokens, repeat(-1)), dtype=np.int64, count=len(batch.tokens))
+            hit = ids >= 0
+            flat += np.bincount(batch.doc_ids[hit] * n_keywords + ids[hit], minlength=flat.size)
+
+        joined = batch.joined
+        for index, pattern in self._phrases:
+            starts = [start for start in map(_match_start, pattern.finditer(joined))
+                      if start == 0 or not joined[start - 1].isalnum()]
+            if starts:
+                docs = np.searchsorted(batch.offsets, starts, side="right") - 1
+                flat += np.bincount(docs * n_keywords + index, minlength=flat.size)
+        return flat.reshape(n_docs, n_keywords)
+
+
+class RelevanceRanker:
+    """
+    Ranking de fragmentos (resultados de búsqueda) por relevancia para una consulta.
+
+    Puntuación BM25 de los términos de la consulta, calculada con NumPy sobre la
+    matriz de frecuencias del lote completo, más un bonus por cada palabra clave
+    importante presente. Los fragmentos sin ninguna palabra de fútbol se descartan
+    si require_football está activo.
+    """
+
+    def __init__(self, football_keywords: Optional[Sequence[str]] = None,
+                 important_keywords: Optional[Sequence[str]] = None,
+                 important_boost: float = 2.0, k1: float = 1.2, b: float = 0.75,
+                 require_football: bool = True, min_score: float = 0.0):
+        self._football = KeywordMatcher(DEFAULT_FOOTBALL_KEYWORDS if football_keywords is None else football_keywords)
+        self._important_keywords = list(dict.fromkeys(
+            normalize_text(keyword) for keyword in
+            (DEFAULT_IMPORTANT_KEYWORDS if important_keywords is None else important_keywords) if keyword
+        ))
+        self.important_boost = important_boost
+        self.k1 = k1
+        self.b = b
+        self.require_football = require_football
+        self.min_score = min_score
+        self._query_matchers: Dict[Tuple[str, ...], Tuple[KeywordMatcher, List[int], List[int]]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RelevanceRanker":
+        return cls(
+            football_keywords=config["football_keywords"],
+            important_keywords=config["important_keywords"],
+            important_boost=config["important_boost"],
+            k1=config["k1"],
+            b=config["b"],
+            require_football=config["require_football"],
+            min_score=config["min_score"],
+        )
+
+    def score(self, query: str, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Puntuación de cada texto y máscara de textos relacionados con fútbol"""
+        batch = TokenizedBatch.build(texts)
+        n_docs = len(batch.texts)
+
+        # Una sola pasada sobre el lote para los términos de la consulta y las palabras importantes
+        matcher, term_columns, important_columns = self._query_matcher(query)
+        counts = matcher.counts(batch)
+        tf = counts[:, term_columns]
+        scores = np.zeros(n_docs, dtype=np.float64)
+        if tf.size:
+            df = np.count_nonzero(tf, axis=0)
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            avgdl = batch.doc_len.mean() or 1.0
+            norm = self.k1 * (1.0 - self.b + self.b * batch.doc_len / avgdl)
+            scores = (tf * (self.k1 + 1.0) / (tf + norm[:, None])) @ idf
+
+        important = np.count_nonzero(counts[:, important_columns], axis=1)
+        scores += self.important_boost * important
+        return scores, self._football.present(batch) | (important > 0)
+
+    def rank(self, query: str, results: List[Dict[str, Any]], limit: Optional[int] = None,
+             fields: Sequence[str] = ("title", "snippet")) -> List[Dict[str, Any]]:
+        """
+        Filtra y ordena resultados de búsqueda (de mayor a menor relevancia, estable
+        ante empates) usando el texto de `fields`; devuelve como mucho `limit`
+        """
+        if not results:
+            return []
+        texts = [" ".join(str(result.get(field) or "") for field in fields) for result in results]
+        scores, football = self.score(query, texts)
+        keep = scores >= self.min_score
+        if self.require_football:
+            keep &= football
+        order = [i for i in np.argsort(-scores, kind="stable") if keep[i]]
+        return [results[i] for i in order[:limit]]
+
+    def is_football_related(self, text: str) -> bool:
+        return bool(self.score("", [text])[1][0])
+
+    def _query_matcher(self, query: str) -> Tuple[KeywordMatcher, List[int], List[int]]:
+        """Matcher de términos de la consulta + palabras importantes, y la columna de cada grupo"""
+        terms = tuple(dict.fromkeys(query_terms(query)))
+        cached = self._query_matchers.get(terms)
+        if cached is None:
+            if len(self._query_matchers) >= 256:
+                self._query_matchers.clear()
+            matcher = KeywordMatcher(list(terms) + self._important_keywords)
+            columns = {keyword: i for i, keyword in enumerate(matcher.keywords)}
+            cached = self._query_matchers[terms] = (
+                matcher,
+                [columns[term] for term in terms],
+                [columns[keyword] for keyword in self._important_keywords],
+            )
+        return cached
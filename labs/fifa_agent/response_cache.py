@@ -0,0 +1,265 @@
+# response_cache.py
+
+import re
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Set, Callable, Awaitable, Tuple, List
+
+from .fuzzy_index import edit_distance
+from .intents import is_time_sensitive
+from .normalization import query_terms
+
+# Pronombres y deícticos: la respuesta depende del turno anterior, así que no se cachean
+_CONTEXT_DEPENDENT = re.compile(r"(?<!\w)(él|ella|ellos|ellas|ese|esa|eso|aquel|aquella|he|she|him|his|her|they|them|that)(?!\w)")
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    response: Any
+    created_at: float
+    latency: float
+    numbers: Tuple[str, ...]
+    trigrams: Set[str] = field(repr=False)
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _is_typo(a: str, b: str) -> bool:
+    """
+    Errata: pocas ediciones según la longitud (como en SymSpellIndex) y no una variante
+    por prefijo o sufijo, que es otra palabra ("campeon" ~ "subcampeon", "gol" ~ "goles")
+    """
+    shorter, longer = sorted((a, b), key=len)
+    if len(longer) - len(shorter) >= 2 and (longer.startswith(shorter) or longer.endswith(shorter)):
+        return False
+    limit = 0 if len(shorter) < 5 else 1 if len(shorter) < 9 else 2
+    return edit_distance(a, b, limit) <= limit
+
+
+def _terms_compatible(key: str, other: str) -> bool:
+    """
+    Mismos términos en el mismo orden, salvo erratas ("brasil" ~ "brazil" es compatible,
+    "messi" ~ "mbappe" no). El orden conserva los papeles de cada entidad: "brasil perdio
+    contra alemania" y "alemania perdio contra brasil" son preguntas distintas.
+    """
+    terms, other_terms = key.split(), other.split()
+    if len(terms) != len(other_terms):
+        return False
+    for term, other_term in zip(terms, other_terms):
+        if term == other_term:
+            continue
+        # Entidades ya resueltas ("player:messi"): distintas son otra entidad, nunca una errata
+        if ":" in term or ":" in other_term or not _is_typo(term, other_term):
+            return False
+    return True
+
+
+class ResponseCache:
+    """
+    Caché de respuestas con búsqueda exacta y por similitud de n-gramas.
+
+    1. La consulta se normaliza (tildes, mayúsculas, palabras vacías ES/EN):
+       "¿Quién ganó en 2014?" y "quien gano el mundial 2014" -> "quien gano 2014"
+    2. Se busca primero la clave exacta y después la entrada más parecida por
+       trigramas de caracteres (coeficiente de Dice), exigiendo los mismos números
+       para no confundir 2014 con 2018 y los mismos términos en el mismo orden salvo
+       erratas de pocas letras ("brazil" ~ "brasil", pero no "messi" ~ "mbappe" ni
+       "campeon" ~ "subcampeon", ni "brasil ... alemania" ~ "alemania ... brasil").
+       Con `canonicalize`, los nombres de jugadores y países de la clave se sustituyen
+       antes por su id canónico ("mbape", "Kylian Mbappé" -> "player:mbappe").
+    3. Las entradas caducan por TTL y se expulsan por LRU al superar max_entries.
+    4. Con un almacén compartido (attach_shared, ver shared_cache.py), un fallo local
+       se busca por clave exacta en el almacén y cada respuesta nueva se escribe también
+       allí, así que los workers de serving.py comparten lo que cada uno calcula.
+
+    Las consultas sensibles al tiempo (las que el SYSTEM_PROMPT manda a google_search)
+    nunca se leen ni se guardan.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0,
+                 similarity_threshold: float = 0.8, min_terms: int = 2,
+                 clock: Callable[[], float] = time.monotonic,
+                 canonicalize: Optional[Callable[[List[str]], List[str]]] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.min_terms = min_terms
+        self._clock = clock
+        self._canonicalize = canonicalize
+        self._shared: Optional[Any] = None
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        self._counters = {
+            "exact_hits": 0,
+            "similar_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        self._latency_saved = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    canonicalize: Optional[Callable[[List[str]], List[str]]] = None) -> "ResponseCache":
+        return cls(
+            max_entries=config["max_entries"],
+            ttl_seconds=config["ttl_seconds"],
+            similarity_threshold=config["similarity_threshold"],
+            min_terms=config.get("min_terms", 2),
+            canonicalize=canonicalize if config.get("canonical_entities", True) else None,
+        )
+
+    def attach_shared(self, store: Any):
+        """Usa `store` (SharedCacheStore) como segundo nivel compartido entre procesos"""
+        self._shared = store
+
+    def cache_key(self, query: str) -> Optional[str]:
+        """Clave normalizada, o None si la consulta no debe cachearse"""
+        if is_time_sensitive(query) or _CONTEXT_DEPENDENT.search(query.lower()):
+            return None
+        terms = query_terms(query)
+        if len(terms) < self.min_terms:
+            return None
+        if self._canonicalize is not None:
+            terms = self._canonicalize(terms)
+        return " ".join(terms)
+
+    def get(self, query: str) -> Optional[Any]:
+        key = self.cache_key(query)
+        if key is None:
+            self._counters["bypassed"] += 1
+            return None
+
+        entry = self._lookup(key)
+        if entry is None and self._shared is not None:
+            entry = self._lookup_shared(key)
+        if entry is None:
+            self._counters["misses"] += 1
+            return None
+
+        self._latency_saved += entry.latency
+        return entry.response
+
+    def put(self, query: str, response: Any, latency: float = 0.0):
+        key = self.cache_key(query)
+        if key is None or response is None:
+            return
+        self._insert(key, response, latency, self._clock())
+        if self._shared is not None:
+            self._shared.put("responses", key, {"response": response, "latency": latency}, self.ttl_seconds)
+
+    def _insert(self, key: str, response: Any, latency: float, created_at: float) -> CacheEntry:
+        if key in self._entries:
+            self._remove(key)
+        entry = CacheEntry(
+            key=key,
+            response=response,
+            created_at=created_at,
+            latency=latency,
+            numbers=tuple(t for t in key.split() if t.isdigit()),
+            trigrams=_trigrams(key),
+        )
+        self._entries[key] = entry
+        for trigram in entry.trigrams:
+            self._trigram_index[trigram].add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._counters["evictions"] += 1
+        return entry
+
+    async def get_or_compute(self, query: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Devuelve la respuesta cacheada o la calcula con compute() y la guarda"""
+        cached = self.get(query)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        response = await compute()
+        self.put(query, response, latency=time.perf_counter() - start)
+        return response
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and self._alive(entry):
+            self._entries.move_to_end(key)
+            self._counters["exact_hits"] += 1
+            return entry
+
+        entry = self._most_similar(key)
+        if entry is not None:
+            self._entries.move_to_end(entry.key)
+            self._counters["similar_hits"] += 1
+        return entry
+
+    def _lookup_shared(self, key: str) -> Optional[CacheEntry]:
+        # Solo clave exacta: la similitud por trigramas se resuelve con las entradas locales
+        found = self._shared.get("responses", key)
+        if found is None:
+            return None
+        value, remaining = found
+        self._counters["shared_hits"] += 1
+        # La copia local caduca a la vez que la compartida
+        created_at = self._clock() - (self.ttl_seconds - remaining)
+        return self._insert(key, value["response"], value["latency"], created_at)
+
+    def _most_similar(self, key: str) -> Optional[CacheEntry]:
+        trigrams = _trigrams(key)
+        numbers = tuple(t for t in key.split() if t.isdigit())
+
+        # Solo se comparan las entradas que comparten algún trigrama
+        shared: Dict[str, int] = defaultdict(int)
+        for trigram in trigrams:
+            for candidate in self._trigram_index.get(trigram, ()):
+                shared[candidate] += 1
+
+        best, best_score = None, self.similarity_threshold
+        for candidate_key, common in shared.items():
+            entry = self._entries[candidate_key]
+            score = 2 * common / (len(trigrams) + len(entry.trigrams))
+            if (score >= best_score and entry.numbers == numbers
+                    and _terms_compatible(key, candidate_key) and self._alive(entry)):
+                best, best_score = entry, score
+        return best
+
+    def _alive(self, entry: CacheEntry) -> bool:
+        if self._clock() - entry.created_at <= self.ttl_seconds:
+            return True
+        self._remove(entry.key)
+        self._counters["expirations"] += 1
+        return False
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        for trigram in entry.trigrams:
+            keys = self._trigram_index[trigram]
+            keys.discard(key)
+            if not keys:
+                del self._trigram_index[trigram]
+
+    def clear(self):
+        self._entries.clear()
+        self._trigram_index.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos, fallos, expulsiones y latencia ahorrada"""
+        hits = self._counters["exact_hits"] + self._counters["similar_hits"] + self._counters["shared_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "latency_saved_seconds": round(self._latency_saved, 6),
+        }
@@ -0,0 +1,524 @@
+# serving.py
+#
+# Servidor HTTP con varios procesos worker y afinidad de sesión:
+#
+#   python -m fifa_agent.serving [--workers 4] [--port 8080] [--agent lab-3-fifa-tools.agent:get_agent]
+#
+#   curl -s localhost:8080/query -d '{"session_id": "abc", "query": "¿Quién ganó en 2014?"}'
+#   curl -s localhost:8080/stats
+#
+# El proceso maestro hace fork de N workers antes de aceptar tráfico; cada worker construye
+# su agente la primera vez que recibe una consulta. Todas las consultas de una sesión van
+# al mismo worker (crc32 del session_id), que guarda el historial de la conversación en el
+# session_service del agente (SESSION_STORE_CONFIG, ver session_store.py): con el almacén
+# "sqlite" o "file" la conversación sobrevive a que su worker se reinicie. Las cachés de
+# respuestas y de búsqueda web se comparten entre workers con un fichero SQLite local
+# (ver shared_cache.py).
+
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import struct
+import tempfile
+import time
+import uuid
+import zlib
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import InMemoryRunner, Runner
+from google.genai import types
+
+from .batch_runner import record_exchange
+from .shared_cache import SharedCacheStore
+
+_FRAME_HEADER = struct.Struct("!I")
+_HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}
+
+# Módulos que ADK importa en la primera ejecución del Runner (fastapi, authlib y sus modelos
+# de pydantic: ~0.5 s de CPU); el maestro los importa antes del fork para que ningún worker
+# los vuelva a importar
+ADK_LAZY_MODULES = ("google.adk.workflow._workflow", "google.adk.workflow._llm_agent_wrapper",
+                    "google.adk.flows.llm_flows.auto_flow")
+
+
+def load_factory(path: str) -> Callable[[], Any]:
+    """"paquete.modulo:funcion" -> función que construye el agente"""
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name or "get_agent")
+
+
+def worker_for_session(session_id: str, workers: int) -> int:
+    """Worker de una sesión; crc32 y no hash(), que cambia entre procesos"""
+    return zlib.crc32(session_id.encode("utf-8")) % workers
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Mensaje JSON precedido de su longitud (4 bytes), o None si el otro extremo cerró"""
+    try:
+        header = await reader.readexactly(_FRAME_HEADER.size)
+        return json.loads(await reader.readexactly(_FRAME_HEADER.unpack(header)[0]))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+def write_frame(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    data = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    writer.write(_FRAME_HEADER.pack(len(data)) + data)
+
+
+class AgentWorker:
+    """
+    Lo que ejecuta cada proceso worker: un agente construido perezosamente, un
+    Runner con una sesión de ADK por session_id y el mismo camino que los
+    bucles CLI (router -> caché -> modelo). Las consultas de sesiones distintas se
+    atienden a la vez; las de una misma sesión, en orden de llegada.
+    """
+
+    def __init__(self, index: int, agent_factory: Callable[[], Any],
+                 shared: Optional[SharedCacheStore] = None, app_name: str = "fifa_serving"):
+        self.index = index
+        self._factory = agent_factory
+        self._shared = shared
+        self._app_name = app_name
+        self._agent: Optional[Any] = None
+        self._runner: Optional[Runner] = None
+        self._locks: Dict[str, List[Any]] = {}
+        self._counters = {"queries": 0, "router": 0, "cache": 0, "model": 0, "errors": 0}
+        self._busy_seconds = 0.0
+
+    def _ensure_agent(self) -> Any:
+        if self._agent is None:
+            self._agent = self._factory()
+            if self._shared is not None:
+                self._agent.response_cache.attach_shared(self._shared)
+                web_search = getattr(self._agent, "web_search", None)
+                if web_search is not None:
+                    web_search.attach_shared(self._shared)
+            session_service = getattr(self._agent, "session_service", None)
+            if session_service is None:
+                self._runner = InMemoryRunner(agent=self._agent, app_name=self._app_name)
+            else:
+                self._runner = Runner(
+                    app_name=self._app_name, agent=self._agent, session_service=session_service,
+                    artifact_service=InMemoryArtifactService(), memory_service=InMemoryMemoryService(),
+                )
+        return self._agent
+
+    async def answer(self, session_id: str, user_id: str, query: str) -> Dict[str, Any]:
+        agent = self._ensure_agent()
+        # [lock, consultas que lo tienen o esperan]: sin ninguna, se suelta (no uno por sesión vista)
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                start = time.perf_counter()
+                router, cache = agent.streaming.router, agent.streaming.cache
+                prefetcher = getattr(agent, "prefetcher", None)
+                if prefetcher is not None:
+                    # Los prefetch de esta sesión, aparte de los de las demás sesiones del worker
+                    prefetcher.observe(query, session_id)
+                text = await router.answer(query) if router is not None else None
+                source = "router"
+                if text is None and cache is not None:
+                    text = cache.get(query)
+                    source = "cache"
+                if text is None:
+                    source = "model"
+                    text = await self._run_model(session_id, user_id, query)
+                    if cache is not None and text:
+                        cache.put(query, text, latency=time.perf_counter() - start)
+                else:
+                    # En el historial, para las preguntas de seguimiento que lleguen al modelo
+                    await record_exchange(self._runner, query, text, user_id, session_id)
+                elapsed = time.perf_counter() - start
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
+
+        self._counters["queries"] += 1
+        self._counters[source] += 1
+        self._busy_seconds += elapsed
+        return {"session_id": session_id, "text": text, "source": source,
+                "worker": self.index, "elapsed_ms": round(elapsed * 1000, 3)}
+
+    async def _run_model(self, session_id: str, user_id: str, query: str) -> str:
+        service = self._runner.session_service
+        session = await service.get_session(app_name=self._app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            await service.create_session(app_name=self._app_name, user_id=user_id, session_id=session_id)
+
+        message = types.Content(role="user", parts=[types.Part(text=query)])
+        parts: List[str] = []
+        async for event in self._runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+            if event.content and event.content.parts and not event.partial:
+                parts.extend(part.text for part in event.content.parts if part.text and not part.thought)
+        return "".join(parts)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "worker": self.index,
+            "pid": os.getpid(),
+            "agent_loaded": self._agent is not None,
+            "active_sessions": len(self._locks),     # Con alguna consulta en curso
+            **self._counters,
+            "busy_seconds": round(self._busy_seconds, 6),
+            "cpu_seconds": round(time.process_time(), 6),   # CPU del proceso desde que arrancó
+        }
+        if self._agent is not None:
+            stats["response_cache"] = self._agent.response_cache.stats()
+            if getattr(self._agent, "session_service", None) is not None:
+                stats["session_store"] = self._agent.session_service.stats()
+            web_search = getattr(self._agent, "web_search", None)
+            if web_search is not None:
+                stats["web_search"] = web_search.stats()
+        if self._shared is not None:
+            stats["shared_cache"] = self._shared.stats()
+        return stats
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende los mensajes del maestro; cada respuesta lleva el id de su petición"""
+        pending = set()
+        while True:
+            message = await read_frame(reader)
+            if message is None:
+                break
+            task = asyncio.ensure_future(self._reply(message, writer))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        for task in list(pending):
+            task.cancel()
+        writer.close()
+
+    async def _reply(self, message: Dict[str, Any], writer: asyncio.StreamWriter):
+        try:
+            if message["op"] == "stats":
+                result = self.stats()
+            else:
+                result = await self.answer(message["session_id"], message["user_id"], message["query"])
+            response = {"id": message["id"], "ok": True, "result": result}
+        except Exception as error:
+            self._counters["errors"] += 1
+            response = {"id": message["id"], "ok": False, "error": f"{type(error).__name__}: {error}"}
+        write_frame(writer, response)
+        await writer.drain()
+
+
+def _worker_main(index: int, socket_path: str, agent_factory: Callable[[], Any],
+                 shared: Optional[SharedCacheStore]):
+    # Ctrl+C lo gestiona el maestro, que termina los workers con SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    worker = AgentWorker(index, agent_factory, shared)
+
+    async def serve():
+        server = await asyncio.start_unix_server(worker.handle_connection, path=socket_path)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+class _WorkerLink:
+    """Conexión del maestro con un worker: varias peticiones en vuelo, emparejadas por id"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._pending: Dict[int, "asyncio.Future"] = {}
+        self._next_id = 0
+        self._reader_task = asyncio.ensure_future(self._read_responses())
+
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+
+    async def request(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            write_frame(self._writer, dict(message, id=request_id))
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_responses(self):
+        while True:
+            message = await read_frame(self._reader)
+            if message is None:
+                break
+            future = self._pending.get(message["id"])
+            if future is not None and not future.done():
+                future.set_result(message)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("el worker cerró la conexión"))
+
+    def close(self):
+        self._reader_task.cancel()
+        self._writer.close()
+
+
+class PreforkServer:
+    """
+    Proceso maestro: lanza los workers (fork, antes de aceptar tráfico), sirve HTTP y
+    reenvía cada consulta al worker de su sesión por un socket Unix.
+
+    - POST /query {"session_id", "query", "user_id"?}: sin session_id se crea una sesión
+      nueva y se devuelve su id para los siguientes turnos.
+    - GET /stats: contadores de cada worker (consultas por origen, cachés, sesiones).
+    - GET /health
+
+    Con preload_data el dataset se carga en el maestro antes del fork y los workers
+    comparten sus páginas de memoria; preload_modules hace lo mismo con los módulos que
+    ADK importa perezosamente en la primera consulta que llega al modelo. Si un worker muere, se relanza con la siguiente
+    consulta de sus sesiones (que pierden el historial).
+    """
+
+    def __init__(self, agent_factory: Callable[[], Any], workers: int = 0,
+                 host: str = "127.0.0.1", port: int = 8080,
+                 shared_cache_path: Optional[str] = "", shared_cache_max_entries: int = 20000,
+                 preload_data: bool = True, preload_modules: Tuple[str, ...] = ADK_LAZY_MODULES,
+                 request_timeout: float = 120.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.request_timeout = request_timeout
+        self._factory = agent_factory
+        self._preload_data = preload_data
+        self._preload_modules = tuple(preload_modules)
+        self._socket_dir = tempfile.mkdtemp(prefix="fifa_serving_")
+        # None desactiva el almacén compartido; "" usa un fichero temporal del servidor
+        if shared_cache_path == "":
+            shared_cache_path = os.path.join(self._socket_dir, "shared_cache.sqlite")
+        self._shared = (SharedCacheStore(shared_cache_path, max_entries=shared_cache_max_entries)
+                        if shared_cache_path else None)
+        self._context = multiprocessing.get_context("fork")
+        self._processes: List[Optional[Any]] = [None] * self.workers
+        self._links: List[Optional[_WorkerLink]] = [None] * self.workers
+        self._connecting: Dict[int, "asyncio.Future"] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._counters = {"requests": 0, "errors": 0, "restarts": 0, "sessions_created": 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    agent_factory: Optional[Callable[[], Any]] = None) -> "PreforkServer":
+        return cls(
+            agent_factory or load_factory(config["agent_factory"]),
+            workers=config["workers"],
+            host=config["host"],
+            port=config["port"],
+            shared_cache_path=config["shared_cache_path"],
+            shared_cache_max_entries=config["shared_cache_max_entries"],
+            preload_data=config["preload_data"],
+            preload_modules=config["preload_modules"],
+            request_timeout=config["request_timeout_seconds"],
+        )
+
+    def _socket_path(self, index: int) -> str:
+        return os.path.join(self._socket_dir, f"worker_{index}.sock")
+
+    def _spawn(self, index: int):
+        path = self._socket_path(index)
+        if os.path.exists(path):
+            os.unlink(path)
+        process = self._context.Process(target=_worker_main, name=f"fifa-worker-{index}", daemon=True,
+                                        args=(index, path, self._factory, self._shared))
+        process.start()
+        self._processes[index] = process
+
+    def start_workers(self):
+        """Lanza todos los workers (en el maestro, antes del event loop si es posible)"""
+        if self._preload_data:
+            from .world_cup_data import get_data_store
+            get_data_store()
+        for module in self._preload_modules:
+            importlib.import_module(module)
+        if self._shared is not None:
+            len(self._shared)  # Crea el esquema antes de que los workers compitan por hacerlo
+            self._shared.close()
+        for index in range(self.workers):
+            self._spawn(index)
+
+    async def _link(self, index: int) -> _WorkerLink:
+        link = self._links[index]
+        if link is not None and not link.closed:
+            return link
+        # Varias consultas pueden llegar a la vez para un worker aún sin conexión: una sola conecta
+        if index not in self._connecting:
+            self._connecting[index] = asyncio.ensure_future(self._connect(index))
+        try:
+            return await asyncio.shield(self._connecting[index])
+        finally:
+            self._connecting.pop(index, None)
+
+    async def _connect(self, index: int) -> _WorkerLink:
+        if self._links[index] is not None:
+            self._links[index].close()
+        process = self._processes[index]
+        if process is None or not process.is_alive():
+            if process is not None:
+                self._counters["restarts"] += 1
+            self._spawn(index)
+        deadline = time.monotonic() + 30.0
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self._socket_path(index))
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.01)
+        self._links[index] = _WorkerLink(reader, writer)
+        return self._links[index]
+
+    async def query(self, query: str, session_id: Optional[str] = None,
+                    user_id: str = "web_user") -> Dict[str, Any]:
+        """Envía la consulta al worker de la sesión y devuelve su respuesta"""
+        self._counters["requests"] += 1
+        if not session_id:
+            session_id = uuid.uuid4().hex
+            self._counters["sessions_created"] += 1
+        link = await self._link(worker_for_session(session_id, self.workers))
+        response = await link.request(
+            {"op": "query", "session_id": session_id, "user_id": user_id, "query": query},
+            self.request_timeout,
+        )
+        if not response["ok"]:
+            self._counters["errors"] += 1
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    async def worker_stats(self) -> List[Dict[str, Any]]:
+        stats = []
+        for index in range(self.workers):
+            link = await self._link(index)
+            stats.append((await link.request({"op": "stats"}, self.request_timeout))["result"])
+        return stats
+
+    async def start(self):
+        if any(process is None for process in self._processes):
+            self.start_workers()
+        self._server = await asyncio.start_server(self._handle_http, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"🌐 FIFA serving en http://{self.host}:{self.port} con {self.workers} workers")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP/1.1 mínimo con keep-alive: las peticiones de una conexión se atienden en orden"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+                status, payload = await self._route(method, path.split("?", 1)[0], body)
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "workers": self.workers}
+        if method == "GET" and path == "/stats":
+            return 200, {"master": self.stats(), "workers": await self.worker_stats()}
+        if method != "POST" or path != "/query":
+            return 404, {"error": f"{method} {path} no existe"}
+
+        try:
+            request = json.loads(body or b"{}")
+            query = request["query"].strip()
+        except (ValueError, KeyError, AttributeError):
+            return 400, {"error": "se esperaba un JSON con 'query' (y opcionalmente 'session_id' y 'user_id')"}
+        try:
+            return 200, await self.query(query, request.get("session_id"), request.get("user_id") or "web_user")
+        except (RuntimeError, ConnectionError, asyncio.TimeoutError) as error:
+            return 503, {"error": f"{type(error).__name__}: {error}"}
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "workers": self.workers,
+                "alive": sum(1 for process in self._processes if process is not None and process.is_alive())}
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for link in self._links:
+            if link is not None:
+                link.close()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout=5)
+
+
+def main():
+    from .config import SERVING_CONFIG
+
+    parser = argparse.ArgumentParser(description="Servidor HTTP del agente FIFA con varios workers")
+    parser.add_argument("--agent", default=SERVING_CONFIG["agent_factory"], help="modulo:funcion que crea el agente")
+    parser.add_argument("--workers", type=int, default=SERVING_CONFIG["workers"], help="0 = uno por núcleo")
+    parser.add_argument("--host", default=SERVING_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=SERVING_CONFIG["port"])
+    args = parser.parse_args()
+
+    server = PreforkServer.from_config(
+        dict(SERVING_CONFIG, workers=args.workers, host=args.host, port=args.port),
+        load_factory(args.agent),
+    )
+    # Los workers se lanzan antes del event loop del maestro
+    server.start_workers()
+
+    async def run():
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
+
+
+if __name__ == "__main__":
+    main()
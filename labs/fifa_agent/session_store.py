@@ -0,0 +1,665 @@
+# session_store.py
+
+import hashlib
+import os
+import sqlite3
+import struct
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+try:
+    # Opcional: con la extensión en C de msgpack se codifica igual, unas diez veces más rápido
+    import msgpack as _msgpack
+except ImportError:
+    _msgpack = None
+
+SessionKey = Tuple[str, str, str]     # (app_name, user_id, session_id)
+
+# Registros de una sesión: [0, app, user, id, estado, creación] y después [1, evento] por evento
+_HEADER, _EVENT = 0, 1
+# Campos que casi siempre repiten el valor del evento anterior: solo se guardan si cambian
+_REPEATED_FIELDS = ("invocation_id", "author", "branch", "node_info")
+
+
+# --- Codificación binaria -------------------------------------------------------------
+#
+# Subconjunto de MessagePack (None, bool, int, float, str, bytes, list, dict): es lo que
+# produce model_dump(mode="json") más los ids en binario. Se implementa aquí para no añadir
+# dependencias; los bytes son MessagePack estándar y cualquier librería los puede leer
+# (packb/unpackb delegan en msgpack si está instalado).
+
+_UINT8, _UINT16, _UINT32, _UINT64 = (struct.Struct(f) for f in ("!B", "!H", "!I", "!Q"))
+_INT8, _INT16, _INT32, _INT64 = (struct.Struct(f) for f in ("!b", "!h", "!i", "!q"))
+_FLOAT64 = struct.Struct("!d")
+
+
+def packb(value: Any) -> bytes:
+    if _msgpack is not None:
+        return _msgpack.packb(value, use_bin_type=True)
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+def _pack(value: Any, out: bytearray):
+    if value is None:
+        out.append(0xC0)
+    elif value is True:
+        out.append(0xC3)
+    elif value is False:
+        out.append(0xC2)
+    elif isinstance(value, int):
+        _pack_int(value, out)
+    elif isinstance(value, float):
+        out.append(0xCB)
+        out += _FLOAT64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        size = len(data)
+        if size < 32:
+            out.append(0xA0 | size)
+        elif size < 0x100:
+            out.append(0xD9)
+            out.append(size)
+        elif size < 0x10000:
+            out.append(0xDA)
+            out += _UINT16.pack(size)
+        else:
+            out.append(0xDB)
+            out += _UINT32.pack(size)
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        size = len(value)
+        if size < 0x100:
+            out.append(0xC4)
+            out.append(size)
+        elif size < 0x10000:
+            out.append(0xC5)
+            out += _UINT16.pack(size)
+        else:
+            out.append(0xC6)
+            out += _UINT32.pack(size)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        _pack_length(len(value), 0x90, 0xDC, out)
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        _pack_length(len(value), 0x80, 0xDE, out)
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        raise TypeError(f"tipo no serializable: {type(value).__name__}")
+
+
+def _pack_int(value: int, out: bytearray):
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xFF)
+    elif value >= 0:
+        for marker, fmt, limit in ((0xCC, _UINT8, 0x100), (0xCD, _UINT16, 0x10000),
+                                   (0xCE, _UINT32, 0x100000000), (0xCF, _UINT64, 0x10000000000000000)):
+            if value < limit:
+                out.append(marker)
+                out += fmt.pack(value)
+                return
+        raise OverflowError("entero demasiado grande para MessagePack")
+    else:
+        for marker, fmt, limit in ((0xD0, _INT8, 0x80), (0xD1, _INT16, 0x8000),
+                                   (0xD2, _INT32, 0x80000000), (0xD3, _INT64, 0x8000000000000000)):
+            if value >= -limit:
+                out.append(marker)
+                out += fmt.pack(value)
+                return
+        raise OverflowError("entero demasiado grande para MessagePack")
+
+
+def _pack_length(size: int, fix: int, marker16: int, out: bytearray):
+    # marker16 + 1 es la variante de 32 bits (0xDC/0xDD arrays, 0xDE/0xDF mapas)
+    if size < 16:
+        out.append(fix | size)
+    elif size < 0x10000:
+        out.append(marker16)
+        out += _UINT16.pack(size)
+    else:
+        out.append(marker16 + 1)
+        out += _UINT32.pack(size)
+
+
+def unpackb(data: bytes) -> Any:
+    if _msgpack is not None:
+        return _msgpack.unpackb(data, raw=False)
+    value, position = _unpack(data, 0)
+    if position != len(data):
+        raise ValueError("bytes sobrantes tras el valor MessagePack")
+    return value
+
+
+def _unpack(data: bytes, position: int) -> Tuple[Any, int]:
+    # Por frecuencia en los eventos: claves y textos cortos, mapas, enteros pequeños, listas
+    marker = data[position]
+    position += 1
+    if 0xA0 <= marker < 0xC0:
+        end = position + marker - 0xA0
+        return data[position:end].decode("utf-8"), end
+    if 0x80 <= marker < 0x90:
+        items = {}
+        for _ in range(marker - 0x80):
+            key, position = _unpack(data, position)
+            items[key], position = _unpack(data, position)
+        return items, position
+    if marker < 0x80:
+        return marker, position
+    if 0x90 <= marker < 0xA0:
+        values = []
+        for _ in range(marker - 0x90):
+            value, position = _unpack(data, position)
+            values.append(value)
+        return values, position
+    if marker >= 0xE0:
+        return marker - 0x100, position
+    if marker == 0xC0:
+        return None, position
+    if marker == 0xC2:
+        return False, position
+    if marker == 0xC3:
+        return True, position
+    if marker == 0xCB:
+        return _FLOAT64.unpack_from(data, position)[0], position + 8
+    if marker in _SIZED:
+        fmt, kind = _SIZED[marker]
+        size = fmt.unpack_from(data, position)[0]
+        position += fmt.size
+        if kind == "int":
+            return size, position
+        if kind == "str":
+            return data[position:position + size].decode("utf-8"), position + size
+        if kind == "bin":
+            return bytes(data[position:position + size]), position + size
+        if kind == "array":
+            values = []
+            for _ in range(size):
+                value, position = _unpack(data, position)
+                values.append(value)
+            return values, position
+        items = {}
+        for _ in range(size):
+            key, position = _unpack(data, position)
+            items[key], position = _unpack(data, position)
+        return items, position
+    raise ValueError(f"marcador MessagePack no soportado: 0x{marker:02x}")
+
+
+# marcador -> (formato del tamaño o valor, tipo)
+_SIZED = {
+    0xCC: (_UINT8, "int"), 0xCD: (_UINT16, "int"), 0xCE: (_UINT32, "int"), 0xCF: (_UINT64, "int"),
+    0xD0: (_INT8, "int"), 0xD1: (_INT16, "int"), 0xD2: (_INT32, "int"), 0xD3: (_INT64, "int"),
+    0xD9: (_UINT8, "str"), 0xDA: (_UINT16, "str"), 0xDB: (_UINT32, "str"),
+    0xC4: (_UINT8, "bin"), 0xC5: (_UINT16, "bin"), 0xC6: (_UINT32, "bin"),
+    0xDC: (_UINT16, "array"), 0xDD: (_UINT32, "array"),
+    0xDE: (_UINT16, "map"), 0xDF: (_UINT32, "map"),
+}
+
+
+def frame(payload: bytes) -> bytes:
+    """Registro con su longitud delante (varint), para poder concatenarlos"""
+    size = len(payload)
+    prefix = bytearray()
+    while size >= 0x80:
+        prefix.append((size & 0x7F) | 0x80)
+        size >>= 7
+    prefix.append(size)
+    return bytes(prefix) + payload
+
+
+def iter_frames(data: bytes) -> Iterator[bytes]:
+    position, end = 0, len(data)
+    while position < end:
+        size, shift = 0, 0
+        while True:
+            byte = data[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        yield data[position:position + size]
+        position += size
+
+
+# --- Codificación de sesiones con el historial en deltas ------------------------------
+
+def _pack_id(value: str) -> Any:
+    # Los ids de evento son UUID: 16 bytes en lugar de 36 caracteres
+    try:
+        packed = uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return value
+    return packed.bytes if str(packed) == value else value
+
+
+def _unpack_id(value: bytes) -> str:
+    digits = value.hex()
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+
+class _Tail:
+    """Lo que el siguiente evento necesita del anterior para codificarse en delta"""
+
+    __slots__ = ("timestamp", "fields")
+
+    def __init__(self, timestamp: float):
+        self.timestamp = timestamp
+        self.fields: Dict[str, Any] = {}
+
+
+def encode_header(key: SessionKey, state: Dict[str, Any], created: float) -> bytes:
+    return frame(packb([_HEADER, key[0], key[1], key[2], state, created]))
+
+
+def encode_event(event: Event, tail: _Tail) -> bytes:
+    """
+    Un evento como delta del anterior: marca de tiempo en microsegundos desde el evento
+    previo, los campos repetidos (invocación, autor, rama) solo si cambian y el id en
+    binario. Actualiza `tail` para el siguiente evento.
+    """
+    data = event.model_dump(mode="json", exclude_none=True, exclude_defaults=True)
+    timestamp = data.pop("timestamp", event.timestamp)
+    data["dt"] = round((timestamp - tail.timestamp) * 1_000_000)
+    # Se acumula lo mismo que acumulará el decodificador: el error no crece con la sesión
+    tail.timestamp += data["dt"] / 1_000_000
+    for field in _REPEATED_FIELDS:
+        value = data.get(field)
+        if value == tail.fields.get(field):
+            data.pop(field, None)
+        elif value is None:
+            # Estaba en el evento anterior y en este no: se marca explícitamente
+            data[field] = None
+        if value is None:
+            tail.fields.pop(field, None)
+        else:
+            tail.fields[field] = value
+    if "id" in data:
+        data["id"] = _pack_id(data["id"])
+    return frame(packb([_EVENT, data]))
+
+
+def decode_records(data: bytes) -> Tuple[Optional[List[Any]], List[Dict[str, Any]], _Tail]:
+    """Cabecera, eventos (como dicts de model_dump) y cola para seguir codificando"""
+    header: Optional[List[Any]] = None
+    events: List[Dict[str, Any]] = []
+    tail = _Tail(0.0)
+    for record in iter_frames(data):
+        kind, *body = unpackb(record)
+        if kind == _HEADER:
+            header = [kind, *body]
+            tail.timestamp = header[5]
+            continue
+        event = body[0]
+        tail.timestamp += event.pop("dt") / 1_000_000
+        event["timestamp"] = tail.timestamp
+        for field in _REPEATED_FIELDS:
+            if field not in event:
+                if field in tail.fields:
+                    event[field] = tail.fields[field]
+            elif event[field] is None:
+                del event[field]
+                tail.fields.pop(field, None)
+            else:
+                tail.fields[field] = event[field]
+        if isinstance(event.get("id"), bytes):
+            event["id"] = _unpack_id(event["id"])
+        events.append(event)
+    return header, events, tail
+
+
+def _replay_state(header: List[Any], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    state = dict(header[4])
+    for event in events:
+        state.update(event.get("actions", {}).get("state_delta", {}))
+    return state
+
+
+# --- Almacenes ------------------------------------------------------------------------
+#
+# Un almacén solo guarda bytes: los registros de cada sesión concatenados en orden. Todos
+# exponen load / append / delete / keys y len().
+
+class MemorySessionStore:
+    """
+    Registros en un dict del proceso: una sesión ocupa un único bytearray, que append()
+    amplía en su sitio (sin copiar la sesión entera por cada evento)
+    """
+
+    def __init__(self):
+        self._data: Dict[SessionKey, bytearray] = {}
+
+    def load(self, key: SessionKey) -> Optional[bytes]:
+        data = self._data.get(key)
+        return bytes(data) if data is not None else None
+
+    def append(self, key: SessionKey, record: bytes):
+        data = self._data.get(key)
+        if data is None:
+            self._data[key] = bytearray(record)
+        else:
+            data += record
+
+    def delete(self, key: SessionKey):
+        self._data.pop(key, None)
+
+    def keys(self, app_name: str, user_id: Optional[str] = None) -> List[SessionKey]:
+        return [key for key in self._data if key[0] == app_name and (user_id is None or key[1] == user_id)]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def close(self):
+        pass
+
+
+_SESSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_records (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, seq)
+) WITHOUT ROWID
+"""
+
+
+class SQLiteSessionStore:
+    """
+    Registros en un fichero SQLite (modo WAL): cada turno añade filas, nunca reescribe la
+    sesión. Como SharedCacheStore, la conexión se abre perezosamente en cada proceso, así
+    que los workers de serving.py pueden compartir el fichero: una sesión sobrevive a un
+    reinicio o a que otro worker la atienda.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                         isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SESSIONS_SCHEMA)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def load(self, key: SessionKey) -> Optional[bytes]:
+        rows = self._db().execute(
+            "SELECT data FROM session_records WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq",
+            key,
+        ).fetchall()
+        return b"".join(row[0] for row in rows) if rows else None
+
+    def append(self, key: SessionKey, record: bytes):
+        self._db().execute(
+            "INSERT INTO session_records (app_name, user_id, session_id, seq, data) "
+            "SELECT ?, ?, ?, COALESCE(MAX(seq) + 1, 0), ? FROM session_records "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (*key, record, *key),
+        )
+
+    def delete(self, key: SessionKey):
+        self._db().execute(
+            "DELETE FROM session_records WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+        )
+
+    def keys(self, app_name: str, user_id: Optional[str] = None) -> List[SessionKey]:
+        if user_id is None:
+            rows = self._db().execute(
+                "SELECT app_name, user_id, session_id FROM session_records WHERE app_name = ? AND seq = 0",
+                (app_name,),
+            )
+        else:
+            rows = self._db().execute(
+                "SELECT app_name, user_id, session_id FROM session_records "
+                "WHERE app_name = ? AND user_id = ? AND seq = 0",
+                (app_name, user_id),
+            )
+        return [tuple(row) for row in rows]
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM session_records WHERE seq = 0").fetchone()[0]
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+
+class FileSessionStore:
+    """
+    Un fichero de solo-añadir por sesión, repartidos en 256 subdirectorios por el hash de
+    la clave (los ids de sesión no tienen por qué ser nombres de fichero válidos). Listar
+    sesiones lee la cabecera de cada fichero: es la operación lenta de este almacén.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: SessionKey) -> str:
+        digest = hashlib.blake2b("\x1f".join(key).encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:] + ".session")
+
+    def load(self, key: SessionKey) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def append(self, key: SessionKey, record: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "ab") as handle:
+            handle.write(record)
+
+    def delete(self, key: SessionKey):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _files(self) -> Iterator[str]:
+        if not os.path.isdir(self.directory):
+            return
+        for bucket in os.scandir(self.directory):
+            if bucket.is_dir():
+                for entry in os.scandir(bucket.path):
+                    if entry.name.endswith(".session"):
+                        yield entry.path
+
+    def keys(self, app_name: str, user_id: Optional[str] = None) -> List[SessionKey]:
+        keys = []
+        for path in self._files():
+            with open(path, "rb") as handle:
+                header = unpackb(next(iter_frames(handle.read())))
+            if header[1] == app_name and (user_id is None or header[2] == user_id):
+                keys.append((header[1], header[2], header[3]))
+        return keys
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._files())
+
+    def close(self):
+        pass
+
+
+def open_store(backend: str, config: Dict[str, Any]):
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(config["sqlite_path"])
+    if backend == "file":
+        return FileSessionStore(config["file_directory"])
+    raise ValueError(f"almacén de sesiones desconocido: {backend!r} (memory, sqlite o file)")
+
+
+# --- Servicio de sesiones de ADK --------------------------------------------------------
+
+class CompactSessionService(BaseSessionService):
+    """
+    SessionService de ADK sobre un almacén de bytes (memoria, SQLite o ficheros).
+
+    Cada sesión se guarda como registros MessagePack de solo-añadir: una cabecera y un
+    registro por evento, codificado como delta del anterior (ver encode_event). Solo las
+    `max_active` sesiones usadas más recientemente se mantienen deserializadas como objetos
+    de ADK; el resto son bytes y se cargan perezosamente en get_session. Un turno escribe
+    solo sus eventos nuevos, nunca la sesión entera.
+
+    Diferencias con InMemorySessionService: get_session devuelve la sesión de la caché
+    activa (sin copia) y el estado "app:" y "user:" se guarda con cada sesión, no compartido
+    entre las sesiones del usuario. Una sesión debe tener un único escritor a la vez (la
+    afinidad de serving.py lo garantiza).
+    """
+
+    def __init__(self, store: Any = None, max_active: int = 256):
+        super().__init__()
+        self._store = store if store is not None else MemorySessionStore()
+        self._max_active = max_active
+        # clave -> (sesión deserializada, cola para codificar el siguiente evento)
+        self._active: "OrderedDict[SessionKey, Tuple[Session, _Tail]]" = OrderedDict()
+        self._counters = {"created": 0, "loads": 0, "active_hits": 0, "evictions": 0,
+                          "appends": 0, "bytes_written": 0}
+        self._load_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CompactSessionService":
+        return cls(open_store(config["backend"], config), max_active=config["max_active"])
+
+    @property
+    def store(self) -> Any:
+        return self._store
+
+    def _activate(self, key: SessionKey, session: Session, tail: _Tail):
+        self._active[key] = (session, tail)
+        if len(self._active) > self._max_active:
+            # La sesión expulsada ya está en el almacén: solo se suelta el objeto
+            self._active.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _load(self, key: SessionKey) -> Optional[Tuple[Session, _Tail]]:
+        start = time.perf_counter()
+        data = self._store.load(key)
+        if data is None:
+            return None
+        header, events, tail = decode_records(data)
+        session = Session(
+            id=key[2], app_name=key[0], user_id=key[1],
+            state=_replay_state(header, events),
+            events=[Event.model_validate(event) for event in events],
+            last_update_time=tail.timestamp,
+        )
+        self._counters["loads"] += 1
+        self._load_seconds += time.perf_counter() - start
+        self._activate(key, session, tail)
+        return session, tail
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = session_id.strip() if session_id else uuid.uuid4().hex
+        key = (app_name, user_id, session_id)
+        if key in self._active or self._store.load(key) is not None:
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        created = time.time()
+        state = {k: v for k, v in (state or {}).items() if not k.startswith(State.TEMP_PREFIX)}
+        record = encode_header(key, state, created)
+        self._store.append(key, record)
+        session = Session(id=session_id, app_name=app_name, user_id=user_id, state=dict(state),
+                          last_update_time=created)
+        self._activate(key, session, _Tail(created))
+        self._counters["created"] += 1
+        self._counters["bytes_written"] += len(record)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        active = self._active.get(key)
+        if active is not None:
+            self._active.move_to_end(key)
+            self._counters["active_hits"] += 1
+        else:
+            active = self._load(key)
+            if active is None:
+                return None
+        session = active[0]
+        if config is None:
+            return session
+        events = session.events
+        if config.num_recent_events is not None:
+            events = events[-config.num_recent_events:] if config.num_recent_events else []
+        if config.after_timestamp is not None:
+            events = [event for event in events if event.timestamp >= config.after_timestamp]
+        return session.model_copy(update={"events": events, "state": dict(session.state)})
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        sessions = []
+        for key in self._store.keys(app_name, user_id):
+            active = self._active.get(key)
+            if active is not None:
+                state, updated = dict(active[0].state), active[0].last_update_time
+            else:
+                # Sin deserializar eventos: basta con los dicts para el estado y la fecha
+                data = self._store.load(key)
+                if data is None:
+                    continue
+                header, events, tail = decode_records(data)
+                state, updated = _replay_state(header, events), tail.timestamp
+            sessions.append(Session(id=key[2], app_name=key[0], user_id=key[1], state=state,
+                                    last_update_time=updated))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._active.pop(key, None)
+        self._store.delete(key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session, event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+        key = (session.app_name, session.user_id, session.id)
+        active = self._active.get(key)
+        if active is None:
+            # Expulsada de la caché activa mientras se usaba: se recarga para seguir el delta
+            active = self._load(key)
+            if active is None:
+                return event
+        if active[0] is not session:
+            self._commit_event_to_session(active[0], event)
+            active[0].last_update_time = event.timestamp
+        record = encode_event(event, active[1])
+        self._store.append(key, record)
+        self._counters["appends"] += 1
+        self._counters["bytes_written"] += len(record)
+        return event
+
+    def stats(self) -> Dict[str, Any]:
+        loads = self._counters["loads"]
+        return {
+            **self._counters,
+            "active": len(self._active),
+            "load_mean_ms": self._load_seconds / loads * 1000 if loads else 0.0,
+        }
@@ -0,0 +1,133 @@
+# shared_cache.py
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Any, Optional, Tuple, Callable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class SharedCacheStore:
+    """
+    Almacén clave/valor con caducidad compartido entre procesos, sobre un fichero SQLite
+    local en modo WAL (lecturas concurrentes sin bloquear a quien escribe).
+
+    Es el segundo nivel de ResponseCache y CachedWebSearch cuando el agente se sirve con
+    varios workers (ver serving.py): lo que un worker calcula lo leen los demás. Los
+    valores se guardan como JSON y cada espacio de nombres ("responses", "web_search")
+    tiene sus propias claves.
+
+    La conexión se abre perezosamente en cada proceso (una conexión SQLite no sobrevive
+    a un fork), así que el mismo objeto puede crearse en el proceso maestro y usarse en
+    los workers. Cada `cleanup_every` escrituras se borran las entradas caducadas y, si
+    se supera max_entries, las que caducan antes.
+    """
+
+    def __init__(self, path: str, max_entries: int = 20000, cleanup_every: int = 256,
+                 busy_timeout: float = 5.0, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.cleanup_every = cleanup_every
+        self.busy_timeout = busy_timeout
+        # Reloj de pared: el monotónico no es comparable entre procesos
+        self._clock = clock
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._puts_since_cleanup = 0
+        self._counters = {"hits": 0, "misses": 0, "puts": 0, "errors": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SharedCacheStore":
+        return cls(config["shared_cache_path"], max_entries=config["shared_cache_max_entries"])
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            # Tras un fork se abre una conexión nueva (la heredada no se toca)
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                         isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        """(valor, segundos de vida restantes), o None si no está o ha caducado"""
+        try:
+            row = self._db().execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        except sqlite3.Error:
+            # Un fallo del almacén compartido nunca rompe la consulta: se trata como fallo de caché
+            self._counters["errors"] += 1
+            return None
+        remaining = row[1] - self._clock() if row is not None else 0.0
+        if remaining <= 0:
+            self._counters["misses"] += 1
+            return None
+        self._counters["hits"] += 1
+        return json.loads(row[0]), remaining
+
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: float):
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        try:
+            self._db().execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, encoded, self._clock() + ttl_seconds),
+            )
+        except sqlite3.Error:
+            self._counters["errors"] += 1
+            return
+        self._counters["puts"] += 1
+        self._puts_since_cleanup += 1
+        if self._puts_since_cleanup >= self.cleanup_every:
+            self.cleanup()
+
+    def cleanup(self):
+        """Borra las entradas caducadas y, por encima de max_entries, las que caducan antes"""
+        self._puts_since_cleanup = 0
+        try:
+            db = self._db()
+            removed = db.execute("DELETE FROM cache WHERE expires_at <= ?", (self._clock(),)).rowcount
+            excess = db.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += db.execute(
+                    "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY expires_at LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        except sqlite3.Error:
+            self._counters["errors"] += 1
+            return
+        self._counters["evictions"] += removed
+
+    def clear(self, namespace: Optional[str] = None):
+        if namespace is None:
+            self._db().execute("DELETE FROM cache")
+        else:
+            self._db().execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de este proceso (cada worker lleva los suyos)"""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {**self._counters, "hit_rate": self._counters["hits"] / lookups if lookups else 0.0}
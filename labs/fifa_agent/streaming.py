@@ -0,0 +1,208 @@
+# streaming.py
+
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import InMemoryRunner, Runner
+from google.adk.sessions import BaseSessionService
+from google.genai import types
+
+from .batch_runner import record_exchange
+from .intent_router import IntentRouter
+from .response_cache import ResponseCache
+from .tracing import Tracer
+
+
+@dataclass
+class StreamMetrics:
+    source: str                       # "router", "cache" o "model"
+    ttft_seconds: float               # tiempo hasta el primer trozo de texto
+    total_seconds: float
+    chunks: int
+    characters: int
+    completed: bool = True            # False si el consumidor dejó de leer antes del final
+
+
+class StreamingResponder:
+    """
+    Responde consultas en streaming para los bucles CLI.
+
+    Las respuestas del router y de la caché se entregan de una vez; el resto se
+    ejecuta con el Runner de ADK en modo SSE y se entrega trozo a trozo según el
+    modelo genera texto. Por cada consulta se registra el tiempo hasta el primer
+    token (TTFT) por separado de la latencia total, que es lo que percibe el usuario.
+
+    stream() recibe la conversación de cada consulta; sin ella usa la del responder. Con un
+    session_service persistente (ver session_store.py) y un session_id fijo, la
+    conversación se retoma donde quedó tras reiniciar el proceso. `observe` (el del prefetch
+    del agente) recibe cada pregunta con el id de la sesión antes del router.
+    """
+
+    def __init__(self, agent: Any, router: Optional[IntentRouter] = None,
+                 cache: Optional[ResponseCache] = None, app_name: str = "fifa_cli", user_id: str = "cli_user",
+                 tracer: Optional[Tracer] = None, session_service: Optional[BaseSessionService] = None,
+                 session_id: Optional[str] = None, observe: Optional[Callable[[str, Optional[str]], None]] = None,
+                 history_size: int = 1024):
+        self._agent = agent
+        self._router = router
+        self._cache = cache
+        self._tracer = tracer or Tracer(enabled=False)
+        self._app_name = app_name
+        self._user_id = user_id
+        self._session_service = session_service
+        self._runner: Optional[Runner] = None
+        # Conversación por defecto de stream() (la del CLI), conocida desde la primera pregunta
+        self._session_id = session_id or uuid.uuid4().hex
+        self._observe = observe
+        self._run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+        self.last_metrics: Optional[StreamMetrics] = None
+        # Métricas de las últimas `history_size` consultas (percentiles); los totales, aparte
+        self._history: "deque[StreamMetrics]" = deque(maxlen=history_size)
+        self._queries = 0
+        self._sources: Dict[str, int] = {}
+        self._interrupted = 0
+
+    @property
+    def router(self) -> Optional[IntentRouter]:
+        """Router usado antes del modelo (None si está desactivado)"""
+        return self._router
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        return self._cache
+
+    async def _ensure_session(self, session_id: str):
+        # El Runner se crea con la primera consulta que lo necesita
+        if self._runner is None:
+            if self._session_service is None:
+                self._runner = InMemoryRunner(agent=self._agent, app_name=self._app_name)
+            else:
+                self._runner = Runner(
+                    app_name=self._app_name, agent=self._agent, session_service=self._session_service,
+                    artifact_service=InMemoryArtifactService(), memory_service=InMemoryMemoryService(),
+                )
+        service = self._runner.session_service
+        # Retomar la conversación guardada con ese id, si existe
+        session = await service.get_session(app_name=self._app_name, user_id=self._user_id, session_id=session_id)
+        if session is None:
+            await service.create_session(app_name=self._app_name, user_id=self._user_id, session_id=session_id)
+
+    async def stream(self, query: str, session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Genera el texto de la respuesta a medida que está disponible, en la conversación
+        `session_id` (por defecto, la del responder).
+
+        Si el consumidor deja de leer antes del final (aclose(), o un break), las métricas
+        y el span se registran igualmente; la respuesta incompleta no se guarda en la caché.
+        """
+        session_id = session_id or self._session_id
+        start = time.perf_counter()
+        first_chunk: Optional[float] = None
+        chunks: List[str] = []
+        source = "router"
+        completed = False
+        span = self._tracer.start("fifa.stream")
+        try:
+            if self._observe is not None:
+                self._observe(query, session_id)
+            answer = await self._router.answer(query) if self._router is not None else None
+            if answer is None and self._cache is not None:
+                answer = self._cache.get(query)
+                source = "cache"
+
+            if answer is not None:
+                first_chunk = time.perf_counter()
+                chunks.append(answer)
+                yield answer
+                # En el historial, para las preguntas de seguimiento que lleguen al modelo
+                await self._ensure_session(session_id)
+                await record_exchange(self._runner, query, answer, self._user_id, session_id)
+            else:
+                source = "model"
+                final: List[str] = []
+                async for chunk in self._stream_model(query, session_id, final):
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter()
+                    chunks.append(chunk)
+                    yield chunk
+                # Solo el texto del último turno (no el de los turnos previos a una herramienta)
+                if self._cache is not None and final and final[-1]:
+                    self._cache.put(query, final[-1], latency=time.perf_counter() - start)
+            completed = True
+        finally:
+            end = time.perf_counter()
+            metrics = StreamMetrics(
+                source=source,
+                ttft_seconds=(first_chunk or end) - start,
+                total_seconds=end - start,
+                chunks=len(chunks),
+                characters=sum(len(chunk) for chunk in chunks),
+                completed=completed,
+            )
+            self.last_metrics = metrics
+            self._history.append(metrics)
+            self._queries += 1
+            self._sources[source] = self._sources.get(source, 0) + 1
+            if not completed:
+                self._interrupted += 1
+            span.set("fifa.source", source)
+            span.set("fifa.cache_hit", source == "cache")
+            span.set("fifa.ttft_ms", round(metrics.ttft_seconds * 1000, 3))
+            span.set("fifa.completed", completed)
+            self._tracer.end(span)
+
+    async def _stream_model(self, query: str, session_id: str, final: List[str]) -> AsyncIterator[str]:
+        """Trozos de texto del modelo; añade a `final` el texto completo de cada respuesta final"""
+        await self._ensure_session(session_id)
+        message = types.Content(role="user", parts=[types.Part(text=query)])
+
+        # Con SSE el modelo emite eventos parciales (deltas) y al final de cada turno un
+        # evento completo con el texto agregado; este último solo se usa si no hubo parciales
+        streamed_turn = False
+        async for event in self._runner.run_async(
+            user_id=self._user_id, session_id=session_id,
+            new_message=message, run_config=self._run_config,
+        ):
+            text = _event_text(event)
+            if event.partial:
+                if text:
+                    streamed_turn = True
+                    yield text
+                continue
+            if event.is_final_response():
+                final.append(text)
+            if text and not streamed_turn:
+                yield text
+            streamed_turn = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Consultas respondidas en streaming por origen (e interrumpidas por el consumidor), y
+        TTFT y latencia total (p50/máximo) de las últimas `history_size`
+        """
+        if not self._history:
+            return {"queries": 0}
+        ttft = sorted(m.ttft_seconds for m in self._history)
+        total = sorted(m.total_seconds for m in self._history)
+        return {
+            "queries": self._queries,
+            "ttft_p50_seconds": ttft[len(ttft) // 2],
+            "ttft_max_seconds": ttft[-1],
+            "total_p50_seconds": total[len(total) // 2],
+            "total_max_seconds": total[-1],
+            "sources": dict(self._sources),
+            "interrupted": self._interrupted,
+        }
+
+
+def _event_text(event: Any) -> str:
+    """Texto visible de un evento (sin llamadas a herramientas ni partes de razonamiento)"""
+    if event.content is None or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text and not part.thought)
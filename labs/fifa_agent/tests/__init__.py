@@ -0,0 +1 @@
+# Tests unitarios del FIFA Agent (se ejecutan desde labs/ con python -m pytest fifa_agent/tests)
@@ -0,0 +1,84 @@
+# test_entity_resolution.py
+#
+# Resolución de jugadores y países con alias, tildes y erratas (world_cup_data.py y fuzzy_index.py)
+
+import pytest
+
+from ..fuzzy_index import SymSpellIndex, edit_distance
+from ..normalization import query_terms
+from ..world_cup_data import get_data_store
+
+
+@pytest.fixture(scope="module")
+def store():
+    return get_data_store()
+
+
+@pytest.mark.parametrize("name", ["Mbape", "Mbappé", "mbappe", "Kylian Mbappe", "Kylian Mbappé"])
+def test_player_typos_and_accents_resolve_to_same_id(store, name):
+    assert store.resolve_player(name) == "mbappe"
+
+
+@pytest.mark.parametrize("name", ["Holanda", "Países Bajos", "paises bajos", "Netherlands"])
+def test_country_aliases_resolve_to_fifa_code(store, name):
+    assert store.resolve_country(name) == "NED"
+
+
+def test_country_typo_resolves(store):
+    assert store.resolve_country("Alemanía") == "GER"
+
+
+@pytest.mark.parametrize("name", ["Muller", "Müller", "Muler"])
+def test_shared_surname_is_ambiguous(store, name):
+    # Gerd y Thomas Müller: el apellido solo (o con errata) no elige a ninguno
+    assert store.resolve_player(name) is None
+    assert sorted(store.player_candidates(name)) == ["Gerd Müller", "Thomas Müller"]
+
+
+def test_full_name_disambiguates(store):
+    assert store.resolve_player("Thomas Muller") == "thomas_muller"
+    assert store.resolve_player("Gerd Müller") == "gerd_muller"
+    assert store.player_candidates("Thomas Muller") == []
+
+
+def test_explicit_alias_wins_over_surname(store):
+    assert store.resolve_player("Ronaldo") == "ronaldo"
+
+
+@pytest.mark.parametrize("name", ["gol", "Iran", "xyz"])
+def test_short_or_unknown_terms_are_not_corrected(store, name):
+    assert store.resolve_player(name) is None
+    assert store.resolve_country(name) is None
+
+
+def test_canonical_terms_unify_spellings(store):
+    typo = store.canonical_terms(query_terms("goles de mbape en 2018"))
+    full = store.canonical_terms(query_terms("goles de Kylian Mbappé en 2018"))
+    assert typo == full == ["goles", "player:mbappe", "2018"]
+    assert store.canonical_terms(query_terms("final de Holanda")) == \
+        store.canonical_terms(query_terms("final de Países Bajos"))
+
+
+def test_canonical_terms_do_not_correct_numbers(store):
+    assert "2018" in store.canonical_terms(query_terms("goles en 2018"))
+    assert "2014" not in store.canonical_terms(query_terms("goles en 2018"))
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("mbappe", "mbape", 2) == 1
+    assert edit_distance("muller", "mulelr", 2) == 1
+    assert edit_distance("messi", "mbappe", 2) == 3
+
+
+def test_symspell_respects_length_limits():
+    index = SymSpellIndex(["mbappe", "muller", "iran", "argentina"])
+    assert index.correct("mbape") == "mbappe"
+    assert index.correct("argentiina") == "argentina"
+    assert index.lookup("irak") == []        # Palabra corta: solo exacta
+    assert index.lookup("mbpe") == []        # Dos erratas en una palabra de 5 letras
+
+
+def test_symspell_returns_ties_without_correcting():
+    index = SymSpellIndex(["garcia", "marcia"])
+    assert index.lookup("harcia") == ["garcia", "marcia"]
+    assert index.correct("harcia") is None
@@ -0,0 +1,173 @@
+# test_prefetch.py
+#
+# Prefetch de seguimientos por sesión y cancelación al cambiar de tema (prefetch.py)
+
+import asyncio
+from typing import Dict, Any, List, Tuple
+
+from ..fifa_tools import FIFATools
+from ..prefetch import FollowUpPrefetcher
+
+_TOOLS = FIFATools()
+
+
+class RecordingTools:
+    """Herramientas locales que apuntan cada llamada; con `blocked`, las llamadas esperan a release()"""
+
+    def __init__(self):
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.blocked = False
+        self._released = asyncio.Event()
+
+    async def run(self, name: str, **kwargs: Any) -> Dict[str, Any]:
+        self.calls.append((name, kwargs))
+        if self.blocked:
+            await self._released.wait()
+        return _TOOLS.call(name, **kwargs)
+
+    def release(self):
+        self._released.set()
+
+
+async def turn(prefetcher: FollowUpPrefetcher, session: str, question: str, name: str, **kwargs: Any) -> Dict[str, Any]:
+    """Una pregunta de `session` que llama a una herramienta, en su propio contexto como una invocación de ADK"""
+    async def invocation():
+        prefetcher.observe(question, session)
+        return await prefetcher.run(name, **kwargs)
+    return await asyncio.create_task(invocation())
+
+
+async def settle():
+    """Deja correr los prefetch programados"""
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+def test_follow_up_hit_is_scoped_to_session():
+    async def scenario():
+        tools = RecordingTools()
+        prefetcher = FollowUpPrefetcher(tools.run)
+        await turn(prefetcher, "a", "¿Quién ganó el Mundial 2014?", "search_world_cup_info", query="ganador", year=2014)
+        await settle()
+        assert prefetcher.stats()["completed"] == 3
+
+        # Otra sesión no ve los prefetch de "a": la herramienta se llama de verdad
+        calls = len(tools.calls)
+        result = await turn(prefetcher, "b", "¿Cuál fue la final de 2014?", "search_world_cup_info", query="final", year=2014)
+        assert len(tools.calls) == calls + 1
+        assert result["year"] == 2014
+
+        # En "a" la misma pregunta se responde con el prefetch, sin llamar a la herramienta
+        calls = len(tools.calls)
+        result = await turn(prefetcher, "a", "¿Cuál fue la final de 2014?", "search_world_cup_info",
+                            query="¿Cuál fue la final?", year=2014)
+        assert len(tools.calls) == calls
+        assert result["query"] == "¿Cuál fue la final?"
+        assert prefetcher.stats()["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_prefetch_hit_echoes_actual_arguments():
+    async def scenario():
+        tools = RecordingTools()
+        prefetcher = FollowUpPrefetcher(tools.run)
+        await turn(prefetcher, "a", "¿Quién ganó el Mundial 2014?", "search_world_cup_info", query="ganador", year=2014)
+        await settle()
+        calls = len(tools.calls)
+        # Prefetcheado como "Alemania": "Germany" es la misma petición canónica
+        result = await turn(prefetcher, "a", "Germany record", "get_country_performance", country="Germany")
+        assert len(tools.calls) == calls
+        assert result["country"] == "Germany"
+
+    asyncio.run(scenario())
+
+
+def test_new_topic_cancels_pending_prefetch():
+    async def scenario():
+        tools = RecordingTools()
+        prefetcher = FollowUpPrefetcher(tools.run)
+        await turn(prefetcher, "a", "¿Quién ganó el Mundial 2014?", "search_world_cup_info", query="ganador", year=2014)
+        tools.blocked = True
+        await settle()
+        assert prefetcher.stats()["running"] == 2
+
+        prefetcher.observe("¿Quién ganó el Mundial 1986?", "a")
+        await settle()
+        stats = prefetcher.stats()
+        assert stats["cancelled"] == 3
+        assert stats["pending"] == 0
+        assert stats["running"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_follow_up_without_entities_keeps_prefetch():
+    async def scenario():
+        tools = RecordingTools()
+        prefetcher = FollowUpPrefetcher(tools.run)
+        await turn(prefetcher, "a", "¿Quién ganó el Mundial 2014?", "search_world_cup_info", query="ganador", year=2014)
+        tools.blocked = True
+        await settle()
+
+        # Sin entidades ("ese torneo") o con las del prefetch (el campeón), sigue la conversación
+        prefetcher.observe("¿Y el goleador de ese torneo?", "a")
+        prefetcher.observe("¿Cuántos títulos tiene Alemania?", "a")
+        assert prefetcher.stats()["cancelled"] == 0
+        assert prefetcher.stats()["pending"] == 3
+        tools.release()
+        await settle()
+
+    asyncio.run(scenario())
+
+
+def test_new_topic_in_other_session_does_not_cancel():
+    async def scenario():
+        tools = RecordingTools()
+        prefetcher = FollowUpPrefetcher(tools.run)
+        await turn(prefetcher, "a", "¿Quién ganó el Mundial 2014?", "search_world_cup_info", query="ganador", year=2014)
+        tools.blocked = True
+        await settle()
+
+        prefetcher.observe("¿Quién ganó el Mundial 1986?", "b")
+        assert prefetcher.stats()["cancelled"] == 0
+        assert prefetcher.stats()["pending"] == 3
+        tools.release()
+        await settle()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_all_closes_only_given_session():
+    async def scenario():
+        tools = RecordingTools()
+        prefetcher = FollowUpPrefetcher(tools.run)
+        await turn(prefetcher, "a", "¿Quién ganó el Mundial 2014?", "search_world_cup_info", query="ganador", year=2014)
+        await turn(prefetcher, "b", "¿Quién ganó el Mundial 1986?", "search_world_cup_info", query="ganador", year=1986)
+        tools.blocked = True
+        await settle()
+        assert prefetcher.stats()["pending"] == 6
+
+        prefetcher.cancel_all("a")
+        await settle()
+        assert prefetcher.stats()["pending"] == 3
+        assert all(entry.session == "b" for entry in prefetcher._entries.values())
+
+        prefetcher.cancel_all()
+        await settle()
+        assert prefetcher.stats()["pending"] == 0
+        assert prefetcher.stats()["running"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_disabled_prefetcher_only_forwards_calls():
+    async def scenario():
+        tools = RecordingTools()
+        prefetcher = FollowUpPrefetcher(tools.run, enabled=False)
+        await turn(prefetcher, "a", "¿Quién ganó el Mundial 2014?", "search_world_cup_info", query="ganador", year=2014)
+        await settle()
+        assert len(tools.calls) == 1
+        assert prefetcher.stats()["scheduled"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+# test_response_cache.py
+#
+# Claves de la caché de respuestas y compatibilidad entre consultas parecidas (response_cache.py)
+
+import pytest
+
+from ..response_cache import ResponseCache, _terms_compatible
+from ..world_cup_data import get_data_store
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(canonicalize=get_data_store().canonical_terms)
+
+
+def test_key_ignores_accents_case_and_stopwords(cache):
+    assert cache.cache_key("¿Quién ganó el Mundial 2014?") == cache.cache_key("quien gano mundial 2014")
+
+
+def test_key_uses_canonical_entities(cache):
+    assert cache.cache_key("goles de mbape en 2018") == "goles player:mbappe 2018"
+    assert cache.cache_key("goles de Kylian Mbappé en 2018") == "goles player:mbappe 2018"
+
+
+@pytest.mark.parametrize("query", ["¿Y él cuántos goles hizo?", "mundial", "¿Quién juega hoy?"])
+def test_context_dependent_short_or_live_queries_are_not_cached(cache, query):
+    assert cache.cache_key(query) is None
+
+
+def test_typos_are_compatible():
+    assert _terms_compatible("campeon brasil 2002", "campeon brazil 2002")
+    assert _terms_compatible("maximo goleador historia", "maximo goleaddor historia")
+
+
+def test_word_order_is_not_compatible():
+    assert not _terms_compatible("country:BRA perdio contra country:GER",
+                                 "country:GER perdio contra country:BRA")
+
+
+def test_different_entities_and_words_are_not_compatible():
+    assert not _terms_compatible("goles player:messi", "goles player:mbappe")
+    assert not _terms_compatible("campeon 2014", "subcampeon 2014")
+    assert not _terms_compatible("gol 2014", "goles 2014")
+
+
+def test_different_numbers_are_not_compatible():
+    assert not _terms_compatible("quien gano 2014", "quien gano 2018")
+
+
+def test_spelling_variants_of_entity_hit_exact_key(cache):
+    cache.put("¿Cuántos títulos tiene Brasil?", "cinco")
+    assert cache.get("cuantos titulos tiene Brazil") == "cinco"
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_similar_lookup_accepts_typo(cache):
+    cache.put("¿Quién es el máximo goleador de la historia?", "Miroslav Klose")
+    assert cache.get("quien es el maximo goleaddor de la historia") == "Miroslav Klose"
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_similar_lookup_rejects_other_year(cache):
+    cache.put("¿Quién ganó el Mundial 2014?", "Alemania")
+    assert cache.get("¿Quién ganó el Mundial 2018?") is None
+    assert cache.get("¿Quién ganó el Mundial 2014?") == "Alemania"
+
+
+def test_similar_lookup_rejects_swapped_roles(cache):
+    cache.put("¿Brasil perdió contra Alemania en 2014?", "sí, 1-7")
+    assert cache.get("¿Alemania perdió contra Brasil en 2014?") is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=10, clock=clock)
+    cache.put("¿Quién ganó el Mundial 2014?", "Alemania")
+    clock.now = 11
+    assert cache.get("¿Quién ganó el Mundial 2014?") is None
+    assert cache.stats()["expirations"] == 1
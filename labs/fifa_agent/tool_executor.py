@@ -0,0 +1,130 @@
+# tool_executor.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable
+
+# Pools compartidos por proceso (uno por tipo y tamaño), creados con la primera herramienta que los usa
+_POOLS: Dict[tuple, Executor] = {}
+_POOLS_LOCK = threading.Lock()
+
+# Instancia de las herramientas en cada proceso del pool (se crea una vez por proceso)
+_WORKER_TOOLS: Dict[Callable[[], Any], Any] = {}
+
+
+def get_pool(kind: str, max_workers: int) -> Executor:
+    key = (kind, max_workers)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            if kind == "process":
+                pool = ProcessPoolExecutor(max_workers=max_workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fifa-tools")
+            _POOLS[key] = pool
+    return pool
+
+
+def _call_in_thread(tools: Any, name: str, kwargs: Dict[str, Any]) -> Any:
+    return tools.call(name, **kwargs)
+
+
+def _call_in_process(factory: Callable[[], Any], name: str, kwargs: Dict[str, Any]) -> Any:
+    tools = _WORKER_TOOLS.get(factory)
+    if tools is None:
+        # Con el dataset .wcc (mmap) cada proceso abre el archivo sin copiarlo
+        tools = _WORKER_TOOLS[factory] = factory()
+    return tools.call(name, **kwargs)
+
+
+class ToolExecutor:
+    """
+    Ejecuta las herramientas del agente con un timeout por herramienta y, para las
+    marcadas como intensivas en CPU, en un pool de hilos o de procesos.
+
+    ADK ya lanza con asyncio.gather las llamadas que el modelo pide en un mismo turno
+    y devuelve las respuestas en el orden de las llamadas; aquí se evita que una
+    herramienta lenta bloquee el event loop (y con él las demás llamadas del turno y
+    las otras sesiones) o retrase la respuesta indefinidamente. Una herramienta que
+    supera su timeout devuelve "action": "tool_timeout" para que el modelo responda
+    con lo que tenga, en lugar de fallar la invocación entera.
+
+    El timeout solo se aplica donde puede cortar algo: a las herramientas del pool y a
+    las de io_bound_tools, cuyo tools.run() espera E/S. Las demás (todo el registro de
+    FIFATools: búsquedas en memoria) se llaman en línea con tools.call(), sin wait_for ni
+    una Task por llamada: un cuerpo síncrono no se puede interrumpir, y la herramienta
+    que lo necesite va en cpu_bound_tools.
+    """
+
+    def __init__(self, tools: Any, factory: Optional[Callable[[], Any]] = None,
+                 default_timeout: float = 10.0, timeouts: Optional[Dict[str, float]] = None,
+                 cpu_bound: Optional[List[str]] = None, io_bound: Optional[List[str]] = None,
+                 executor: Optional[str] = "thread", max_workers: int = 4):
+        self._tools = tools
+        self._factory = factory or type(tools)
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.cpu_bound = set(cpu_bound or [])
+        self.io_bound = set(io_bound or [])
+        self.executor = executor
+        self.max_workers = max_workers
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_config(cls, tools: Any, config: Dict[str, Any]) -> "ToolExecutor":
+        return cls(
+            tools,
+            default_timeout=config["default_timeout_seconds"],
+            timeouts=config["timeouts"],
+            cpu_bound=config["cpu_bound_tools"],
+            io_bound=config["io_bound_tools"],
+            executor=config["cpu_executor"],
+            max_workers=config["max_workers"],
+        )
+
+    async def run(self, name: str, **kwargs: Any) -> Dict[str, Any]:
+        """Resultado de la herramienta `name` con los argumentos dados, o tool_timeout"""
+        start = time.perf_counter()
+        timeout = self.timeouts.get(name, self.default_timeout)
+        if name in self.io_bound:
+            call = self._tools.run(name, **kwargs)
+        elif name not in self.cpu_bound or not self.executor:
+            # Síncrona y en memoria: un timeout no podría cortarla
+            result = self._tools.call(name, **kwargs)
+            self._record(name, time.perf_counter() - start)
+            return result
+        else:
+            loop = asyncio.get_running_loop()
+            pool = get_pool(self.executor, self.max_workers)
+            if self.executor == "process":
+                call = loop.run_in_executor(pool, _call_in_process, self._factory, name, kwargs)
+            else:
+                call = loop.run_in_executor(pool, _call_in_thread, self._tools, name, kwargs)
+
+        try:
+            result = await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            self._record(name, time.perf_counter() - start, timed_out=True)
+            return {
+                "action": "tool_timeout",
+                "tool": name,
+                "timeout_seconds": timeout,
+                "instruction": "La herramienta no respondió a tiempo; responde con tu conocimiento interno",
+            }
+        self._record(name, time.perf_counter() - start)
+        return result
+
+    def _record(self, name: str, seconds: float, timed_out: bool = False):
+        counters = self._counters.setdefault(name, {"calls": 0, "timeouts": 0, "seconds": 0.0})
+        counters["calls"] += 1
+        counters["timeouts"] += timed_out
+        counters["seconds"] += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Llamadas, timeouts y tiempo medio por herramienta"""
+        return {
+            name: {**counters, "mean_ms": counters["seconds"] / counters["calls"] * 1000}
+            for name, counters in self._counters.items()
+        }
@@ -0,0 +1,472 @@
+# tracing.py
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List, Tuple
+
+# Límites de los histogramas de duración (segundos), como los de los SDK de OpenTelemetry
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Span activo en la tarea actual (los spans de ADK cuelgan del span de la consulta)
+_CURRENT_SPAN: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("fifa_current_span", default=None)
+
+
+class Span:
+    """Operación con nombre, inicio/fin en nanosegundos y atributos (modelo de datos de OpenTelemetry)"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes: Any):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+class _NoopSpan:
+    """Span vacío de un tracer desactivado: una sola instancia compartida, sin asignaciones"""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanScope:
+    """Context manager de Tracer.span(): activa el span en la tarea y lo cierra al salir"""
+
+    __slots__ = ("_tracer", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._token = _CURRENT_SPAN.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, traceback):
+        _CURRENT_SPAN.reset(self._token)
+        if exc is not None:
+            self._span.error = f"{type(exc).__name__}: {exc}"
+        self._tracer.end(self._span)
+        return False
+
+
+class OTelJsonExporter:
+    """
+    Escribe los spans en un archivo JSONL con el formato OTLP/JSON del file exporter
+    del OpenTelemetry Collector: una línea {"resourceSpans": [...]} por traza completa.
+
+    export() solo guarda la traza en un buffer: un hilo en segundo plano la serializa y
+    escribe cada `flush_seconds` (o antes, con `max_buffered` trazas pendientes), así que
+    la petición no paga la escritura en el event loop. Lo pendiente se escribe al salir
+    del proceso (atexit) o con flush().
+    """
+
+    def __init__(self, path: str, service_name: str = "fifa_agent", flush_seconds: float = 1.0,
+                 max_buffered: int = 512):
+        self.path = path
+        self.service_name = service_name
+        self.flush_seconds = flush_seconds
+        self.max_buffered = max_buffered
+        self._buffer: List[List[Span]] = []
+        self._lock = threading.Lock()
+        # Un solo escritor a la vez (el hilo o un flush() explícito)
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counters = {"traces": 0, "flushes": 0}
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            self._buffer.append(spans)
+            pending = len(self._buffer)
+            if self._thread is None:
+                # El hilo se arranca con la primera traza (no al construir el exportador)
+                self._thread = threading.Thread(target=self._run, name="fifa-otel-json", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        if pending >= self.max_buffered:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Escribe ya las trazas pendientes"""
+        with self._write_lock:
+            with self._lock:
+                traces, self._buffer = self._buffer, []
+            if not traces:
+                return
+            lines = [self._line(spans) for spans in traces]
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+            self._counters["traces"] += len(traces)
+            self._counters["flushes"] += 1
+
+    def _line(self, spans: List[Span]) -> str:
+        return json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "fifa_agent.tracing"}, "spans": [_otlp_span(span) for span in spans]}],
+        }]}, ensure_ascii=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "pending": len(self._buffer)}
+
+
+class PrometheusExporter:
+    """
+    Agrega los spans en métricas con formato de texto de Prometheus: histograma de
+    duración por tipo de span y contadores de tokens, llamadas, aciertos de caché y
+    errores. render() devuelve el texto; serve(port) lo publica en /metrics.
+    """
+
+    def __init__(self, namespace: str = "fifa_agent"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], List[float]] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def export(self, spans: List[Span]):
+        with self._lock:
+            for span in spans:
+                label = span.attributes.get("fifa.tool", span.attributes.get("fifa.source", ""))
+                key = (span.name, str(label))
+                bucket = self._histograms.setdefault(key, [0.0] * (len(DURATION_BUCKETS) + 2))
+                duration = span.duration_seconds
+                for i, bound in enumerate(DURATION_BUCKETS):
+                    if duration <= bound:
+                        bucket[i] += 1
+                bucket[-2] += 1
+                bucket[-1] += duration
+
+                labels = (("span", span.name),)
+                self._add("spans_total", labels, 1)
+                if span.error:
+                    self._add("span_errors_total", labels, 1)
+                for attribute, metric in (("gen_ai.usage.input_tokens", "input_tokens_total"),
+                                          ("gen_ai.usage.output_tokens", "output_tokens_total")):
+                    if attribute in span.attributes:
+                        self._add(metric, (), span.attributes[attribute])
+                if span.attributes.get("fifa.cache_hit"):
+                    self._add("cache_hits_total", labels, 1)
+
+    def _add(self, metric: str, labels: Tuple[Tuple[str, str], ...], value: float):
+        key = (metric, labels)
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def render(self) -> str:
+        prefix = self.namespace
+        lines = [f"# TYPE {prefix}_span_duration_seconds histogram"]
+        with self._lock:
+            for (name, label), bucket in sorted(self._histograms.items()):
+                labels = f'span="{name}",label="{_escape(label)}"'
+                for bound, count in zip(DURATION_BUCKETS, bucket):
+                    lines.append(f'{prefix}_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count:g}')
+                lines.append(f'{prefix}_span_duration_seconds_bucket{{{labels},le="+Inf"}} {bucket[-2]:g}')
+                lines.append(f"{prefix}_span_duration_seconds_count{{{labels}}} {bucket[-2]:g}")
+                lines.append(f"{prefix}_span_duration_seconds_sum{{{labels}}} {bucket[-1]:.6f}")
+            declared = set()
+            for (metric, labels), value in sorted(self._counters.items()):
+                if metric not in declared:
+                    lines.append(f"# TYPE {prefix}_{metric} counter")
+                    declared.add(metric)
+                rendered = ",".join(f'{key}="{_escape(value_)}"' for key, value_ in labels)
+                lines.append(f"{prefix}_{metric}{{{rendered}}} {value:g}" if rendered else f"{prefix}_{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Publica /metrics en un hilo aparte (http.server de la biblioteca estándar)"""
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = exporter.render().encode("utf-8")
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="fifa-metrics", daemon=True).start()
+        return self._server
+
+
+class Tracer:
+    """
+    Trazas por consulta del agente: un span por invocación de ADK, por llamada al
+    modelo (tokens de entrada/salida) y por llamada a herramienta (resultado y
+    acierto de caché), más los spans de la propia capa del agente (router, caché).
+
+    Los spans de ADK se registran con callbacks (instrument()), así que cubren todas
+    las herramientas, también las que se añadan después. Al cerrar la invocación se
+    anotan model_ms, tool_ms y overhead_ms (el resto: ADK, callbacks, event loop).
+
+    Desactivado, instrument() no registra ningún callback y span() devuelve un span
+    vacío compartido: el coste es una comprobación de un booleano.
+    """
+
+    def __init__(self, exporters: Optional[List[Any]] = None, enabled: bool = True, max_open: int = 4096):
+        self.exporters = exporters or []
+        self.enabled = enabled and bool(self.exporters)
+        self.max_open = max_open
+        self._open: "OrderedDict[str, Span]" = OrderedDict()
+        self._traces: Dict[str, List[Span]] = {}
+        self._invocations: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Tracer":
+        if not config["enabled"]:
+            return cls(enabled=False)
+        exporters: List[Any] = []
+        if "otel_json" in config["exporters"]:
+            exporters.append(OTelJsonExporter(config["otel_json_path"], config["service_name"],
+                                              flush_seconds=config["otel_json_flush_seconds"]))
+        if "prometheus" in config["exporters"]:
+            prometheus = PrometheusExporter(config["service_name"])
+            if config["prometheus_port"]:
+                prometheus.serve(config["prometheus_port"])
+            exporters.append(prometheus)
+        return cls(exporters)
+
+    # --- API para la capa del agente -------------------------------------------------
+
+    def span(self, name: str, **attributes: Any):
+        """Context manager con un span hijo del activo (o raíz de una traza nueva)"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _SpanScope(self, Span(name, _CURRENT_SPAN.get(), **attributes))
+
+    def start(self, name: str, **attributes: Any):
+        """
+        Span sin activar en la tarea; para generadores asíncronos, donde un contextvar
+        fijado entre dos yield quedaría activo en el código del consumidor. Se cierra con end()
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(name, _CURRENT_SPAN.get(), **attributes)
+
+    def end(self, span: Span):
+        if span is NOOP_SPAN:
+            return
+        span.end_ns = time.time_ns()
+        with self._lock:
+            trace = self._traces.setdefault(span.trace_id, [])
+            trace.append(span)
+            if span.parent_id is not None:
+                # Trazas cuya raíz nunca se cerrará (invocación interrumpida): descartar las más antiguas
+                while len(self._traces) > self.max_open:
+                    del self._traces[next(iter(self._traces))]
+                return
+            del self._traces[span.trace_id]
+        # Traza completa (se cerró la raíz): exportar todos sus spans juntos
+        for exporter in self.exporters:
+            exporter.export(trace)
+
+    def prometheus_text(self) -> str:
+        return "".join(exporter.render() for exporter in self.exporters if isinstance(exporter, PrometheusExporter))
+
+    # --- Callbacks de ADK ------------------------------------------------------------
+
+    def instrument(self, agent: Any):
+        """Registra los callbacks de trazas en el agente (no hace nada si está desactivado)"""
+        if not self.enabled:
+            return
+        agent.before_agent_callback = _append(agent.before_agent_callback, self.before_agent)
+        agent.after_agent_callback = _prepend(agent.after_agent_callback, self.after_agent)
+        # El span del modelo se abre después de los demás before_model_callback
+        # (presupuesto de prompt, compactación) para medir solo la llamada
+        agent.before_model_callback = _append(agent.before_model_callback, self.before_model)
+        agent.after_model_callback = _prepend(agent.after_model_callback, self.after_model)
+        agent.on_model_error_callback = _prepend(agent.on_model_error_callback, self.on_model_error)
+        agent.before_tool_callback = _append(agent.before_tool_callback, self.before_tool)
+        agent.after_tool_callback = _prepend(agent.after_tool_callback, self.after_tool)
+        agent.on_tool_error_callback = _prepend(agent.on_tool_error_callback, self.on_tool_error)
+
+    def before_agent(self, callback_context: Any):
+        invocation_id = callback_context.invocation_id
+        span = Span("fifa.invocation", _CURRENT_SPAN.get(), **{"fifa.agent": callback_context.agent_name})
+        self._invocations[invocation_id] = {"model": 0.0, "tool": 0.0}
+        self._start(invocation_id, span)
+        return None
+
+    def after_agent(self, callback_context: Any):
+        invocation_id = callback_context.invocation_id
+        span = self._pop(invocation_id)
+        totals = self._invocations.pop(invocation_id, None)
+        if span is not None and totals is not None:
+            end_ns = time.time_ns()
+            total_ms = (end_ns - span.start_ns) / 1e6
+            span.set("fifa.model_ms", round(totals["model"] * 1000, 3))
+            span.set("fifa.tool_ms", round(totals["tool"] * 1000, 3))
+            span.set("fifa.overhead_ms", round(max(0.0, total_ms - (totals["model"] + totals["tool"]) * 1000), 3))
+            self.end(span)
+        return None
+
+    def before_model(self, callback_context: Any, llm_request: Any):
+        parent = self._open.get(callback_context.invocation_id)
+        span = Span("fifa.model", parent, **{"gen_ai.request.model": llm_request.model or ""})
+        self._start(f"{callback_context.invocation_id}:model", span)
+        return None
+
+    def after_model(self, callback_context: Any, llm_response: Any):
+        if llm_response.partial:
+            return None
+        span = self._pop(f"{callback_context.invocation_id}:model")
+        if span is not None:
+            usage = llm_response.usage_metadata
+            if usage is not None:
+                span.set("gen_ai.usage.input_tokens", usage.prompt_token_count or 0)
+                span.set("gen_ai.usage.output_tokens", usage.candidates_token_count or 0)
+            calls = [part.function_call.name for part in (llm_response.content.parts or [])
+                     if part.function_call] if llm_response.content else []
+            if calls:
+                span.set("fifa.tool_calls", ",".join(calls))
+            self._finish(callback_context.invocation_id, "model", span)
+        return None
+
+    def on_model_error(self, callback_context: Any, llm_request: Any, error: Exception):
+        span = self._pop(f"{callback_context.invocation_id}:model")
+        if span is not None:
+            span.error = f"{type(error).__name__}: {error}"
+            self._finish(callback_context.invocation_id, "model", span)
+        return None
+
+    def before_tool(self, tool: Any, args: Dict[str, Any], tool_context: Any):
+        parent = self._open.get(tool_context.invocation_id)
+        span = Span("fifa.tool", parent, **{"fifa.tool": tool.name})
+        self._start(tool_context.function_call_id, span)
+        return None
+
+    def after_tool(self, tool: Any, args: Dict[str, Any], tool_context: Any, tool_response: Any):
+        span = self._pop(tool_context.function_call_id)
+        if span is not None:
+            if isinstance(tool_response, dict):
+                if "action" in tool_response:
+                    span.set("fifa.action", str(tool_response["action"]))
+                if "cached" in tool_response:
+                    span.set("fifa.cache_hit", bool(tool_response["cached"]))
+            self._finish(tool_context.invocation_id, "tool", span)
+        return None
+
+    def on_tool_error(self, tool: Any, args: Dict[str, Any], tool_context: Any, error: Exception):
+        span = self._pop(tool_context.function_call_id)
+        if span is not None:
+            span.error = f"{type(error).__name__}: {error}"
+            self._finish(tool_context.invocation_id, "tool", span)
+        return None
+
+    def _start(self, key: str, span: Span):
+        with self._lock:
+            self._open[key] = span
+            # Invocaciones interrumpidas sin after_agent: no acumular spans abiertos ni sus totales
+            while len(self._open) > self.max_open:
+                evicted, _ = self._open.popitem(last=False)
+                self._invocations.pop(evicted, None)
+
+    def _pop(self, key: str) -> Optional[Span]:
+        with self._lock:
+            return self._open.pop(key, None)
+
+    def _finish(self, invocation_id: str, kind: str, span: Span):
+        self.end(span)
+        totals = self._invocations.get(invocation_id)
+        if totals is not None:
+            totals[kind] += span.duration_seconds
+
+
+# Un tracer por configuración y proceso: todos los agentes escriben en el mismo archivo
+# o publican en el mismo endpoint /metrics
+_TRACERS: Dict[str, Tracer] = {}
+_TRACERS_LOCK = threading.Lock()
+
+
+def get_tracer(config: Dict[str, Any]) -> Tracer:
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _TRACERS_LOCK:
+        tracer = _TRACERS.get(key)
+        if tracer is None:
+            tracer = _TRACERS[key] = Tracer.from_config(config)
+    return tracer
+
+
+def _append(existing: Any, callback: Any) -> List[Any]:
+    if existing is None:
+        return [callback]
+    return (list(existing) if isinstance(existing, list) else [existing]) + [callback]
+
+
+def _prepend(existing: Any, callback: Any) -> List[Any]:
+    if existing is None:
+        return [callback]
+    return [callback] + (list(existing) if isinstance(existing, list) else [existing])
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
@@ -0,0 +1,248 @@
+# web_search.py
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable
+
+from .normalization import normalize_text, query_terms
+
+# Tema de una búsqueda -> patrones; el tema decide cuánto tiempo vive el resultado en caché.
+# Las noticias y resultados en vivo caducan en minutos, el estado de un jugador en horas.
+SEARCH_TOPIC_PATTERNS = {
+    "live": r"\b(en vivo|live|resultado|resultados|marcador|score|hoy|today|ahora|now)\b",
+    "news": r"\b(noticia|noticias|news|ultima|ultimas|ultimo|ultimos|latest|reciente|recientes)\b",
+    "player_status": r"\b(club|fichaje|fichajes|transferencia|transfer|lesion|lesionado|injury|injured|juega|plays)\b",
+    "tournament": r"\b(clasificacion|clasificados|eliminatorias|qualif\w*|calendario|schedule|sede|sedes|2026|2030)\b",
+}
+
+_TOPICS = [(topic, re.compile(pattern)) for topic, pattern in SEARCH_TOPIC_PATTERNS.items()]
+
+
+def search_topic(query: str) -> str:
+    text = normalize_text(query)
+    for topic, pattern in _TOPICS:
+        if pattern.search(text):
+            return topic
+    return "default"
+
+
+@dataclass
+class SearchEntry:
+    value: Dict[str, Any]
+    expires_at: float
+
+
+class GroundedSearchBackend:
+    """
+    Búsqueda con Google a través de Gemini (grounding con la herramienta google_search).
+
+    La búsqueda integrada de ADK se ejecuta en el servidor dentro de la llamada del
+    agente y no se puede interceptar; aquí se hace como una llamada aparte al mismo
+    cliente compartido, y se devuelven el resumen y las fuentes (título y URL).
+    """
+
+    def __init__(self, model: Any, max_output_tokens: int = 512):
+        self._model = model
+        self._max_output_tokens = max_output_tokens
+
+    async def search(self, query: str, max_results: int) -> Dict[str, Any]:
+        from google.genai import types
+
+        response = await self._model.api_client.aio.models.generate_content(
+            model=self._model.model,
+            contents=query,
+            config=types.GenerateContentConfig(
+                tools=[types.Tool(google_search=types.GoogleSearch())],
+                max_output_tokens=self._max_output_tokens,
+            ),
+        )
+        candidate = response.candidates[0] if response.candidates else None
+        metadata = candidate.grounding_metadata if candidate else None
+        chunks = (metadata.grounding_chunks or []) if metadata else []
+
+        # Fragmento de cada fuente: los segmentos de la respuesta que cita
+        snippets: Dict[int, List[str]] = {}
+        for support in (metadata.grounding_supports or []) if metadata else []:
+            for index in support.grounding_chunk_indices or []:
+                if support.segment and support.segment.text:
+                    snippets.setdefault(index, []).append(support.segment.text)
+
+        results = []
+        for index, chunk in enumerate(chunks):
+            if chunk.web and len(results) < max_results:
+                results.append({"title": chunk.web.title, "url": chunk.web.uri,
+                                "snippet": " ".join(snippets.get(index, []))})
+        return {"summary": response.text or "", "results": results}
+
+
+class StubSearchBackend:
+    """Backend local para pruebas: resultados deterministas, latencia fija y contador de llamadas"""
+
+    def __init__(self, fixtures: Optional[Dict[str, List[Dict[str, str]]]] = None, latency_seconds: float = 0.05):
+        self._fixtures = {normalize_text(key): value for key, value in (fixtures or {}).items()}
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    async def search(self, query: str, max_results: int) -> Dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        text = normalize_text(query)
+        for key, results in self._fixtures.items():
+            if key in text:
+                return {"summary": f"Resultados de prueba para '{query}'", "results": results[:max_results]}
+        results = [
+            {"title": f"Resultado {i + 1} para '{query}'", "url": f"https://example.com/search/{i + 1}",
+             "snippet": f"Noticias de fútbol sobre {query}"}
+            for i in range(max_results)
+        ]
+        return {"summary": f"Resultados de prueba para '{query}'", "results": results}
+
+
+class CachedWebSearch:
+    """
+    Capa de búsqueda web con caché y deduplicación.
+
+    - Single-flight: búsquedas idénticas en vuelo comparten una sola llamada al backend
+      (las ráfagas tras un partido envían cientos de búsquedas iguales en segundos).
+    - Caché LRU con TTL por tema (noticias y resultados en vivo caducan antes).
+    - Cada llamada al backend se limita a timeout segundos; si hay ranker, se piden
+      `candidates` resultados y se filtran y reordenan antes de quedarse con max_results.
+
+    Dos consultas con los mismos términos significativos ("últimas noticias FIFA",
+    "FIFA: últimas noticias") comparten entrada. Con attach_shared, los resultados se
+    comparten también entre los workers de serving.py (la deduplicación en vuelo sigue
+    siendo por proceso).
+    """
+
+    def __init__(self, backend: Any, max_results: int = 5, timeout: float = 10.0,
+                 ttl_seconds: Optional[Dict[str, float]] = None, max_entries: int = 512,
+                 ranker: Optional[Any] = None, candidates: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._backend = backend
+        self._ranker = ranker
+        self.max_results = max_results
+        self.candidates = max(candidates or max_results, max_results) if ranker else max_results
+        self.timeout = timeout
+        self.ttl_seconds = ttl_seconds or {"default": 1800}
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, SearchEntry]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._shared: Optional[Any] = None
+        self._counters = {"hits": 0, "shared_hits": 0, "misses": 0, "coalesced": 0, "errors": 0, "timeouts": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, backend: Any, config: Dict[str, Any], ranker: Optional[Any] = None) -> "CachedWebSearch":
+        return cls(
+            backend,
+            ranker=ranker,
+            candidates=config["candidate_results"],
+            max_results=config["max_results"],
+            timeout=config["timeout"],
+            ttl_seconds=config["ttl_seconds"],
+            max_entries=config["max_entries"],
+        )
+
+    def attach_shared(self, store: Any):
+        """Usa `store` (SharedCacheStore) como segundo nivel compartido entre procesos"""
+        self._shared = store
+
+    def cache_key(self, query: str) -> str:
+        terms = sorted(set(query_terms(query)))
+        return " ".join(terms) or normalize_text(query)
+
+    async def search(self, query: str) -> Dict[str, Any]:
+        """Resultados de la búsqueda (de caché, de una búsqueda en vuelo o nuevos)"""
+        key = self.cache_key(query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return dict(entry.value, cached=True)
+            del self._entries[key]
+
+        if self._shared is not None and key not in self._inflight:
+            found = self._shared.get("web_search", key)
+            if found is not None:
+                value, remaining = found
+                self._store(key, value, remaining)
+                self._counters["shared_hits"] += 1
+                return dict(value, cached=True)
+
+        task = self._inflight.get(key)
+        if task is None:
+            self._counters["misses"] += 1
+            task = asyncio.ensure_future(self._fetch(key, query))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._counters["coalesced"] += 1
+
+        try:
+            # shield: si un llamador se cancela, la búsqueda compartida sigue para los demás
+            value = await asyncio.shield(task)
+        except asyncio.TimeoutError:
+            return self._unavailable(query, "timeout")
+        except Exception as error:
+            return self._unavailable(query, f"{type(error).__name__}: {error}")
+        return dict(value, cached=False)
+
+    async def _fetch(self, key: str, query: str) -> Dict[str, Any]:
+        try:
+            found = await asyncio.wait_for(self._backend.search(query, self.candidates), self.timeout)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise
+        except Exception:
+            self._counters["errors"] += 1
+            raise
+
+        results = found.get("results", [])
+        if self._ranker is not None:
+            # Solo los resultados relevantes y de fútbol entran en el contexto del modelo
+            results = self._ranker.rank(query, results, limit=self.max_results)
+
+        topic = search_topic(query)
+        value = {
+            "action": "web_results",
+            "query": query,
+            "topic": topic,
+            "summary": found.get("summary", ""),
+            "results": results[:self.max_results],
+        }
+        ttl = self.ttl_seconds.get(topic, self.ttl_seconds["default"])
+        self._store(key, value, ttl)
+        if self._shared is not None:
+            self._shared.put("web_search", key, value, ttl)
+        return value
+
+    def _store(self, key: str, value: Dict[str, Any], ttl: float):
+        self._entries[key] = SearchEntry(value, self._clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    @staticmethod
+    def _unavailable(query: str, reason: str) -> Dict[str, Any]:
+        # No se cachea: la siguiente consulta vuelve a intentarlo
+        return {
+            "action": "search_unavailable",
+            "query": query,
+            "reason": reason,
+            "instruction": "La búsqueda no está disponible ahora; responde con tu conocimiento e indica que no pudiste verificar datos actuales",
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self._counters["hits"] + self._counters["shared_hits"] + self._counters["coalesced"]
+        lookups = saved + self._counters["misses"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "backend_calls_saved_ratio": saved / lookups if lookups else 0.0,
+        }
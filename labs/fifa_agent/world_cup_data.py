@@ -0,0 +1,623 @@
+# world_cup_data.py
+
+import hashlib
+import json
+import os
+import re
+import warnings
+from collections import defaultdict
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from .aggregates import AggregateTables
+from .columnar import ColumnarFile, writable
+from .config import DATA_CONFIG
+from .fuzzy_index import SymSpellIndex
+from .normalization import normalize_text, query_terms
+
+# Palabras clave (ya normalizadas) para interpretar el parámetro query de search_world_cup_info.
+# Se comparan términos completos, no subcadenas ("semifinal" no es "final", ni "ghost" es
+# "host"), así que se listan también los plurales; el primer tema que coincide gana
+QUERY_KEYWORDS = {
+    "runner_up": ("subcampeon", "subcampeones", "finalista", "finalistas", "runner up", "runners up",
+                  "perdio la final"),
+    "third_place": ("tercer", "tercero", "tercera", "third"),
+    "top_scorer": ("goleador", "goleadores", "bota de oro", "top scorer", "top scorers", "golden boot", "goles", "goals"),
+    "winner": ("ganador", "ganadores", "gano", "campeon", "campeones", "winner", "winners", "won", "champion",
+               "champions", "titulo", "titulos"),
+    "final": ("final", "finales"),
+    "host": ("sede", "sedes", "anfitrion", "anfitriones", "organizador", "organizo", "host", "hosts", "hosted",
+             "donde se jugo"),
+}
+
+# Las mismas palabras clave como secuencias de términos de query_terms ("bota de oro" -> bota, oro)
+_QUERY_KEYWORD_TERMS = {
+    topic: tuple(tuple(query_terms(keyword)) for keyword in keywords) for topic, keywords in QUERY_KEYWORDS.items()
+}
+
+# Temas aceptados por get_fun_facts (español/inglés) -> clave del dataset
+FUN_FACT_TOPICS = {
+    "records": "records", "record": "records", "recordes": "records",
+    "history": "history", "historia": "history", "historico": "history",
+    "players": "players", "player": "players", "jugadores": "players", "jugador": "players",
+    "finals": "finals", "final": "finals", "finales": "finals",
+    "general": "general", "curiosidades": "general",
+}
+
+# Confederaciones por nombre o región (ya normalizados) para filtrar clasificaciones
+CONFEDERATION_KEYWORDS = {
+    "uefa": "UEFA", "europa": "UEFA", "europeo": "UEFA", "europeos": "UEFA", "europe": "UEFA", "european": "UEFA",
+    "conmebol": "CONMEBOL", "sudamerica": "CONMEBOL", "sudamericano": "CONMEBOL", "sudamericanos": "CONMEBOL",
+    "south american": "CONMEBOL",
+    "concacaf": "CONCACAF", "norteamerica": "CONCACAF", "centroamerica": "CONCACAF",
+    "caf": "CAF", "africa": "CAF", "africano": "CAF", "africanos": "CAF", "african": "CAF",
+    "afc": "AFC", "asia": "AFC", "asiatico": "AFC", "asiaticos": "AFC", "asian": "AFC",
+    "ofc": "OFC", "oceania": "OFC",
+}
+
+_CONFEDERATION_PATTERN = re.compile(r"\b(" + "|".join(sorted(CONFEDERATION_KEYWORDS, key=len, reverse=True)) + r")\b")
+
+# Correcciones de erratas recordadas por store (se vacía al llenarse)
+_FUZZY_MEMO_SIZE = 4096
+
+_YEAR_PATTERN = re.compile(r"\b(19[3-9]\d|20\d\d)\b")
+_HAS_DIGIT = re.compile(r"\d")
+
+
+
+def _has_phrase(terms: List[str], phrase: Tuple[str, ...]) -> bool:
+    """True si `phrase` aparece como términos consecutivos de `terms`"""
+    size = len(phrase)
+    if size == 1:
+        return phrase[0] in terms
+    return any(tuple(terms[i:i + size]) == phrase for i in range(len(terms) - size + 1))
+
+
+class WorldCupDataStore:
+    """Índices sobre el dataset de la Copa del Mundo (de solo lectura salvo append_tournament)"""
+
+    def __init__(self, tournaments: Mapping[int, Dict[str, Any]], finals: Mapping[int, Dict[str, Any]],
+                 countries: Mapping[str, Dict[str, Any]], players: Mapping[str, Dict[str, Any]],
+                 fun_facts: Dict[str, List[str]], version: int = 1, coverage: str = "",
+                 indexes: Optional[Dict[str, Mapping]] = None, aggregates: Optional[AggregateTables] = None):
+        self.version = version
+        self.coverage = coverage
+        # Cambia con cada append_tournament: quien memoriza respuestas del store la compara
+        self.revision = 0
+
+        # Índices principales: año, código FIFA de país e id de jugador.
+        # Pueden ser dicts (JSON) o tablas columnares sobre mmap (.wcc)
+        self._tournaments = tournaments
+        self._finals = finals
+        self._countries = countries
+        self._players = players
+        self._fun_facts = fun_facts
+        # Agregados y clasificaciones materializados (ver aggregates.py); si el
+        # archivo no los trae se calculan en la primera consulta que los usa
+        self._aggregates = aggregates
+
+        # Índices de nombres normalizados (sin tildes, minúsculas) -> id canónico
+        if indexes is not None:
+            self._country_index = indexes["country_index"]
+            self._player_index = indexes["player_index"]
+            self._ambiguous_players = indexes["ambiguous_players"]
+        else:
+            self._country_index: Dict[str, str] = {}
+            for code, country in self._countries.items():
+                for name in [code, country["name"], country["name_es"], *country.get("aliases", [])]:
+                    self._country_index[normalize_text(name)] = code
+
+            self._player_index: Dict[str, str] = {}
+            self._ambiguous_players: Dict[str, List[str]] = {}
+            self._index_players()
+
+        # Índices de erratas sobre las mismas claves; se construyen en el primer nombre no encontrado.
+        # Las correcciones ya calculadas se recuerdan (los nombres mal escritos se repiten)
+        self._fuzzy_indexes: Dict[str, SymSpellIndex] = {}
+        self._fuzzy_matches: Dict[tuple, Optional[str]] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorldCupDataStore":
+        """Construye el store a partir del dataset ya parseado (dict de dicts)"""
+        return cls(
+            tournaments={t["year"]: t for t in data["tournaments"]},
+            finals={m["year"]: m for m in data.get("matches", []) if m.get("stage") == "final"},
+            countries={c["code"]: c for c in data["countries"]},
+            players={p["id"]: p for p in data["players"]},
+            fun_facts=data.get("fun_facts", {}),
+            version=data.get("version", 1),
+            coverage=data.get("coverage", ""),
+            aggregates=AggregateTables.build(data["tournaments"], data["countries"], data["players"]),
+        )
+
+    @classmethod
+    def from_json(cls, path: str) -> "WorldCupDataStore":
+        """Carga el dataset desde un archivo JSON"""
+        with open(path, encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+    @classmethod
+    def from_columnar(cls, path: str) -> "WorldCupDataStore":
+        """
+        Abre el dataset en formato columnar (.wcc) con mmap.
+
+        No parsea nada por adelantado: las filas y los índices de nombres se
+        leen del archivo mapeado solo cuando una consulta los necesita.
+        """
+        source = ColumnarFile(path)
+        store = cls(
+            tournaments=source.table("tournaments"),
+            finals=source.table("finals"),
+            countries=source.table("countries"),
+            players=source.table("players"),
+            fun_facts=source.meta.get("fun_facts", {}),
+            version=source.meta.get("version", 1),
+            coverage=source.meta.get("coverage", ""),
+            indexes={
+                name: source.table(name).values_of("value")
+                for name in ("country_index", "player_index", "ambiguous_players")
+            },
+            # Agregados como vistas sobre sus tablas del .wcc (los anteriores no las traen)
+            aggregates=AggregateTables.from_columnar(source) if "aggregate_boards" in source.meta else None,
+        )
+        # Mantener vivo el mmap mientras exista el store
+        store._source = source
+        return store
+
+    def export_indexes(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Índices de nombres como filas clave/valor, para guardarlos en el formato columnar"""
+        return {
+            name: [{"key": key, "value": value} for key, value in index.items()]
+            for name, index in (
+                ("country_index", self._country_index),
+                ("player_index", self._player_index),
+                ("ambiguous_players", self._ambiguous_players),
+            )
+        }
+
+    @property
+    def aggregates(self) -> AggregateTables:
+        """Títulos, finales y goles por país y jugador, y sus clasificaciones"""
+        if self._aggregates is None:
+            self._aggregates = AggregateTables.build(
+                self._tournaments.values(), self._countries.values(), self._players.values()
+            )
+        return self._aggregates
+
+    def append_tournament(self, tournament: Dict[str, Any], matches: Iterable[Dict[str, Any]] = (),
+                          player_stats: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+        """
+        Añade un Mundial nuevo sin recalcular el resto del dataset.
+
+        Args:
+            tournament: Fila con el formato de "tournaments" del dataset
+            matches: Partidos del torneo (se indexa la final)
+            player_stats: id de jugador -> {"goals", "matches"} en ese torneo; los jugadores
+                nuevos necesitan además "name" y "country"
+
+        Returns:
+            Clasificaciones actualizadas
+        """
+        year = tournament["year"]
+        # Los datos base pueden ser tablas de solo lectura sobre mmap: los cambios van encima
+        self._tournaments = writable(self._tournaments)
+        self._finals = writable(self._finals)
+        self._players = writable(self._players)
+        self._player_index = writable(self._player_index)
+        self._fuzzy_indexes.pop("player", None)
+        self._fuzzy_matches.clear()
+        self.revision += 1
+
+        self._tournaments[year] = tournament
+        for match in matches:
+            if match.get("stage") == "final":
+                self._finals[year] = match
+
+        stats_by_player: Dict[str, Dict[str, Any]] = {}
+        for player_id, stats in (player_stats or {}).items():
+            if player_id in self._players:
+                player = dict(self._players[player_id])
+            else:
+                player = {"id": player_id, "name": stats["name"], "country": stats["country"], "goals": 0,
+                          "matches": 0, "goals_by_year": {}, "titles": [], "highlights": []}
+                self._player_index.setdefault(normalize_text(player["name"]), player_id)
+            player["goals"] += stats.get("goals", 0)
+            player["matches"] += stats.get("matches", 0)
+            player["goals_by_year"] = {**player["goals_by_year"], str(year): stats.get("goals", 0)}
+            if player["country"] == tournament["winner"]:
+                player["titles"] = [*player["titles"], year]
+            self._players[player_id] = player
+            stats_by_player[player_id] = {**stats, "country": player["country"]}
+
+        return self.aggregates.add_tournament(tournament, stats_by_player)
+
+    def _index_players(self):
+        """Indexa nombre completo, alias y apellido; los apellidos repetidos quedan como ambiguos"""
+        surnames: Dict[str, List[str]] = defaultdict(list)
+        for player_id, player in self._players.items():
+            self._player_index[normalize_text(player["name"])] = player_id
+            surname = normalize_text(player["name"]).split()[-1]
+            surnames[surname].append(player_id)
+
+        for surname, player_ids in surnames.items():
+            if len(player_ids) == 1:
+                self._player_index.setdefault(surname, player_ids[0])
+            else:
+                self._ambiguous_players[surname] = player_ids
+
+        # Los alias explícitos tienen prioridad (ej: "Ronaldo" -> Ronaldo Nazário)
+        for player_id, player in self._players.items():
+            for alias in player.get("aliases", []):
+                key = normalize_text(alias)
+                self._player_index[key] = player_id
+                self._ambiguous_players.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # Búsquedas básicas
+    # ------------------------------------------------------------------
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(self._tournaments)
+
+    def get_tournament(self, year: int) -> Optional[Dict[str, Any]]:
+        return self._tournaments.get(year)
+
+    def resolve_country(self, name: str) -> Optional[str]:
+        """Devuelve el código FIFA del país ("Holanda" -> "NED", "Alemanía" -> "GER") o None"""
+        return self.country_for_key(normalize_text(name), fuzzy=True)
+
+    def resolve_player(self, name: str) -> Optional[str]:
+        """Devuelve el id canónico del jugador ("Mbape" -> "mbappe"; "Muller" es ambiguo y devuelve None)"""
+        return self.player_for_key(normalize_text(name), fuzzy=True)
+
+    def country_for_key(self, key: str, fuzzy: bool = False) -> Optional[str]:
+        """Como resolve_country, para claves ya normalizadas; con fuzzy=False solo coincidencias exactas"""
+        code = self._country_index.get(key)
+        if code is None and fuzzy:
+            code = self._fuzzy_match("country", key)
+        return code
+
+    def player_for_key(self, key: str, fuzzy: bool = False) -> Optional[str]:
+        """Como resolve_player, para claves ya normalizadas; con fuzzy=False solo coincidencias exactas"""
+        player_id = self._player_index.get(key)
+        if player_id is None and fuzzy:
+            player_id = self._fuzzy_match("player", key)
+        return player_id
+
+    def player_candidates(self, name: str) -> List[str]:
+        """Nombres completos de los jugadores que comparten el apellido consultado ("Muller", "Muler")"""
+        key = normalize_text(name)
+        player_ids = self._ambiguous_players.get(key)
+        if player_ids is None:
+            corrected = self._fuzzy_index("player").correct(key)
+            player_ids = self._ambiguous_players.get(corrected, []) if corrected else []
+        return [self._players[player_id]["name"] for player_id in player_ids]
+
+    def canonical_terms(self, terms: List[str]) -> List[str]:
+        """
+        Términos de una consulta con los jugadores y países sustituidos por su id canónico
+        ("player:mbappe", "country:NED"), de modo que "goles mbape" y "goles kylian mbappé"
+        o "holanda" y "paises bajos" dan la misma clave de caché
+        """
+        canonical: List[str] = []
+        position = 0
+        while position < len(terms):
+            for size in (3, 2, 1):
+                gram = " ".join(terms[position:position + size])
+                if size > 1 and position + size > len(terms):
+                    continue
+                # Erratas solo en nombres de una o dos palabras (los de tres se escriben completos)
+                entity = self._entity_for_key(gram, fuzzy=size < 3 and not _HAS_DIGIT.search(gram))
+                if entity is not None:
+                    canonical.append(entity)
+                    position += size
+                    break
+            else:
+                canonical.append(terms[position])
+                position += 1
+        return canonical
+
+    def _entity_for_key(self, key: str, fuzzy: bool) -> Optional[str]:
+        if len(key) >= 3:
+            player_id = self.player_for_key(key, fuzzy=fuzzy)
+            if player_id is not None:
+                return f"player:{player_id}"
+        # Los códigos de 3 letras ("por", "mar", "col") chocan con palabras comunes
+        if len(key) >= 4 or key == "usa":
+            code = self.country_for_key(key, fuzzy=fuzzy)
+            if code is not None:
+                return f"country:{code}"
+        return None
+
+    def _fuzzy_index(self, kind: str) -> SymSpellIndex:
+        index = self._fuzzy_indexes.get(kind)
+        if index is None:
+            if kind == "player":
+                keys = [*self._player_index, *self._ambiguous_players]
+            else:
+                keys = list(self._country_index)
+            index = self._fuzzy_indexes[kind] = SymSpellIndex(keys)
+        return index
+
+    def _fuzzy_match(self, kind: str, key: str) -> Optional[str]:
+        """Id de la clave más cercana con erratas, si todas las más cercanas son la misma entidad"""
+        memo_key = (kind, key)
+        if memo_key in self._fuzzy_matches:
+            return self._fuzzy_matches[memo_key]
+        index = self._player_index if kind == "player" else self._country_index
+        ids = {index.get(match) for match in self._fuzzy_index(kind).lookup(key)}
+        match = ids.pop() if len(ids) == 1 else None
+        if len(self._fuzzy_matches) >= _FUZZY_MEMO_SIZE:
+            self._fuzzy_matches.clear()
+        self._fuzzy_matches[memo_key] = match
+        return match
+
+    def player_name(self, player_id: str) -> str:
+        return self._players[player_id]["name"]
+
+    def country_name(self, code: str) -> str:
+        """Nombre en español del país, o el propio código si no está en el dataset"""
+        country = self._countries.get(code)
+        return country["name_es"] if country else code
+
+    # ------------------------------------------------------------------
+    # Vistas que devuelven las herramientas
+    # ------------------------------------------------------------------
+
+    def tournament_summary(self, year: int) -> Optional[Dict[str, Any]]:
+        """Resumen de un Mundial con los nombres de países ya resueltos"""
+        tournament = self._tournaments.get(year)
+        if tournament is None:
+            return None
+
+        summary = {
+            "year": year,
+            "hosts": [self.country_name(code) for code in tournament["hosts"]],
+            "winner": self.country_name(tournament["winner"]),
+            "runner_up": self.country_name(tournament["runner_up"]),
+            "third_place": self.country_name(tournament["third_place"]),
+            "teams": tournament["teams"],
+            "matches": tournament["matches"],
+            "goals": tournament["goals"],
+            "top_scorers": [
+                {"player": s["player"], "country": self.country_name(s["country"]), "goals": s["goals"]}
+                for s in tournament["top_scorers"]
+            ],
+        }
+
+        final = self._finals.get(year)
+        if final:
+            summary["final"] = {
+                "match": f"{self.country_name(final['home'])} {final['score']} {self.country_name(final['away'])}",
+                "venue": final["venue"],
+            }
+            if final.get("note"):
+                summary["final"]["note"] = final["note"]
+        return summary
+
+    def country_summary(self, code: str) -> Dict[str, Any]:
+        """Títulos, finales y participaciones de un país"""
+        country = self._countries[code]
+        results = self.aggregates.results(code)
+        titles = results["titles"]
+        runner_up = results["runner_up"]
+
+        summary = {
+            "country": country["name_es"],
+            "confederation": country["confederation"],
+            "participations": country["participations"],
+            "titles": len(titles),
+            "title_years": titles,
+            "finals": len(titles) + len(runner_up),
+            "runner_up_years": runner_up,
+            "third_place_years": results["third_place"],
+            "hosted": results["hosted"],
+        }
+
+        if titles:
+            summary["best_result"] = "campeón"
+        elif runner_up:
+            summary["best_result"] = "subcampeón"
+        elif results["third_place"]:
+            summary["best_result"] = "tercer lugar"
+        else:
+            summary["best_result"] = country.get("best_result", "sin datos")
+        return summary
+
+    def player_summary(self, player_id: str, context: str = "world_cup") -> Dict[str, Any]:
+        """Estadísticas mundialistas de un jugador; si context es un año se añaden sus goles de ese torneo"""
+        player = self._players[player_id]
+        summary = {
+            "name": player["name"],
+            "country": self.country_name(player["country"]),
+            "world_cup_goals": player["goals"],
+            "matches": player["matches"],
+            "tournaments": [int(year) for year in player["goals_by_year"]],
+            "goals_by_tournament": player["goals_by_year"],
+            "titles": player["titles"],
+            "highlights": player.get("highlights", []),
+        }
+
+        year_match = _YEAR_PATTERN.search(context or "")
+        if year_match:
+            summary["year"] = int(year_match.group(1))
+            summary["goals_in_year"] = player["goals_by_year"].get(year_match.group(1), 0)
+        return summary
+
+    def title_ranking(self, confederation: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Países campeones ordenados por número de títulos (de toda la historia o de una confederación)"""
+        board = f"titles:{confederation}" if confederation else "titles"
+        ranking = []
+        for code in self.aggregates.top(board):
+            years = self.aggregates.results(code)["titles"]
+            ranking.append({"country": self.country_name(code), "titles": len(years), "years": years})
+        return ranking
+
+    def finals_ranking(self, confederation: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Países ordenados por finales disputadas"""
+        board = f"finals:{confederation}" if confederation else "finals"
+        ranking = []
+        for code in self.aggregates.top(board):
+            results = self.aggregates.results(code)
+            ranking.append({
+                "country": self.country_name(code),
+                "finals": len(results["titles"]) + len(results["runner_up"]),
+                "won": results["titles"],
+                "lost": results["runner_up"],
+            })
+        return ranking
+
+    def top_scorers(self, limit: int = 10, confederation: Optional[str] = None,
+                    year: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Máximos goleadores del dataset: históricos, de una confederación o de un Mundial"""
+        if year is not None:
+            board = f"scorers:{year}"
+        else:
+            board = f"scorers:{confederation}" if confederation else "scorers"
+        scorers = []
+        for player_id in self.aggregates.top(board, limit):
+            player = self._players[player_id]
+            entry = {"player": player["name"], "country": self.country_name(player["country"])}
+            if year is not None:
+                entry["goals"] = player["goals_by_year"][str(year)]
+            else:
+                entry.update(goals=player["goals"], matches=player["matches"])
+            scorers.append(entry)
+        return scorers
+
+    def fun_facts(self, topic: str = "general") -> List[str]:
+        key = FUN_FACT_TOPICS.get(normalize_text(topic), "general")
+        return self._fun_facts.get(key, [])
+
+    # ------------------------------------------------------------------
+    # Consultas de alto nivel usadas por FIFATools / FIFAToolsEnhanced
+    # ------------------------------------------------------------------
+
+    def info_request(self, query: str, year: Optional[int] = None) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+        """
+        (año, tema, confederación) que determinan la respuesta de lookup_world_cup_info:
+        "goleador 2014" y "¿quién fue el máximo goleador en 2014?" piden lo mismo
+        """
+        normalized = normalize_text(query or "")
+        if year is None:
+            year_match = _YEAR_PATTERN.search(normalized)
+            year = int(year_match.group(1)) if year_match else None
+
+        terms = query_terms(normalized)
+        topic = next(
+            (name for name, phrases in _QUERY_KEYWORD_TERMS.items() if any(_has_phrase(terms, p) for p in phrases)),
+            None,
+        )
+        # La confederación solo cuenta en los listados históricos (sin año)
+        confederation_match = _CONFEDERATION_PATTERN.search(normalized) if year is None else None
+        confederation = CONFEDERATION_KEYWORDS[confederation_match.group(1)] if confederation_match else None
+        return year, topic, confederation
+
+    def lookup_world_cup_info(self, query: str, year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Responde search_world_cup_info desde el dataset.
+
+        Returns:
+            Diccionario con los datos encontrados, o None si la consulta no se
+            puede responder localmente (ej: un Mundial posterior a 2022)
+        """
+        year, topic, confederation = self.info_request(query, year)
+        if year is not None:
+            summary = self.tournament_summary(year)
+            if summary is None:
+                return None
+            result = {"tournament": summary}
+            if topic == "top_scorer":
+                result["answer"] = summary["top_scorers"]
+            elif topic == "final":
+                result["answer"] = summary.get("final")
+            elif topic == "host":
+                result["answer"] = summary["hosts"]
+            elif topic is not None:
+                result["answer"] = summary[topic]
+            return result
+
+        # Sin año: listados históricos (de una confederación si la consulta la menciona)
+        if topic == "winner":
+            if confederation:
+                return {"confederation": confederation, "answer": self.title_ranking(confederation)}
+            return {"answer": self.title_ranking(), "champions_by_year": {
+                y: self.country_name(t["winner"]) for y, t in sorted(self._tournaments.items())
+            }}
+        if topic == "top_scorer":
+            if confederation:
+                return {"confederation": confederation, "answer": self.top_scorers(confederation=confederation)}
+            return {"answer": self.top_scorers()}
+        if topic in ("runner_up", "final"):
+            result = {"answer": self.finals_ranking(confederation)}
+            return {"confederation": confederation, **result} if confederation else result
+        if topic == "host":
+            return {"answer": {
+                y: [self.country_name(code) for code in t["hosts"]] for y, t in sorted(self._tournaments.items())
+            }}
+        return None
+
+    def lookup_player(self, player_name: str, context: str = "world_cup") -> Optional[Dict[str, Any]]:
+        player_id = self.resolve_player(player_name)
+        if player_id is None:
+            return None
+        return {"statistics": self.player_summary(player_id, context)}
+
+    def lookup_country(self, country: str) -> Optional[Dict[str, Any]]:
+        code = self.resolve_country(country)
+        if code is None:
+            return None
+        return {"performance": self.country_summary(code), "title_ranking": self.title_ranking()}
+
+
+def dataset_digest(path: str) -> str:
+    """SHA-256 del JSON del dataset (convert_dataset lo guarda en el .wcc como source_sha256)"""
+    with open(path, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def dataset_fingerprint(path: str) -> Dict[str, Any]:
+    """Tamaño, fecha de modificación y SHA-256 del JSON, para el header del .wcc"""
+    stat = os.stat(path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns, "source_sha256": dataset_digest(path)}
+
+
+def columnar_matches_source(meta: Dict[str, Any], path: str) -> bool:
+    """
+    Si el .wcc (su header, `meta`) se generó a partir del JSON `path`. Solo con stat():
+    otro tamaño es otro archivo, y mismo tamaño y fecha es el mismo. El JSON se lee y se
+    hashea únicamente si coincide el tamaño pero no la fecha (un checkout o una copia)
+    """
+    stat = os.stat(path)
+    if meta.get("source_size") != stat.st_size:
+        return False
+    if meta.get("source_mtime_ns") == stat.st_mtime_ns:
+        return True
+    return meta.get("source_sha256") == dataset_digest(path)
+
+
+@lru_cache(maxsize=None)
+def get_data_store() -> WorldCupDataStore:
+    """
+    Instancia compartida del dataset; se carga una sola vez por proceso, en el primer uso.
+
+    Si existe la versión columnar (.wcc) se abre con mmap, de modo que los workers
+    comparten las páginas y el arranque no depende del tamaño del dataset. Solo se usa
+    si se generó a partir del JSON configurado: con otro FIFA_DATASET_PATH, o si el JSON
+    cambió sin regenerar el .wcc, se avisa y se carga el JSON. La comprobación compara
+    tamaño y fecha del JSON con los del header (ver columnar_matches_source).
+    """
+    json_path, columnar_path = DATA_CONFIG["dataset_path"], DATA_CONFIG["columnar_path"]
+    if os.path.exists(columnar_path):
+        store = WorldCupDataStore.from_columnar(columnar_path)
+        if not DATA_CONFIG["verify_columnar"] or not os.path.exists(json_path):
+            return store
+        if columnar_matches_source(store._source.meta, json_path):
+            return store
+        warnings.warn(
+            f"{columnar_path} no se generó a partir de {json_path}: se carga el JSON. "
+            f"Regenera el .wcc con `python -m fifa_agent.convert_dataset {json_path}`"
+        )
+    return WorldCupDataStore.from_json(json_path)
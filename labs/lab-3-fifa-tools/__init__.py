@@ -1,2 +1,12 @@
 # Lab 3: FIFA Agent con Herramientas de Búsqueda Web
-from . import agent
\ No newline at end of file
+#
+# root_agent y el módulo agent se cargan al primer acceso (ver fifa_agent/__init__.py)
+import importlib
+
+
+def __getattr__(name: str):
+    if name == "root_agent":
+        return importlib.import_module(".agent", __name__).root_agent
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,35 +1,45 @@
 # agent.py
 
 import asyncio
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, Optional, AsyncIterator
 from google.adk import Agent
-from google.adk.models.google_llm import Gemini
-from google.adk.tools import google_search
-from .config import MODEL_CONFIG, AGENT_CONFIG, SYSTEM_PROMPT
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import Runner
+from google.adk.tools.google_search_tool import GoogleSearchTool
+from fifa_agent.adk_tools import build_tools
+from fifa_agent.response_cache import ResponseCache
+from fifa_agent.intent_router import IntentRouter
+from fifa_agent.model_backend import get_model
+from fifa_agent.model_tiering import ModelTiering
+from fifa_agent.prefetch import FollowUpPrefetcher
+from fifa_agent.context_window import ContextCompactor
+from fifa_agent.prompt_budget import PromptBudget
+from fifa_agent.streaming import StreamingResponder
+from fifa_agent.batch_runner import run_adk_query, record_exchange
+from fifa_agent.tracing import Tracer, get_tracer
+from fifa_agent.tool_executor import ToolExecutor
+from fifa_agent.relevance import RelevanceRanker
+from fifa_agent.session_store import CompactSessionService
+from fifa_agent.web_search import CachedWebSearch, GroundedSearchBackend, StubSearchBackend
+from fifa_agent.world_cup_data import get_data_store
+from .config import (MODEL_CONFIG, MODEL_POLICY_CONFIG, MODEL_TIERS_CONFIG, AGENT_CONFIG, SYSTEM_PROMPT,
+                     SYSTEM_PROMPT_SECTIONS, RESPONSE_CACHE_CONFIG, ROUTER_CONFIG, PROMPT_BUDGET_CONFIG, STREAMING_CONFIG,
+                     WEB_SEARCH_CONFIG, RELEVANCE_CONFIG, CONTEXT_WINDOW_CONFIG, TRACING_CONFIG,
+                     TOOL_EXECUTION_CONFIG, PREFETCH_CONFIG, SESSION_STORE_CONFIG)
 from .fifa_tools_enhanced import FIFAToolsEnhanced
 
 class FIFAWorldCupAgentPlus(Agent):
     """Agente FIFA con herramientas mejoradas y Google Search"""
     
-    def __init__(self):
-        # Configurar el modelo Gemini
-        model_kwargs = {
-            "model": MODEL_CONFIG["model_name"],
-            "location": MODEL_CONFIG["location"],
-            "temperature": MODEL_CONFIG["temperature"],
-            "max_tokens": MODEL_CONFIG["max_output_tokens"]
-        }
-        
-        # Usar API key o project_id según lo disponible
-        if MODEL_CONFIG["api_key"]:
-            model_kwargs["api_key"] = MODEL_CONFIG["api_key"]
-        elif MODEL_CONFIG["project_id"]:
-            model_kwargs["project_id"] = MODEL_CONFIG["project_id"]
-        
-        model = Gemini(**model_kwargs)
-        
-        # Inicializar herramientas FIFA
-        self._fifa_tools = FIFAToolsEnhanced()
+    def __init__(self, model: Optional[BaseLlm] = None, search_backend: Optional[Any] = None):
+        # Modelo inyectable; por defecto, uno por nivel de MODEL_TIERS_CONFIG según el tipo
+        # de consulta, compartidos por el proceso (una sola instancia y un solo pool de
+        # conexiones por modelo para todos los agentes) y cada uno con su política de hedge
+        tiering = ModelTiering.from_config(MODEL_TIERS_CONFIG, MODEL_CONFIG, MODEL_POLICY_CONFIG, model=model)
+        model = tiering.model
         
         # Configurar el agente con herramientas registradas
         super().__init__(
@@ -37,23 +47,213 @@ class FIFAWorldCupAgentPlus(Agent):
             description=AGENT_CONFIG["description"],
             model=model,
             instruction=SYSTEM_PROMPT,
-            tools=[google_search]  # Register google_search tool
+            # google_search integrada junto a las herramientas del dataset: ADK la ejecuta como
+            # subagente, porque Gemini no combina la búsqueda nativa con function calling
+            tools=[GoogleSearchTool(bypass_multi_tools_limit=True)] if WEB_SEARCH_CONFIG["mode"] == "native" else []
+        )
+        
+        # Inicializar herramientas FIFA y caché después de super().__init__()
+        # (Pydantic descarta los atributos privados asignados antes)
+        self._ranker = RelevanceRanker.from_config(RELEVANCE_CONFIG)
+        self._fifa_tools = FIFAToolsEnhanced(ranker=self._ranker)
+        # Timeout por herramienta y pool para las intensivas en CPU
+        self._tool_executor = ToolExecutor.from_config(self._fifa_tools, TOOL_EXECUTION_CONFIG)
+        # Clave de caché con los jugadores y países ya resueltos: las erratas comparten entrada
+        self._response_cache = ResponseCache.from_config(RESPONSE_CACHE_CONFIG, get_data_store().canonical_terms)
+        
+        # Búsquedas web con caché por tema y deduplicación de búsquedas idénticas en vuelo
+        if search_backend is None:
+            if WEB_SEARCH_CONFIG["backend"] == "stub" or MODEL_CONFIG["backend"] == "fake":
+                search_backend = StubSearchBackend()
+            else:
+                # La búsqueda usa el cliente de Gemini directamente: el del modelo de MODEL_CONFIG
+                # (sin niveles ni política), que el registro comparte con el principal del agente
+                search_backend = GroundedSearchBackend(get_model(MODEL_CONFIG))
+        self._web_search = CachedWebSearch.from_config(
+            search_backend, WEB_SEARCH_CONFIG, self._ranker if RELEVANCE_CONFIG["enabled"] else None
         )
+        if WEB_SEARCH_CONFIG["mode"] != "native":
+            # Misma herramienta (google_search) para el modelo, pero con caché y deduplicación
+            self.tools.append(self.google_search)
+        
+        # Herramientas (y, si se activa, búsquedas) de las preguntas de seguimiento probables
+        self._prefetcher = FollowUpPrefetcher.from_config(
+            self._tool_executor.run, PREFETCH_CONFIG,
+            search=self._web_search.search, search_key=self._web_search.cache_key,
+        )
+        # Sin prefetch, router y herramientas llaman directamente al ejecutor
+        tool_call = self._prefetcher.run if self._prefetcher.enabled else self._tool_executor.run
+        self._router = IntentRouter.from_config(self._fifa_tools, ROUTER_CONFIG, call=tool_call)
+        
+        # Enviar al modelo solo las secciones del prompt relevantes para cada consulta
+        self._prompt_budget = PromptBudget.from_config(SYSTEM_PROMPT_SECTIONS, PROMPT_BUDGET_CONFIG, self._router.classify)
+        # Compactar el historial de sesiones largas (ventana de turnos + resumen de los antiguos);
+        # va después del presupuesto de prompt para medir la instrucción ya recortada
+        self._context_window = ContextCompactor.from_config(CONTEXT_WINDOW_CONFIG)
+        # Modelo, tope de salida y herramientas del nivel de la consulta (tras el presupuesto
+        # de prompt, cuyo max_output_tokens limita)
+        self._model_tiering = tiering
+        # Clasifica con el router solo si prompt_budget no dejó la intención (desactivado)
+        self._model_tiering.classify = self._router.classify
+        self.before_model_callback = [
+            self._prompt_budget.before_model_callback,
+            self._model_tiering.before_model_callback,
+            self._context_window.before_model_callback,
+        ]
+        # Una pregunta sobre otras entidades cancela los prefetch pendientes
+        self.before_agent_callback = [self._prefetcher.before_agent_callback]
+        self._tracer = get_tracer(TRACING_CONFIG)
+        # Sesiones en bytes (memoria, SQLite o ficheros); solo las activas se deserializan
+        self._session_service = CompactSessionService.from_config(SESSION_STORE_CONFIG)
+        self._streaming = StreamingResponder(
+            self, self._router if ROUTER_CONFIG["enabled"] else None, self._response_cache,
+            tracer=self._tracer, session_service=self._session_service,
+            session_id=SESSION_STORE_CONFIG["cli_session_id"], observe=self._prefetcher.observe,
+            history_size=STREAMING_CONFIG["history_size"],
+        )
+        # Runner de process_query, creado con la primera consulta que llega al modelo
+        self._runner: Optional[Runner] = None
+        
+        # Herramientas del registro de FIFATools (las mismas que en fifa_agent): declaraciones
+        # generadas una vez y llamadas que van directas al prefetch o al ejecutor
+        self.tools.extend(build_tools(self._fifa_tools, tool_call))
+        
+        # Spans de modelo y herramientas (al final: deben ver todos los callbacks y herramientas)
+        self._tracer.instrument(self)
     
     @property
     def fifa_tools(self):
         """Property access to FIFA tools for backward compatibility"""
         return self._fifa_tools
+    
+    @property
+    def response_cache(self) -> ResponseCache:
+        """Caché de respuestas; stats() expone aciertos, tasa de acierto y latencia ahorrada"""
+        return self._response_cache
+    
+    @property
+    def router(self) -> IntentRouter:
+        """Router determinista; stats() expone cuántas consultas se resolvieron sin el modelo"""
+        return self._router
+    
+    @property
+    def tool_executor(self) -> ToolExecutor:
+        """Ejecución de herramientas; stats() expone llamadas, timeouts y tiempo medio por herramienta"""
+        return self._tool_executor
+    
+    @property
+    def prefetcher(self) -> FollowUpPrefetcher:
+        """Prefetch de seguimientos; stats() expone la proporción de aciertos"""
+        return self._prefetcher
+    
+    @property
+    def prompt_budget(self) -> PromptBudget:
+        """Presupuesto de prompt; stats() expone los tokens de entrada ahorrados por petición"""
+        return self._prompt_budget
+    
+    @property
+    def model_tiering(self) -> ModelTiering:
+        """Niveles de modelo; stats() expone peticiones por nivel y el coste del clasificador"""
+        return self._model_tiering
+    
+    @property
+    def context_window(self) -> ContextCompactor:
+        """Compactación del historial; stats() expone los tokens de historial ahorrados por petición"""
+        return self._context_window
+    
+    @property
+    def tracer(self) -> Tracer:
+        """Trazas de modelo y herramientas (TRACING_CONFIG); sin coste si están desactivadas"""
+        return self._tracer
+    
+    @property
+    def streaming(self) -> StreamingResponder:
+        """Respuestas en streaming; last_metrics y stats() exponen el TTFT y la latencia total"""
+        return self._streaming
+    
+    @property
+    def session_service(self) -> CompactSessionService:
+        """Sesiones de conversación persistentes (SESSION_STORE_CONFIG); stats() expone cargas y bytes"""
+        return self._session_service
+    
+    @property
+    def web_search(self) -> CachedWebSearch:
+        """Búsqueda web; stats() expone aciertos de caché, búsquedas deduplicadas y timeouts"""
+        return self._web_search
+    
+    async def google_search(self, query: str) -> Dict[str, Any]:
+        """
+        Busca en Google información actualizada sobre fútbol: noticias, resultados,
+        estado actual de jugadores, clasificatorias y próximos torneos.
+        
+        Args:
+            query: Términos de búsqueda
+        
+        Returns:
+            Resumen de la búsqueda y fuentes (título y URL)
+        """
+        return await self._prefetcher.search(query)
 
     
     async def process_enhanced_query(self, query: str, context: Dict[str, Any]) -> str:
         """
         Procesa consultas permitiendo que el modelo decida cuándo usar google_search
+        (`context` guarda entre consultas el id de la conversación, "session_id")
+        """
+        with self._tracer.span("fifa.query") as span:
+            # La conversación de `context` (con la primera consulta se abre una y su id queda en él)
+            session_id = context.setdefault("session_id", SESSION_STORE_CONFIG["cli_session_id"] or uuid.uuid4().hex)
+            # Pregunta nueva de la sesión: cancela los prefetch de entidades que ya no menciona
+            self._prefetcher.observe(query, session_id)
+            # Las preguntas factuales simples se responden con el dataset local sin llamar al modelo
+            if ROUTER_CONFIG["enabled"]:
+                answer = await self._router.answer(query)
+                if answer is not None:
+                    span.set("fifa.source", "router")
+                    # En el historial, para las preguntas de seguimiento que lleguen al modelo
+                    await record_exchange(self._get_runner(), query, answer, "cli_user", session_id)
+                    return answer
+            
+            computed = False
+            
+            async def compute() -> str:
+                nonlocal computed
+                computed = True
+                return await self._run_model(query, session_id)
+            
+            # Las preguntas repetidas se sirven desde la caché; las que necesitan
+            # google_search (2024-2025, noticias, club actual) nunca se cachean
+            # El modelo decidirá si usar google_search basándose en las instrucciones del sistema
+            response = await self._response_cache.get_or_compute(query, compute)
+            span.set("fifa.source", "model" if computed else "cache")
+            span.set("fifa.cache_hit", not computed)
+            if not computed:
+                await record_exchange(self._get_runner(), query, response, "cli_user", session_id)
+            return response
+    
+    async def _run_model(self, query: str, session_id: str) -> str:
+        """Respuesta del modelo por el Runner de ADK, en la sesión persistente `session_id`"""
+        return await run_adk_query(self._get_runner(), query, user_id="cli_user", session_id=session_id)
+    
+    def _get_runner(self) -> Runner:
+        # El Runner se crea con la primera consulta que lo necesita
+        if self._runner is None:
+            self._runner = Runner(
+                app_name="fifa_cli", agent=self, session_service=self._session_service,
+                artifact_service=InMemoryArtifactService(), memory_service=InMemoryMemoryService(),
+            )
+        return self._runner
+    
+    def stream_enhanced_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """
+        Igual que process_enhanced_query, pero genera el texto a medida que el modelo
+        lo produce (también tras usar google_search)
         """
-        # Simplemente pasar la consulta al modelo con contexto mínimo
-        # El modelo decidirá si usar google_search basándose en las instrucciones del sistema
-        response = await self.run(query, context)
-        return response
+        session_id = None
+        if context is not None:
+            # La misma conversación que process_enhanced_query con ese `context`
+            session_id = context.setdefault("session_id", SESSION_STORE_CONFIG["cli_session_id"] or uuid.uuid4().hex)
+        return self._streaming.stream(query, session_id)
 
 async def main():
     """Función principal adaptada para gemini-2.5-flash"""
@@ -78,7 +278,10 @@ async def main():
     print("• 'Datos curiosos sobre la Copa del Mundo'")
     print("• '¿Cuál fue el mejor Mundial de la historia?'")
     print()
-    print("Escribe 'salir' para terminar.\n")
+    if SESSION_STORE_CONFIG["cli_session_id"]:
+        # La conversación vive en el almacén de sesiones: un reinicio la retoma donde quedó
+        print(f"💾 Conversación '{SESSION_STORE_CONFIG['cli_session_id']}' "
+              f"(almacén {SESSION_STORE_CONFIG['backend']})\n")
     
     while True:
         try:
@@ -94,8 +297,20 @@ async def main():
             print("🤖 Gemini 2.5 Flash con herramientas procesando...")
             
             # Usar el agente con herramientas FIFA y Google Search
-            response = await agent.process_enhanced_query(query, context)
-            print(f"🏆 Experto FIFA: {response}\n")
+            if STREAMING_CONFIG["enabled"]:
+                # Mostrar la respuesta a medida que llega en lugar de esperar al texto completo
+                print("🏆 Experto FIFA: ", end="", flush=True)
+                async for chunk in agent.stream_enhanced_query(query, context):
+                    print(chunk, end="", flush=True)
+                print()
+                if STREAMING_CONFIG["show_timings"]:
+                    metrics = agent.streaming.last_metrics
+                    print(f"⏱️  Primer token: {metrics.ttft_seconds * 1000:.0f} ms | "
+                          f"Total: {metrics.total_seconds * 1000:.0f} ms ({metrics.source})")
+                print()
+            else:
+                response = await agent.process_enhanced_query(query, context)
+                print(f"🏆 Experto FIFA: {response}\n")
             
         except KeyboardInterrupt:
             print("\n👋 ¡Hasta luego!")
@@ -108,9 +323,17 @@ def get_agent():
     """Función requerida por ADK Web para obtener el agente adaptado"""
     return FIFAWorldCupAgentPlus()
 
+def __getattr__(name: str):
+    """
+    root_agent perezoso para ADK Web: el agente se construye la primera vez que
+    se accede a él (no al importar el módulo) y se reutiliza después
+    """
+    if name == "root_agent":
+        agent = get_agent()
+        globals()["root_agent"] = agent
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 if __name__ == "__main__":
     # Ejecutar en modo CLI
     asyncio.run(main())
-else:
-    # Ejecutar en modo ADK Web
-    root_agent = get_agent()
\ No newline at end of file
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# batch_eval.py - Ejecuta un lote de preguntas (JSONL) contra FIFAWorldCupAgentPlus
+#
+# Desde labs/:
+#   python -m lab-3-fifa-tools.batch_eval preguntas.jsonl -o resultados.jsonl
+#
+# Cada línea de entrada es {"id"?: ..., "query": "..."}; cada línea de salida añade
+# answer, source (router/cache/model), latency_seconds o error. Los resultados se
+# escriben en orden de finalización, no de entrada (usa "id" para emparejarlos).
+
+import argparse
+import asyncio
+import sys
+
+from fifa_agent.batch_runner import BatchRunner, read_jsonl
+from .agent import FIFAWorldCupAgentPlus
+from .config import BATCH_CONFIG
+
+
+async def run_batch(input_path: str, output_path: str, config: dict):
+    agent = FIFAWorldCupAgentPlus()
+    runner = BatchRunner.from_config(agent, config)
+
+    with open(output_path, "w", encoding="utf-8") as output:
+        stats = await runner.run(read_jsonl(input_path), output)
+
+    print(f"✅ {stats['completed']} respuestas, {stats['failed']} errores en {stats['elapsed_seconds']:.1f} s", file=sys.stderr)
+    print(f"   Llamadas al modelo: {stats['model_calls']} | Reintentos: {stats['retries']}", file=sys.stderr)
+    print(f"   Router: {agent.router.stats()} | Caché: hit_rate {agent.response_cache.stats()['hit_rate']:.2f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lote de preguntas contra FIFA World Cup Agent Plus")
+    parser.add_argument("input", help="JSONL con una pregunta por línea ({\"query\": ...})")
+    parser.add_argument("-o", "--output", default="resultados.jsonl")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONFIG["concurrency"])
+    parser.add_argument("--rpm", type=float, default=BATCH_CONFIG["requests_per_minute"],
+                        help="Peticiones por minuto permitidas al modelo")
+    args = parser.parse_args()
+
+    config = dict(BATCH_CONFIG, concurrency=args.concurrency, requests_per_minute=args.rpm)
+    asyncio.run(run_batch(args.input, args.output, config))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,68 @@ MODEL_CONFIG = {
     "location": "us-central1",
     "temperature": 0.7,
     "max_output_tokens": 1500,
+    # Pool HTTP del cliente compartido (ver model_backend.get_model)
+    "connection_pool": {
+        "max_connections": 100,
+        "max_keepalive_connections": 50,
+        "keepalive_expiry_seconds": 120,
+    },
+    # "gemini" o "fake" (ScriptedModel local, para pruebas y carga sin endpoint)
+    "backend": os.getenv("FIFA_MODEL_BACKEND", "gemini"),
+    "fake": {
+        "ttft_median_ms": 500,
+        "ttft_sigma": 0.5,
+        "token_delay_ms": 10,
+        "error_rate": 0.0,
+        "seed": None,
+    },
+}
+
+# Política de peticiones al modelo para la latencia de cola (ver model_policy.py)
+MODEL_POLICY_CONFIG = {
+    "enabled": True,
+    "deadline_seconds": 30.0,         # Plazo de cada petición al modelo, contando todos los intentos
+    "attempt_timeout_seconds": 15.0,  # Sin primera respuesta en este tiempo se pasa a la reserva
+    # Petición duplicada tras el p95 del principal: mismo modelo en otra región
+    # (con API key la región no aplica y el duplicado va al mismo endpoint)
+    "hedge": {"location": "us-east1"},
+    "hedge_percentile": 0.95,
+    "hedge_min_delay_seconds": 0.05,
+    "hedge_initial_delay_seconds": 2.0,   # Hasta tener hedge_min_samples latencias
+    "hedge_min_samples": 20,
+    "hedge_budget": 0.1,              # Como mucho un 10% de peticiones duplicadas
+    "fallback": {"model_name": "gemini-2.5-flash-lite"},  # Más barato, si nadie responde a tiempo
+}
+
+# Herramientas del dataset local (todas menos google_search)
+DATASET_TOOLS = ["search_world_cup_info", "get_player_statistics", "get_country_performance", "get_fun_facts"]
+
+# Modelo, presupuesto de salida y herramientas según el tipo de consulta (ver model_tiering.py)
+MODEL_TIERS_CONFIG = {
+    "enabled": True,
+    # Nivel -> sobrescrituras de MODEL_CONFIG ({} = el modelo por defecto), tope de tokens
+    # de salida y herramientas declaradas al modelo (None = todas, [] = ninguna); el perfil
+    # de prompt_budget de sus intenciones solo debe describir las herramientas declaradas
+    "tiers": {
+        "factoid":   {"model": {"model_name": "gemini-2.0-flash",
+                                "fake": {**MODEL_CONFIG["fake"], "ttft_median_ms": 300}},
+                      "max_output_tokens": 500, "tools": DATASET_TOOLS},
+        "statistic": {"model": {"model_name": "gemini-2.0-flash",
+                                "fake": {**MODEL_CONFIG["fake"], "ttft_median_ms": 300}},
+                      "max_output_tokens": 800, "tools": DATASET_TOOLS},
+        "analysis":  {"model": {}, "max_output_tokens": MODEL_CONFIG["max_output_tokens"], "tools": None},
+        "current":   {"model": {}, "max_output_tokens": 1000, "tools": None},  # Con google_search
+    },
+    # Intenciones de IntentRouter.classify() -> nivel (las no listadas usan default_tier)
+    "intent_tiers": {
+        "winner": "factoid", "runner_up": "factoid", "third_place": "factoid", "host": "factoid",
+        "final": "factoid", "fun_facts": "factoid",
+        "top_scorer": "statistic", "most_titles": "statistic", "player_goals": "statistic",
+        "player_profile": "statistic", "country_titles": "statistic",
+        "analysis": "analysis",
+        "current": "current",
+    },
+    "default_tier": "analysis",       # Consulta no reconocida: el modelo completo, con google_search
 }
 
 # Configuración del agente
@@ -25,31 +87,178 @@ WEB_SEARCH_CONFIG = {
     "max_results": 5,
     "timeout": 10,
     "user_agent": "FIFA-Agent-ADK/2.0",
+    # "cached": google_search pasa por fifa_agent/web_search.py (caché + deduplicación);
+    # "native": la herramienta google_search integrada de ADK, sin caché
+    "mode": os.getenv("FIFA_SEARCH_MODE", "cached"),
+    "backend": os.getenv("FIFA_SEARCH_BACKEND", "grounded"),  # o "stub" (local, para pruebas)
+    "max_entries": 512,
+    "candidate_results": 10,     # Resultados pedidos al backend antes del ranking (se quedan max_results)
+    # Vida en caché por tema de la búsqueda (segundos)
+    "ttl_seconds": {
+        "live": 60,              # Resultados y marcadores en vivo
+        "news": 300,             # Noticias recientes
+        "player_status": 3600,   # Club actual, lesiones, fichajes
+        "tournament": 6 * 3600,  # Clasificación, calendario y sedes
+        "default": 1800,
+    },
 }
 
-# Prompt del sistema adaptado para gemini-2.5-flash con google_search
-SYSTEM_PROMPT = """
-Eres un experto en la Copa Mundial de la FIFA con conocimiento extensivo desde 1930 hasta 2022.
+# Ranking de resultados de búsqueda (ver fifa_agent/relevance.py): BM25 de los términos de la
+# consulta más un bonus por palabra clave importante; se descartan los que no son de fútbol
+RELEVANCE_CONFIG = {
+    "enabled": True,
+    "football_keywords": [
+        "fifa", "world cup", "copa mundial", "football", "soccer", "futbol",
+        "player", "jugador", "goal", "gol", "team", "equipo", "champion",
+        "campeon", "tournament", "torneo", "match", "partido",
+        "seleccion", "mundial", "eliminatorias", "qualifier",
+    ],
+    "important_keywords": ["fifa", "world cup", "copa mundial"],
+    "important_boost": 2.0,
+    "k1": 1.2,                   # Saturación de la frecuencia de término (BM25)
+    "b": 0.75,                   # Normalización por longitud del fragmento (BM25)
+    "require_football": True,
+    "min_score": 0.0,
+}
+
+# Caché de respuestas (ver response_cache.py)
+RESPONSE_CACHE_CONFIG = {
+    "max_entries": 1024,
+    "ttl_seconds": 6 * 3600,          # Los datos históricos no cambian; las noticias nunca se cachean
+    "similarity_threshold": 0.8,      # Coeficiente de Dice mínimo entre trigramas
+    "min_terms": 2,                   # "¿y en 2018?" depende del turno anterior: no se cachea
+    "canonical_entities": True,       # Jugadores/países por id canónico en la clave ("mbape" = "Mbappé")
+}
+
+# Router determinista previo al modelo (ver intent_router.py)
+ROUTER_CONFIG = {
+    "enabled": True,
+    "min_confidence": 0.75,           # Por debajo de este valor la consulta va a Gemini
+}
+
+# Ejecución de herramientas: timeouts y pool para las intensivas en CPU (ver tool_executor.py)
+TOOL_EXECUTION_CONFIG = {
+    "default_timeout_seconds": 10.0,  # Tras el timeout la herramienta devuelve "tool_timeout"
+    "timeouts": {},                   # Timeout por herramienta, ej: {"get_player_statistics": 2.0}
+    "cpu_bound_tools": [],            # Herramientas ejecutadas en el pool (no bloquean el event loop)
+    "io_bound_tools": [],             # Herramientas cuyo tools.run() espera E/S (las demás, sin timeout)
+    "cpu_executor": "thread",         # "thread", "process" o None (siempre en el event loop)
+    "max_workers": 4,
+}
+
+# Prefetch especulativo de las herramientas de la siguiente pregunta (ver prefetch.py)
+PREFETCH_CONFIG = {
+    "enabled": True,
+    "max_concurrency": 2,             # Prefetch en ejecución a la vez (nunca compiten con la respuesta)
+    "max_pending": 16,                # Resultados prefetcheados guardados (en curso o listos)
+    "max_per_call": 3,                # Seguimientos previstos por cada llamada a herramienta
+    "ttl_seconds": 300,               # Un prefetch no usado en este tiempo se descarta
+    "timeout_seconds": 2.0,
+    "web_search": False,              # Búsquedas web de actualidad especulativas (gastan cuota)
+}
+
+# Presupuesto de prompt por intención (ver prompt_budget.py)
+PROMPT_BUDGET_CONFIG = {
+    "enabled": True,
+    # Perfil -> secciones de SYSTEM_PROMPT_SECTIONS enviadas y límite de tokens de salida.
+    # Cada perfil describe solo las herramientas que declara el nivel de MODEL_TIERS_CONFIG
+    # de sus intenciones: factoid y statistic llevan las del dataset (tools), sin la
+    # búsqueda web (search, protocol, closing)
+    "profiles": {
+        "factoid":   {"sections": ["identity", "tools", "format"], "max_output_tokens": 500},
+        "player":    {"sections": ["identity", "specialties", "tools", "format"], "max_output_tokens": 800},
+        "country":   {"sections": ["identity", "specialties", "tools", "format"], "max_output_tokens": 800},
+        "fun_facts": {"sections": ["identity", "specialties", "tools", "format"], "max_output_tokens": 800},
+        "analysis":  {"sections": ["identity", "capabilities", "specialties", "tools", "search", "format", "examples",
+                                   "closing"], "max_output_tokens": 1500},
+        "current":   {"sections": ["identity", "tools", "search", "protocol", "format", "closing"],
+                      "max_output_tokens": 1000},
+        "general":   {"sections": None, "max_output_tokens": MODEL_CONFIG["max_output_tokens"]},  # None = prompt completo
+    },
+    # Intenciones de IntentRouter.classify() -> perfil (las no listadas usan "general")
+    "intent_profiles": {
+        "winner": "factoid", "runner_up": "factoid", "third_place": "factoid", "host": "factoid",
+        "final": "factoid", "top_scorer": "factoid", "most_titles": "factoid",
+        "player_goals": "player", "player_profile": "player",
+        "country_titles": "country",
+        "fun_facts": "fun_facts",
+        "analysis": "analysis",
+        "current": "current",
+    },
+}
 
-CAPACIDADES PRINCIPALES:
+# Ejecución de lotes de preguntas (ver batch_eval.py y fifa_agent/batch_runner.py)
+BATCH_CONFIG = {
+    "concurrency": 16,                # Consultas en vuelo a la vez
+    "requests_per_minute": 600,       # Cuota del modelo (token bucket)
+    "max_retries": 5,                 # Reintentos ante 429/5xx
+    "backoff_base_seconds": 1.0,      # Backoff exponencial con jitter completo
+    "backoff_max_seconds": 60.0,
+}
+
+# Compactación del historial en sesiones largas (ver context_window.py)
+CONTEXT_WINDOW_CONFIG = {
+    "enabled": True,
+    "window_turns": 4,                # Turnos recientes enviados completos (sin payloads de herramientas)
+    "max_input_tokens": 8000,         # Presupuesto por petición: prompt + resumen + historial
+    "summary_max_tokens": 600,        # Tamaño máximo del resumen de los turnos antiguos
+    "summary_line_chars": 240,        # Longitud máxima de cada línea pregunta/respuesta del resumen
+}
+
+# Trazas por consulta: spans de modelo y herramientas (ver tracing.py)
+TRACING_CONFIG = {
+    "enabled": os.getenv("FIFA_TRACING", "0") == "1",   # Desactivado: sin callbacks ni coste
+    "exporters": os.getenv("FIFA_TRACING_EXPORTERS", "otel_json").split(","),  # "otel_json", "prometheus"
+    "otel_json_path": os.getenv("FIFA_TRACE_FILE", "fifa_traces.jsonl"),
+    "otel_json_flush_seconds": 1.0,   # Las trazas se escriben por lotes desde un hilo aparte
+    "prometheus_port": int(os.getenv("FIFA_METRICS_PORT", "0")),  # 0 = sin servidor /metrics
+    "service_name": "fifa_agent_plus",
+}
+
+# Respuestas en streaming en el modo CLI (ver streaming.py)
+STREAMING_CONFIG = {
+    "enabled": True,
+    "show_timings": True,             # Mostrar tiempo al primer token y latencia total
+    "history_size": 1024,             # Consultas recientes para los percentiles de stats()
+}
+
+# Sesiones de conversación persistentes (ver session_store.py)
+SESSION_STORE_CONFIG = {
+    "backend": os.getenv("FIFA_SESSION_BACKEND", "memory"),  # "memory", "sqlite" o "file"
+    "sqlite_path": os.getenv("FIFA_SESSION_DB", "fifa_sessions.sqlite"),
+    "file_directory": os.getenv("FIFA_SESSION_DIR", "fifa_sessions"),
+    "max_active": 256,                # Sesiones deserializadas en memoria; el resto se guarda en bytes
+    "cli_session_id": os.getenv("FIFA_SESSION_ID", ""),  # "" = conversación nueva en cada arranque
+}
+
+# Prompt del sistema adaptado para gemini-2.5-flash con google_search
+# Dividido en secciones para que prompt_budget.py envíe solo las relevantes para cada
+# consulta; SYSTEM_PROMPT es el prompt completo (todas las secciones en orden)
+SYSTEM_PROMPT_SECTIONS = {
+    "identity": """Eres un experto en la Copa Mundial de la FIFA con conocimiento extensivo desde 1930 hasta 2022.""",
+    "capabilities": """CAPACIDADES PRINCIPALES:
 ✓ Historia completa de todas las Copas del Mundo (1930-2022)
 ✓ Estadísticas de jugadores legendarios y equipos
 ✓ Récords históricos y datos curiosos
 ✓ Análisis de rendimiento por países
 ✓ Conocimiento de los Mundiales más recientes (Qatar 2022, Rusia 2018, Brasil 2014, etc.)
-✓ Acceso a información actualizada vía Google Search cuando sea necesario
-
-ESPECIALIDADES:
+✓ Acceso a información actualizada vía Google Search cuando sea necesario""",
+    "specialties": """ESPECIALIDADES:
 📊 Estadísticas detalladas: goleadores, asistencias, records
 🏆 Rendimiento de países: títulos, finales, participaciones
 🎯 Datos curiosos: anécdotas, récords únicos, momentos históricos
 ⚽ Jugadores icónicos: Pelé, Maradona, Ronaldo, Messi, Mbappé
-🌍 Análisis por regiones: América, Europa, África, Asia
-
-HERRAMIENTAS DISPONIBLES:
+🌍 Análisis por regiones: América, Europa, África, Asia""",
+    "tools": """HERRAMIENTAS DISPONIBLES:
+📚 Dataset local de Mundiales (si devuelven action "local_data", son datos verificados: respóndelos tal cual):
+- search_world_cup_info(query, year): Ganador, final, goleador o sede de un Mundial
+- get_player_statistics(player_name, context): Estadísticas de un jugador en Mundiales
+- get_country_performance(country): Títulos y participaciones de un país
+- get_fun_facts(topic): Datos curiosos y récords""",
+    "search": """BÚSQUEDA WEB:
 🔍 google_search: Para información actualizada de 2024-2025, noticias recientes, estados actuales de jugadores, etc.
-
-PROTOCOLO DE BÚSQUEDA:
+- Si usas google_search, combina la información encontrada con tu conocimiento""",
+    "protocol": """PROTOCOLO DE BÚSQUEDA:
 1. PRIMERO: Usa tu conocimiento interno extensivo para responder
 2. SI NO TIENES la información específica o es sobre eventos de 2024-2025: USA google_search inmediatamente
 3. Situaciones donde DEBES usar google_search:
@@ -57,21 +266,19 @@ PROTOCOLO DE BÚSQUEDA:
    - Noticias de FIFA o fútbol actuales
    - Estado actual de jugadores (club, lesiones, transferencias)
    - Próximos torneos o eventos de FIFA
-   - Información que claramente no está en tu conocimiento base
-
-FORMATO DE RESPUESTA:
+   - Información que claramente no está en tu conocimiento base""",
+    "format": """FORMATO DE RESPUESTA:
 - Responde con confianza usando tu conocimiento extensivo
 - Proporciona datos específicos y estadísticas precisas
 - Incluye contexto histórico relevante
-- Mantén un tono experto y entusiasta sobre el fútbol
-- Si usas google_search, combina la información encontrada con tu conocimiento
-
-EJEMPLOS DE TU CONOCIMIENTO:
+- Mantén un tono experto y entusiasta sobre el fútbol""",
+    "examples": """EJEMPLOS DE TU CONOCIMIENTO:
 • Copa del Mundo 2022: Argentina campeón, Messi ganó su primer Mundial
 • Copa del Mundo 2018: Francia campeón, Mbappé joven estrella
 • Goleadores históricos: Miroslav Klose (16 goles), Ronaldo (15), Müller (14)
 • Países con más títulos: Brasil (5), Alemania (4), Italia (4), Argentina (3)
-• Records únicos: Brasil único pentacampeón, Pelé único tricampeón como jugador
+• Records únicos: Brasil único pentacampeón, Pelé único tricampeón como jugador""",
+    "closing": """IMPORTANTE: Si la consulta requiere información que no tienes o es sobre eventos posteriores a 2022, usa google_search inmediatamente para obtener datos actualizados.""",
+}
 
-IMPORTANTE: Si la consulta requiere información que no tienes o es sobre eventos posteriores a 2022, usa google_search inmediatamente para obtener datos actualizados.
-"""
\ No newline at end of file
+SYSTEM_PROMPT = "\n" + "\n\n".join(SYSTEM_PROMPT_SECTIONS.values()) + "\n"
\ No newline at end of file
@@ -1,57 +1,22 @@
 # fifa_tools_enhanced.py
 
-import asyncio
 from typing import Dict, Any, Optional, List
-from datetime import datetime
-from google.adk.tools import google_search
+from fifa_agent.fifa_tools import FIFATools
+from fifa_agent.relevance import RelevanceRanker
+from fifa_agent.world_cup_data import WorldCupDataStore
 
-class FIFAToolsEnhanced:
-    """Herramientas mejoradas que incluyen búsqueda web para información actualizada"""
+class FIFAToolsEnhanced(FIFATools):
+    """
+    Herramientas mejoradas que incluyen búsqueda web para información actualizada.
     
-    def __init__(self):
-        pass
+    Las herramientas del dataset local (y su registro) son las de FIFATools; aquí solo
+    se añade el ranking de resultados web y los métodos deprecados.
+    """
     
-    async def search_world_cup_info(self, query: str, year: Optional[int] = None) -> Dict[str, Any]:
-        """
-        Permite a Gemini buscar información específica sobre Mundiales.
-        """
-        return {
-            "action": "use_gemini_knowledge",
-            "query": query,
-            "year": year,
-            "instruction": "Usa tu conocimiento interno sobre la Copa del Mundo para responder esta consulta específica"
-        }
-    
-    async def get_player_statistics(self, player_name: str, context: str = "world_cup") -> Dict[str, Any]:
-        """
-        Permite a Gemini proporcionar estadísticas de jugadores.
-        """
-        return {
-            "action": "use_gemini_knowledge",
-            "player": player_name,
-            "context": context,
-            "instruction": "Proporciona estadísticas detalladas de este jugador en Copas del Mundo usando tu conocimiento interno"
-        }
-    
-    async def get_country_performance(self, country: str) -> Dict[str, Any]:
-        """
-        Permite a Gemini proporcionar información sobre el rendimiento de países.
-        """
-        return {
-            "action": "use_gemini_knowledge",
-            "country": country,
-            "instruction": "Proporciona información completa sobre el rendimiento de este país en Copas del Mundo"
-        }
-    
-    async def get_fun_facts(self, topic: str = "general") -> Dict[str, Any]:
-        """
-        Permite a Gemini compartir datos curiosos sobre la Copa del Mundo.
-        """
-        return {
-            "action": "use_gemini_knowledge",
-            "topic": topic,
-            "instruction": "Comparte datos curiosos e interesantes sobre la Copa del Mundo relacionados con este tema"
-        }
+    def __init__(self, data_store: Optional[WorldCupDataStore] = None, ranker: Optional[RelevanceRanker] = None):
+        # Dataset local compartido con fifa_agent (una sola copia por proceso)
+        super().__init__(data_store)
+        self._ranker = ranker or RelevanceRanker()
     
     async def search_web_info(self, query: str, max_results: int = 3) -> Dict[str, Any]:
         """
@@ -68,31 +33,19 @@ class FIFAToolsEnhanced:
         }
     
     
+    def rank_search_results(self, query: str, results: List[Dict[str, Any]],
+                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Filtra los resultados que no son de fútbol y los ordena por relevancia (todo el lote a la vez)"""
+        return self._ranker.rank(query, results, limit)
+    
     def _is_football_related(self, text: str) -> bool:
         """Verifica si el texto está relacionado con fútbol/FIFA"""
-        football_keywords = [
-            'fifa', 'world cup', 'copa mundial', 'football', 'soccer', 'futbol',
-            'player', 'jugador', 'goal', 'gol', 'team', 'equipo', 'champion',
-            'campeón', 'tournament', 'torneo', 'match', 'partido'
-        ]
-        
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in football_keywords)
+        return self._ranker.is_football_related(text)
     
     def _calculate_relevance(self, text: str, query: str) -> float:
-        """Calcula un score de relevancia básico"""
-        text_lower = text.lower()
-        query_lower = query.lower()
-        
-        # Puntuación base por palabras clave de la consulta
-        query_words = query_lower.split()
-        relevance_score = sum(1 for word in query_words if word in text_lower)
-        
-        # Bonus por palabras clave importantes
-        important_keywords = ['fifa', 'world cup', 'copa mundial']
-        relevance_score += sum(2 for keyword in important_keywords if keyword in text_lower)
-        
-        return relevance_score
+        """Calcula el score de relevancia (BM25 + bonus por palabras clave importantes)"""
+        scores, _ = self._ranker.score(query, [text])
+        return float(scores[0])
     
     
     async def get_current_fifa_news(self, topic: str = "world cup") -> Dict[str, Any]:
@@ -1,37 +1,47 @@
 #!/usr/bin/env python3
 # test_simple.py - Prueba simple del agente FIFA con gemini-2.0-flash-exp
+#
+# Desde labs/: python -m lab-3-fifa-tools.test_simple
 
 import asyncio
-from agent import FIFAWorldCupAgentPlus
+import io
+import json
+
+from fifa_agent.batch_runner import BatchRunner
+from .agent import FIFAWorldCupAgentPlus
+from .config import BATCH_CONFIG
 
 async def test_basic_queries():
     """Prueba básica del agente FIFA sin function calling"""
-    
+
     agent = FIFAWorldCupAgentPlus()
-    context = {}
-    
+
     test_queries = [
         "¿Quién ganó la Copa del Mundo 2022?",
         "¿Cuántas Copas del Mundo ha ganado Brasil?",
         "¿Quién es el máximo goleador en la historia de los Mundiales?",
         "Dame un dato curioso sobre la Copa del Mundo"
     ]
-    
+
     print("🏆 Probando FIFA World Cup Agent con Gemini 2.0 Flash Exp")
     print("=" * 60)
-    
-    for i, query in enumerate(test_queries, 1):
-        print(f"\n{i}. Pregunta: {query}")
+
+    # Las preguntas se ejecutan en paralelo con el runner de lotes (cuota y reintentos incluidos)
+    runner = BatchRunner.from_config(agent, BATCH_CONFIG)
+    output = io.StringIO()
+    await runner.run(({"id": i, "query": query} for i, query in enumerate(test_queries, 1)), output)
+    results = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["id"])
+
+    for result in results:
+        print(f"\n{result['id']}. Pregunta: {result['query']}")
         print("-" * 40)
-        
-        try:
-            response = await agent.run(query, context)
-            print(f"Respuesta: {response}")
-            
-        except Exception as e:
-            print(f"❌ Error: {e}")
-        
+
+        if "error" in result:
+            print(f"❌ Error: {result['error']}")
+        else:
+            print(f"Respuesta: {result['answer']}")
+
         print()
 
 if __name__ == "__main__":
-    asyncio.run(test_basic_queries())
\ No newline at end of file
+    asyncio.run(test_basic_queries())